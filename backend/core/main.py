@@ -4,33 +4,51 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from backend.routes.ws import router as ws_router
+from backend.state import store
 from backend.state.store import StateSingleton
 
 DUMP_INTERVAL_SECONDS = 6000
+# How often the compactor looks at the journal, and how large the journal may
+# grow before it is folded into the checkpoint ahead of the dump interval.
+COMPACTION_CHECK_SECONDS = 30
+JOURNAL_COMPACTION_BYTES = 4 * 1024 * 1024
 
 
 async def _periodic_dump(stop_event: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    last_dump = loop.time()
     while True:
         try:
             await asyncio.wait_for(
                 stop_event.wait(),
-                timeout=DUMP_INTERVAL_SECONDS,
+                timeout=COMPACTION_CHECK_SECONDS,
             )
             return
         except TimeoutError:
             pass
-        StateSingleton.dumpState()
+        if (
+            loop.time() - last_dump < DUMP_INTERVAL_SECONDS
+            and StateSingleton.journalSize() < JOURNAL_COMPACTION_BYTES
+        ):
+            continue
+        from backend.features.state_sync.service import state_sync_service
+
+        await state_sync_service.compact_checkpoint()
+        last_dump = loop.time()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     state = StateSingleton.initializeState()
-    from backend.features.augmentations.service import (
-        synchronize_equipment_augmentations_mutation,
-    )
+    from backend.features.state_sync.patch_log import PatchLog, patch_log_directory
+    from backend.features.state_sync.service import state_sync_service
 
-    if synchronize_equipment_augmentations_mutation(state):
-        StateSingleton.dumpState()
+    state_sync_service.attach_patch_log(
+        PatchLog(patch_log_directory(store.STATE_PATH)),
+        state_version=StateSingleton.stateVersion(),
+    )
+    if state_sync_service.synchronize_state(state):
+        await asyncio.wrap_future(StateSingleton.scheduleDump())
     stop_event = asyncio.Event()
     task = asyncio.create_task(_periodic_dump(stop_event))
     try:
@@ -38,7 +56,7 @@ async def lifespan(app: FastAPI):
     finally:
         stop_event.set()
         await task
-        StateSingleton.dumpState()
+        await asyncio.wrap_future(StateSingleton.scheduleDump())
 
 
 def create_app() -> FastAPI:
@@ -4,7 +4,7 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any, Generic, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 from backend.core.request_context import build_request_source, request_source_context
 from backend.features.session.models import SessionRole, WebSocketSession
@@ -25,6 +25,21 @@ class MalformedRequestError(RegistryError):
     """Raised when the request payload is missing routing information."""
 
 
+def validation_error_message(exc: ValidationError) -> str:
+    errors = exc.errors(include_url=False)
+    if not errors:
+        return "Invalid request payload"
+
+    formatted_errors: list[str] = []
+    for error in errors:
+        location = ".".join(str(part) for part in error["loc"])
+        if location:
+            formatted_errors.append(f"{location}: {error['msg']}")
+        else:
+            formatted_errors.append(str(error["msg"]))
+    return "; ".join(formatted_errors)
+
+
 @dataclass(frozen=True)
 class ClientGenerationMetadata:
     namespace: str
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any
+
+# Distinct paths kept interned. Past this the table starts over; paths already
+# handed out stay valid, they just stop being shared with new ones.
+STATE_PATH_INTERN_LIMIT = 65536
+
+
+class StatePath(str):
+    """A state path parsed once into its decoded segments and root.
+
+    It compares, hashes and serializes as its text, so it can go anywhere a
+    path string is expected. Build paths with `parse_state_path` or
+    `join_state_path`, which intern them; copies are the same object.
+    """
+
+    segments: tuple[str, ...]
+    root: str | None
+
+    def __copy__(self) -> StatePath:
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> StatePath:
+        return self
+
+    def __reduce__(self) -> tuple[Any, tuple[str]]:
+        return parse_state_path, (str(self),)
+
+
+_interned: dict[str, StatePath] = {}
+
+
+def encode_segment(segment: str) -> str:
+    return segment.replace("~", "~0").replace("/", "~1")
+
+
+def decode_segment(segment: str) -> str:
+    return segment.replace("~1", "/").replace("~0", "~")
+
+
+def parse_state_path(path: str) -> StatePath:
+    """The interned path for `path`, which must start with `/`."""
+    if isinstance(path, StatePath):
+        return path
+    interned = _interned.get(path)
+    if interned is not None:
+        return interned
+    if not path.startswith("/"):
+        raise ValueError(f"State path must start with '/': {path}")
+    if path == "/":
+        return _intern(path, ())
+    return _intern(path, tuple(decode_segment(segment) for segment in path[1:].split("/")))
+
+
+@lru_cache(maxsize=STATE_PATH_INTERN_LIMIT)
+def join_state_path(*segments: str) -> StatePath:
+    """The interned path addressing `segments`, encoding each one."""
+    text = "/" + "/".join(encode_segment(segment) for segment in segments)
+    return _interned.get(text) or _intern(text, segments)
+
+
+def _intern(text: str, segments: tuple[str, ...]) -> StatePath:
+    path = StatePath(text)
+    path.segments = segments
+    path.root = segments[0] if segments else None
+    if len(_interned) >= STATE_PATH_INTERN_LIMIT:
+        _interned.clear()
+    _interned[text] = path
+    return path
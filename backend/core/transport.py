@@ -5,6 +5,8 @@ from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
+from backend.core.state_path import StatePath, parse_state_path
+
 SocketGroup = Literal["dms", "players"]
 
 
@@ -19,10 +21,21 @@ class ResponseModel:
 
 @dataclass
 class PatchOp:
+    """One patch operation. Valid paths are held as interned `StatePath`s."""
+
     op: Literal["set", "inc", "add", "remove"]
     path: str
     value: Any | None = None
 
+    def __post_init__(self) -> None:
+        # Malformed paths stay plain strings and fail where they are resolved.
+        if not isinstance(self.path, StatePath) and self.path.startswith("/"):
+            self.path = parse_state_path(self.path)
+
+    @property
+    def segments(self) -> tuple[str, ...]:
+        return parse_state_path(self.path).segments
+
 
 @dataclass
 class Error(ResponseModel):
@@ -0,0 +1,146 @@
+"""Measure formula evaluation through expanded text against compiled formulas,
+and sheet-by-sheet evaluation against one batch over many template copies."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from collections.abc import Callable
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+from backend.dev.seed import seed_state
+from backend.features.formula_runtime.service import (
+    FormulaBatch,
+    evaluate_bound_formula,
+    evaluate_numeric_expression,
+    evaluate_resource_maxima,
+    evaluate_resource_maxima_batch,
+    evaluate_sheet_stats,
+    evaluate_sheet_stats_batch,
+)
+from backend.features.sheet_admin.sheets.service import build_instanced_sheet_from_template
+from backend.state.models.formula import Formula
+from backend.state.models.state import State
+from backend.state.store import StateSingleton
+
+
+def _subjects(state: State) -> list[Any]:
+    """Every seeded template, and every instance that carries its own stats."""
+    return [
+        *state.sheets.values(),
+        *(instance for instance in state.instanced_sheets.values() if instance.stats),
+    ]
+
+
+def _formulas(subjects: list[Any]) -> list[tuple[Any, Formula]]:
+    return [
+        (subject, value)
+        for subject in subjects
+        for value in [*vars(subject.stats).values(), subject.max_health, subject.max_mana]
+        if isinstance(value, Formula)
+    ]
+
+
+def _outcome(evaluate: Callable[[], Any]) -> tuple[str, Any]:
+    try:
+        return "result", evaluate()
+    except (ArithmeticError, SyntaxError, TypeError, ValueError) as exc:
+        return "error", f"{type(exc).__name__}: {exc}"
+
+
+def _per_call_us(calls: list[Callable[[], Any]], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for call in calls:
+            _outcome(call)
+    return (time.perf_counter() - started) / (rounds * len(calls)) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--copies", type=int, default=40)
+    args = parser.parse_args()
+
+    original_state = StateSingleton._state
+    try:
+        with TemporaryDirectory(prefix=".benchmark-") as directory:
+            state = asyncio.run(seed_state(Path(directory) / "state_dumpy.json"))
+    finally:
+        StateSingleton._state = original_state
+
+    subjects = _subjects(state)
+    formulas = _formulas(subjects)
+    text_calls = [
+        lambda root=root, formula=formula: evaluate_numeric_expression(
+            formula.expand_formula(root)
+        )
+        for root, formula in formulas
+    ]
+    compiled_calls = [
+        lambda root=root, formula=formula: evaluate_bound_formula(formula.bind(root))
+        for root, formula in formulas
+    ]
+
+    # Same seed, same rolls: both paths must agree on every value and error.
+    for text_call, compiled_call in zip(text_calls, compiled_calls, strict=True):
+        random.seed(0)
+        expected = _outcome(text_call)
+        random.seed(0)
+        if _outcome(compiled_call) != expected:
+            raise SystemExit(f"Compiled evaluation disagrees with text: {expected}")
+
+    text = _per_call_us(text_calls, args.rounds)
+    compiled = _per_call_us(compiled_calls, args.rounds)
+    print(
+        f"{len(formulas)} seeded formulas: text {text:.1f} us, "
+        f"compiled {compiled:.1f} us per evaluation ({text / compiled:.1f}x)"
+    )
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for subject in subjects:
+            evaluate_sheet_stats(subject)
+            evaluate_resource_maxima(subject)
+    elapsed = (time.perf_counter() - started) / (args.rounds * len(subjects)) * 1000
+    print(f"{len(subjects)} seeded sheets: stats and maxima {elapsed:.3f} ms per sheet")
+
+    # Encounter-style copies of every template, as one batch or one by one.
+    copies = [
+        build_instanced_sheet_from_template(template, parent_sheet_id=template_id)
+        for template_id, template in state.sheets.items()
+        for _ in range(args.copies)
+    ]
+    for index, copy in enumerate(copies):
+        for stat_name, value in vars(copy.stats).items():
+            if isinstance(value, int) and not isinstance(value, bool):
+                setattr(copy.stats, stat_name, value + index % 7)
+
+    def one_by_one() -> list[Any]:
+        return [(evaluate_sheet_stats(copy), evaluate_resource_maxima(copy)) for copy in copies]
+
+    def batched() -> list[Any]:
+        batch = FormulaBatch(copies)
+        maxima = evaluate_resource_maxima_batch(copies, batch=batch)
+        return list(zip(evaluate_sheet_stats_batch(copies, batch=batch), maxima, strict=True))
+
+    if batched() != one_by_one():
+        raise SystemExit("Batched evaluation disagrees with evaluating each sheet alone.")
+    rounds = max(1, args.rounds // 10)
+    timings = []
+    for evaluate in (one_by_one, batched):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            evaluate()
+        timings.append((time.perf_counter() - started) / (rounds * len(copies)) * 1000)
+    print(
+        f"{len(copies)} template copies: one by one {timings[0]:.3f} ms, "
+        f"batched {timings[1]:.3f} ms per sheet ({timings[0] / timings[1]:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Measure the per-frame cost of validated and direct server-event serialization."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import Callable
+from copy import deepcopy
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+from pydantic_core import to_jsonable_python
+
+from backend.core.transport import PatchOp
+from backend.dev.seed import seed_state
+from backend.features.state_sync.service import build_state_patch, state_sync_service
+from backend.protocol.socket import _validate_server_event
+from backend.state.models.state import State
+from backend.state.store import StateSingleton
+
+
+def _enlarge(state: State, copies: int) -> State:
+    """Clone every template and instance so the snapshot approaches table size."""
+    enlarged = deepcopy(state)
+    for index in range(1, copies):
+        for sheet_id, sheet in state.sheets.items():
+            clone = deepcopy(sheet)
+            clone.id = f"{sheet_id}_copy_{index}"
+            enlarged.sheets[clone.id] = clone
+        for instance_id, instance in state.instanced_sheets.items():
+            enlarged.instanced_sheets[f"{instance_id}_copy_{index}"] = deepcopy(instance)
+    return enlarged
+
+
+def _per_frame_ms(encode: Callable[[Any], Any], event: Any, frames: int) -> float:
+    started = time.perf_counter()
+    for _ in range(frames):
+        json.dumps(encode(event), separators=(",", ":"), ensure_ascii=False)
+    return (time.perf_counter() - started) / frames * 1000
+
+
+async def _events(copies: int) -> dict[str, Any]:
+    with TemporaryDirectory(prefix=".benchmark-") as directory:
+        state = await seed_state(Path(directory) / "state_dumpy.json")
+    StateSingleton._state = _enlarge(state, copies)
+    await state_sync_service.reset()
+    instances = StateSingleton.getState().instanced_sheets
+    instance_id, instance = next(iter(instances.items()))
+    patch = build_state_patch(
+        [
+            PatchOp(
+                op="set",
+                path=state_sync_service.join_path("instanced_sheets", instance_id),
+                value=instance,
+            )
+        ],
+        state_version=1,
+    )
+    # A patch the size of a large encounter spawn: every instance added at once.
+    spawn = build_state_patch(
+        [
+            PatchOp(
+                op="add",
+                path=state_sync_service.join_path("instanced_sheets", instance_id),
+                value=instance,
+            )
+            for instance_id, instance in instances.items()
+        ],
+        state_version=2,
+    )
+    return {"patch": patch, "spawn patch": spawn}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=20)
+    args = parser.parse_args()
+
+    original_state = StateSingleton._state
+    try:
+        events = asyncio.run(_events(args.copies))
+    finally:
+        StateSingleton._state = original_state
+    for name, event in events.items():
+        size = len(json.dumps(to_jsonable_python(event)))
+        validated = _per_frame_ms(_validate_server_event, event, args.frames)
+        direct = _per_frame_ms(to_jsonable_python, event, args.frames)
+        print(
+            f"{name}: {size / 1024:.0f} KiB, validated {validated:.2f} ms/frame, "
+            f"direct {direct:.2f} ms/frame ({validated / direct:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
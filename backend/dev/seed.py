@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+import json
 from copy import deepcopy
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -45,21 +46,35 @@ class _SeedWebSocket:
     async def send_json(self, payload: dict[str, Any]) -> None:
         self.sent_messages.append(payload)
 
+    async def send_text(self, data: str) -> None:
+        await self.send_json(json.loads(data))
 
-async def _send_authoring_request(
+
+async def _send_authoring_requests(
     websocket: _SeedWebSocket,
-    payload: dict[str, Any],
+    requests: list[dict[str, Any]],
 ) -> None:
     start = len(websocket.sent_messages)
-    await handle_client_payload(websocket, payload)
+    await handle_client_payload(
+        websocket,
+        {"type": "batch", "requests": requests, "request_id": "seed-batch"},
+    )
     responses = websocket.sent_messages[start:]
     errors = [response for response in responses if response.get("type") == "error"]
     if errors:
+        raise RuntimeError(f"Seed batch failed: {errors[0].get('reason')}")
+    completed = [
+        response for response in responses if response.get("type") == "batch_completed"
+    ]
+    if not completed:
+        raise RuntimeError("Seed batch returned no response.")
+    failed = [
+        result for result in completed[0]["results"] if result["status"] == "failed"
+    ]
+    if failed:
         raise RuntimeError(
-            f"Seed request '{payload['type']}' failed: {errors[0].get('reason')}"
+            f"Seed request '{failed[0]['request_type']}' failed: {failed[0]['reason']}"
         )
-    if not responses:
-        raise RuntimeError(f"Seed request '{payload['type']}' returned no response.")
 
 
 def _add_seed_access_codes(state: State) -> None:
@@ -134,19 +149,23 @@ async def _build_seed_checkpoint(build_path: Path) -> State:
 
     websocket = _SeedWebSocket()
     await websocket_sessions.connect(websocket, role="dm")
+    # One batch: a single transaction, journal write and patch for the
+    # whole authoring sequence.
+    requests: list[dict[str, Any]] = []
     for index, request in enumerate(
         authoring_requests(mana_manipulation_effect_bonus=7),
         start=1,
     ):
         payload = deepcopy(request)
         payload["request_id"] = f"seed-{index:03d}"
-        await _send_authoring_request(websocket, payload)
+        requests.append(payload)
+    await _send_authoring_requests(websocket, requests)
 
     def add_access_codes(state: State) -> None:
         _add_seed_access_codes(state)
 
     await state_sync_service.apply_private_mutation(add_access_codes)
-    seeded_state = store_module._load_checkpoint(build_path)
+    seeded_state = store_module._load_persisted_state(build_path)
     if seeded_state is None:
         raise RuntimeError("The temporary seed checkpoint could not be reloaded.")
     _validate_seed_state(seeded_state)
@@ -167,7 +186,7 @@ async def seed_state(target_path: Path | None = None) -> State:
             seeded_state = await _build_seed_checkpoint(build_path)
 
         store_module.STATE_PATH = target
-        StateSingleton.replaceState(seeded_state)
+        await StateSingleton.replaceStateAsync(seeded_state)
         installed_state = store_module._load_checkpoint(target)
         if installed_state is None:
             raise RuntimeError("The installed seed checkpoint could not be reloaded.")
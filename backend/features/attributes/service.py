@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from copy import deepcopy
+from collections.abc import Collection
+from copy import copy, deepcopy
+from typing import TypeVar
 
 from backend.core.transport import PatchOp
 from backend.features.attributes.schema import (
@@ -45,9 +47,11 @@ from backend.state.models.attribute import (
     validate_sheet_formula_dependencies,
 )
 from backend.state.models.formula import Formula, FormulaAliases
-from backend.state.models.sheet import Sheet
+from backend.state.models.sheet import InstancedSheet, Sheet
 from backend.state.models.state import State
 
+SubjectT = TypeVar("SubjectT", Sheet, InstancedSheet)
+
 
 def _build_attribute_value(
     payload: AttributeValuePayload,
@@ -470,27 +474,39 @@ def _apply_candidate_subject_attributes(
 def reevaluate_sheet_attributes_mutations(
     state: State,
     sheet_id: str,
+    attribute_ids: Collection[str] | None = None,
 ) -> list[PatchOp]:
+    """Re-evaluate a sheet's Attributes, or only `attribute_ids`, and patch them."""
     sheet = state.sheets.get(sheet_id)
     if sheet is None:
         raise ValueError(f"Sheet '{sheet_id}' does not exist.")
-    candidate = deepcopy(sheet)
-    synchronize_all_sheet_attributes(candidate)
+    candidate = _attribute_candidate(sheet)
+    synchronize_all_sheet_attributes(candidate, attribute_ids)
     return _apply_candidate_sheet_attributes(state, sheet_id, candidate)
 
 
 def reevaluate_instance_attributes_mutations(
     state: State,
     instance_id: str,
+    attribute_ids: Collection[str] | None = None,
 ) -> list[PatchOp]:
+    """Re-evaluate an instance's Attributes, or only `attribute_ids`, and patch them."""
     instance = state.instanced_sheets.get(instance_id)
     if instance is None:
         raise ValueError(f"Instance '{instance_id}' does not exist.")
-    candidate = deepcopy(instance)
-    synchronize_all_sheet_attributes(candidate)
+    candidate = _attribute_candidate(instance)
+    synchronize_all_sheet_attributes(candidate, attribute_ids)
     return _apply_candidate_instance_attributes(state, instance_id, candidate)
 
 
+def _attribute_candidate(subject: SubjectT) -> SubjectT:
+    # Evaluation only writes Attribute bridges, so the rest of the subject is
+    # shared with the live one rather than copied.
+    candidate = copy(subject)
+    candidate.attributes = deepcopy(subject.attributes)
+    return candidate
+
+
 def validate_and_evaluate_sheet_attributes(
     sheet: Sheet,
     attribute_ids: set[str] | None = None,
@@ -3,7 +3,7 @@ from __future__ import annotations
 import hashlib
 import json
 from collections import defaultdict
-from copy import deepcopy
+from copy import copy, deepcopy
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Literal
@@ -17,6 +17,7 @@ from backend.features.formula_runtime.service import (
     normalize_numeric_result,
 )
 from backend.features.state_sync.service import state_sync_service
+from backend.features.state_sync.synchronizers import SynchronizerScope
 from backend.features.variable_registry.service import is_augmentation_target_allowed
 from backend.state.models.augmentation import (
     Augmentation,
@@ -48,6 +49,43 @@ class ConditionPresetHookResult:
     reason: str | None = None
 
 
+_DIRECT_EFFECT_SUBJECT_ROOTS = ("sheets", "instanced_sheets")
+_FORMULA_SUBJECT_FIELDS = (
+    "stats",
+    "stat_bonuses",
+    "resistances",
+    "attributes",
+    "racial_hp_multiplier",
+    "max_health",
+    "max_mana",
+)
+# What equipment reconciliation reads: the items each instance carries and the
+# item fields that become augmentations, plus every field a direct effect can
+# target or its formula can read on the instance, its sheet, or its source item.
+EQUIPMENT_AUGMENTATION_INPUTS: tuple[tuple[str, ...], ...] = (
+    *(
+        ("instanced_sheets", "*", field_name)
+        for field_name in (
+            "parent_id",
+            "items",
+            "augments",
+            "health",
+            "mana",
+            *_FORMULA_SUBJECT_FIELDS,
+        )
+    ),
+    *(("sheets", "*", field_name) for field_name in _FORMULA_SUBJECT_FIELDS),
+    *(
+        ("items", "*", field_name)
+        for field_name in ("name", "interaction_type", "augmentation_templates", "attributes")
+    ),
+    ("augmentations",),
+    ("standalone_effects",),
+    ("standalone_effect_applications",),
+    ("direct_effect_projections",),
+)
+
+
 @dataclass
 class _ResolvedTarget:
     state_path: str
@@ -208,10 +246,16 @@ def _equipment_augmentation_id(
     return f"equipment:{digest}"
 
 
-def _desired_equipment_augmentations(state: State) -> dict[str, Augmentation]:
+def _desired_equipment_augmentations(
+    state: State,
+    instance_ids: set[str] | None = None,
+) -> dict[str, Augmentation]:
     desired: dict[str, Augmentation] = {}
-    for instance_id, instance in sorted(state.instanced_sheets.items()):
-        if instance.parent_id not in state.sheets:
+    for instance_id in sorted(
+        state.instanced_sheets if instance_ids is None else instance_ids
+    ):
+        instance = state.instanced_sheets.get(instance_id)
+        if instance is None or instance.parent_id not in state.sheets:
             continue
         for bridge_key, bridge in sorted(instance.items.items()):
             if not bridge.equipped or bridge.count <= 0:
@@ -276,13 +320,18 @@ def _standalone_application_augmentation(
     )
 
 
-def _desired_standalone_augmentations(state: State) -> dict[str, Augmentation]:
+def _desired_standalone_augmentations(
+    state: State,
+    instance_ids: set[str] | None = None,
+) -> dict[str, Augmentation]:
     desired: dict[str, Augmentation] = {}
     for application_id, application in sorted(
         state.standalone_effect_applications.items()
     ):
         if not application.active:
             continue
+        if instance_ids is not None and application.instance_id not in instance_ids:
+            continue
         definition = state.standalone_effects.get(application.definition_id)
         if definition is None or not definition.active:
             continue
@@ -296,10 +345,15 @@ def _desired_projected_augmentations(
     state: State,
     *,
     equipment: dict[str, Augmentation] | None = None,
+    instance_ids: set[str] | None = None,
 ) -> dict[str, Augmentation]:
     return {
-        **(_desired_equipment_augmentations(state) if equipment is None else equipment),
-        **_desired_standalone_augmentations(state),
+        **(
+            _desired_equipment_augmentations(state, instance_ids)
+            if equipment is None
+            else equipment
+        ),
+        **_desired_standalone_augmentations(state, instance_ids),
     }
 
 
@@ -319,9 +373,36 @@ def _adjusted_projection_base(
     return normalize_numeric_result(projection.base_value + external_delta)
 
 
+def _projection_subject(target_path: str) -> tuple[str, ...]:
+    return state_sync_service._parse_path(target_path)[:2]
+
+
+def _direct_effect_working_state(
+    state: State,
+    subjects: set[tuple[str, str]] | None,
+) -> State:
+    """A copy of `state` whose sheets and instances in `subjects` can be rewritten.
+
+    Every other root is shared with `state` and must only be read.
+    """
+    working_state = copy(state)
+    for root in _DIRECT_EFFECT_SUBJECT_ROOTS:
+        subjects_in_root = getattr(state, root)
+        if subjects is None:
+            setattr(working_state, root, deepcopy(subjects_in_root))
+            continue
+        copied = dict(subjects_in_root)
+        for subject_root, subject_id in subjects:
+            if subject_root == root and subject_id in copied:
+                copied[subject_id] = deepcopy(copied[subject_id])
+        setattr(working_state, root, copied)
+    return working_state
+
+
 def _sync_direct_effects(
     state: State,
     desired: dict[str, Augmentation],
+    subjects: set[tuple[str, str]] | None = None,
 ) -> list[PatchOp]:
     effects_by_path: dict[str, list[Augmentation]] = defaultdict(list)
     for augmentation in desired.values():
@@ -344,7 +425,11 @@ def _sync_direct_effects(
         effects_by_path[target.state_path].append(augmentation)
 
     base_values: dict[str, int | float] = {}
-    existing_paths = set(state.direct_effect_projections)
+    existing_paths = {
+        target_path
+        for target_path in state.direct_effect_projections
+        if subjects is None or _projection_subject(target_path) in subjects
+    }
     desired_paths = set(effects_by_path)
     ops: list[PatchOp] = []
 
@@ -367,7 +452,7 @@ def _sync_direct_effects(
             else _adjusted_projection_base(projection, current_value)
         )
 
-    working_state = deepcopy(state)
+    working_state = _direct_effect_working_state(state, subjects)
     for target_path, base_value in base_values.items():
         _set_numeric_value(working_state, target_path, base_value)
 
@@ -452,18 +537,131 @@ def _sync_direct_effects(
     return ops
 
 
-def synchronize_equipment_augmentations_mutation(state: State) -> list[PatchOp]:
-    desired = _desired_equipment_augmentations(state)
+def equipment_augmentation_subjects(
+    state: State,
+    scope: SynchronizerScope,
+) -> set[tuple[str, str]] | None:
+    """Sheets and instances whose equipment or direct effects `scope` can change.
+
+    Each is a `(root, id)` pair. An instance brings its parent sheet along,
+    since effects on the instance read the sheet's unmodified values. Returns
+    None when every sheet and instance has to be reconciled.
+    """
+    touched = {
+        root: scope.ids(root)
+        for root in (
+            "sheets",
+            "instanced_sheets",
+            "items",
+            "augmentations",
+            "standalone_effects",
+            "standalone_effect_applications",
+            "direct_effect_projections",
+        )
+    }
+    if any(ids is None for ids in touched.values()):
+        return None
+    sheet_ids = set(touched["sheets"])
+    instance_ids = set(touched["instanced_sheets"])
+
+    for augmentation_id in touched["augmentations"]:
+        augmentation = state.augmentations.get(augmentation_id)
+        if augmentation is None:
+            if augmentation_id.startswith("equipment:"):
+                # A removed equipment record does not say which instance held it.
+                return None
+            continue
+        if augmentation.lifecycle_owner != "equipment":
+            continue
+        if augmentation.applied_target_id is None:
+            return None
+        instance_ids.add(augmentation.applied_target_id)
+
+    for application_id in touched["standalone_effect_applications"]:
+        application = state.standalone_effect_applications.get(application_id)
+        if application is not None:
+            instance_ids.add(application.instance_id)
+        else:
+            instance_ids.update(_standalone_application_instance_ids(state, application_id))
+    if touched["standalone_effects"] or touched["items"]:
+        for application in state.standalone_effect_applications.values():
+            if (
+                application.definition_id in touched["standalone_effects"]
+                or application.source.id in touched["items"]
+            ):
+                instance_ids.add(application.instance_id)
+
+    for target_path in touched["direct_effect_projections"]:
+        subject = _projection_subject(target_path)
+        if len(subject) < 2:
+            continue
+        if subject[0] == "sheets":
+            sheet_ids.add(subject[1])
+        elif subject[0] == "instanced_sheets":
+            instance_ids.add(subject[1])
+
+    if sheet_ids or touched["items"]:
+        for instance_id, instance in state.instanced_sheets.items():
+            if instance.parent_id in sheet_ids or any(
+                bridge.item_id in touched["items"] for bridge in instance.items.values()
+            ):
+                instance_ids.add(instance_id)
+    for instance_id in instance_ids:
+        instance = state.instanced_sheets.get(instance_id)
+        if instance is not None:
+            sheet_ids.add(instance.parent_id)
+    return {("sheets", sheet_id) for sheet_id in sheet_ids} | {
+        ("instanced_sheets", instance_id) for instance_id in instance_ids
+    }
+
+
+def _standalone_application_instance_ids(
+    state: State,
+    application_id: str,
+) -> list[str]:
+    """Instances a removed application's ID could name; see standalone_effect_application_id."""
+    prefix = "standalone:"
+    if not application_id.startswith(prefix):
+        return []
+    rest = application_id[len(prefix) :]
+    return [
+        rest[:index]
+        for index, character in enumerate(rest)
+        if character == ":" and rest[:index] in state.instanced_sheets
+    ]
+
+
+def synchronize_equipment_augmentations_mutation(
+    state: State,
+    subjects: set[tuple[str, str]] | None = None,
+) -> list[PatchOp]:
+    """Reconcile equipment augmentations and the direct effects they project.
+
+    Covers every sheet and instance, or only the `(root, id)` pairs in
+    `subjects`, as `equipment_augmentation_subjects` returns them.
+    """
+    instance_ids = (
+        None
+        if subjects is None
+        else {subject_id for root, subject_id in subjects if root == "instanced_sheets"}
+    )
+    desired = _desired_equipment_augmentations(state, instance_ids)
     existing_ids = {
         augmentation_id
         for augmentation_id, augmentation in state.augmentations.items()
         if augmentation.lifecycle_owner == "equipment"
+        and (instance_ids is None or augmentation.applied_target_id in instance_ids)
     }
     desired_ids = set(desired)
     managed_ids = existing_ids | desired_ids
     ops: list[PatchOp] = []
 
-    for instance_id, instance in sorted(state.instanced_sheets.items()):
+    for instance_id in sorted(
+        state.instanced_sheets if instance_ids is None else instance_ids
+    ):
+        instance = state.instanced_sheets.get(instance_id)
+        if instance is None:
+            continue
         desired_instance_ids = {
             augmentation_id
             for augmentation_id, augmentation in desired.items()
@@ -519,7 +717,12 @@ def synchronize_equipment_augmentations_mutation(state: State) -> list[PatchOp]:
     ops.extend(
         _sync_direct_effects(
             state,
-            _desired_projected_augmentations(state, equipment=desired),
+            _desired_projected_augmentations(
+                state,
+                equipment=desired,
+                instance_ids=instance_ids,
+            ),
+            subjects,
         )
     )
     return ops
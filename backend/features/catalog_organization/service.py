@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from copy import deepcopy
 
 from backend.core.transport import PatchOp
@@ -10,6 +11,7 @@ from backend.features.catalog_organization.schema import (
     RenameCatalogFolder,
 )
 from backend.features.state_sync.service import state_sync_service
+from backend.features.state_sync.synchronizers import SynchronizerScope
 from backend.state.models.catalog import (
     CatalogEntry,
     CatalogFolder,
@@ -19,20 +21,24 @@ from backend.state.models.catalog import (
 from backend.state.models.state import State
 
 
+# State root holding the entries of each catalog.
+CATALOG_COLLECTION_ROOTS: dict[CatalogKey, str] = {
+    "actions": "actions",
+    "attributes": "attributes",
+    "conditions": "condition_presets",
+    "effects": "standalone_effects",
+    "formulas": "formulas",
+    "item_templates": "item_templates",
+    "items": "items",
+    "proficiencies": "proficiencies",
+    "sheet_instances": "instanced_sheets",
+    "sheet_templates": "sheets",
+    "tags": "tags",
+}
+
+
 def _catalog_collection(state: State, catalog: CatalogKey) -> dict:
-    return {
-        "actions": state.actions,
-        "attributes": state.attributes,
-        "conditions": state.condition_presets,
-        "effects": state.standalone_effects,
-        "formulas": state.formulas,
-        "item_templates": state.item_templates,
-        "items": state.items,
-        "proficiencies": state.proficiencies,
-        "sheet_instances": state.instanced_sheets,
-        "sheet_templates": state.sheets,
-        "tags": state.tags,
-    }[catalog]
+    return getattr(state, CATALOG_COLLECTION_ROOTS[catalog])
 
 
 def _validate_parent(
@@ -317,15 +323,22 @@ async def delete_catalog_folder(request: DeleteCatalogFolder) -> None:
 
 def synchronize_catalog_entries_mutation(
     state: State,
+    placement_ids: Iterable[str] | None = None,
 ) -> list[PatchOp]:
-    entries = deepcopy(state.catalog_entries)
+    """Drop placements whose entry no longer exists.
+
+    Checks every placement, or only `placement_ids` when given.
+    """
+    candidate_ids = state.catalog_entries if placement_ids is None else placement_ids
     stale_ids = [
         placement_id
-        for placement_id, placement in entries.items()
-        if placement.entry_id not in _catalog_collection(state, placement.catalog)
+        for placement_id in sorted(candidate_ids)
+        if (placement := state.catalog_entries.get(placement_id)) is not None
+        and placement.entry_id not in _catalog_collection(state, placement.catalog)
     ]
     if not stale_ids:
         return []
+    entries = deepcopy(state.catalog_entries)
     for placement_id in stale_ids:
         del entries[placement_id]
     return [
@@ -335,3 +348,19 @@ def synchronize_catalog_entries_mutation(
             entries,
         )
     ]
+
+
+def catalog_placement_ids(scope: SynchronizerScope) -> set[str] | None:
+    """The placements a synchronizer scope can leave stale, or None for all."""
+    placement_ids = scope.ids("catalog_entries")
+    if placement_ids is None:
+        return None
+    placement_ids = set(placement_ids)
+    for catalog, root in CATALOG_COLLECTION_ROOTS.items():
+        entry_ids = scope.ids(root)
+        if entry_ids is None:
+            return None
+        placement_ids.update(
+            catalog_entry_placement_id(catalog, entry_id) for entry_id in entry_ids
+        )
+    return placement_ids
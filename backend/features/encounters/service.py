@@ -8,6 +8,10 @@ from backend.features.encounters.schema import (
     SaveEncounterPreset,
     SpawnEncounterPreset,
 )
+from backend.features.formula_runtime.service import (
+    evaluate_resource_maxima,
+    resource_maxima_roll_dice,
+)
 from backend.features.sheet_admin.sheets.service import (
     build_instanced_sheet_from_template,
 )
@@ -93,6 +97,10 @@ async def spawn_encounter_preset(request: SpawnEncounterPreset) -> None:
         _validate_encounter_references(encounter, state)
 
         ops = []
+        # Copies of a template start at the same maxima, evaluated once, unless
+        # the maxima roll dice, in which case each copy rolls its own. The
+        # copies' own projections are then evaluated as one batch.
+        template_maxima: dict[str, dict[str, int]] = {}
         for entry in encounter.entries:
             for index in range(1, entry.count + 1):
                 instance_id = _next_instance_id(
@@ -101,9 +109,17 @@ async def spawn_encounter_preset(request: SpawnEncounterPreset) -> None:
                     template_id=entry.template_id,
                     index=index,
                 )
+                template = state.sheets[entry.template_id]
+                maxima = template_maxima.get(entry.template_id)
+                if maxima is None:
+                    maxima = evaluate_resource_maxima(template)
+                    if not resource_maxima_roll_dice(template):
+                        template_maxima[entry.template_id] = maxima
                 instance = build_instanced_sheet_from_template(
-                    state.sheets[entry.template_id],
+                    template,
                     parent_sheet_id=entry.template_id,
+                    health=maxima["health"],
+                    mana=maxima["mana"],
                 )
                 path = state_sync_service.join_path("instanced_sheets", instance_id)
                 ops.append(state_sync_service.add_mutation(state, path, instance))
@@ -2,17 +2,28 @@ from __future__ import annotations
 
 import ast
 import math
+import operator
 import random
 import re
-from dataclasses import dataclass
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import TYPE_CHECKING, Any
 
 from backend.state.models.augmentation import (
     EvaluationFormulaModifierEffect,
     RollModeModifierEffect,
 )
-from backend.state.models.formula import Formula, normalize_formula_tags
+from backend.state.models.formula import (
+    FORMULA_ALIAS_PATTERN,
+    BindingMemo,
+    BoundFormula,
+    Formula,
+    normalize_formula_tags,
+    referenced_formula,
+)
 from backend.state.models.formula import FormulaAliases
+from backend.state.models.proficiency import ProficiencyBridge
 
 if TYPE_CHECKING:
     from backend.state.models.sheet import InstancedSheet, Sheet
@@ -28,6 +39,9 @@ _ROLL20_COMMAND_PATTERN = re.compile(
 )
 _MAX_DICE_COUNT = 100
 _MAX_DICE_SIDES = 100_000
+# Distinct formula texts kept compiled. Entries are keyed by text, so an edited
+# formula compiles afresh and the old entry ages out.
+FORMULA_COMPILE_CACHE_SIZE = 4096
 
 _ALLOWED_BINARY_OPERATORS = {
     ast.Add: lambda left, right: left + right,
@@ -42,6 +56,16 @@ _ALLOWED_UNARY_OPERATORS = {
     ast.UAdd: lambda value: value,
     ast.USub: lambda value: -value,
 }
+# The same operators applied across whole columns with `map`.
+_COLUMN_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
 _ALLOWED_FUNCTIONS = {
     "min": min,
     "max": max,
@@ -145,10 +169,31 @@ def _compose_numeric_expression(
 
 
 def _roll_dice_expression(match: re.Match[str]) -> str:
-    count = int(match.group("count") or "1")
-    sides = int(match.group("sides"))
-    keep_mode = match.group("keep")
-    keep_count = int(match.group("keep_count") or "0")
+    return str(_roll_dice(_DiceTerm.from_match(match)))
+
+
+@dataclass(frozen=True, slots=True)
+class _DiceTerm:
+    count: int
+    sides: int
+    keep_mode: str | None
+    keep_count: int
+
+    @classmethod
+    def from_match(cls, match: re.Match[str]) -> "_DiceTerm":
+        return cls(
+            count=int(match.group("count") or "1"),
+            sides=int(match.group("sides")),
+            keep_mode=match.group("keep"),
+            keep_count=int(match.group("keep_count") or "0"),
+        )
+
+
+def _roll_dice(term: _DiceTerm) -> int:
+    count = term.count
+    sides = term.sides
+    keep_mode = term.keep_mode
+    keep_count = term.keep_count
 
     if count <= 0:
         raise ValueError("Dice count must be greater than 0.")
@@ -169,7 +214,7 @@ def _roll_dice_expression(match: re.Match[str]) -> str:
             raise ValueError("Dice keep count cannot exceed dice count.")
         kept_rolls = sorted(rolls, reverse=keep_mode.lower() == "kh")[:keep_count]
 
-    return str(sum(kept_rolls))
+    return sum(kept_rolls)
 
 
 def _resolve_dice_expressions(expression: str) -> str:
@@ -206,108 +251,440 @@ def _evaluate_math_node(node: ast.AST) -> float | int:
         if node.keywords:
             raise ValueError("Formula functions do not support keyword arguments.")
         args = [_evaluate_math_node(arg) for arg in node.args]
-        if function_name in {"floor", "ceil"} and len(args) != 1:
-            raise ValueError(f"{function_name}() requires exactly one argument.")
-        if function_name == "round":
-            if len(args) not in {1, 2}:
-                raise ValueError("round() requires one or two arguments.")
-            if len(args) == 2 and not isinstance(args[1], int):
-                raise ValueError("round() digits argument must be a whole number.")
-        if function_name in {"min", "max"} and not args:
-            raise ValueError(f"{function_name}() requires at least one argument.")
+        _check_function_arguments(function_name, args)
         return function(*args)
     raise ValueError(f"Unsupported formula expression: {node.__class__.__name__}")
 
 
+def _check_function_arguments(function_name: str, args: list[float | int]) -> None:
+    if function_name in {"floor", "ceil"} and len(args) != 1:
+        raise ValueError(f"{function_name}() requires exactly one argument.")
+    if function_name == "round":
+        if len(args) not in {1, 2}:
+            raise ValueError("round() requires one or two arguments.")
+        if len(args) == 2 and not isinstance(args[1], int):
+            raise ValueError("round() digits argument must be a whole number.")
+    if function_name in {"min", "max"} and not args:
+        raise ValueError(f"{function_name}() requires at least one argument.")
+
+
 def evaluate_numeric_expression(expression: str) -> float | int:
     expression = _resolve_dice_expressions(expression)
     parsed = ast.parse(expression, mode="eval")
     return normalize_numeric_result(_evaluate_math_node(parsed))
 
 
+Evaluator = Callable[[Sequence[Any]], float | int]
+# Takes one column of values per term and the row count; returns a column.
+ColumnEvaluator = Callable[[Sequence[list[Any]], int], list[Any]]
+# Alias values the expanded text spells as a plain number literal.
+_NUMBER_TYPES = (int, float, bool)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledFormula:
+    """Formula text parsed once into an evaluator over its dice and aliases.
+
+    `terms` lists every dice expression and alias placeholder in text order,
+    which is the order the expanded text would roll them in. `evaluate` takes
+    one value per term and walks the same checks `_evaluate_math_node` makes.
+    `evaluate_columns` computes many rows at once from already resolved term
+    values; it raises whenever any row would.
+    """
+
+    terms: tuple[_DiceTerm | str, ...]
+    evaluate: Evaluator
+    evaluate_columns: ColumnEvaluator
+
+
+@lru_cache(maxsize=FORMULA_COMPILE_CACHE_SIZE)
+def compile_formula_text(
+    text: str,
+    alias_names: frozenset[str],
+) -> CompiledFormula | None:
+    """Compile formula text whose `alias_names` are bound at evaluation time.
+
+    Returns None when the compiled form might not agree with evaluating the
+    expanded text, for instance when the text does not parse or a rolled number
+    would run into the characters around it. Callers then evaluate the text.
+    """
+    if not text.isascii() or not text.isprintable() or "#" in text or "\\" in text:
+        return None
+    try:
+        # Lay the text out as its expansion would be, with a one-digit stand-in
+        # for each alias value and dice roll, and note where each one lands.
+        alias_positions: list[tuple[int, str]] = []
+        pieces: list[str] = []
+        length = 0
+        last = 0
+        for match in FORMULA_ALIAS_PATTERN.finditer(text):
+            if match.group(1) not in alias_names:
+                continue
+            pieces.append(text[last : match.start()])
+            length += match.start() - last
+            alias_positions.append((length + 1, match.group(1)))
+            pieces.append("(1)")
+            length += 3
+            last = match.end()
+        pieces.append(text[last:])
+        aliased = "".join(pieces)
+
+        dice = list(_DICE_PATTERN.finditer(aliased))
+        positioned: list[tuple[int, _DiceTerm | str]] = []
+        shift = 0
+        pending_aliases = iter(alias_positions)
+        next_alias = next(pending_aliases, None)
+        for match in [*dice, None]:
+            boundary = match.start() if match is not None else len(aliased) + 1
+            while next_alias is not None and next_alias[0] < boundary:
+                positioned.append((next_alias[0] - shift, next_alias[1]))
+                next_alias = next(pending_aliases, None)
+            if match is None:
+                break
+            positioned.append((match.start() - shift, _DiceTerm.from_match(match)))
+            shift += len(match.group(0)) - 1
+        laid_out = _DICE_PATTERN.sub("1", aliased)
+
+        slots = {
+            (position, position + 1): index
+            for index, (position, _) in enumerate(positioned)
+        }
+        tree = ast.parse(laid_out, mode="eval")
+        evaluate = _compile_math_node(tree, dict(slots))
+        evaluate_columns = _compile_column_node(tree, slots)
+    except (MemoryError, RecursionError, SyntaxError, ValueError):
+        return None
+    if slots:
+        # A stand-in merged into a neighbouring token, so the real value would
+        # have parsed differently.
+        return None
+    return CompiledFormula(
+        terms=tuple(term for _, term in positioned),
+        evaluate=evaluate,
+        evaluate_columns=evaluate_columns,
+    )
+
+
+def _compile_math_node(
+    node: ast.AST,
+    slots: dict[tuple[int, int], int],
+) -> Evaluator:
+    """Compile `node` into a closure, claiming the term stand-ins it holds."""
+    if isinstance(node, ast.Expression):
+        return _compile_math_node(node.body, slots)
+    if isinstance(node, ast.Constant):
+        index = slots.pop((node.col_offset, node.end_col_offset), None)
+        if index is not None:
+            return lambda values: _term_value(values[index])
+        if isinstance(node.value, int | float):
+            value = node.value
+            return lambda values: value
+    if isinstance(node, ast.BinOp):
+        operator_type = type(node.op)
+        binary = _ALLOWED_BINARY_OPERATORS.get(operator_type)
+        if binary is None:
+            return _fail(f"Unsupported formula operator: {operator_type.__name__}")
+        left = _compile_math_node(node.left, slots)
+        right = _compile_math_node(node.right, slots)
+        return lambda values: binary(left(values), right(values))
+    if isinstance(node, ast.UnaryOp):
+        operator_type = type(node.op)
+        unary = _ALLOWED_UNARY_OPERATORS.get(operator_type)
+        if unary is None:
+            return _fail(f"Unsupported formula operator: {operator_type.__name__}")
+        operand = _compile_math_node(node.operand, slots)
+        return lambda values: unary(operand(values))
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name):
+            return _fail("Unsupported formula function.")
+        function_name = node.func.id
+        function = _ALLOWED_FUNCTIONS.get(function_name)
+        if function is None:
+            return _fail(f"Unsupported formula function: {function_name}")
+        if node.keywords:
+            return _fail("Formula functions do not support keyword arguments.")
+        arguments = [_compile_math_node(arg, slots) for arg in node.args]
+
+        def call(values: Sequence[Any]) -> float | int:
+            args = [argument(values) for argument in arguments]
+            _check_function_arguments(function_name, args)
+            return function(*args)
+
+        return call
+    return _fail(f"Unsupported formula expression: {node.__class__.__name__}")
+
+
+def _compile_column_node(
+    node: ast.AST,
+    slots: dict[tuple[int, int], int],
+) -> ColumnEvaluator:
+    """Compile `node` like `_compile_math_node`, over a column per term."""
+    if isinstance(node, ast.Expression):
+        return _compile_column_node(node.body, slots)
+    if isinstance(node, ast.Constant):
+        index = slots.pop((node.col_offset, node.end_col_offset), None)
+        if index is not None:
+            return lambda columns, count: columns[index]
+        if isinstance(node.value, int | float):
+            value = node.value
+            return lambda columns, count: [value] * count
+    if isinstance(node, ast.BinOp):
+        operator_type = type(node.op)
+        binary = _COLUMN_BINARY_OPERATORS.get(operator_type)
+        if binary is None:
+            return _fail(f"Unsupported formula operator: {operator_type.__name__}")
+        left = _compile_column_node(node.left, slots)
+        right = _compile_column_node(node.right, slots)
+        return lambda columns, count: list(
+            map(binary, left(columns, count), right(columns, count))
+        )
+    if isinstance(node, ast.UnaryOp):
+        operator_type = type(node.op)
+        if operator_type not in _ALLOWED_UNARY_OPERATORS:
+            return _fail(f"Unsupported formula operator: {operator_type.__name__}")
+        operand = _compile_column_node(node.operand, slots)
+        if operator_type is ast.UAdd:
+            return operand
+        return lambda columns, count: list(map(operator.neg, operand(columns, count)))
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name):
+            return _fail("Unsupported formula function.")
+        function_name = node.func.id
+        function = _ALLOWED_FUNCTIONS.get(function_name)
+        if function is None:
+            return _fail(f"Unsupported formula function: {function_name}")
+        if node.keywords:
+            return _fail("Formula functions do not support keyword arguments.")
+        arguments = [_compile_column_node(arg, slots) for arg in node.args]
+
+        def call(columns: Sequence[list[Any]], count: int) -> list[Any]:
+            args = [argument(columns, count) for argument in arguments]
+            # The text fixes the argument count; only round's digits vary by row.
+            _check_function_arguments(function_name, [0] * len(args))
+            if function_name == "round" and len(args) == 2:
+                for digits in args[1]:
+                    _check_function_arguments(function_name, [0, digits])
+            return list(map(function, *args))
+
+        return call
+    return _fail(f"Unsupported formula expression: {node.__class__.__name__}")
+
+
+def _fail(message: str) -> Callable[..., Any]:
+    def fail(*args: Any) -> Any:
+        raise ValueError(message)
+
+    return fail
+
+
+def _term_value(value: Any) -> float | int:
+    if callable(value):
+        return value()
+    if isinstance(value, float) and not math.isfinite(value):
+        # Expanded text spells these `inf` and `nan`, which are not numbers.
+        raise ValueError("Unsupported formula expression: Name")
+    return value
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class _LinkedFormula:
+    """A compiled formula paired with the value behind each of its terms."""
+
+    compiled: CompiledFormula
+    bindings: list[Any]
+    bonus: Any
+    rolls_dice: bool
+
+
+@dataclass
+class FormulaMemo(BindingMemo):
+    """Formula work shared by every evaluation against one root.
+
+    Besides sharing bindings, each formula that rolls no dice is evaluated
+    once, however many formulas reference it. The root must not change while
+    the memo is in use, so a memo lives for one evaluation pass.
+    """
+
+    # Keyed by `id` because bound formulas hold dicts; the value keeps the
+    # bound formula alive so its id is not reused.
+    linked: dict[int, tuple[BoundFormula, _LinkedFormula | None]] = field(
+        default_factory=dict
+    )
+    values: dict[_LinkedFormula, float | int] = field(default_factory=dict)
+
+
+def _link_formula(
+    bound: BoundFormula,
+    memo: FormulaMemo | None = None,
+) -> _LinkedFormula | None:
+    """Pair a bound formula's compiled text with the value behind each term."""
+    if memo is not None:
+        cached = memo.linked.get(id(bound))
+        if cached is not None:
+            return cached[1]
+    linked = _link_bound_formula(bound, memo)
+    if memo is not None:
+        memo.linked[id(bound)] = (bound, linked)
+    return linked
+
+
+def _link_bound_formula(
+    bound: BoundFormula,
+    memo: FormulaMemo | None,
+) -> _LinkedFormula | None:
+    compiled = compile_formula_text(bound.text, frozenset(bound.aliases))
+    if compiled is None or (bound.bonus and type(bound.bonus) not in _NUMBER_TYPES):
+        return None
+    bindings: list[Any] = []
+    rolls_dice = False
+    for term in compiled.terms:
+        if not isinstance(term, str):
+            bindings.append(term)
+            rolls_dice = True
+            continue
+        value = bound.aliases[term]
+        if isinstance(value, BoundFormula):
+            value = _link_formula(value, memo)
+            if value is None:
+                return None
+            rolls_dice = rolls_dice or value.rolls_dice
+        elif type(value) not in _NUMBER_TYPES:
+            return None
+        bindings.append(value)
+    return _LinkedFormula(compiled, bindings, bound.bonus, rolls_dice)
+
+
+def _roll_linked_formula(
+    linked: _LinkedFormula,
+    memo: FormulaMemo | None = None,
+) -> Callable[[], float | int]:
+    """Roll every die in text order and return the formula's evaluation."""
+    values: list[Any] = []
+    for binding in linked.bindings:
+        if isinstance(binding, _DiceTerm):
+            values.append(_roll_dice(binding))
+        elif not isinstance(binding, _LinkedFormula):
+            values.append(binding)
+        elif memo is None or binding.rolls_dice:
+            values.append(_roll_linked_formula(binding, memo))
+        else:
+            values.append(_memoized_formula(binding, memo))
+    compiled = linked.compiled
+    bonus = linked.bonus
+    if not bonus:
+        return lambda: compiled.evaluate(values)
+    return lambda: compiled.evaluate(values) + _term_value(bonus)
+
+
+def _memoized_formula(
+    linked: _LinkedFormula,
+    memo: FormulaMemo,
+) -> Callable[[], float | int]:
+    # Evaluated lazily, like any nested term, so errors keep their order.
+    # Failures are not kept and simply raise again on the next reference.
+    def value() -> float | int:
+        result = memo.values.get(linked)
+        if result is None:
+            result = _roll_linked_formula(linked, memo)()
+            memo.values[linked] = result
+        return result
+
+    return value
+
+
+def evaluate_bound_formula(
+    bound: BoundFormula,
+    memo: FormulaMemo | None = None,
+) -> float | int:
+    """Evaluate a bound formula exactly as its expanded text would evaluate.
+
+    Every die is rolled before anything is computed, in the order the expanded
+    text lists them, so results and errors match `evaluate_numeric_expression`.
+    Text the compiler declines is evaluated through that function instead.
+    """
+    linked = _link_formula(bound, memo)
+    if linked is None:
+        return evaluate_numeric_expression(bound.render())
+    if memo is not None and not linked.rolls_dice:
+        return normalize_numeric_result(_memoized_formula(linked, memo)())
+    return normalize_numeric_result(_roll_linked_formula(linked, memo)())
+
+
 def evaluate_numeric_formula(
     formula_root: Any,
     formula: Formula,
     *,
     execution_context: FormulaExecutionContext | None = None,
     modifiers: tuple[EvaluationTimeEffect, ...] = (),
+    memo: FormulaMemo | None = None,
 ) -> float | int:
     context = execution_context or FormulaExecutionContext.for_formula(formula)
-    expanded_formula = formula.expand_formula(formula_root)
-    result = evaluate_numeric_expression(expanded_formula)
+    result = evaluate_bound_formula(formula.bind(formula_root, memo=memo), memo)
     for effect in modifiers:
         if not isinstance(effect, EvaluationFormulaModifierEffect):
             continue
         if not _effect_matches_context(effect, context):
             continue
-        modifier = evaluate_numeric_expression(effect.value.expand_formula(formula_root))
+        modifier = evaluate_bound_formula(effect.value.bind(formula_root, memo=memo), memo)
         result = apply_numeric_operation(result, modifier, effect.operation)
     return normalize_numeric_result(result)
 
 
 def evaluate_sheet_stats(
     sheet: Sheet | InstancedSheet,
+    *,
+    memo: FormulaMemo | None = None,
 ) -> dict[str, float | int]:
     """Return backend-evaluated sheet stats, omitting invalid legacy formulas."""
+    if memo is None:
+        memo = FormulaMemo()
     evaluated: dict[str, float | int] = {}
-    for stat_name, value in vars(sheet.stats).items():
-        if isinstance(value, bool):
-            continue
-        if isinstance(value, int | float):
-            evaluated[stat_name] = value
-            continue
-        if not isinstance(value, Formula):
-            continue
-        try:
-            result = evaluate_numeric_formula(sheet, value)
-            result = normalize_numeric_result(
-                result + sheet.stat_bonuses.get(stat_name, 0)
-            )
+    for stat_name in vars(sheet.stats):
+        result = evaluate_sheet_stat(sheet, stat_name, memo=memo)
+        if result is not None:
             evaluated[stat_name] = result
-        except (ArithmeticError, SyntaxError, TypeError, ValueError):
-            # Persisted legacy formulas may be invalid. They remain authoring data,
-            # but must not be projected to clients as a misleading numeric zero.
-            continue
     return evaluated
 
 
+def evaluate_sheet_stat(
+    sheet: Sheet | InstancedSheet,
+    stat_name: str,
+    *,
+    memo: FormulaMemo | None = None,
+) -> float | int | None:
+    """Return one backend-evaluated stat, or None when it is not projected."""
+    value = getattr(sheet.stats, stat_name)
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int | float):
+        return value
+    if not isinstance(value, Formula):
+        return None
+    try:
+        result = evaluate_numeric_formula(sheet, value, memo=memo)
+        return normalize_numeric_result(result + sheet.stat_bonuses.get(stat_name, 0))
+    except (ArithmeticError, SyntaxError, TypeError, ValueError):
+        # Persisted legacy formulas may be invalid. They remain authoring data,
+        # but must not be projected to clients as a misleading numeric zero.
+        return None
+
+
 def evaluate_resource_maximum(
     sheet: Sheet | InstancedSheet,
     resource: str,
+    *,
+    memo: FormulaMemo | None = None,
 ) -> int:
-    formula = sheet.max_health if resource == "health" else sheet.max_mana
-    normalized_formula = formula
-    if formula.aliases is None:
-        alias_names = sorted(set(re.findall(r"@([A-Za-z_][A-Za-z0-9_]*)", formula.text)))
-        inferred = [
-            FormulaAliases(name=name, path=["stats", name])
-            for name in alias_names
-            if sheet.stats is not None and hasattr(sheet.stats, name)
-        ]
-        if inferred:
-            normalized_formula = Formula(
-                aliases=inferred,
-                text=formula.text,
-                tags=list(formula.tags),
-            )
-    elif sheet.stats is not None:
-        aliases = [
-            FormulaAliases(
-                name=alias.name,
-                path=(
-                    ["stats", alias.path[0]]
-                    if len(alias.path) == 1 and hasattr(sheet.stats, alias.path[0])
-                    else list(alias.path)
-                ),
-            )
-            for alias in formula.aliases
-        ]
-        normalized_formula = Formula(
-            aliases=aliases,
-            text=formula.text,
-            tags=list(formula.tags),
-        )
-    result = evaluate_numeric_formula(sheet, normalized_formula)
+    result = evaluate_numeric_formula(sheet, _maximum_formula(sheet, resource), memo=memo)
+    return _bounded_maximum(resource, result)
+
+
+def _maximum_formula(sheet: Sheet | InstancedSheet, resource: str) -> Formula:
+    # Maxima name stats the way nested formulas do, so they share its cache.
+    return referenced_formula(sheet, sheet.max_health if resource == "health" else sheet.max_mana)
+
+
+def _bounded_maximum(resource: str, result: Any) -> int:
     if isinstance(result, bool) or not isinstance(result, int | float):
         raise ValueError(f"Maximum {resource} formula must resolve to a number.")
     if not math.isfinite(result):
@@ -317,13 +694,281 @@ def evaluate_resource_maximum(
 
 def evaluate_resource_maxima(
     sheet: Sheet | InstancedSheet,
+    *,
+    memo: FormulaMemo | None = None,
 ) -> dict[str, int]:
+    if memo is None:
+        memo = FormulaMemo()
     return {
-        "health": evaluate_resource_maximum(sheet, "health"),
-        "mana": evaluate_resource_maximum(sheet, "mana"),
+        "health": evaluate_resource_maximum(sheet, "health", memo=memo),
+        "mana": evaluate_resource_maximum(sheet, "mana", memo=memo),
     }
 
 
+def resource_maxima_roll_dice(sheet: Sheet | InstancedSheet) -> bool:
+    """Whether evaluating the sheet's resource maxima may roll dice.
+
+    Formulas the compiler declines count as rolling, since their text is
+    only known at evaluation time.
+    """
+    memo = FormulaMemo()
+    for resource in ("health", "mana"):
+        linked = _link_formula(_maximum_formula(sheet, resource).bind(sheet, memo=memo), memo)
+        if linked is None or linked.rolls_dice:
+            return True
+    return False
+
+
+# Marks a row a batch left for per-subject evaluation.
+_UNBATCHED: Any = object()
+
+
+class FormulaBatch:
+    """Formula work shared by many subjects evaluated at once, column by column.
+
+    Copies of one template carry the same formula texts at the same paths and
+    differ only in the numbers those formulas read. Each alias path is resolved
+    on every subject into one column, a formula found there is compiled once,
+    and its compiled evaluator computes the whole column in one pass. Columns
+    are kept per path, so a stat read by several formulas is evaluated once.
+
+    A subject whose formula at a path differs from the others', or whose row
+    would not evaluate the way its own bound formula does (dice, a failed
+    evaluation, a value the compiler would not bind), is left out of the
+    column. The batch functions evaluate such subjects one at a time, with a
+    memo per subject, so results and errors are the same as evaluating each
+    subject alone. Every subject must have stats, and, as with a memo, none
+    may change while the batch is in use.
+    """
+
+    def __init__(self, roots: Sequence[Any]) -> None:
+        self.roots = list(roots)
+        self._columns: dict[tuple[str, ...], list[Any]] = {}
+        self._planning: set[tuple[str, ...]] = set()
+        self._memos: dict[int, FormulaMemo] = {}
+        # Keyed by `id`; the value keeps the formula alive so its id is not reused.
+        self._keys: dict[int, tuple[Formula, Any]] = {}
+
+    def memo(self, index: int) -> FormulaMemo:
+        """The memo for evaluating the subject at `index` on its own."""
+        memo = self._memos.get(index)
+        if memo is None:
+            memo = self._memos[index] = FormulaMemo()
+        return memo
+
+    def evaluate(self, formulas: Sequence[Formula | None]) -> list[Any]:
+        """Evaluate each subject's formula, bound as given, to its raw result.
+
+        Rows whose formula is None, or that the batch could not evaluate, hold
+        `_UNBATCHED`. Subjects with identical formulas are computed together.
+        """
+        results = [_UNBATCHED] * len(self.roots)
+        for formula, eligible in self._groups(formulas):
+            values = self._formula_values(formula.text, formula.aliases or [], eligible)
+            for index, included in enumerate(eligible):
+                if included:
+                    results[index] = values[index]
+        return results
+
+    def _groups(self, formulas: Sequence[Any]) -> list[tuple[Formula, list[bool]]]:
+        """Each distinct formula among `formulas`, with the rows that hold it."""
+        groups: dict[Any, tuple[Formula, list[bool]]] = {}
+        for index, formula in enumerate(formulas):
+            if not isinstance(formula, Formula):
+                continue
+            cached = self._keys.get(id(formula))
+            if cached is None:
+                cached = self._keys[id(formula)] = (formula, _formula_key(formula))
+            key = cached[1]
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = (formula, [False] * len(self.roots))
+            group[1][index] = True
+        return list(groups.values())
+
+    def _column(self, path: tuple[str, ...]) -> list[Any]:
+        column = self._columns.get(path)
+        if column is not None:
+            return column
+        if path in self._planning:
+            # A reference cycle. Bound one at a time, these rows fail alike.
+            return [_UNBATCHED] * len(self.roots)
+        self._planning.add(path)
+        try:
+            column = self._path_column(path)
+        finally:
+            self._planning.discard(path)
+        self._columns[path] = column
+        return column
+
+    def _path_column(self, path: tuple[str, ...]) -> list[Any]:
+        values = [_path_value(root, path) for root in self.roots]
+        column = [
+            _UNBATCHED if isinstance(value, Formula) else _leaf_value(value)
+            for value in values
+        ]
+        bonused = len(path) == 2 and path[0] == "stats"
+        for formula, eligible in self._groups(values):
+            representative = eligible.index(True)
+            nested = referenced_formula(self.roots[representative], formula)
+            results = self._formula_values(nested.text, nested.aliases or [], eligible)
+            for index, result in enumerate(results):
+                if result is _UNBATCHED:
+                    continue
+                if bonused:
+                    bonus = getattr(self.roots[index], "stat_bonuses", {}).get(path[1], 0)
+                    if bonus:
+                        result = _add_bonus(result, bonus)
+                column[index] = result
+        return column
+
+    def _formula_values(
+        self,
+        text: str,
+        aliases: Sequence[FormulaAliases],
+        eligible: list[bool],
+    ) -> list[Any]:
+        results = [_UNBATCHED] * len(self.roots)
+        compiled = compile_formula_text(text, frozenset(alias.name for alias in aliases))
+        if compiled is None or not all(isinstance(term, str) for term in compiled.terms):
+            return results
+        # Every alias is resolved, used or not, as binding would.
+        alias_columns = [self._column(tuple(alias.path)) for alias in aliases]
+        named: dict[str, list[Any]] = {}
+        for alias, column in zip(aliases, alias_columns, strict=True):
+            named.setdefault(alias.name, column)
+        rows = [
+            index
+            for index, included in enumerate(eligible)
+            if included
+            and all(column[index] is not _UNBATCHED for column in alias_columns)
+        ]
+        if not rows:
+            return results
+        term_columns = [named[name] for name in compiled.terms]
+        if len(rows) < len(self.roots):
+            term_columns = [[column[index] for index in rows] for column in term_columns]
+        try:
+            values = compiled.evaluate_columns(term_columns, len(rows))
+        except (ArithmeticError, TypeError, ValueError):
+            return results
+        for index, value in zip(rows, values, strict=True):
+            results[index] = value
+        return results
+
+
+def _formula_key(formula: Formula) -> Any:
+    if formula.aliases is None:
+        return formula.text
+    return (formula.text, *[(alias.name, *alias.path) for alias in formula.aliases])
+
+
+def _path_value(root: Any, path: tuple[str, ...]) -> Any:
+    """Resolve `path` as `Formula._resolve_path_value` does, without raising."""
+    value = root
+    for branch in path:
+        if isinstance(value, dict):
+            if branch not in value:
+                return _UNBATCHED
+            value = value[branch]
+            continue
+        value = getattr(value, branch, None)
+        if value is None:
+            return _UNBATCHED
+    return value
+
+
+def _leaf_value(value: Any) -> Any:
+    """A plain value as a compiled term reads it, or `_UNBATCHED`."""
+    try:
+        if isinstance(value, ProficiencyBridge):
+            value = min(value.growth_rate * value.use_count, 1)
+        elif not isinstance(value, int | float):
+            return _UNBATCHED
+        if type(value) not in _NUMBER_TYPES:
+            return _UNBATCHED
+        return _term_value(value)
+    except (ArithmeticError, TypeError, ValueError):
+        return _UNBATCHED
+
+
+def _add_bonus(value: Any, bonus: Any) -> Any:
+    if type(bonus) not in _NUMBER_TYPES:
+        return _UNBATCHED
+    try:
+        return value + _term_value(bonus)
+    except (ArithmeticError, TypeError, ValueError):
+        return _UNBATCHED
+
+
+def evaluate_sheet_stats_batch(
+    subjects: Sequence[Sheet | InstancedSheet],
+    *,
+    batch: FormulaBatch | None = None,
+) -> list[dict[str, float | int]]:
+    """`evaluate_sheet_stats` for each of `subjects`, sharing work across them.
+
+    The subjects' stats must share one type. Dice in a stat formula are still
+    rolled per subject, though subjects are visited stat by stat.
+    """
+    if batch is None:
+        batch = FormulaBatch(subjects)
+    evaluated: list[dict[str, float | int]] = [{} for _ in subjects]
+    if not subjects:
+        return evaluated
+    for stat_name in vars(subjects[0].stats):
+        values = [getattr(subject.stats, stat_name) for subject in subjects]
+        results = batch.evaluate(
+            [value if isinstance(value, Formula) else None for value in values]
+        )
+        for index, subject in enumerate(subjects):
+            result = results[index]
+            if result is _UNBATCHED:
+                result = evaluate_sheet_stat(subject, stat_name, memo=batch.memo(index))
+            else:
+                try:
+                    result = normalize_numeric_result(
+                        normalize_numeric_result(result)
+                        + subject.stat_bonuses.get(stat_name, 0)
+                    )
+                except (ArithmeticError, SyntaxError, TypeError, ValueError):
+                    result = None
+            if result is not None:
+                evaluated[index][stat_name] = result
+    return evaluated
+
+
+def evaluate_resource_maxima_batch(
+    subjects: Sequence[Sheet | InstancedSheet],
+    *,
+    batch: FormulaBatch | None = None,
+) -> list[dict[str, int]]:
+    """`evaluate_resource_maxima` for each of `subjects`, sharing work across them.
+
+    Subjects are finished in order, so the first error raised is the one
+    evaluating them one after another would raise.
+    """
+    if batch is None:
+        batch = FormulaBatch(subjects)
+    resources = ("health", "mana")
+    results = [
+        batch.evaluate([_maximum_formula(subject, resource) for subject in subjects])
+        for resource in resources
+    ]
+    maxima: list[dict[str, int]] = []
+    for index, subject in enumerate(subjects):
+        subject_maxima: dict[str, int] = {}
+        for resource, resource_results in zip(resources, results, strict=True):
+            result = resource_results[index]
+            subject_maxima[resource] = (
+                evaluate_resource_maximum(subject, resource, memo=batch.memo(index))
+                if result is _UNBATCHED
+                else _bounded_maximum(resource, normalize_numeric_result(result))
+            )
+        maxima.append(subject_maxima)
+    return maxima
+
+
 def compose_roll20_message(
     formula_root: Any,
     formula: Formula,
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+
 from backend.core.transport import PatchOp
 from backend.features.pinned_actions.schema import SetPinnedInstanceActions
 from backend.features.state_sync.service import state_sync_service
@@ -30,9 +32,17 @@ def available_action_relationship_ids(state: State, instance: InstancedSheet) ->
     return available
 
 
-def synchronize_pinned_actions_mutation(state: State) -> list[PatchOp]:
+def synchronize_pinned_actions_mutation(
+    state: State,
+    instance_ids: Iterable[str] | None = None,
+) -> list[PatchOp]:
     ops: list[PatchOp] = []
-    for instance_id, instance in state.instanced_sheets.items():
+    if instance_ids is None:
+        instance_ids = state.instanced_sheets
+    for instance_id in sorted(instance_ids):
+        instance = state.instanced_sheets.get(instance_id)
+        if instance is None:
+            continue
         available = available_action_relationship_ids(state, instance)
         cleaned = [action_id for action_id in instance.pinned_action_ids if action_id in available]
         if cleaned != instance.pinned_action_ids:
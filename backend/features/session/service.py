@@ -1,7 +1,14 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Callable, Iterable
+import json
+import logging
+import os
+from collections import OrderedDict, deque
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from typing import Any
 
 from fastapi import WebSocket
@@ -11,12 +18,87 @@ from backend.features.session.models import SessionRole, WebSocketSession
 from backend.core.transport import SocketGroup
 
 VALID_SOCKET_GROUPS: tuple[SocketGroup, ...] = ("dms", "players")
+# Events a session may have waiting to be written before it is treated as a
+# slow consumer. Evicted sockets are closed with "try again later"; the client
+# reconnects and resynchronizes from a fresh snapshot.
+SEND_QUEUE_LIMIT = int(os.environ.get("WEBSOCKET_SEND_QUEUE_LIMIT", "256"))
+SLOW_CONSUMER_CLOSE_CODE = 1013
+# Milliseconds a session's writer waits on a coalescible event, such as a state
+# patch, so the ones broadcast right after it can be merged into one frame.
+# Zero sends every event as its own frame.
+COALESCE_WINDOW_MS = float(os.environ.get("WEBSOCKET_COALESCE_WINDOW_MS", "0"))
+# Merged frames kept so sessions in the same audience encode each merge once.
+_COALESCED_FRAME_CACHE_SIZE = 64
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(eq=False)
+class _Coalescing:
+    """Payloads waiting in an outbox to be merged into one frame.
+
+    Broadcasts that find this entry at the tail of a session's outbox join it
+    until the writer seals it.
+    """
+
+    merge: Callable[[list[Any]], Any]
+    audience: Hashable
+    payloads: list[Any]
+    sealed: bool = False
+
+
+@dataclass
+class _Outbox:
+    pending: deque[str | _Coalescing] = field(default_factory=deque)
+    writer: asyncio.Task[None] | None = None
+
+
+@dataclass
+class HeldDeliveries:
+    """Sends and broadcasts made while deliveries were held, in call order.
+
+    Each entry is the name of the session service method and its arguments.
+    """
+
+    calls: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = field(
+        default_factory=list
+    )
+
+    def sent_to(self, session: WebSocketSession, *, start: int = 0) -> list[Any]:
+        """Payloads passed to `send` for `session` from call index `start` on."""
+        return [
+            args[1]
+            for name, args, _ in self.calls[start:]
+            if name == "send" and args[0] is session
+        ]
+
+
+_held_deliveries: ContextVar[HeldDeliveries | None] = ContextVar(
+    "held_deliveries",
+    default=None,
+)
 
 
 class WebSocketSessionService:
+    """Tracks connected sessions and delivers server events to them.
+
+    Every connected session has its own outbox. Sending only queues the
+    normalized, JSON-encoded event and makes sure a writer task is draining that outbox, so
+    one slow socket never holds up delivery to the others or the caller that
+    produced the event. A session whose outbox grows past `SEND_QUEUE_LIMIT`
+    is disconnected instead of being waited on.
+    """
+
     def __init__(self) -> None:
         self._lock = asyncio.Lock()
         self._sessions: dict[WebSocket, WebSocketSession] = {}
+        self._outboxes: dict[WebSocket, _Outbox] = {}
+        self._closing: set[asyncio.Task[None]] = set()
+        self.coalesce_window_ms = COALESCE_WINDOW_MS
+        self._coalesced_frames: OrderedDict[
+            tuple[Hashable, tuple[int, ...]],
+            tuple[tuple[Any, ...], str],
+        ] = OrderedDict()
 
     async def connect(
         self,
@@ -30,6 +112,7 @@ class WebSocketSessionService:
         async with self._lock:
             session = WebSocketSession(websocket=websocket, role=role)
             self._sessions[websocket] = session
+            self._outboxes.setdefault(websocket, _Outbox())
         return session
 
     async def set_role(
@@ -61,10 +144,17 @@ class WebSocketSessionService:
     async def disconnect(self, websocket: WebSocket) -> None:
         async with self._lock:
             self._sessions.pop(websocket, None)
+            outbox = self._outboxes.pop(websocket, None)
+        if outbox is not None:
+            _stop_writer(outbox)
 
     async def reset(self) -> None:
         async with self._lock:
             self._sessions.clear()
+            outboxes = tuple(self._outboxes.values())
+            self._outboxes.clear()
+        for outbox in outboxes:
+            _stop_writer(outbox)
 
     async def get_session(self, websocket: WebSocket) -> WebSocketSession:
         async with self._lock:
@@ -97,8 +187,50 @@ class WebSocketSessionService:
             "players": total_connections,
         }
 
+    @contextmanager
+    def hold_deliveries(self) -> Iterator[HeldDeliveries]:
+        """Record instead of deliver every send and broadcast made in the block.
+
+        Used by request batches, whose requests must not announce anything
+        before the batch commits. `release` delivers the recorded events; a
+        discarded `HeldDeliveries` delivers nothing.
+        """
+        held = HeldDeliveries()
+        token = _held_deliveries.set(held)
+        try:
+            yield held
+        finally:
+            _held_deliveries.reset(token)
+
+    async def release(self, held: HeldDeliveries) -> None:
+        """Deliver held events in the order they were made."""
+        calls = list(held.calls)
+        held.calls.clear()
+        for name, args, kwargs in calls:
+            await getattr(self, name)(*args, **kwargs)
+
+    def _hold(self, name: str, *args: Any, **kwargs: Any) -> bool:
+        held = _held_deliveries.get()
+        if held is None:
+            return False
+        held.calls.append((name, args, kwargs))
+        return True
+
     async def send(self, session: WebSocketSession, payload: Any) -> None:
-        await session.websocket.send_json(normalize_server_event(payload))
+        if self._hold("send", session, payload):
+            return
+        await self.send_frame(session, encode_server_event(payload))
+
+    async def send_frame(self, session: WebSocketSession, frame: str) -> None:
+        """Send an event already encoded by `encode_server_event`."""
+        if self._hold("send_frame", session, frame):
+            return
+        websocket = session.websocket
+        if websocket not in self._outboxes:
+            await websocket.send_text(frame)
+            return
+        self._enqueue(websocket, frame)
+        await self._yield_to_writers()
 
     async def broadcast(
         self,
@@ -107,6 +239,8 @@ class WebSocketSessionService:
         groups: Iterable[SocketGroup] | None = None,
         exclude: Iterable[WebSocket] | None = None,
     ) -> None:
+        if self._hold("broadcast", payload, groups=groups, exclude=exclude):
+            return
         target_groups = tuple(groups) if groups is not None else VALID_SOCKET_GROUPS
         excluded_connections = set(exclude or [])
 
@@ -125,17 +259,12 @@ class WebSocketSessionService:
                     if session.is_dm
                 )
 
-        disconnected: list[WebSocket] = []
+        frame = encode_server_event(payload)
         for websocket in targets:
             if websocket in excluded_connections:
                 continue
-            try:
-                await websocket.send_json(normalize_server_event(payload))
-            except RuntimeError:
-                disconnected.append(websocket)
-
-        for websocket in disconnected:
-            await self.disconnect(websocket)
+            self._enqueue(websocket, frame)
+        await self._yield_to_writers()
 
     async def broadcast_by_role(
         self,
@@ -143,42 +272,189 @@ class WebSocketSessionService:
         player_payload: Any,
         dm_payload: Any,
     ) -> None:
+        if self._hold(
+            "broadcast_by_role",
+            player_payload=player_payload,
+            dm_payload=dm_payload,
+        ):
+            return
         async with self._lock:
             targets = tuple(self._sessions.items())
 
-        disconnected: list[WebSocket] = []
+        player_frame = encode_server_event(player_payload)
+        dm_frame = encode_server_event(dm_payload)
         for websocket, session in targets:
             if not session.is_authenticated:
                 continue
-            payload = dm_payload if session.is_dm else player_payload
-            try:
-                await websocket.send_json(normalize_server_event(payload))
-            except RuntimeError:
-                disconnected.append(websocket)
-
-        for websocket in disconnected:
-            await self.disconnect(websocket)
+            self._enqueue(websocket, dm_frame if session.is_dm else player_frame)
+        await self._yield_to_writers()
 
     async def broadcast_per_session(
         self,
         payload_for_session: Callable[[WebSocketSession], Any],
+        *,
+        audience: Callable[[WebSocketSession], Hashable] | None = None,
+        coalesce: Callable[[list[Any]], Any] | None = None,
+    ) -> None:
+        """Send each authenticated session its own payload.
+
+        Sessions that map to the same ``audience`` key are known to receive
+        identical payloads, so the payload is built and encoded once per key
+        and the resulting frame is shared between them.
+
+        With ``coalesce`` and a coalescing window, payloads still waiting in a
+        session's outbox when the next one arrives are passed to ``coalesce``
+        together and sent as the one event it returns.
+        """
+        if self._hold(
+            "broadcast_per_session",
+            payload_for_session,
+            audience=audience,
+            coalesce=coalesce,
+        ):
+            return
+        if coalesce is not None and audience is not None and self.coalesce_window_ms > 0:
+            await self._broadcast_coalescing(payload_for_session, audience, coalesce)
+            return
+        async with self._lock:
+            targets = tuple(self._sessions.items())
+
+        frames: dict[Hashable, str] = {}
+        for websocket, session in targets:
+            if not session.is_authenticated:
+                continue
+            if audience is None:
+                frame = encode_server_event(payload_for_session(session))
+            else:
+                key = audience(session)
+                frame = frames.get(key)
+                if frame is None:
+                    frame = encode_server_event(payload_for_session(session))
+                    frames[key] = frame
+            self._enqueue(websocket, frame)
+        await self._yield_to_writers()
+
+    async def _broadcast_coalescing(
+        self,
+        payload_for_session: Callable[[WebSocketSession], Any],
+        audience: Callable[[WebSocketSession], Hashable],
+        merge: Callable[[list[Any]], Any],
     ) -> None:
         async with self._lock:
             targets = tuple(self._sessions.items())
 
-        disconnected: list[WebSocket] = []
+        payloads: dict[Hashable, Any] = {}
         for websocket, session in targets:
             if not session.is_authenticated:
                 continue
+            outbox = self._outboxes.get(websocket)
+            if outbox is None:
+                continue
+            key = audience(session)
+            if key not in payloads:
+                payloads[key] = payload_for_session(session)
+            tail = outbox.pending[-1] if outbox.pending else None
+            if (
+                isinstance(tail, _Coalescing)
+                and not tail.sealed
+                and tail.merge is merge
+                and tail.audience == key
+            ):
+                tail.payloads.append(payloads[key])
+                continue
+            self._enqueue(websocket, _Coalescing(merge, key, [payloads[key]]))
+        await self._yield_to_writers()
+
+    def _coalesced_frame(self, entry: _Coalescing) -> str:
+        key = (entry.audience, tuple(id(payload) for payload in entry.payloads))
+        cached = self._coalesced_frames.get(key)
+        # The cached payloads keep their IDs from being reused while cached.
+        if cached is not None:
+            self._coalesced_frames.move_to_end(key)
+            return cached[1]
+        payload = (
+            entry.payloads[0] if len(entry.payloads) == 1 else entry.merge(entry.payloads)
+        )
+        frame = encode_server_event(payload)
+        self._coalesced_frames[key] = (tuple(entry.payloads), frame)
+        if len(self._coalesced_frames) > _COALESCED_FRAME_CACHE_SIZE:
+            self._coalesced_frames.popitem(last=False)
+        return frame
+
+    def _enqueue(self, websocket: WebSocket, frame: str | _Coalescing) -> None:
+        outbox = self._outboxes.get(websocket)
+        if outbox is None:
+            return
+        if len(outbox.pending) >= SEND_QUEUE_LIMIT:
+            self._evict(websocket)
+            return
+        outbox.pending.append(frame)
+        if outbox.writer is None or outbox.writer.done():
+            outbox.writer = asyncio.get_running_loop().create_task(
+                self._drain(websocket, outbox)
+            )
+
+    async def _yield_to_writers(self) -> None:
+        # One pass through the event loop lets writers whose sockets accept the
+        # event straight away deliver it before the caller moves on.
+        await asyncio.sleep(0)
+
+    async def _drain(self, websocket: WebSocket, outbox: _Outbox) -> None:
+        while outbox.pending:
+            head = outbox.pending[0]
+            if isinstance(head, _Coalescing):
+                if not head.sealed:
+                    await asyncio.sleep(self.coalesce_window_ms / 1000)
+                    head.sealed = True
+                    if not outbox.pending or outbox.pending[0] is not head:
+                        continue
+                outbox.pending.popleft()
+                frame = self._coalesced_frame(head)
+            else:
+                frame = outbox.pending.popleft()
             try:
-                await websocket.send_json(
-                    normalize_server_event(payload_for_session(session))
-                )
-            except RuntimeError:
-                disconnected.append(websocket)
+                await websocket.send_text(frame)
+            except Exception:
+                outbox.pending.clear()
+                await self.disconnect(websocket)
+                return
+
+    def _evict(self, websocket: WebSocket) -> None:
+        self._sessions.pop(websocket, None)
+        outbox = self._outboxes.pop(websocket, None)
+        if outbox is not None:
+            _stop_writer(outbox)
+        logger.warning(
+            "Disconnecting a websocket session that fell %d events behind.",
+            SEND_QUEUE_LIMIT,
+        )
+        task = asyncio.get_running_loop().create_task(
+            _close_slow_consumer(websocket)
+        )
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+
+def encode_server_event(payload: Any) -> str:
+    """Normalize a server event and encode it the way `send_json` would."""
+    return json.dumps(
+        normalize_server_event(payload),
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+
+
+def _stop_writer(outbox: _Outbox) -> None:
+    outbox.pending.clear()
+    if outbox.writer is not None and outbox.writer is not asyncio.current_task():
+        outbox.writer.cancel()
+
 
-        for websocket in disconnected:
-            await self.disconnect(websocket)
+async def _close_slow_consumer(websocket: WebSocket) -> None:
+    try:
+        await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+    except Exception:
+        logger.debug("Slow websocket consumer was already closed.", exc_info=True)
 
 
 websocket_sessions = WebSocketSessionService()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from copy import deepcopy
 from dataclasses import asdict, is_dataclass
 from uuid import uuid4
@@ -349,33 +350,69 @@ def _validate_item_action_grants(item: Item, state: State) -> None:
 
 def _validate_item_player_catalog_access(item: Item, state: State) -> None:
     for instance_id in item.player_catalog_access.instance_ids:
-        instance = state.instanced_sheets.get(instance_id)
-        parent = state.sheets.get(instance.parent_id) if instance else None
-        if instance is None or parent is None or parent.dm_only:
+        if not _is_player_instance(state, instance_id):
             raise ValueError(
                 "Item player catalog access references invalid player instance "
                 f"'{instance_id}'."
             )
 
 
-def synchronize_item_player_catalog_access_mutation(state: State) -> list:
+def _is_player_instance(state: State, instance_id: str) -> bool:
+    instance = state.instanced_sheets.get(instance_id)
+    parent = state.sheets.get(instance.parent_id) if instance else None
+    return parent is not None and not parent.dm_only
+
+
+def synchronize_item_player_catalog_access_mutation(
+    state: State,
+    item_ids: Iterable[str] | None = None,
+    *,
+    instance_ids: Iterable[str] = (),
+    sheet_ids: Iterable[str] = (),
+) -> list:
+    """Drop player catalog grants for instances that are no longer players'.
+
+    Checks every item when `item_ids` is None. Otherwise checks `item_ids` and
+    any item granted to one of `instance_ids`, or to an instance of one of
+    `sheet_ids`, that stopped being a player instance.
+    """
+    if item_ids is None:
+        candidate_ids = set(state.items)
+    else:
+        sheet_ids = set(sheet_ids)
+        lost_ids = {
+            instance_id
+            for instance_id in instance_ids
+            if not _is_player_instance(state, instance_id)
+        }
+        if sheet_ids:
+            lost_ids.update(
+                instance_id
+                for instance_id, instance in state.instanced_sheets.items()
+                if instance.parent_id in sheet_ids
+                and not _is_player_instance(state, instance_id)
+            )
+        candidate_ids = set(item_ids)
+        if lost_ids:
+            candidate_ids.update(
+                item_id
+                for item_id, item in state.items.items()
+                if item.player_catalog_access.mode == "selected"
+                and not lost_ids.isdisjoint(item.player_catalog_access.instance_ids)
+            )
+
     ops = []
-    valid_player_instance_ids = {
-        instance_id
-        for instance_id, instance in state.instanced_sheets.items()
-        if (
-            (parent := state.sheets.get(instance.parent_id)) is not None
-            and not parent.dm_only
-        )
-    }
-    for item_id, item in sorted(state.items.items()):
+    for item_id in sorted(candidate_ids):
+        item = state.items.get(item_id)
+        if item is None:
+            continue
         access = item.player_catalog_access
         if access.mode != "selected":
             continue
         retained_ids = [
             instance_id
             for instance_id in access.instance_ids
-            if instance_id in valid_player_instance_ids
+            if _is_player_instance(state, instance_id)
         ]
         if retained_ids == access.instance_ids:
             continue
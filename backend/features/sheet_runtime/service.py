@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import re
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
@@ -21,7 +21,7 @@ from backend.features.formula_runtime.service import (
     compose_roll20_expression,
     compose_roll20_message,
     evaluate_numeric_formula,
-    evaluate_resource_maxima,
+    evaluate_resource_maxima_batch,
     normalize_numeric_result,
     resolve_roll_mode,
 )
@@ -1163,12 +1163,24 @@ def effective_damage_resistance(
     return max(0.0, min(resistance, 1.0))
 
 
-def synchronize_resource_bounds_mutation(state: State) -> list[PatchOp]:
+def synchronize_resource_bounds_mutation(
+    state: State,
+    instance_ids: Iterable[str] | None = None,
+) -> list[PatchOp]:
+    """Clamp resources to their maxima, for every instance or only `instance_ids`.
+
+    The maxima are evaluated as one formula batch across the instances.
+    """
     ops: list[PatchOp] = []
-    for instance_id, instance in sorted(state.instanced_sheets.items()):
-        if instance.stats is None:
-            continue
-        maxima = evaluate_resource_maxima(instance)
+    if instance_ids is None:
+        instance_ids = state.instanced_sheets
+    instances: list[tuple[str, InstancedSheet]] = []
+    for instance_id in sorted(instance_ids):
+        instance = state.instanced_sheets.get(instance_id)
+        if instance is not None and instance.stats is not None:
+            instances.append((instance_id, instance))
+    all_maxima = evaluate_resource_maxima_batch([instance for _, instance in instances])
+    for (instance_id, instance), maxima in zip(instances, all_maxima, strict=True):
         for resource in ("health", "mana"):
             path = state_sync_service.join_path(
                 "instanced_sheets",
@@ -1,7 +1,27 @@
+from typing import Any
+
+from pydantic import ValidationError
+
+from backend.core.request_registry import (
+    RegistryError,
+    RequestRegistry,
+    validation_error_message,
+)
 from backend.features.session.models import WebSocketSession
-from backend.features.session.service import websocket_sessions
-from backend.features.state_sync.schema import ResyncState, UndoLastStateChange
+from backend.features.session.service import HeldDeliveries, websocket_sessions
+from backend.features.state_sync.schema import (
+    BatchCompleted,
+    BatchItemResult,
+    RequestBatch,
+    ResyncState,
+    UndoLastStateChange,
+)
 from backend.features.state_sync import service
+from backend.state.migrations import PersistedStateError
+
+
+class _BatchAborted(Exception):
+    """Raised inside a batch to roll back every request in it."""
 
 
 async def send_connection_bootstrap(session: WebSocketSession) -> None:
@@ -10,9 +30,9 @@ async def send_connection_bootstrap(session: WebSocketSession) -> None:
 
 async def handle_request(session: WebSocketSession, request: ResyncState) -> None:
     if request.last_seen_version is None:
-        await websocket_sessions.send(
+        await websocket_sessions.send_frame(
             session,
-            await service.state_sync_service.snapshot(
+            await service.state_sync_service.snapshot_frame(
                 request_id=request.request_id,
                 role=session.role,
                 assigned_instance_id=session.assigned_instance_id,
@@ -22,13 +42,14 @@ async def handle_request(session: WebSocketSession, request: ResyncState) -> Non
 
     replay = await service.state_sync_service.replay_since(
         request.last_seen_version,
+        epoch=request.last_seen_epoch,
         role=session.role,
         assigned_instance_id=session.assigned_instance_id,
     )
     if replay is None or not replay:
-        await websocket_sessions.send(
+        await websocket_sessions.send_frame(
             session,
-            await service.state_sync_service.snapshot(
+            await service.state_sync_service.snapshot_frame(
                 request_id=request.request_id,
                 role=session.role,
                 assigned_instance_id=session.assigned_instance_id,
@@ -47,3 +68,97 @@ async def handle_undo_last_state_change(request: UndoLastStateChange) -> None:
     )
     if not undone:
         raise ValueError("There are no state changes to undo.")
+
+
+async def handle_request_batch(
+    session: WebSocketSession,
+    request: RequestBatch,
+    registry: RequestRegistry,
+) -> None:
+    """Run the batched requests as one transaction, stopping at the first failure.
+
+    Events the requests send are held until the batch commits, then delivered
+    after its state patch; a failed batch delivers none of them.
+    """
+    results: list[BatchItemResult] = []
+    held = HeldDeliveries()
+    try:
+        async with service.state_sync_service.batch(request_id=request.request_id):
+            with websocket_sessions.hold_deliveries() as held:
+                for index, payload in enumerate(request.requests):
+                    result = await _run_batch_item(session, registry, held, index, payload)
+                    results.append(result)
+                    if result.status == "failed":
+                        raise _BatchAborted
+    except _BatchAborted:
+        applied = False
+        for result in results:
+            if result.status == "applied":
+                result.status = "rolled_back"
+        results.extend(
+            _batch_item_result(index, payload, "skipped")
+            for index, payload in enumerate(request.requests)
+            if index >= len(results)
+        )
+    else:
+        applied = True
+        await websocket_sessions.release(held)
+
+    await websocket_sessions.send(
+        session,
+        BatchCompleted(
+            response_id=None,
+            applied=applied,
+            results=results,
+            state_version=service.state_sync_service.current_version,
+            request_id=request.request_id,
+        ),
+    )
+
+
+async def _run_batch_item(
+    session: WebSocketSession,
+    registry: RequestRegistry,
+    held: HeldDeliveries,
+    index: int,
+    payload: dict[str, Any],
+) -> BatchItemResult:
+    start = len(held.calls)
+    try:
+        await registry.dispatch(session, payload)
+    except ValidationError as exc:
+        return _batch_item_result(index, payload, "failed", validation_error_message(exc))
+    except (RegistryError, PermissionError, PersistedStateError, ValueError) as exc:
+        return _batch_item_result(index, payload, "failed", str(exc))
+    # Some handlers answer a rejected request with an error event of their own
+    # instead of raising.
+    for event in held.sent_to(session, start=start):
+        reason = _error_reason(event)
+        if reason is not None:
+            return _batch_item_result(index, payload, "failed", reason)
+    return _batch_item_result(index, payload, "applied")
+
+
+def _batch_item_result(
+    index: int,
+    payload: dict[str, Any],
+    status: str,
+    reason: str | None = None,
+) -> BatchItemResult:
+    request_type = payload.get("type")
+    request_id = payload.get("request_id")
+    return BatchItemResult(
+        index=index,
+        request_type=request_type if isinstance(request_type, str) else None,
+        request_id=request_id if isinstance(request_id, str) else None,
+        status=status,
+        reason=reason,
+    )
+
+
+def _error_reason(event: Any) -> str | None:
+    if isinstance(event, dict):
+        event_type, reason = event.get("type"), event.get("reason")
+    else:
+        event_type, reason = getattr(event, "type", None), getattr(event, "reason", None)
+    return str(reason) if event_type == "error" else None
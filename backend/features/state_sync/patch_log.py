@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TextIO
+from uuid import uuid4
+
+from pydantic_core import to_jsonable_python
+
+from backend.core.transport import PatchOp
+from backend.features.state_sync.schema import StatePatch
+
+logger = logging.getLogger(__name__)
+# Bytes of published patches kept on disk for resync. The oldest segment is
+# dropped once the log grows past this; clients further behind get a snapshot.
+PATCH_LOG_RETENTION_BYTES = int(
+    os.environ.get("STATE_PATCH_LOG_RETENTION_BYTES", str(64 * 1024 * 1024))
+)
+PATCH_LOG_SEGMENT_BYTES = 4 * 1024 * 1024
+_META_FILE = "meta.json"
+_SEGMENT_SUFFIX = ".jsonl"
+
+
+def patch_log_directory(state_path: Path) -> Path:
+    return state_path.with_name(f"{state_path.name}.patches")
+
+
+@dataclass
+class _Segment:
+    path: Path
+    first_version: int
+    size: int
+
+
+class PatchLog:
+    """Published patches on disk, so resync can reach past the in-memory history.
+
+    Patches are appended to segment files named by the first version they hold,
+    one JSON line per patch. An epoch identifies one unbroken run of versions.
+
+    The log is best-effort: appends are flushed but not fsynced, so a crash
+    can lose any part of it the OS had not yet written, not only the tail.
+    `open` therefore reads the whole log back and keeps the epoch only when it
+    holds every version from its base through the version the persisted state
+    was loaded at. Anything else starts a new epoch, and clients get a snapshot.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        retention_bytes: int = PATCH_LOG_RETENTION_BYTES,
+        segment_bytes: int = PATCH_LOG_SEGMENT_BYTES,
+    ) -> None:
+        self.directory = directory
+        self.retention_bytes = retention_bytes
+        self.segment_bytes = segment_bytes
+        self.epoch = ""
+        self._base_version = 0
+        self._last_version = 0
+        self._segments: list[_Segment] = []
+        self._file: TextIO | None = None
+
+    @property
+    def size(self) -> int:
+        return sum(segment.size for segment in self._segments)
+
+    def open(self, state_version: int) -> str:
+        """Load the log for state at `state_version` and return its epoch."""
+        self.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = self._read_meta()
+        self._segments = self._scan_segments()
+        self._base_version = meta.get("base_version", 0) if meta else 0
+        self._last_version = self._base_version
+        if self._segments:
+            self._last_version = self._recover_tail(self._segments[-1])
+        if (
+            meta is None
+            or not isinstance(meta.get("epoch"), str)
+            or self._last_version != state_version
+            or not self._is_contiguous()
+        ):
+            if meta is not None:
+                logger.warning(
+                    "Patch log %s does not hold every version through %s; "
+                    "starting a new epoch.",
+                    self.directory,
+                    state_version,
+                )
+            return self.restart(state_version)
+        self.epoch = meta["epoch"]
+        return self.epoch
+
+    def restart(self, state_version: int) -> str:
+        """Drop every patch and start a new epoch at `state_version`."""
+        self.epoch = uuid4().hex
+        self.clear(state_version)
+        return self.epoch
+
+    def clear(self, state_version: int) -> None:
+        """Drop every patch, keeping the epoch; later appends follow `state_version`."""
+        self.close()
+        for segment in self._segments:
+            segment.path.unlink(missing_ok=True)
+        self._segments = []
+        self._base_version = state_version
+        self._last_version = state_version
+        self._write_meta()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def append(self, patch: StatePatch) -> None:
+        """Append the next published patch."""
+        if patch.state_version != self._last_version + 1:
+            raise ValueError(
+                f"Patch log expected version {self._last_version + 1}, "
+                f"got {patch.state_version}."
+            )
+        line = json.dumps(
+            {
+                "state_version": patch.state_version,
+                "request_id": patch.request_id,
+                "ops": to_jsonable_python(patch.ops or []),
+            },
+            separators=(",", ":"),
+        ) + "\n"
+        if not self._segments or self._segments[-1].size >= self.segment_bytes:
+            self._start_segment(patch.state_version)
+        segment = self._segments[-1]
+        if self._file is None:
+            self._file = segment.path.open("a", encoding="utf-8")
+        self._file.write(line)
+        self._file.flush()
+        segment.size += len(line.encode("utf-8"))
+        self._last_version = patch.state_version
+        self._enforce_retention()
+
+    def read_since(
+        self,
+        last_seen_version: int,
+        *,
+        max_bytes: int,
+    ) -> list[StatePatch] | None:
+        """Patches after `last_seen_version`, or None when the log cannot serve them.
+
+        Reading stops with None once the patches add up to more than
+        `max_bytes`, which callers set to what a snapshot would cost instead.
+        """
+        if last_seen_version > self._last_version:
+            return None
+        if last_seen_version == self._last_version:
+            return []
+        if not self._segments or last_seen_version + 1 < self._segments[0].first_version:
+            return None
+
+        index = bisect_right(
+            [segment.first_version for segment in self._segments],
+            last_seen_version + 1,
+        ) - 1
+        patches: list[StatePatch] = []
+        total = 0
+        for segment in self._segments[index:]:
+            with segment.path.open("rb") as file:
+                for line in file:
+                    record = json.loads(line)
+                    if record["state_version"] <= last_seen_version:
+                        continue
+                    total += len(line)
+                    if total > max_bytes:
+                        return None
+                    patches.append(_decode_patch(record))
+        return patches
+
+    def _start_segment(self, first_version: int) -> None:
+        self.close()
+        path = self.directory / f"{first_version:020d}{_SEGMENT_SUFFIX}"
+        self._segments.append(_Segment(path=path, first_version=first_version, size=0))
+
+    def _enforce_retention(self) -> None:
+        if len(self._segments) < 2 or self.size <= self.retention_bytes:
+            return
+        while len(self._segments) > 1 and self.size > self.retention_bytes:
+            dropped = self._segments.pop(0)
+            dropped.path.unlink(missing_ok=True)
+        self._base_version = self._segments[0].first_version - 1
+        self._write_meta()
+
+    def _scan_segments(self) -> list[_Segment]:
+        segments: list[_Segment] = []
+        for path in self.directory.glob(f"*{_SEGMENT_SUFFIX}"):
+            try:
+                first_version = int(path.name[: -len(_SEGMENT_SUFFIX)])
+            except ValueError:
+                continue
+            segments.append(
+                _Segment(path=path, first_version=first_version, size=path.stat().st_size)
+            )
+        segments.sort(key=lambda segment: segment.first_version)
+        return segments
+
+    def _is_contiguous(self) -> bool:
+        """Whether the segments hold each version after the base once, in order."""
+        expected = self._base_version + 1
+        for segment in self._segments:
+            if segment.first_version != expected:
+                return False
+            with segment.path.open("rb") as file:
+                for line in file:
+                    try:
+                        version = json.loads(line)["state_version"]
+                    except (ValueError, KeyError, TypeError):
+                        return False
+                    if version != expected:
+                        return False
+                    expected += 1
+        return expected - 1 == self._last_version
+
+    def _recover_tail(self, segment: _Segment) -> int:
+        """Cut a torn line off the last segment and return its last version."""
+        last_version = segment.first_version - 1
+        offset = 0
+        with segment.path.open("rb") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                last_version = record["state_version"]
+                offset += len(line)
+        if offset != segment.size:
+            with segment.path.open("r+b") as file:
+                file.truncate(offset)
+            segment.size = offset
+        return last_version
+
+    def _read_meta(self) -> dict[str, Any] | None:
+        try:
+            meta = json.loads((self.directory / _META_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return meta if isinstance(meta, dict) else None
+
+    def _write_meta(self) -> None:
+        path = self.directory / _META_FILE
+        temporary_path = path.with_name(f"{path.name}.tmp")
+        temporary_path.write_text(
+            json.dumps({"epoch": self.epoch, "base_version": self._base_version}),
+            encoding="utf-8",
+        )
+        os.replace(temporary_path, path)
+
+
+def _decode_patch(record: dict[str, Any]) -> StatePatch:
+    return StatePatch(
+        response_id=None,
+        ops=[PatchOp(**op) for op in record["ops"]],
+        state_version=record["state_version"],
+        request_id=record["request_id"],
+    )
@@ -0,0 +1,423 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from backend.features.formula_runtime.service import (
+    FormulaBatch,
+    FormulaMemo,
+    evaluate_resource_maxima,
+    evaluate_resource_maxima_batch,
+    evaluate_resource_maximum,
+    evaluate_sheet_stat,
+    evaluate_sheet_stats,
+    evaluate_sheet_stats_batch,
+)
+from backend.features.inventory.service import (
+    calculate_carried_weight,
+    calculate_container_contents_weights,
+)
+from backend.features.state_sync.rollback import MISSING, active_rollback_log
+from backend.state.models.attribute import FormulaDependencyGraph
+from backend.state.models.sheet import InstancedSheet, Sheet
+from backend.state.models.state import State
+
+SubjectKey = tuple[str, str]
+
+INVENTORY_ROOTS = ("sheets", "instanced_sheets")
+
+
+@dataclass(frozen=True)
+class InventoryProjection:
+    current_carried_weight: float
+    contents_weights: dict[str, float]
+
+
+class ProjectionStore:
+    """Derived sheet and instance values, kept until their inputs change.
+
+    Values are computed on first use and reused by snapshots and mutation
+    patches alike. State sync tells the store which subjects a transaction
+    touched; those entries are recomputed (or dropped) and everything else is
+    served from memory. The store is tied to one state object and starts over
+    when the state is replaced. Every entry written while a transaction's
+    rollback log is active is recorded there, so rolling the transaction back
+    puts back the entries it replaced and leaves the rest alone.
+
+    It also indexes which subjects carry each item, so an edit to one catalog
+    item only reaches the inventories that hold it. The index is built on first
+    use and each subject's entry is redone whenever its inventory is refreshed.
+
+    Each subject's formula dependency graph is kept too. When a transaction
+    writes under a subject whose stat values are stored, only the stats and
+    maxima downstream of those writes are evaluated again.
+
+    Many subjects that need stat values at once, such as every sheet in a
+    snapshot or the instances an encounter spawns, are evaluated as one
+    formula batch, since copies of a template share all their formulas.
+    """
+
+    def __init__(self) -> None:
+        self._state: State | None = None
+        self._stats: dict[SubjectKey, dict[str, Any]] = {}
+        self._inventory: dict[SubjectKey, InventoryProjection] = {}
+        self._holders: dict[str, frozenset[SubjectKey]] | None = None
+        self._held_items: dict[SubjectKey, frozenset[str]] = {}
+        self._graphs: dict[SubjectKey, FormulaDependencyGraph] = {}
+
+    def bind(self, state: State) -> None:
+        if state is not self._state:
+            self.clear()
+            self._state = state
+
+    def clear(self) -> None:
+        self._state = None
+        self._stats.clear()
+        self._inventory.clear()
+        self._holders = None
+        self._held_items.clear()
+        self._graphs.clear()
+
+    def stat_values(self, state: State, root: str, subject_id: str) -> dict[str, Any] | None:
+        """Evaluated stats and resource maxima, or None for a subject without stats."""
+        self.bind(state)
+        key = (root, subject_id)
+        cached = self._stats.get(key)
+        if cached is None:
+            cached = _evaluate_stat_values(state, root, subject_id)
+            if cached is not None:
+                self._write(self._stats, key, cached)
+        return cached
+
+    def prime_stat_values(self, state: State, keys: Iterable[SubjectKey]) -> None:
+        """Evaluate the stat values of every subject in `keys` not yet stored.
+
+        The subjects are evaluated together as one formula batch. If any of
+        them fails to evaluate, nothing is stored, and each subject raises on
+        its own when it is read.
+        """
+        self.bind(state)
+        subjects: list[tuple[SubjectKey, Sheet | InstancedSheet, int]] = []
+        owners: dict[int, int] = {}
+        stat_owners: list[Sheet | InstancedSheet] = []
+        for key in keys:
+            if key in self._stats:
+                continue
+            subject = _subject(state, *key)
+            owner = _stat_owner(state, key[0], subject)
+            if subject is None or owner is None or owner.stats is None:
+                continue
+            # Instances without their own stats share their template's values.
+            if id(owner) not in owners:
+                owners[id(owner)] = len(stat_owners)
+                stat_owners.append(owner)
+            subjects.append((key, subject, owners[id(owner)]))
+        if not stat_owners:
+            return
+        batch = FormulaBatch(stat_owners)
+        try:
+            maxima = evaluate_resource_maxima_batch(stat_owners, batch=batch)
+        except (ArithmeticError, SyntaxError, TypeError, ValueError):
+            return
+        evaluated_stats = evaluate_sheet_stats_batch(stat_owners, batch=batch)
+        for key, subject, index in subjects:
+            values = _stat_values(
+                key[0],
+                subject,
+                dict(evaluated_stats[index]),
+                maxima[index],
+            )
+            self._write(self._stats, key, values)
+
+    def inventory_values(
+        self,
+        state: State,
+        root: str,
+        subject_id: str,
+    ) -> InventoryProjection | None:
+        self.bind(state)
+        key = (root, subject_id)
+        cached = self._inventory.get(key)
+        if cached is None:
+            cached = _evaluate_inventory(state, root, subject_id)
+            if cached is not None:
+                self._write(self._inventory, key, cached)
+        return cached
+
+    def dependency_graph(
+        self,
+        state: State,
+        root: str,
+        subject_id: str,
+        changed: Sequence[Sequence[str]] = (),
+    ) -> FormulaDependencyGraph | None:
+        """The subject's formula dependency graph, brought up to date.
+
+        `changed` lists subject-relative paths written since the last call.
+        """
+        self.bind(state)
+        key = (root, subject_id)
+        subject = _subject(state, root, subject_id)
+        if subject is None:
+            self._write(self._graphs, key, MISSING)
+            return None
+        graph = self._graphs.get(key)
+        graph = (
+            FormulaDependencyGraph.build(subject)
+            if graph is None
+            else graph.refreshed(subject, changed)
+        )
+        self._write(self._graphs, key, graph)
+        return graph
+
+    def refresh_stat_values(
+        self,
+        state: State,
+        root: str,
+        subject_id: str,
+        changed: Sequence[Sequence[str]] | None = None,
+    ) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
+        """Recompute a subject's stat values, returning (previous, current).
+
+        With the subject-relative paths a transaction `changed`, only values
+        that depend on them are evaluated again; otherwise everything is.
+        """
+        self.bind(state)
+        key = (root, subject_id)
+        previous = self._stats.get(key)
+        self._write(self._stats, key, MISSING)
+        if root == "sheets":
+            self._forget_template_dependents(subject_id)
+        graph = (
+            self.dependency_graph(state, root, subject_id, changed)
+            if changed is not None
+            else None
+        )
+        subject = _subject(state, root, subject_id)
+        if (
+            previous is None
+            or graph is None
+            or subject is None
+            or subject.stats is None
+        ):
+            return previous, self.stat_values(state, root, subject_id)
+        current = _reevaluate_stat_values(subject, previous, graph.dirty(changed))
+        self._write(self._stats, key, current)
+        return previous, current
+
+    def refresh_inventory(
+        self,
+        state: State,
+        root: str,
+        subject_id: str,
+    ) -> tuple[InventoryProjection | None, InventoryProjection | None]:
+        """Recompute a subject's inventory weights, returning (previous, current)."""
+        self.bind(state)
+        key = (root, subject_id)
+        previous = self._inventory.get(key)
+        self._write(self._inventory, key, MISSING)
+        self._index_holder(state, root, subject_id)
+        return previous, self.inventory_values(state, root, subject_id)
+
+    def holders_of(self, state: State, item_id: str) -> set[SubjectKey]:
+        """Sheets and instances whose inventory has a bridge to `item_id`."""
+        self.bind(state)
+        if self._holders is None:
+            holders: dict[str, set[SubjectKey]] = {}
+            held_items: dict[SubjectKey, frozenset[str]] = {}
+            for root in INVENTORY_ROOTS:
+                for subject_id, subject in getattr(state, root).items():
+                    held = _held_item_ids(subject)
+                    held_items[(root, subject_id)] = held
+                    for held_id in held:
+                        holders.setdefault(held_id, set()).add((root, subject_id))
+            self._write(self, "_held_items", held_items)
+            self._write(
+                self,
+                "_holders",
+                {held_id: frozenset(keys) for held_id, keys in holders.items()},
+            )
+        return set(self._holders.get(item_id, ()))
+
+    def forget_stat_values(self, root: str, subject_id: str | None = None) -> None:
+        """Drop cached stat values for one subject, or for a whole root."""
+        self._forget(self._stats, root, subject_id)
+        # Writes the graph was not told about may have moved its reads.
+        self._forget(self._graphs, root, subject_id)
+        if root == "sheets" and subject_id is not None:
+            self._forget_template_dependents(subject_id)
+        elif root == "sheets":
+            self._forget(self._stats, "instanced_sheets")
+
+    def forget_inventory(self, root: str, subject_id: str | None = None) -> None:
+        """Drop cached inventory weights for one subject, or for a whole root."""
+        self._forget(self._inventory, root, subject_id)
+        if subject_id is None:
+            self._write(self, "_holders", None)
+            self._write(self, "_held_items", {})
+
+    def _write(self, container: Any, key: Any, value: Any) -> None:
+        """Set an entry or attribute, or drop an entry for `MISSING`.
+
+        Inside a transaction the replaced value is recorded in its rollback log.
+        """
+        if isinstance(container, dict):
+            prior = container.get(key, MISSING)
+            if value is MISSING:
+                container.pop(key, None)
+            else:
+                container[key] = value
+        else:
+            prior = getattr(container, key)
+            setattr(container, key, value)
+        log = active_rollback_log(self._state)
+        if log is not None and prior is not value:
+            log.record_entry(container, key, prior)
+
+    def _forget(
+        self,
+        cache: dict[SubjectKey, Any],
+        root: str,
+        subject_id: str | None = None,
+    ) -> None:
+        keys = (
+            [(root, subject_id)]
+            if subject_id is not None
+            else [key for key in cache if key[0] == root]
+        )
+        for key in keys:
+            self._write(cache, key, MISSING)
+
+    def _index_holder(self, state: State, root: str, subject_id: str) -> None:
+        index = self._holders
+        if index is None:
+            return
+        key = (root, subject_id)
+        subject = _subject(state, root, subject_id)
+        before = self._held_items.get(key, frozenset())
+        held = _held_item_ids(subject) if subject is not None else frozenset()
+        self._write(self._held_items, key, held if subject is not None else MISSING)
+        # Holder sets are replaced rather than edited so a rollback can put the
+        # previous set back.
+        for item_id in before - held:
+            holders = index.get(item_id, frozenset()) - {key}
+            self._write(index, item_id, holders or MISSING)
+        for item_id in held - before:
+            self._write(index, item_id, index.get(item_id, frozenset()) | {key})
+
+    def _forget_template_dependents(self, sheet_id: str) -> None:
+        # Instances without their own stats are evaluated from their template.
+        if self._state is None:
+            return
+        for instance_id, instance in self._state.instanced_sheets.items():
+            if instance.parent_id == sheet_id and instance.stats is None:
+                self._write(self._stats, ("instanced_sheets", instance_id), MISSING)
+
+
+def _held_item_ids(subject: Sheet | InstancedSheet) -> frozenset[str]:
+    return frozenset(bridge.item_id for bridge in subject.items.values())
+
+
+def _subject(state: State, root: str, subject_id: str) -> Sheet | InstancedSheet | None:
+    if root == "sheets":
+        return state.sheets.get(subject_id)
+    if root == "instanced_sheets":
+        return state.instanced_sheets.get(subject_id)
+    return None
+
+
+def _stat_owner(
+    state: State,
+    root: str,
+    subject: Sheet | InstancedSheet | None,
+) -> Sheet | InstancedSheet | None:
+    """The subject whose stats are evaluated for `subject`."""
+    if subject is None or root == "sheets" or subject.stats is not None:
+        return subject
+    return state.sheets.get(subject.parent_id)
+
+
+def _evaluate_stat_values(
+    state: State,
+    root: str,
+    subject_id: str,
+) -> dict[str, Any] | None:
+    subject = _subject(state, root, subject_id)
+    stat_owner = _stat_owner(state, root, subject)
+    if subject is None or stat_owner is None:
+        return None
+    # Stats and maxima reference one another, so they share one memo.
+    memo = FormulaMemo()
+    maxima = evaluate_resource_maxima(stat_owner, memo=memo)
+    return _stat_values(
+        root,
+        subject,
+        evaluate_sheet_stats(stat_owner, memo=memo),
+        maxima,
+    )
+
+
+def _stat_values(
+    root: str,
+    subject: Sheet | InstancedSheet,
+    evaluated_stats: dict[str, float | int],
+    maxima: dict[str, int],
+) -> dict[str, Any]:
+    values: dict[str, Any] = {
+        "evaluated_stats": evaluated_stats,
+        "evaluated_max_health": maxima["health"],
+        "evaluated_max_mana": maxima["mana"],
+    }
+    if root == "instanced_sheets":
+        from backend.features.sheet_runtime.service import evaluate_reaction_limit
+
+        values["evaluated_max_reactions"] = evaluate_reaction_limit(subject)
+    return values
+
+
+def _reevaluate_stat_values(
+    subject: Sheet | InstancedSheet,
+    previous: dict[str, Any],
+    dirty: set[tuple[str, ...]],
+) -> dict[str, Any]:
+    memo = FormulaMemo()
+    previous_stats = previous["evaluated_stats"]
+    evaluated_stats: dict[str, float | int] = {}
+    for stat_name in vars(subject.stats):
+        if ("stats", stat_name) in dirty:
+            result = evaluate_sheet_stat(subject, stat_name, memo=memo)
+        else:
+            result = previous_stats.get(stat_name)
+        if result is not None:
+            evaluated_stats[stat_name] = result
+    current = {**previous, "evaluated_stats": evaluated_stats}
+    for resource in ("health", "mana"):
+        if (f"max_{resource}",) in dirty:
+            current[f"evaluated_max_{resource}"] = evaluate_resource_maximum(
+                subject,
+                resource,
+                memo=memo,
+            )
+    if "evaluated_max_reactions" in current:
+        from backend.features.sheet_runtime.service import evaluate_reaction_limit
+
+        current["evaluated_max_reactions"] = evaluate_reaction_limit(subject)
+    return current
+
+
+def _evaluate_inventory(
+    state: State,
+    root: str,
+    subject_id: str,
+) -> InventoryProjection | None:
+    subject = _subject(state, root, subject_id)
+    if subject is None:
+        return None
+    return InventoryProjection(
+        current_carried_weight=calculate_carried_weight(subject.items, state.items),
+        contents_weights=calculate_container_contents_weights(
+            subject.items,
+            state.items,
+        ),
+    )
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from backend.core.transport import PatchOp
+from backend.features.session.models import SessionRole
+from backend.features.state_sync.visibility import PlayerVisibility
+from backend.state.models.state import State
+
+# Distinct paths whose resolved handler each policy remembers.
+_RESOLVED_LIMIT = 4096
+
+
+@dataclass
+class RedactionContext:
+    """One patch being redacted for one audience.
+
+    Handlers append what the audience receives to `ops`. `state` is the
+    published state the patch belongs to. The player's visibility and the
+    projected state are built on first use and shared by every operation in
+    the patch.
+    """
+
+    state: State
+    role: SessionRole
+    assigned_instance_id: str | None
+    project: Callable[[], dict[str, Any]]
+    player_visibility: Callable[[], PlayerVisibility]
+    ops: list[PatchOp] = field(default_factory=list)
+    refresh_catalog_projection: bool = False
+    _projected_state: dict[str, Any] | None = None
+    _visibility: PlayerVisibility | None = None
+
+    def projected_state(self) -> dict[str, Any]:
+        if self._projected_state is None:
+            self._projected_state = self.project()
+        return self._projected_state
+
+    def visibility(self) -> PlayerVisibility:
+        if self._visibility is None:
+            self._visibility = self.player_visibility()
+        return self._visibility
+
+
+RedactionHandler = Callable[[RedactionContext, PatchOp, tuple[str, ...]], None]
+
+
+@dataclass
+class _PolicyNode:
+    children: dict[str, _PolicyNode] = field(default_factory=dict)
+    handler: RedactionHandler | None = None
+
+
+class RedactionPolicy:
+    """Path rules compiled into a prefix trie.
+
+    A rule's pattern is a path prefix whose segments may be `*` to match any
+    entity; a literal segment takes precedence over `*`. An operation is handled
+    by the rule with the longest pattern along its path, or by `default`, so
+    resolving one costs a walk of its depth. Resolutions are remembered per
+    path, since they depend only on the path's segments.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[tuple[Sequence[str], RedactionHandler]],
+        *,
+        default: RedactionHandler,
+    ) -> None:
+        self._default = default
+        self._root = _PolicyNode()
+        self._resolved: dict[tuple[str, ...], RedactionHandler] = {}
+        for pattern, handler in rules:
+            node = self._root
+            for segment in pattern:
+                node = node.children.setdefault(segment, _PolicyNode())
+            if node.handler is not None:
+                raise ValueError(f"Redaction rule {'/'.join(pattern)} is registered twice.")
+            node.handler = handler
+
+    def resolve(self, segments: tuple[str, ...]) -> RedactionHandler:
+        handler = self._resolved.get(segments)
+        if handler is not None:
+            return handler
+        node = self._root
+        handler = self._default
+        for segment in segments:
+            child = node.children.get(segment) or node.children.get("*")
+            if child is None:
+                break
+            node = child
+            if node.handler is not None:
+                handler = node.handler
+        if len(self._resolved) >= _RESOLVED_LIMIT:
+            self._resolved.clear()
+        self._resolved[segments] = handler
+        return handler
+
+    def apply(self, context: RedactionContext, ops: Iterable[PatchOp]) -> None:
+        for op in ops:
+            segments = op.segments
+            self.resolve(segments)(context, op, segments)
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from copy import copy, deepcopy
+from dataclasses import dataclass, replace
+from typing import Any
+
+from backend.core.transport import PatchOp
+from backend.state.models.state import State
+
+MISSING = object()
+
+
+@dataclass(frozen=True)
+class _PriorRoot:
+    root: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class _PriorValue:
+    """One path helper write and the value it replaced.
+
+    `container` and `leaf` locate the write (`leaf` is a position for lists),
+    `path` addresses it with list positions made concrete, and `value` is the
+    detached prior value, or `MISSING` where the write created the node.
+    """
+
+    path: str
+    segments: tuple[str, ...]
+    container: Any
+    leaf: Any
+    op: str
+    value: Any
+    amount: int | float | None = None
+
+
+@dataclass(frozen=True)
+class _PriorEntry:
+    """A write to a cache derived from the state, and what it replaced.
+
+    `container` is the cache, a dict or an object, and `key` the entry or
+    attribute written. `value` is `MISSING` where the write created the entry.
+    These records are not state writes: they stay out of the write set, the
+    undo entry and the published view.
+    """
+
+    container: Any
+    key: Any
+    value: Any
+
+
+class RollbackLog:
+    """The prior value of every path a transaction wrote, in write order.
+
+    Nothing is copied up front except the roots mutations edit without the path
+    helpers. Each helper write records the node it replaced, which the write
+    itself detached, so nothing is cloned either. Restoring undoes the writes in
+    reverse, and the same records invert into the transaction's undo entry.
+    """
+
+    def __init__(self, state: State) -> None:
+        self.state = state
+        self._records: list[_PriorRoot | _PriorValue | _PriorEntry] = []
+        self._preserved: set[str] = set()
+
+    def preserve_root(self, root: str, *, deep: bool = True) -> None:
+        """Keep a whole root for a mutation that edits it without the path helpers."""
+        if root in self._preserved:
+            return
+        current = getattr(self.state, root)
+        self._preserved.add(root)
+        self._records.append(
+            _PriorRoot(root=root, value=deepcopy(current) if deep else copy(current))
+        )
+
+    def preserved_root(self, root: str) -> Any:
+        """The value a root held before the transaction, or `MISSING`."""
+        for record in self._records:
+            if isinstance(record, _PriorRoot) and record.root == root:
+                return record.value
+        return MISSING
+
+    def record(
+        self,
+        path: str,
+        segments: Sequence[str],
+        container: Any,
+        leaf: Any,
+        op: str,
+        prior: Any,
+        *,
+        amount: int | float | None = None,
+    ) -> None:
+        """Record a path helper write that has just replaced `prior`."""
+        self._records.append(
+            _PriorValue(
+                path=path,
+                segments=tuple(segments),
+                container=container,
+                leaf=leaf,
+                op=op,
+                value=prior,
+                amount=amount,
+            )
+        )
+
+    def record_entry(self, container: Any, key: Any, prior: Any) -> None:
+        """Record a derived cache write that has just replaced `prior`."""
+        self._records.append(_PriorEntry(container=container, key=key, value=prior))
+
+    def written_branches(self) -> frozenset[tuple[str, str | None]]:
+        """The entities (or whole roots, keyed `None`) this transaction changed."""
+        return frozenset(
+            _branch(record)
+            for record in self._records
+            if not isinstance(record, _PriorEntry)
+        )
+
+    def release_unchanged_roots(self, roots: Iterable[str]) -> None:
+        """Stop tracking preserved roots that still equal their kept copies.
+
+        Roots kept up front are recorded whether or not the transaction changes
+        them. Releasing the unchanged ones keeps them out of the write set and
+        keeps a later restore from overwriting another transaction's edit.
+        """
+        for root in roots:
+            for index, record in enumerate(self._records):
+                if isinstance(record, _PriorRoot) and record.root == root:
+                    if record.value == getattr(self.state, root):
+                        del self._records[index]
+                        self._preserved.discard(root)
+                    break
+
+    def savepoint(self) -> int:
+        """A mark that `rollback_to` can later undo the log back to."""
+        return len(self._records)
+
+    def rollback_to(self, savepoint: int, *, later: Sequence[RollbackLog] = ()) -> None:
+        """Undo the writes recorded after `savepoint`, keeping the earlier ones.
+
+        `later` lists, oldest first, the logs of transactions staged on top of
+        this one. State writes never overlap theirs, but cache entries can: an
+        entry one of them wrote again keeps its value, and the prior value is
+        handed to that log for its own rollback to restore.
+        """
+        for record in reversed(self._records[savepoint:]):
+            if isinstance(record, _PriorRoot):
+                setattr(self.state, record.root, record.value)
+                self._preserved.discard(record.root)
+            elif isinstance(record, _PriorEntry):
+                if not _hand_entry_to(later, record):
+                    _undo_write(record.container, record.key, "set", record.value)
+            else:
+                _undo_write(record.container, record.leaf, record.op, record.value)
+        del self._records[savepoint:]
+
+    def restore(self, *, later: Sequence[RollbackLog] = ()) -> None:
+        self.rollback_to(0, later=later)
+
+    def inverse_operations(self) -> list[PatchOp]:
+        """Operations that undo the recorded writes, newest first.
+
+        Preserved roots are not included; their edits are not undoable.
+        """
+        inverse: list[PatchOp] = []
+        for record in reversed(self._records):
+            if not isinstance(record, _PriorValue):
+                continue
+            if record.op == "inc":
+                inverse.append(PatchOp(op="inc", path=record.path, value=-record.amount))
+            elif record.op == "remove":
+                inverse.append(PatchOp(op="add", path=record.path, value=record.value))
+            elif record.value is MISSING:
+                inverse.append(PatchOp(op="remove", path=record.path))
+            else:
+                inverse.append(PatchOp(op="set", path=record.path, value=record.value))
+        return inverse
+
+
+def branches_overlap(
+    left: Iterable[tuple[str, str | None]],
+    right: Iterable[tuple[str, str | None]],
+) -> bool:
+    """Whether two write sets share an entity, counting a whole root as all of it."""
+    entities: dict[str, set[str | None]] = {}
+    for root, key in left:
+        entities.setdefault(root, set()).add(key)
+    for root, key in right:
+        keys = entities.get(root)
+        if keys is not None and (key is None or None in keys or key in keys):
+            return True
+    return False
+
+
+def published_state(state: State, logs: Sequence[RollbackLog]) -> State:
+    """`state` as it stood before the given transactions, which must not overlap.
+
+    Returns `state` itself when there is nothing to undo. Otherwise the copy is
+    shallow: only the entities those transactions wrote are copied, and their
+    writes are undone on the copies.
+    """
+    records = [
+        record
+        for log in logs
+        for record in reversed(log._records)
+        if not isinstance(record, _PriorEntry)
+    ]
+    if not records:
+        return state
+    view = copy(state)
+    copied_roots: set[str] = set()
+    copied_entities: set[tuple[str, str]] = set()
+    for record in records:
+        if isinstance(record, _PriorRoot):
+            continue
+        root, key = _branch(record)
+        if root in copied_roots:
+            continue
+        if key is None:
+            setattr(view, root, deepcopy(getattr(state, root)))
+            copied_roots.add(root)
+            continue
+        if (root, key) in copied_entities:
+            continue
+        if not any(branch[0] == root for branch in copied_entities):
+            setattr(view, root, dict(getattr(state, root)))
+        copied_entities.add((root, key))
+        entities = getattr(view, root)
+        if key in entities:
+            entities[key] = deepcopy(entities[key])
+
+    # Each log is undone newest record first, as `restore` does.
+    for record in records:
+        if isinstance(record, _PriorRoot):
+            setattr(view, record.root, record.value)
+            continue
+        container = _resolve(view, record.segments[:-1])
+        value = record.value if record.value is MISSING else deepcopy(record.value)
+        _undo_write(container, record.leaf, record.op, value)
+    return view
+
+
+def _branch(record: _PriorRoot | _PriorValue) -> tuple[str, str | None]:
+    if isinstance(record, _PriorRoot):
+        return record.root, None
+    if len(record.segments) == 1:
+        return record.segments[0], None
+    return record.segments[0], record.segments[1]
+
+
+def _hand_entry_to(logs: Sequence[RollbackLog], record: _PriorEntry) -> bool:
+    for log in logs:
+        for index, other in enumerate(log._records):
+            if (
+                isinstance(other, _PriorEntry)
+                and other.container is record.container
+                and other.key == record.key
+            ):
+                log._records[index] = replace(other, value=record.value)
+                return True
+    return False
+
+
+def _resolve(root: Any, segments: Sequence[str]) -> Any:
+    current = root
+    for segment in segments:
+        if isinstance(current, dict):
+            current = current[segment]
+        elif isinstance(current, list):
+            current = current[int(segment)]
+        else:
+            current = getattr(current, segment)
+    return current
+
+
+def _undo_write(container: Any, leaf: Any, op: str, prior: Any) -> None:
+    if isinstance(container, list):
+        if op == "add":
+            del container[leaf]
+        elif op == "remove":
+            container.insert(leaf, prior)
+        else:
+            container[leaf] = prior
+    elif isinstance(container, dict):
+        if prior is MISSING:
+            container.pop(leaf, None)
+        else:
+            container[leaf] = prior
+    else:
+        setattr(container, leaf, prior)
+
+
+_active_rollback_log: ContextVar[RollbackLog | None] = ContextVar(
+    "active_rollback_log",
+    default=None,
+)
+
+
+def active_rollback_log(state: Any) -> RollbackLog | None:
+    log = _active_rollback_log.get()
+    if log is None or log.state is not state:
+        return None
+    return log
+
+
+@contextmanager
+def rollback_scope(state: State) -> Iterator[RollbackLog]:
+    with recording_into(RollbackLog(state)) as log:
+        yield log
+
+
+@contextmanager
+def recording_into(log: RollbackLog) -> Iterator[RollbackLog]:
+    """Make `log` the active log, such as for writes made after staging."""
+    token = _active_rollback_log.set(log)
+    try:
+        yield log
+    finally:
+        _active_rollback_log.reset(token)
@@ -5,8 +5,16 @@ from backend.core.request_registry import (
 )
 from backend.features.session.models import WebSocketSession
 from backend.features.state_sync import handler
-from backend.features.state_sync.schema import ResyncState, UndoLastStateChange
-from backend.protocol.socket import StatePatchEvent, StateSnapshotEvent
+from backend.features.state_sync.schema import (
+    RequestBatch,
+    ResyncState,
+    UndoLastStateChange,
+)
+from backend.protocol.socket import (
+    BatchCompletedEvent,
+    StatePatchEvent,
+    StateSnapshotEvent,
+)
 
 
 class ResyncStateRoute(RequestRoute[ResyncState]):
@@ -42,6 +50,30 @@ class UndoLastStateChangeRoute(RequestRoute[UndoLastStateChange]):
         await handler.handle_undo_last_state_change(request)
 
 
+class RequestBatchRoute(RequestRoute[RequestBatch]):
+    """Runs many requests as one transaction with one patch and one write.
+
+    Each batched request is authorized against its own route, so the batch
+    itself only requires an authenticated session.
+    """
+
+    type_name = "batch"
+    request_model = RequestBatch
+    emitted_event_models = (StatePatchEvent, BatchCompletedEvent)
+    minimum_role = "player"
+    client_generation = ClientGenerationMetadata(
+        namespace="stateSync",
+        method_name="batch",
+    )
+
+    def __init__(self, registry: RequestRegistry) -> None:
+        self._registry = registry
+
+    async def handle(self, session: WebSocketSession, request: RequestBatch) -> None:
+        await handler.handle_request_batch(session, request, self._registry)
+
+
 def register_routes(registry: RequestRegistry) -> None:
     registry.register(ResyncStateRoute())
     registry.register(UndoLastStateChangeRoute())
+    registry.register(RequestBatchRoute(registry))
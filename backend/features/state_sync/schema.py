@@ -3,11 +3,17 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Literal
 
+from pydantic import Field
+
 from backend.core.transport import PatchOp, RequestModel, ResponseModel
 
+# Requests one batch may carry.
+BATCH_REQUEST_LIMIT = 500
+
 
 class ResyncState(RequestModel):
     last_seen_version: int | None = None
+    last_seen_epoch: str | None = None
     type: Literal["resync_state"]
 
 
@@ -15,10 +21,16 @@ class UndoLastStateChange(RequestModel):
     type: Literal["undo_last_state_change"]
 
 
+class RequestBatch(RequestModel):
+    requests: list[dict[str, Any]] = Field(min_length=1, max_length=BATCH_REQUEST_LIMIT)
+    type: Literal["batch"]
+
+
 @dataclass
 class StateSnapshot(ResponseModel):
     state: dict[str, Any]
     state_version: int
+    state_epoch: str | None = None
     type: Literal["state_snapshot"] = "state_snapshot"
     request_id: str | None = None
 
@@ -29,3 +41,43 @@ class StatePatch(ResponseModel):
     state_version: int = 0
     type: Literal["state_patch"] = "state_patch"
     request_id: str | None = None
+
+
+@dataclass
+class PatchVersion:
+    state_version: int
+    request_id: str | None = None
+
+
+@dataclass
+class CoalescedStatePatch(ResponseModel):
+    """Consecutive patches merged into one frame.
+
+    `ops` take a client from `base_version` to `state_version`; `versions`
+    lists every version in between with the request that produced it.
+    """
+
+    ops: list[PatchOp]
+    base_version: int
+    state_version: int
+    versions: list[PatchVersion]
+    type: Literal["coalesced_state_patch"] = "coalesced_state_patch"
+    request_id: str | None = None
+
+
+@dataclass
+class BatchItemResult:
+    index: int
+    request_type: str | None
+    request_id: str | None
+    status: Literal["applied", "rolled_back", "failed", "skipped"]
+    reason: str | None = None
+
+
+@dataclass
+class BatchCompleted(ResponseModel):
+    applied: bool
+    results: list[BatchItemResult]
+    state_version: int
+    type: Literal["batch_completed"] = "batch_completed"
+    request_id: str | None = None
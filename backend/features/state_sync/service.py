@@ -1,37 +1,61 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
-from collections import deque
-from collections.abc import Awaitable, Callable
-from copy import deepcopy
-from dataclasses import asdict, dataclass, fields, is_dataclass
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Collection, Iterator
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from copy import copy, deepcopy
+from dataclasses import asdict, dataclass, field, is_dataclass
 from typing import Any, TypeVar
+from uuid import uuid4
 
 from backend.core.request_context import RequestSource, current_request_source
+from backend.core.state_path import StatePath, join_state_path, parse_state_path
 from backend.core.transport import PatchOp
 from backend.features.action_history.service import (
     serialize_action_history,
     serialize_action_history_entry,
 )
-from backend.features.formula_runtime.service import (
-    evaluate_resource_maxima,
-    evaluate_sheet_stats,
+from backend.features.session.models import SessionRole, WebSocketSession
+from backend.features.session.service import encode_server_event, websocket_sessions
+from backend.features.state_sync.patch_log import PatchLog
+from backend.features.state_sync.projections import ProjectionStore
+from backend.features.state_sync.redaction import (
+    RedactionContext,
+    RedactionHandler,
+    RedactionPolicy,
 )
-from backend.features.inventory.service import (
-    calculate_carried_weight,
-    calculate_container_contents_weights,
+from backend.features.state_sync.rollback import (
+    MISSING as _MISSING,
+    RollbackLog,
+    active_rollback_log,
+    branches_overlap,
+    published_state,
+    recording_into,
+    rollback_scope,
 )
-from backend.features.session.models import SessionRole, WebSocketSession
-from backend.features.session.service import websocket_sessions
 from backend.features.state_sync.schema import (
+    CoalescedStatePatch,
+    PatchVersion,
     StatePatch,
     StateSnapshot,
 )
+from backend.features.state_sync.synchronizers import (
+    SynchronizerRegistry,
+    SynchronizerScope,
+)
+from backend.features.state_sync.visibility import PlayerVisibility, VisibilityIndex
+from backend.state.models.attribute import FormulaDependencyGraph
 from backend.state.models.state import State
 from backend.state.store import StateSingleton
 
 MutationResultT = TypeVar("MutationResultT")
+StagedT = TypeVar("StagedT")
+PatchAudience = tuple[SessionRole, str | None]
 logger = logging.getLogger(__name__)
 PRIVATE_ITEM_FIELDS = {
     "gm_notes",
@@ -50,13 +74,69 @@ DM_ONLY_STATE_ROOTS = {
     "encounter_presets",
     "item_templates",
 }
-_MISSING = object()
+# Roots edited directly rather than through the path helpers, mapped to whether
+# their records are edited in place. Access codes are private and never patched;
+# checkpoint writes prune action history by replacing its root, and history
+# entries themselves are only ever replaced. Every rollback keeps these up front.
+DIRECTLY_EDITED_STATE_ROOTS = {
+    "sheet_access_codes": True,
+    "action_history": False,
+}
+# Directly edited roots whose changes no patch operation describes. The journal
+# records them as whole-root writes whenever a transaction changes them.
+UNPATCHED_STATE_ROOTS = ("sheet_access_codes",)
+# Encoded snapshots kept for the current state version, across all audiences.
+SNAPSHOT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Snapshot events end with their request ID, so a cached frame encoded without
+# one can be answered to a resync by swapping in the caller's ID.
+_SNAPSHOT_REQUEST_ID_TAIL = ',"request_id":null}'
 
 
 class DuplicateRequestError(ValueError):
     """Raised when a completed state-changing request is submitted again."""
 
 
+class AbortedCommitError(RuntimeError):
+    """Raised when a transaction is undone because a commit queued before it failed."""
+
+
+@dataclass(eq=False)
+class _PendingCommit:
+    """A staged transaction waiting for its journal write to become durable.
+
+    `settled` resolves once the transaction is published (True) or rolled back
+    (False); the next pending commit waits on it before publishing. An
+    `exclusive` commit writes a full checkpoint of memory, so nothing may be
+    staged on top of it until it settles. Only a commit that
+    `advances_version` publishes a patch and takes the next state version.
+    """
+
+    rollback: RollbackLog
+    write: Future[None]
+    settled: asyncio.Future[bool]
+    previous: asyncio.Future[bool] | None
+    exclusive: bool
+    advances_version: bool = True
+    request_id: str | None = None
+
+    @property
+    def failed(self) -> bool:
+        return self.write.done() and self.write.exception() is not None
+
+
+@dataclass(eq=False)
+class _OpenBatch:
+    """The transaction that mutations join while a request batch runs."""
+
+    service: StateSyncService
+    rollback: RollbackLog
+    ops: list[PatchOp] = field(default_factory=list)
+    request_ids: list[str] = field(default_factory=list)
+
+
+_open_batch: ContextVar[_OpenBatch | None] = ContextVar("open_batch", default=None)
+
+
 @dataclass(frozen=True)
 class MutationAuditEntry:
     state_version: int
@@ -86,12 +166,14 @@ def build_state_snapshot(
     state: dict[str, Any],
     *,
     state_version: int,
+    state_epoch: str | None = None,
     request_id: str | None = None,
 ) -> StateSnapshot:
     return StateSnapshot(
         response_id=None,
         state=state,
         state_version=state_version,
+        state_epoch=state_epoch,
         request_id=request_id,
     )
 
@@ -110,16 +192,113 @@ def build_state_patch(
     )
 
 
+def coalesce_state_patches(patches: list[StatePatch]) -> CoalescedStatePatch:
+    """Merge consecutive patches for one audience into a single frame."""
+    return CoalescedStatePatch(
+        response_id=None,
+        ops=coalesce_operations([op for patch in patches for op in patch.ops or []]),
+        base_version=patches[0].state_version - 1,
+        state_version=patches[-1].state_version,
+        versions=[
+            PatchVersion(state_version=patch.state_version, request_id=patch.request_id)
+            for patch in patches
+        ],
+        request_id=patches[-1].request_id,
+    )
+
+
+def coalesce_operations(ops: list[PatchOp]) -> list[PatchOp]:
+    """Drop operations that a later `set` overwrites.
+
+    A `set` supersedes an earlier `set` or `inc` of the same path and every
+    earlier operation below it. The search stops at an `add` or `remove` in a
+    container along the path, since that can shift the list positions the
+    earlier paths refer to.
+    """
+    kept: list[PatchOp | None] = []
+    for op in ops:
+        if op.op == "set":
+            segments = op.segments
+            for index in range(len(kept) - 1, -1, -1):
+                earlier = kept[index]
+                if earlier is None:
+                    continue
+                earlier_segments = earlier.segments
+                if _path_within(earlier_segments, segments) and (
+                    len(earlier_segments) > len(segments)
+                    or earlier.op in ("set", "inc")
+                ):
+                    kept[index] = None
+                elif earlier.op in ("add", "remove") and _path_within(
+                    segments, earlier_segments[:-1]
+                ):
+                    break
+        kept.append(op)
+    return [op for op in kept if op is not None]
+
+
+def _dict_patch_operations(
+    path: StatePath,
+    previous: dict[str, Any],
+    current: dict[str, Any],
+) -> list[PatchOp]:
+    """Operations turning the dict at `path` from `previous` into `current`."""
+    operations = [
+        PatchOp(op="set", path=join_state_path(*path.segments, key), value=value)
+        for key, value in current.items()
+        if key not in previous or previous[key] != value
+    ]
+    operations.extend(
+        PatchOp(op="remove", path=join_state_path(*path.segments, key))
+        for key in previous
+        if key not in current
+    )
+    return operations
+
+
+def _path_within(segments: tuple[str, ...], prefix: tuple[str, ...]) -> bool:
+    return segments[: len(prefix)] == prefix
+
+
+def _keep_op(context: RedactionContext, op: PatchOp, segments: tuple[str, ...]) -> None:
+    context.ops.append(op)
+
+
+def _drop_op(context: RedactionContext, op: PatchOp, segments: tuple[str, ...]) -> None:
+    return None
+
+
+def _keep_or_remove(context: RedactionContext, op: PatchOp, visible: bool) -> None:
+    """Forward a visible op; turn a hidden `set` into a removal of its path."""
+    if visible:
+        context.ops.append(op)
+    elif op.op == "set":
+        context.ops.append(PatchOp(op="remove", path=op.path))
+
+
+def _for_own_instance(handler: RedactionHandler) -> RedactionHandler:
+    def redact(context: RedactionContext, op: PatchOp, segments: tuple[str, ...]) -> None:
+        if segments[1] == context.assigned_instance_id:
+            handler(context, op, segments)
+
+    return redact
+
+
 async def send_bootstrap(session: WebSocketSession) -> None:
-    await websocket_sessions.send(
+    await websocket_sessions.send_frame(
         session,
-        await state_sync_service.snapshot(
+        await state_sync_service.snapshot_frame(
             role=session.role,
             assigned_instance_id=session.assigned_instance_id,
         ),
     )
 
 
+def patch_audience(session: WebSocketSession) -> PatchAudience:
+    """Sessions with the same key receive identical redacted patches."""
+    return (session.role, session.assigned_instance_id)
+
+
 class StateSyncService:
     def __init__(
         self,
@@ -133,9 +312,38 @@ class StateSyncService:
             raise ValueError("processed_request_limit must be at least 1.")
         if mutation_audit_limit < 1:
             raise ValueError("mutation_audit_limit must be at least 1.")
+        # Serializes staging: running a mutation against memory and queueing
+        # its journal write. Waiting for the write happens outside the lock.
         self._lock = asyncio.Lock()
         self._state_version = 0
+        # Names the run of versions clients have seen; a resync from another
+        # epoch gets a snapshot. Patches older than the in-memory history are
+        # read back from the patch log, when one is attached.
+        self._state_epoch = uuid4().hex
+        self._patch_log: PatchLog | None = None
+        # Staged transactions in commit order, removed as they publish or roll
+        # back, and the transaction currently being staged under the lock.
+        self._pending: deque[_PendingCommit] = deque()
+        self._staging: RollbackLog | None = None
         self._patch_history: deque[StatePatch] = deque(maxlen=patch_history_limit)
+        # Redacted copies of retained patches, keyed by version and audience,
+        # shared by every session in that audience and by replays.
+        self._audience_patches: dict[int, dict[PatchAudience, StatePatch]] = {}
+        # Encoded snapshots for the state object and version they were built
+        # from, least recently used first.
+        self._snapshot_frames: OrderedDict[PatchAudience, str] = OrderedDict()
+        self._snapshot_frames_source: tuple[State, int] | None = None
+        self._snapshot_frame_bytes = 0
+        self._projections = ProjectionStore()
+        self._visibility = VisibilityIndex()
+        self._synchronizers: SynchronizerRegistry | None = None
+        # The state object every synchronizer last reconciled in full. Scoped
+        # runs assume entities a mutation did not touch are already reconciled,
+        # which only holds for state that arrived through this service.
+        self._synchronized_state: State | None = None
+        self._compiled_redaction_policies: (
+            tuple[RedactionPolicy, RedactionPolicy] | None
+        ) = None
         self._processed_request_ids: deque[str] = deque(
             maxlen=processed_request_limit
         )
@@ -150,6 +358,20 @@ class StateSyncService:
     def current_version(self) -> int:
         return self._state_version
 
+    @property
+    def current_epoch(self) -> str:
+        return self._state_epoch
+
+    def attach_patch_log(self, patch_log: PatchLog, *, state_version: int) -> None:
+        """Resume numbering at the persisted state's version and log later patches.
+
+        Called at startup, before any mutation. The epoch carries over from the
+        previous process when the log ends exactly at `state_version`.
+        """
+        self._state_version = state_version
+        self._state_epoch = patch_log.open(state_version)
+        self._patch_log = patch_log
+
     @property
     def undo_depth(self) -> int:
         return len(self._undo_history)
@@ -158,7 +380,7 @@ class StateSyncService:
     def mutation_history(self) -> tuple[MutationAuditEntry, ...]:
         return tuple(self._mutation_audit)
 
-    def _redact_item_payload(self, value: Any) -> Any:
+    def _redact_item_payload(self, value: Any, *, state: State | None = None) -> Any:
         if is_dataclass(value):
             value = asdict(value)
         elif isinstance(value, dict):
@@ -168,7 +390,7 @@ class StateSyncService:
 
         for field_name in PRIVATE_ITEM_FIELDS:
             value.pop(field_name, None)
-        self._redact_subject_attributes(value)
+        self._redact_subject_attributes(value, state=state)
         return value
 
     def _player_can_see_item(
@@ -177,29 +399,7 @@ class StateSyncService:
         *,
         assigned_instance_id: str | None,
     ) -> bool:
-        state = StateSingleton.getState()
-        item = state.items.get(item_id)
-        if item is None:
-            return False
-        instance = (
-            state.instanced_sheets.get(assigned_instance_id)
-            if assigned_instance_id is not None
-            else None
-        )
-        carried = instance is not None and any(
-            bridge.item_id == item_id for bridge in instance.items.values()
-        )
-        return (
-            carried
-            or (
-                item.approval_status == "approved"
-                and item.player_catalog_access.allows(assigned_instance_id)
-            )
-            or (
-                item.approval_status == "pending"
-                and item.submitted_by_instance_id == assigned_instance_id
-            )
-        )
+        return item_id in self._player_visibility(assigned_instance_id).items
 
     def _player_can_see_sheet(
         self,
@@ -207,32 +407,34 @@ class StateSyncService:
         *,
         assigned_instance_id: str | None,
     ) -> bool:
-        state = StateSingleton.getState()
-        sheet = state.sheets.get(sheet_id)
-        if sheet is None:
-            return False
-        if not sheet.dm_only:
-            return True
-        instance = (
-            state.instanced_sheets.get(assigned_instance_id)
-            if assigned_instance_id is not None
-            else None
-        )
-        return instance is not None and instance.parent_id == sheet_id
+        return sheet_id in self._player_visibility(assigned_instance_id).sheets
 
-    def _redact_subject_attributes(self, value: dict[str, Any]) -> None:
-        subject_attributes = value.get("attributes")
-        if not isinstance(subject_attributes, dict):
-            return
-        hidden_attribute_ids = {
+    def _player_visibility(self, assigned_instance_id: str | None) -> PlayerVisibility:
+        return self._visibility.for_player(StateSingleton.getState(), assigned_instance_id)
+
+    def _hidden_attribute_ids(self, state: State | None) -> set[str]:
+        """GM-only attributes of `state`, which defaults to live state."""
+        if state is None:
+            state = StateSingleton.getState()
+        return {
             attribute_id
-            for attribute_id, attribute in StateSingleton.getState().attributes.items()
+            for attribute_id, attribute in state.attributes.items()
             if attribute.visibility == "gm_only"
         }
-        for attribute_id in hidden_attribute_ids:
+
+    def _redact_subject_attributes(
+        self,
+        value: dict[str, Any],
+        *,
+        state: State | None = None,
+    ) -> None:
+        subject_attributes = value.get("attributes")
+        if not isinstance(subject_attributes, dict):
+            return
+        for attribute_id in self._hidden_attribute_ids(state):
             subject_attributes.pop(attribute_id, None)
 
-    def _redact_sheet_payload(self, value: Any) -> Any:
+    def _redact_sheet_payload(self, value: Any, *, state: State | None = None) -> Any:
         if is_dataclass(value):
             value = asdict(value)
         elif isinstance(value, dict):
@@ -246,12 +448,7 @@ class StateSyncService:
         value["xp_given_when_slayed"] = 0
         sheet_attributes = value.get("attributes")
         if isinstance(sheet_attributes, dict):
-            hidden_attribute_ids = {
-                attribute_id
-                for attribute_id, attribute in StateSingleton.getState().attributes.items()
-                if attribute.visibility == "gm_only"
-            }
-            for attribute_id in hidden_attribute_ids:
+            for attribute_id in self._hidden_attribute_ids(state):
                 sheet_attributes.pop(attribute_id, None)
         return value
 
@@ -312,9 +509,17 @@ class StateSyncService:
         *,
         role: SessionRole,
         assigned_instance_id: str | None = None,
+        visibility: PlayerVisibility | None = None,
     ) -> dict[str, Any]:
+        """Strip `state` down to what the audience may see.
+
+        `visibility` must describe the state `state` was serialized from; it
+        defaults to the index for live state.
+        """
         if role == "dm":
             return state
+        if visibility is None:
+            visibility = self._player_visibility(assigned_instance_id)
 
         for root in PRIVATE_STATE_ROOTS | DM_ONLY_STATE_ROOTS:
             state.pop(root, None)
@@ -331,17 +536,10 @@ class StateSyncService:
         # Templates behind `dm_only` are enemy stat blocks. The claimed
         # instance's own parent is kept even when it is flagged, because the
         # character sheet cannot render without it.
-        assigned_instance = state.get("instanced_sheets", {}).get(assigned_instance_id)
-        assigned_parent_id = (
-            assigned_instance.get("parent_id")
-            if isinstance(assigned_instance, dict)
-            else None
-        )
         state["sheets"] = {
             sheet_id: sheet
             for sheet_id, sheet in state.get("sheets", {}).items()
-            if sheet_id == assigned_parent_id
-            or not (isinstance(sheet, dict) and sheet.get("dm_only"))
+            if sheet_id in visibility.sheets
         }
 
         hidden_attribute_ids = {
@@ -360,13 +558,7 @@ class StateSyncService:
         for condition_id in hidden_condition_ids:
             state.get("condition_presets", {}).pop(condition_id, None)
 
-        visible_applications = {
-            application_id
-            for application_id, condition in state.get("active_conditions", {}).items()
-            if isinstance(condition, dict)
-            and condition.get("visibility") != "gm_only"
-            and condition.get("instance_id") == assigned_instance_id
-        }
+        visible_applications = visibility.conditions
         state["active_conditions"] = {
             application_id: condition
             for application_id, condition in state.get("active_conditions", {}).items()
@@ -420,31 +612,65 @@ class StateSyncService:
                 for attribute_id in hidden_attribute_ids:
                     sheet_attributes.pop(attribute_id, None)
 
-        visible_item_ids = {
-            item_id
-            for item_id in state.get("items", {})
-            if self._player_can_see_item(
-                item_id,
-                assigned_instance_id=assigned_instance_id,
-            )
-        }
         state["items"] = {
             item_id: item
             for item_id, item in state.get("items", {}).items()
-            if item_id in visible_item_ids
+            if item_id in visibility.items
         }
         for item in state.get("items", {}).values():
             if not isinstance(item, dict):
                 continue
             for field_name in PRIVATE_ITEM_FIELDS:
                 item.pop(field_name, None)
-            self._redact_subject_attributes(item)
-        for action in state.get("actions", {}).values():
-            if isinstance(action, dict):
-                self._redact_subject_attributes(action)
+        # Attribute visibility comes from the serialized state itself, like
+        # everything else here, not from live state.
+        for subject in [
+            *state.get("items", {}).values(),
+            *state.get("actions", {}).values(),
+        ]:
+            subject_attributes = (
+                subject.get("attributes") if isinstance(subject, dict) else None
+            )
+            if isinstance(subject_attributes, dict):
+                for attribute_id in hidden_attribute_ids:
+                    subject_attributes.pop(attribute_id, None)
         self._filter_catalog_organization_for_visible_state(state)
         return state
 
+    def _patch_for_audience(
+        self,
+        patch: StatePatch,
+        *,
+        role: SessionRole,
+        assigned_instance_id: str | None = None,
+    ) -> StatePatch:
+        """The redacted patch for an audience, computed once per version.
+
+        Callers share the returned object and must copy it before changing it.
+        """
+        audience = (role, assigned_instance_id)
+        redacted = self._audience_patches.setdefault(patch.state_version, {})
+        cached = redacted.get(audience)
+        if cached is None:
+            cached = self._redact_patch_for_role(
+                patch,
+                role=role,
+                assigned_instance_id=assigned_instance_id,
+            )
+            redacted[audience] = cached
+        return cached
+
+    async def _broadcast_patch(self, patch: StatePatch) -> None:
+        await websocket_sessions.broadcast_per_session(
+            lambda session: self._patch_for_audience(
+                patch,
+                role=session.role,
+                assigned_instance_id=session.assigned_instance_id,
+            ),
+            audience=patch_audience,
+            coalesce=coalesce_state_patches,
+        )
+
     def _redact_patch_for_role(
         self,
         patch: StatePatch,
@@ -456,72 +682,39 @@ class StateSyncService:
         if not redacted_patch.ops:
             return redacted_patch
 
-        redacted_ops: list[PatchOp] = []
-        refresh_catalog_projection = False
-        for op in redacted_patch.ops:
-            segments = self._parse_path(op.path)
-            if segments and segments[0] in PRIVATE_STATE_ROOTS:
-                continue
-            if segments and segments[0] == "action_history":
-                if op.op == "remove":
-                    redacted_ops.append(op)
-                    continue
-
-                if len(segments) == 1:
-                    serialized_entries = serialize_action_history(
-                        StateSingleton.getState().action_history,
-                        role=role,
-                        assigned_instance_id=assigned_instance_id,
-                    )
-                    op.value = {
-                        key: value.model_dump(mode="json")
-                        for key, value in serialized_entries.items()
-                    }
-                    redacted_ops.append(op)
-                    continue
-
-                entry_id = segments[1]
-                entry = StateSingleton.getState().action_history.get(entry_id)
-                serialized_entry = (
-                    serialize_action_history_entry(
-                        entry,
-                        role=role,
-                        assigned_instance_id=assigned_instance_id,
-                    )
-                    if entry is not None
-                    else None
-                )
-                if serialized_entry is None:
-                    if op.op == "set":
-                        redacted_ops.append(PatchOp(op="remove", path=op.path))
-                    continue
-
-                redacted_ops.append(
-                    PatchOp(
-                        op=op.op if len(segments) == 2 else "set",
-                        path=(
-                            op.path
-                            if len(segments) == 2
-                            else self.join_path("action_history", entry_id)
-                        ),
-                        value=serialized_entry.model_dump(mode="json"),
-                    )
-                )
-                continue
-            if role == "dm":
-                redacted_ops.append(op)
-                continue
-
-            if len(segments) == 2 and segments[0] == "items":
-                refresh_catalog_projection = True
+        # Transactions staged after this patch are already in live state, and
+        # may still roll back; redact against what has been published.
+        state = self._published_state()
+        visibility = (
+            self._visibility if state is StateSingleton.getState() else VisibilityIndex()
+        )
+        context = RedactionContext(
+            state=state,
+            role=role,
+            assigned_instance_id=assigned_instance_id,
+            project=lambda: self._redact_state_for_role(
+                state.to_dict(),
+                role=role,
+                assigned_instance_id=assigned_instance_id,
+                visibility=context.visibility(),
+            ),
+            player_visibility=lambda: visibility.for_player(state, assigned_instance_id),
+        )
+        gm_policy, player_policy = self._redaction_policies()
+        (gm_policy if role == "dm" else player_policy).apply(
+            context,
+            redacted_patch.ops,
+        )
+        redacted_ops = context.ops
 
-            if segments and segments[0] in {"catalog_entries", "catalog_folders"}:
-                projected_state = self._redact_state_for_role(
-                    StateSingleton.getState().to_dict(),
-                    role=role,
-                    assigned_instance_id=assigned_instance_id,
-                )
-                root = segments[0]
+        if context.refresh_catalog_projection:
+            projected_state = context.projected_state()
+            catalog_paths = {
+                self.join_path("catalog_entries"),
+                self.join_path("catalog_folders"),
+            }
+            redacted_ops = [op for op in redacted_ops if op.path not in catalog_paths]
+            for root in ("catalog_folders", "catalog_entries"):
                 redacted_ops.append(
                     PatchOp(
                         op="set",
@@ -529,379 +722,445 @@ class StateSyncService:
                         value=projected_state[root],
                     )
                 )
-                continue
-
-            if segments and segments[0] in DM_ONLY_STATE_ROOTS:
-                continue
+        redacted_patch.ops = redacted_ops
+        return redacted_patch
 
+    def _redaction_policies(self) -> tuple[RedactionPolicy, RedactionPolicy]:
+        """The GM and player redaction rules, compiled on first use."""
+        if self._compiled_redaction_policies is not None:
+            return self._compiled_redaction_policies
+
+        common: list[tuple[tuple[str, ...], RedactionHandler]] = [
+            *(((root,), _drop_op) for root in PRIVATE_STATE_ROOTS),
+            (("action_history",), self._redact_action_history_op),
+        ]
+        player: list[tuple[tuple[str, ...], RedactionHandler]] = [
+            *common,
+            *(((root,), _drop_op) for root in DM_ONLY_STATE_ROOTS),
+            (("catalog_entries",), self._project_catalog_op),
+            (("catalog_folders",), self._project_catalog_op),
             # Mirror of the snapshot rule: a player only ever sees their own
             # claimed instance, so no other instance's mutations are forwarded.
-            if segments and segments[0] == "instanced_sheets":
-                if len(segments) < 2 or segments[1] != assigned_instance_id:
-                    continue
+            (("instanced_sheets",), _drop_op),
+            (("instanced_sheets", "*"), _for_own_instance(_keep_op)),
+            (
+                ("instanced_sheets", "*", "items"),
+                _for_own_instance(self._redact_instance_item_op),
+            ),
+            (
+                ("instanced_sheets", "*", "augments", "*"),
+                _for_own_instance(self._redact_instance_augment_op),
+            ),
+            (("sheets", "*"), self._redact_sheet_op),
+            (("sheets", "*", "attributes", "*"), self._redact_sheet_attribute_op),
+            *(
+                (("sheets", "*", field_name), _drop_op)
+                for field_name in PRIVATE_SHEET_FIELDS | PRIVATE_SHEET_XP_FIELDS
+            ),
+            (("items", "*"), self._redact_item_op),
+            *((("items", "*", field_name), _drop_op) for field_name in PRIVATE_ITEM_FIELDS),
+            (("attributes", "*"), self._redact_attribute_op),
+            (("actions", "*"), self._redact_action_op),
+            (("actions", "*", "attributes", "*"), self._redact_subject_attribute_op),
+            (("active_conditions", "*"), self._redact_active_condition_op),
+            (
+                ("standalone_effect_applications", "*"),
+                self._redact_standalone_application_op,
+            ),
+            (("condition_presets", "*"), self._redact_condition_preset_op),
+            (("augmentations", "*"), self._redact_augmentation_op),
+        ]
+        self._compiled_redaction_policies = (
+            RedactionPolicy(common, default=_keep_op),
+            RedactionPolicy(player, default=_keep_op),
+        )
+        return self._compiled_redaction_policies
 
-            # Enemy templates stay GM-only. A template that becomes `dm_only`
-            # after the client already holds it is turned into a removal so the
-            # client cannot keep serving a stale copy.
-            if len(segments) >= 2 and segments[0] == "sheets":
-                sheet_id = segments[1]
-                if op.op == "remove" and len(segments) == 2:
-                    redacted_ops.append(op)
-                    continue
-                if not self._player_can_see_sheet(
-                    sheet_id,
-                    assigned_instance_id=assigned_instance_id,
-                ):
-                    if op.op == "set" and len(segments) == 2:
-                        redacted_ops.append(
-                            PatchOp(op="remove", path=self.join_path("sheets", sheet_id))
-                        )
-                    continue
+    def _redact_action_history_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        if op.op == "remove":
+            context.ops.append(op)
+            return
 
-            if (
-                len(segments) >= 3
-                and segments[0] == "instanced_sheets"
-                and segments[2] == "items"
-            ):
-                if len(segments) == 4 and op.op in {"add", "set"}:
-                    instance = StateSingleton.getState().instanced_sheets.get(
-                        segments[1]
-                    )
-                    bridge = (
-                        instance.items.get(segments[3])
-                        if instance is not None
-                        else None
-                    )
-                    if bridge is not None and self._player_can_see_item(
-                        bridge.item_id,
-                        assigned_instance_id=assigned_instance_id,
-                    ):
-                        item = StateSingleton.getState().items.get(bridge.item_id)
-                        if item is not None:
-                            redacted_ops.append(
-                                PatchOp(
-                                    op="set",
-                                    path=self.join_path("items", bridge.item_id),
-                                    value=self._redact_item_payload(item),
-                                )
-                            )
-                redacted_ops.append(op)
-                continue
+        if len(segments) == 1:
+            serialized_entries = serialize_action_history(
+                context.state.action_history,
+                role=context.role,
+                assigned_instance_id=context.assigned_instance_id,
+            )
+            op.value = {
+                key: value.model_dump(mode="json")
+                for key, value in serialized_entries.items()
+            }
+            context.ops.append(op)
+            return
 
-            if len(segments) >= 2 and segments[0] == "items":
-                item_id = segments[1]
-                if (
-                    len(segments) >= 3
-                    and segments[2] in PRIVATE_ITEM_FIELDS
-                ):
-                    continue
-                if op.op == "remove" and len(segments) == 2:
-                    redacted_ops.append(op)
-                    continue
-                visible = self._player_can_see_item(
-                    item_id,
-                    assigned_instance_id=assigned_instance_id,
-                )
-                if not visible:
-                    if op.op == "set":
-                        redacted_ops.append(
-                            PatchOp(
-                                op="remove",
-                                path=self.join_path("items", item_id),
-                            )
+        entry_id = segments[1]
+        entry = context.state.action_history.get(entry_id)
+        serialized_entry = (
+            serialize_action_history_entry(
+                entry,
+                role=context.role,
+                assigned_instance_id=context.assigned_instance_id,
+            )
+            if entry is not None
+            else None
+        )
+        if serialized_entry is None:
+            if op.op == "set":
+                context.ops.append(PatchOp(op="remove", path=op.path))
+            return
+
+        context.ops.append(
+            PatchOp(
+                op=op.op if len(segments) == 2 else "set",
+                path=(
+                    op.path
+                    if len(segments) == 2
+                    else self.join_path("action_history", entry_id)
+                ),
+                value=serialized_entry.model_dump(mode="json"),
+            )
+        )
+
+    def _project_catalog_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        root = segments[0]
+        context.ops.append(
+            PatchOp(
+                op="set",
+                path=self.join_path(root),
+                value=context.projected_state()[root],
+            )
+        )
+
+    def _redact_instance_item_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        if len(segments) == 4 and op.op in {"add", "set"}:
+            instance = context.state.instanced_sheets.get(segments[1])
+            bridge = instance.items.get(segments[3]) if instance is not None else None
+            if bridge is not None and bridge.item_id in context.visibility().items:
+                item = context.state.items.get(bridge.item_id)
+                if item is not None:
+                    context.ops.append(
+                        PatchOp(
+                            op="set",
+                            path=self.join_path("items", bridge.item_id),
+                            value=self._redact_item_payload(item, state=context.state),
                         )
-                    continue
-                if len(segments) >= 4 and segments[2] == "attributes":
-                    current_attribute = StateSingleton.getState().attributes.get(
-                        segments[3]
                     )
-                    if (
-                        current_attribute is not None
-                        and current_attribute.visibility != "gm_only"
-                    ):
-                        redacted_ops.append(op)
-                    elif op.op == "remove":
-                        redacted_ops.append(op)
-                    elif op.op == "set":
-                        redacted_ops.append(PatchOp(op="remove", path=op.path))
-                    continue
-                if len(segments) == 2:
-                    current_item = StateSingleton.getState().items.get(item_id)
-                    if current_item is not None:
-                        op.value = self._redact_item_payload(current_item)
-                else:
-                    op.value = self._redact_item_payload(op.value)
-                redacted_ops.append(op)
-                continue
-
-            if len(segments) >= 2 and segments[0] == "attributes":
-                if op.op == "remove":
-                    redacted_ops.append(op)
-                    continue
-                current_attribute = StateSingleton.getState().attributes.get(segments[1])
-                if current_attribute is not None and current_attribute.visibility != "gm_only":
-                    redacted_ops.append(op)
-                elif op.op == "set":
-                    redacted_ops.append(PatchOp(op="remove", path=op.path))
-                continue
+        context.ops.append(op)
 
-            if (
-                len(segments) >= 4
-                and segments[0] == "sheets"
-                and segments[2] == "attributes"
-            ):
-                current_attribute = StateSingleton.getState().attributes.get(segments[3])
-                if current_attribute is not None and current_attribute.visibility != "gm_only":
-                    redacted_ops.append(op)
-                elif op.op == "remove":
-                    redacted_ops.append(op)
-                elif op.op == "set":
-                    redacted_ops.append(PatchOp(op="remove", path=op.path))
-                continue
+    def _redact_instance_augment_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        if op.op == "remove":
+            context.ops.append(op)
+            return
+        augmentation = context.state.augmentations.get(segments[3])
+        if augmentation is not None and augmentation.source.type == "condition":
+            _keep_or_remove(
+                context,
+                op,
+                self._condition_visible(context, augmentation.source.application_id),
+            )
+            return
+        context.ops.append(op)
 
-            if (
-                len(segments) >= 4
-                and segments[0] in {"items", "actions"}
-                and segments[2] == "attributes"
-            ):
-                current_attribute = StateSingleton.getState().attributes.get(segments[3])
-                if current_attribute is not None and current_attribute.visibility != "gm_only":
-                    redacted_ops.append(op)
-                elif op.op == "remove":
-                    redacted_ops.append(op)
-                elif op.op == "set":
-                    redacted_ops.append(PatchOp(op="remove", path=op.path))
-                continue
+    def _sheet_visible(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> bool:
+        """Gate an op under a sheet template; False once the op is handled.
 
-            if len(segments) >= 2 and segments[0] == "active_conditions":
-                if op.op == "remove":
-                    redacted_ops.append(op)
-                    continue
-                value = asdict(op.value) if is_dataclass(op.value) else op.value
-                visible = (
-                    isinstance(value, dict)
-                    and value.get("visibility") != "gm_only"
-                    and value.get("instance_id") == assigned_instance_id
+        Enemy templates stay GM-only. A template that becomes `dm_only` after
+        the client already holds it is turned into a removal so the client
+        cannot keep serving a stale copy.
+        """
+        sheet_id = segments[1]
+        if op.op == "remove" and len(segments) == 2:
+            context.ops.append(op)
+            return False
+        if sheet_id not in context.visibility().sheets:
+            if op.op == "set" and len(segments) == 2:
+                context.ops.append(
+                    PatchOp(op="remove", path=self.join_path("sheets", sheet_id))
                 )
-                if visible:
-                    redacted_ops.append(op)
-                elif op.op == "set":
-                    redacted_ops.append(PatchOp(op="remove", path=op.path))
-                continue
+            return False
+        return True
 
-            if (
-                len(segments) >= 2
-                and segments[0] == "standalone_effect_applications"
-            ):
-                if op.op == "remove":
-                    visible_prefix = f"standalone:{assigned_instance_id}:"
-                    if segments[1].startswith(visible_prefix):
-                        redacted_ops.append(op)
-                    continue
-                value = asdict(op.value) if is_dataclass(op.value) else op.value
-                visible = (
-                    isinstance(value, dict)
-                    and value.get("instance_id") == assigned_instance_id
-                )
-                if visible:
-                    redacted_ops.append(op)
-                elif op.op == "set":
-                    redacted_ops.append(PatchOp(op="remove", path=op.path))
-                continue
+    def _redact_sheet_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        if not self._sheet_visible(context, op, segments):
+            return
+        if len(segments) == 2:
+            op.value = self._redact_sheet_payload(op.value, state=context.state)
+        context.ops.append(op)
 
-            if len(segments) >= 2 and segments[0] == "condition_presets":
-                if op.op == "remove":
-                    redacted_ops.append(op)
-                    continue
-                value = asdict(op.value) if is_dataclass(op.value) else op.value
-                visible = not (
-                    isinstance(value, dict) and value.get("visibility") == "gm_only"
-                )
-                if visible:
-                    redacted_ops.append(op)
-                elif op.op == "set":
-                    redacted_ops.append(PatchOp(op="remove", path=op.path))
-                continue
+    def _redact_sheet_attribute_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        if self._sheet_visible(context, op, segments):
+            self._redact_subject_attribute_op(context, op, segments)
 
-            if len(segments) >= 2 and segments[0] == "augmentations":
-                if op.op == "remove":
-                    redacted_ops.append(op)
-                    continue
-                current_augmentation = StateSingleton.getState().augmentations.get(
-                    segments[1]
+    def _redact_item_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        item_id = segments[1]
+        if len(segments) == 2:
+            context.refresh_catalog_projection = True
+            if op.op == "remove":
+                context.ops.append(op)
+                return
+        if item_id not in context.visibility().items:
+            if op.op == "set":
+                context.ops.append(
+                    PatchOp(op="remove", path=self.join_path("items", item_id))
                 )
-                if (
-                    current_augmentation is None
-                    and segments[1].startswith("condition:")
-                ):
-                    continue
-                if (
-                    current_augmentation is not None
-                    and current_augmentation.source.type == "condition"
-                ):
-                    active_condition = StateSingleton.getState().active_conditions.get(
-                        current_augmentation.source.application_id
-                    )
-                    visible = (
-                        active_condition is not None
-                        and active_condition.visibility != "gm_only"
-                        and active_condition.instance_id == assigned_instance_id
-                    )
-                    if visible:
-                        redacted_ops.append(op)
-                    elif op.op == "set" and len(segments) == 2:
-                        redacted_ops.append(PatchOp(op="remove", path=op.path))
-                    continue
-                value = asdict(op.value) if is_dataclass(op.value) else op.value
-                source = value.get("source") if isinstance(value, dict) else None
-                if isinstance(source, dict) and source.get("type") == "condition":
-                    active_condition = StateSingleton.getState().active_conditions.get(
-                        source.get("application_id")
-                    )
-                    visible = (
-                        active_condition is not None
-                        and active_condition.visibility != "gm_only"
-                        and active_condition.instance_id == assigned_instance_id
-                    )
-                    if visible:
-                        redacted_ops.append(op)
-                    elif op.op == "set":
-                        redacted_ops.append(PatchOp(op="remove", path=op.path))
-                    continue
+            return
+        if len(segments) >= 4 and segments[2] == "attributes":
+            self._redact_subject_attribute_op(context, op, segments)
+            return
+        if len(segments) == 2:
+            current_item = context.state.items.get(item_id)
+            if current_item is not None:
+                op.value = self._redact_item_payload(current_item, state=context.state)
+        else:
+            op.value = self._redact_item_payload(op.value, state=context.state)
+        context.ops.append(op)
 
-            if (
-                len(segments) >= 4
-                and segments[0] == "instanced_sheets"
-                and segments[2] == "augments"
-            ):
-                if op.op == "remove":
-                    if segments[1] == assigned_instance_id:
-                        redacted_ops.append(op)
-                    continue
-                augmentation = StateSingleton.getState().augmentations.get(segments[3])
-                if augmentation is not None and augmentation.source.type == "condition":
-                    active_condition = StateSingleton.getState().active_conditions.get(
-                        augmentation.source.application_id
-                    )
-                    visible = (
-                        active_condition is not None
-                        and active_condition.visibility != "gm_only"
-                        and active_condition.instance_id == assigned_instance_id
-                    )
-                    if visible:
-                        redacted_ops.append(op)
-                    elif op.op == "set":
-                        redacted_ops.append(PatchOp(op="remove", path=op.path))
-                    continue
-            if (
-                len(segments) >= 3
-                and segments[0] == "sheets"
-                and segments[2] in PRIVATE_SHEET_FIELDS | PRIVATE_SHEET_XP_FIELDS
-            ):
-                continue
+    def _redact_attribute_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        _keep_or_remove(
+            context,
+            op,
+            op.op == "remove" or self._attribute_visible(context, segments[1]),
+        )
 
-            if len(segments) == 2 and segments[0] == "sheets":
-                op.value = self._redact_sheet_payload(op.value)
+    def _redact_subject_attribute_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        _keep_or_remove(
+            context,
+            op,
+            op.op == "remove" or self._attribute_visible(context, segments[3]),
+        )
 
-            if len(segments) >= 2 and segments[0] == "actions":
-                if is_dataclass(op.value):
-                    op.value = asdict(op.value)
-                if isinstance(op.value, dict):
-                    self._redact_subject_attributes(op.value)
-            redacted_ops.append(op)
+    def _redact_action_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        if is_dataclass(op.value):
+            op.value = asdict(op.value)
+        if isinstance(op.value, dict):
+            self._redact_subject_attributes(op.value, state=context.state)
+        context.ops.append(op)
 
-        if refresh_catalog_projection:
-            projected_state = self._redact_state_for_role(
-                StateSingleton.getState().to_dict(),
-                role=role,
-                assigned_instance_id=assigned_instance_id,
-            )
-            redacted_ops = [
-                op
-                for op in redacted_ops
-                if op.path
-                not in {
-                    self.join_path("catalog_entries"),
-                    self.join_path("catalog_folders"),
-                }
-            ]
-            for root in ("catalog_folders", "catalog_entries"):
-                redacted_ops.append(
-                    PatchOp(
-                        op="set",
-                        path=self.join_path(root),
-                        value=projected_state[root],
-                    )
-                )
-        redacted_patch.ops = redacted_ops
-        return redacted_patch
+    def _redact_active_condition_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        if op.op == "remove":
+            context.ops.append(op)
+            return
+        value = asdict(op.value) if is_dataclass(op.value) else op.value
+        _keep_or_remove(
+            context,
+            op,
+            isinstance(value, dict)
+            and value.get("visibility") != "gm_only"
+            and value.get("instance_id") == context.assigned_instance_id,
+        )
+
+    def _redact_standalone_application_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        if op.op == "remove":
+            if segments[1].startswith(f"standalone:{context.assigned_instance_id}:"):
+                context.ops.append(op)
+            return
+        value = asdict(op.value) if is_dataclass(op.value) else op.value
+        _keep_or_remove(
+            context,
+            op,
+            isinstance(value, dict)
+            and value.get("instance_id") == context.assigned_instance_id,
+        )
+
+    def _redact_condition_preset_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        if op.op == "remove":
+            context.ops.append(op)
+            return
+        value = asdict(op.value) if is_dataclass(op.value) else op.value
+        _keep_or_remove(
+            context,
+            op,
+            not (isinstance(value, dict) and value.get("visibility") == "gm_only"),
+        )
+
+    def _redact_augmentation_op(
+        self,
+        context: RedactionContext,
+        op: PatchOp,
+        segments: tuple[str, ...],
+    ) -> None:
+        if op.op == "remove":
+            context.ops.append(op)
+            return
+        current_augmentation = context.state.augmentations.get(segments[1])
+        if current_augmentation is None and segments[1].startswith("condition:"):
+            return
+        if (
+            current_augmentation is not None
+            and current_augmentation.source.type == "condition"
+        ):
+            if self._condition_visible(
+                context,
+                current_augmentation.source.application_id,
+            ):
+                context.ops.append(op)
+            elif op.op == "set" and len(segments) == 2:
+                context.ops.append(PatchOp(op="remove", path=op.path))
+            return
+        value = asdict(op.value) if is_dataclass(op.value) else op.value
+        source = value.get("source") if isinstance(value, dict) else None
+        if isinstance(source, dict) and source.get("type") == "condition":
+            _keep_or_remove(
+                context,
+                op,
+                self._condition_visible(context, source.get("application_id")),
+            )
+            return
+        context.ops.append(op)
+
+    def _attribute_visible(self, context: RedactionContext, attribute_id: str) -> bool:
+        attribute = context.state.attributes.get(attribute_id)
+        return attribute is not None and attribute.visibility != "gm_only"
+
+    def _condition_visible(
+        self,
+        context: RedactionContext,
+        application_id: Any,
+    ) -> bool:
+        return application_id in context.visibility().conditions
 
-    def _build_snapshot_locked(
+    def _build_snapshot(
         self,
         *,
         role: SessionRole,
         assigned_instance_id: str | None = None,
         request_id: str | None = None,
     ) -> StateSnapshot:
-        state_model = StateSingleton.getState()
+        state_model = self._published_state()
+        # Projections are only kept for live state; a published view that still
+        # differs from it is evaluated from scratch.
+        live = state_model is StateSingleton.getState()
+        projections = self._projections if live else ProjectionStore()
         state_payload = state_model.to_dict()
-        for sheet_id, sheet in state_model.sheets.items():
-            sheet_payload = state_payload.get("sheets", {}).get(sheet_id)
-            if isinstance(sheet_payload, dict):
-                sheet_payload["evaluated_stats"] = evaluate_sheet_stats(sheet)
-                sheet_payload["current_carried_weight"] = calculate_carried_weight(
-                    sheet.items,
-                    state_model.items,
-                )
-                contents_weights = calculate_container_contents_weights(
-                    sheet.items,
-                    state_model.items,
+        projections.prime_stat_values(
+            state_model,
+            [
+                (root, subject_id)
+                for root in ("sheets", "instanced_sheets")
+                for subject_id in getattr(state_model, root)
+            ],
+        )
+        for root in ("sheets", "instanced_sheets"):
+            subjects = getattr(state_model, root)
+            for subject_id, subject_payload in state_payload.get(root, {}).items():
+                if not isinstance(subject_payload, dict):
+                    continue
+                stat_values = projections.stat_values(
+                    state_model,
+                    root,
+                    subject_id,
                 )
-                for relationship_id, contents_weight in contents_weights.items():
-                    bridge_payload = sheet_payload.get("items", {}).get(
-                        relationship_id
+                if stat_values is None:
+                    continue
+                if root == "instanced_sheets":
+                    subject = subjects[subject_id]
+                    stat_owner = (
+                        subject
+                        if subject.stats is not None
+                        else state_model.sheets[subject.parent_id]
                     )
+                    subject_payload["stats"] = asdict(stat_owner.stats)
+                subject_payload.update(deepcopy(stat_values))
+                inventory = projections.inventory_values(
+                    state_model,
+                    root,
+                    subject_id,
+                )
+                if inventory is None:
+                    continue
+                subject_payload["current_carried_weight"] = (
+                    inventory.current_carried_weight
+                )
+                for relationship_id, bridge_payload in subject_payload.get(
+                    "items", {}
+                ).items():
                     if isinstance(bridge_payload, dict):
-                        bridge_payload["current_contents_weight"] = contents_weight
-                maxima = evaluate_resource_maxima(sheet)
-                sheet_payload["evaluated_max_health"] = maxima["health"]
-                sheet_payload["evaluated_max_mana"] = maxima["mana"]
-        for instance_id, instance in state_model.instanced_sheets.items():
-            instance_payload = state_payload.get("instanced_sheets", {}).get(instance_id)
-            if isinstance(instance_payload, dict):
-                template = state_model.sheets.get(instance.parent_id)
-                runtime_stat_owner = instance if instance.stats is not None else template
-                if runtime_stat_owner is not None:
-                    from backend.features.sheet_runtime.service import evaluate_reaction_limit
-
-                    instance_payload["stats"] = asdict(runtime_stat_owner.stats)
-                    instance_payload["evaluated_stats"] = evaluate_sheet_stats(
-                        runtime_stat_owner
-                    )
-                    instance_payload["current_carried_weight"] = calculate_carried_weight(
-                        instance.items,
-                        state_model.items,
-                    )
-                    contents_weights = calculate_container_contents_weights(
-                        instance.items,
-                        state_model.items,
-                    )
-                    for relationship_id, contents_weight in contents_weights.items():
-                        bridge_payload = instance_payload.get("items", {}).get(
-                            relationship_id
+                        bridge_payload["current_contents_weight"] = (
+                            inventory.contents_weights.get(relationship_id, 0.0)
                         )
-                        if isinstance(bridge_payload, dict):
-                            bridge_payload["current_contents_weight"] = contents_weight
-                    maxima = evaluate_resource_maxima(runtime_stat_owner)
-                    instance_payload["evaluated_max_health"] = maxima["health"]
-                    instance_payload["evaluated_max_mana"] = maxima["mana"]
-                    instance_payload["evaluated_max_reactions"] = evaluate_reaction_limit(
-                        instance
-                    )
         state = self._redact_state_for_role(
             state_payload,
             role=role,
             assigned_instance_id=assigned_instance_id,
+            visibility=(
+                (self._visibility if live else VisibilityIndex()).for_player(
+                    state_model,
+                    assigned_instance_id,
+                )
+                if role != "dm"
+                else None
+            ),
         )
         state["action_history"] = {
             key: value.model_dump(mode="json")
@@ -914,6 +1173,77 @@ class StateSyncService:
         return build_state_snapshot(
             state,
             state_version=self._state_version,
+            state_epoch=self._state_epoch,
+            request_id=request_id,
+        )
+
+    def _snapshot_frame_for(
+        self,
+        *,
+        role: SessionRole,
+        assigned_instance_id: str | None = None,
+        request_id: str | None = None,
+    ) -> str:
+        """The encoded snapshot for an audience, built once per state version."""
+        source = (StateSingleton.getState(), self._state_version)
+        cached_source = self._snapshot_frames_source
+        if (
+            cached_source is None
+            or cached_source[0] is not source[0]
+            or cached_source[1] != source[1]
+        ):
+            self._snapshot_frames.clear()
+            self._snapshot_frame_bytes = 0
+            self._snapshot_frames_source = source
+
+        audience = (role, assigned_instance_id)
+        frame = self._snapshot_frames.get(audience)
+        if frame is None:
+            frame = encode_server_event(
+                self._build_snapshot(
+                    role=role,
+                    assigned_instance_id=assigned_instance_id,
+                )
+            )
+            self._remember_snapshot_frame(audience, frame)
+        else:
+            self._snapshot_frames.move_to_end(audience)
+
+        if request_id is None:
+            return frame
+        if not frame.endswith(_SNAPSHOT_REQUEST_ID_TAIL):
+            return encode_server_event(
+                self._build_snapshot(
+                    role=role,
+                    assigned_instance_id=assigned_instance_id,
+                    request_id=request_id,
+                )
+            )
+        return (
+            frame[: -len("null}")]
+            + json.dumps(request_id, ensure_ascii=False)
+            + "}"
+        )
+
+    def _remember_snapshot_frame(self, audience: PatchAudience, frame: str) -> None:
+        if len(frame) > SNAPSHOT_CACHE_MAX_BYTES:
+            return
+        self._snapshot_frames[audience] = frame
+        self._snapshot_frame_bytes += len(frame)
+        while self._snapshot_frame_bytes > SNAPSHOT_CACHE_MAX_BYTES:
+            _, evicted = self._snapshot_frames.popitem(last=False)
+            self._snapshot_frame_bytes -= len(evicted)
+
+    async def snapshot_frame(
+        self,
+        *,
+        request_id: str | None = None,
+        role: SessionRole = "player",
+        assigned_instance_id: str | None = None,
+    ) -> str:
+        return self._snapshot_frame_for(
+            role=role,
+            assigned_instance_id=assigned_instance_id,
             request_id=request_id,
         )
 
@@ -924,22 +1254,34 @@ class StateSyncService:
         role: SessionRole = "player",
         assigned_instance_id: str | None = None,
     ) -> StateSnapshot:
-        async with self._lock:
-            return self._build_snapshot_locked(
-                role=role,
-                assigned_instance_id=assigned_instance_id,
-                request_id=request_id,
-            )
+        return self._build_snapshot(
+            role=role,
+            assigned_instance_id=assigned_instance_id,
+            request_id=request_id,
+        )
 
     async def reset(self) -> None:
         async with self._lock:
             self._state_version = 0
+            self._state_epoch = (
+                self._patch_log.restart(0)
+                if self._patch_log is not None
+                else uuid4().hex
+            )
             self._patch_history.clear()
+            self._audience_patches.clear()
             self._processed_request_ids.clear()
             self._processed_request_id_set.clear()
             self._no_op_request_ids.clear()
             self._mutation_audit.clear()
             self._undo_history.clear()
+            self._snapshot_frames.clear()
+            self._snapshot_frame_bytes = 0
+            self._snapshot_frames_source = None
+            self._projections.clear()
+            self._visibility.clear()
+            self._pending.clear()
+            self._staging = None
 
     async def replace_state_and_broadcast_snapshots(
         self,
@@ -948,20 +1290,28 @@ class StateSyncService:
         requesting_session: WebSocketSession,
         request_id: str | None = None,
     ) -> None:
+        self._refuse_in_batch("Replacing the state")
         async with self._lock:
-            StateSingleton.replaceState(state)
+            await self._drain_pending()
+            await StateSingleton.replaceStateAsync(
+                state,
+                state_version=self._state_version + 1,
+            )
             self._state_version += 1
             self._patch_history.clear()
+            if self._patch_log is not None:
+                self._patch_log.clear(self._state_version)
+            self._audience_patches.clear()
             self._processed_request_ids.clear()
             self._processed_request_id_set.clear()
             self._no_op_request_ids.clear()
             self._mutation_audit.clear()
             self._undo_history.clear()
             sessions = await websocket_sessions.authenticated_sessions()
-            snapshots = tuple(
+            frames = tuple(
                 (
                     session,
-                    self._build_snapshot_locked(
+                    self._snapshot_frame_for(
                         role=session.role,
                         assigned_instance_id=session.assigned_instance_id,
                         request_id=request_id if session is requesting_session else None,
@@ -970,12 +1320,11 @@ class StateSyncService:
                 for session in sessions
             )
 
-        for session, snapshot in snapshots:
-            await websocket_sessions.send(session, snapshot)
+        for session, frame in frames:
+            await websocket_sessions.send_frame(session, frame)
 
     async def recent_mutations(self) -> tuple[MutationAuditEntry, ...]:
-        async with self._lock:
-            return tuple(self._mutation_audit)
+        return tuple(self._mutation_audit)
 
     def consume_no_op_request(self, request_id: str | None) -> bool:
         """Report whether a request completed without producing any patch.
@@ -1015,6 +1364,18 @@ class StateSyncService:
             request_id=request_id,
         )
         self._patch_history.append(patch)
+        earliest_version = self._patch_history[0].state_version
+        for version in [v for v in self._audience_patches if v < earliest_version]:
+            del self._audience_patches[version]
+        if self._patch_log is not None:
+            try:
+                self._patch_log.append(patch)
+            except (OSError, ValueError) as exc:
+                # A log with a gap must not serve replays across it. The next
+                # startup finds it short of the state and starts a new epoch.
+                logger.warning("Detaching the patch log after a failed append: %s", exc)
+                self._patch_log.close()
+                self._patch_log = None
         return patch
 
     def _record_mutation(
@@ -1046,51 +1407,90 @@ class StateSyncService:
         self,
         last_seen_version: int,
         *,
+        epoch: str | None = None,
         role: SessionRole = "player",
         assigned_instance_id: str | None = None,
     ) -> list[StatePatch] | None:
-        async with self._lock:
-            if last_seen_version < 0:
-                return None
+        """Patches that take a client from `last_seen_version` to the current one.
 
-            if last_seen_version > self._state_version:
-                return None
+        Returns None when the client should take a snapshot instead: it comes
+        from another `epoch`, its version is out of range, or the patches are
+        gone. Gaps older than the in-memory history are read from the patch
+        log, unless the patches would outweigh the audience's snapshot.
+        """
+        if last_seen_version < 0:
+            return None
 
-            if last_seen_version == self._state_version:
-                return []
+        if epoch is not None and epoch != self._state_epoch:
+            return None
 
-            if not self._patch_history:
-                return None
+        if last_seen_version > self._state_version:
+            return None
 
-            earliest_version = self._patch_history[0].state_version
-            if last_seen_version + 1 < earliest_version:
-                return None
+        if last_seen_version == self._state_version:
+            return []
 
-            return [
-                self._redact_patch_for_role(
+        if (
+            not self._patch_history
+            or last_seen_version + 1 < self._patch_history[0].state_version
+        ):
+            return self._replay_from_log(
+                last_seen_version,
+                role=role,
+                assigned_instance_id=assigned_instance_id,
+            )
+
+        return [
+            copy(
+                self._patch_for_audience(
                     patch,
                     role=role,
                     assigned_instance_id=assigned_instance_id,
                 )
-                for patch in self._patch_history
-                if patch.state_version > last_seen_version
-            ]
-
-    def _encode_segment(self, segment: str) -> str:
-        return segment.replace("~", "~0").replace("/", "~1")
+            )
+            for patch in self._patch_history
+            if patch.state_version > last_seen_version
+        ]
 
-    def join_path(self, *segments: str) -> str:
-        return "/" + "/".join(self._encode_segment(segment) for segment in segments)
+    def _replay_from_log(
+        self,
+        last_seen_version: int,
+        *,
+        role: SessionRole,
+        assigned_instance_id: str | None,
+    ) -> list[StatePatch] | None:
+        if self._patch_log is None:
+            return None
+        snapshot_bytes = len(
+            self._snapshot_frame_for(
+                role=role,
+                assigned_instance_id=assigned_instance_id,
+            )
+        )
+        try:
+            patches = self._patch_log.read_since(
+                last_seen_version,
+                max_bytes=snapshot_bytes,
+            )
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Could not replay from the patch log: %s", exc)
+            return None
+        if not patches:
+            return None
+        return [
+            self._redact_patch_for_role(
+                patch,
+                role=role,
+                assigned_instance_id=assigned_instance_id,
+            )
+            for patch in patches
+        ]
 
-    def _decode_segment(self, segment: str) -> str:
-        return segment.replace("~1", "/").replace("~0", "~")
+    def join_path(self, *segments: str) -> StatePath:
+        return join_state_path(*segments)
 
-    def _parse_path(self, path: str) -> list[str]:
-        if not path.startswith("/"):
-            raise ValueError(f"State path must start with '/': {path}")
-        if path == "/":
-            return []
-        return [self._decode_segment(segment) for segment in path[1:].split("/")]
+    def _parse_path(self, path: str) -> tuple[str, ...]:
+        return parse_state_path(path).segments
 
     def _list_index(self, raw_index: str) -> int:
         try:
@@ -1136,58 +1536,61 @@ class StateSyncService:
     def _clone_value(self, value: Any) -> Any:
         return deepcopy(value)
 
-    def _resolve_value(self, root: Any, path: str) -> Any:
-        try:
-            container, leaf = self._resolve_container(root, path)
-        except ValueError:
-            return _MISSING
-
-        if isinstance(container, dict):
-            return (
-                self._clone_value(container[leaf])
-                if leaf in container
-                else _MISSING
-            )
-        if isinstance(container, list):
+    @contextmanager
+    def _transaction_rollback(self, state: State) -> Iterator[RollbackLog]:
+        with rollback_scope(state) as rollback:
+            for root, edited_in_place in DIRECTLY_EDITED_STATE_ROOTS.items():
+                rollback.preserve_root(root, deep=edited_in_place)
             try:
-                return self._clone_value(container[self._list_index(leaf)])
-            except (IndexError, ValueError):
-                return _MISSING
-        if hasattr(container, leaf):
-            return self._clone_value(getattr(container, leaf))
-        return _MISSING
+                yield rollback
+            except BaseException:
+                # Visibility and a full synchronizer pass inside a failed
+                # transaction describe state the rollback has undone.
+                self._visibility.clear()
+                self._synchronized_state = None
+                raise
 
-    def _build_inverse_ops(
+    def _journal_ops(
         self,
-        previous_state: State,
+        state: State,
+        rollback: RollbackLog,
         ops: list[PatchOp],
     ) -> list[PatchOp]:
-        inverse_ops: list[PatchOp] = []
-        for op in reversed(ops):
-            if op.op == "add":
-                inverse_ops.append(PatchOp(op="remove", path=op.path))
-                continue
-            if op.op == "remove":
-                previous_value = self._resolve_value(previous_state, op.path)
-                if previous_value is _MISSING:
-                    raise ValueError(f"Cannot undo remove for missing path {op.path}.")
-                inverse_ops.append(PatchOp(op="add", path=op.path, value=previous_value))
-                continue
-            if op.op == "set":
-                previous_value = self._resolve_value(previous_state, op.path)
-                inverse_ops.append(
-                    PatchOp(op="remove", path=op.path)
-                    if previous_value is _MISSING
-                    else PatchOp(op="set", path=op.path, value=previous_value)
+        journal_ops = list(ops)
+        for root in UNPATCHED_STATE_ROOTS:
+            value = getattr(state, root)
+            prior = rollback.preserved_root(root)
+            if prior is not _MISSING and value != prior:
+                journal_ops.append(
+                    PatchOp(op="set", path=self.join_path(root), value=value)
                 )
-                continue
-            if op.op == "inc":
-                if not isinstance(op.value, int | float):
-                    raise ValueError(f"Cannot undo non-numeric increment at {op.path}.")
-                inverse_ops.append(PatchOp(op="inc", path=op.path, value=-op.value))
-                continue
-            raise ValueError(f"Cannot undo unsupported operation {op.op}.")
-        return inverse_ops
+        return journal_ops
+
+    def _record_prior(
+        self,
+        state: State,
+        path: str,
+        container: Any,
+        leaf: Any,
+        op: str,
+        prior: Any,
+        *,
+        amount: int | float | None = None,
+    ) -> None:
+        rollback = active_rollback_log(state)
+        if rollback is not None:
+            path = parse_state_path(path)
+            if isinstance(container, list):
+                path = join_state_path(*path.segments[:-1], str(leaf))
+            rollback.record(
+                path,
+                path.segments,
+                container,
+                leaf,
+                op,
+                prior,
+                amount=amount,
+            )
 
     def _apply_patch_op(self, state: State, op: PatchOp) -> PatchOp:
         if op.op == "add":
@@ -1211,16 +1614,21 @@ class StateSyncService:
             if leaf in container:
                 raise ValueError(f"State path {path} already exists.")
             container[leaf] = value_copy
+            self._record_prior(state, path, container, leaf, "add", _MISSING)
             return PatchOp(op="add", path=path, value=self._clone_value(value))
 
         if isinstance(container, list):
             if leaf == "-":
                 container.append(value_copy)
+                self._record_prior(
+                    state, path, container, len(container) - 1, "add", _MISSING
+                )
                 return PatchOp(op="add", path=path, value=self._clone_value(value))
             index = self._list_index(leaf)
             if index < 0 or index > len(container):
                 raise ValueError(f"State path {path} does not support that list index.")
             container.insert(index, value_copy)
+            self._record_prior(state, path, container, index, "add", _MISSING)
             return PatchOp(op="add", path=path, value=self._clone_value(value))
 
         raise ValueError(f"State path {path} does not support add mutations.")
@@ -1230,19 +1638,27 @@ class StateSyncService:
         value_copy = self._clone_value(value)
 
         if isinstance(container, dict):
+            prior = container.get(leaf, _MISSING)
             container[leaf] = value_copy
+            self._record_prior(state, path, container, leaf, "set", prior)
             return PatchOp(op="set", path=path, value=self._clone_value(value))
 
         if isinstance(container, list):
             index = self._list_index(leaf)
             try:
+                prior = container[index]
                 container[index] = value_copy
             except IndexError as exc:
                 raise ValueError(f"State path {path} does not exist.") from exc
+            self._record_prior(
+                state, path, container, index % len(container), "set", prior
+            )
             return PatchOp(op="set", path=path, value=self._clone_value(value))
 
         if hasattr(container, leaf):
+            prior = getattr(container, leaf)
             setattr(container, leaf, value_copy)
+            self._record_prior(state, path, container, leaf, "set", prior)
             return PatchOp(op="set", path=path, value=self._clone_value(value))
 
         raise ValueError(f"State path {path} does not support set mutations.")
@@ -1254,6 +1670,7 @@ class StateSyncService:
             if leaf not in container:
                 raise ValueError(f"State path {path} does not exist.")
             removed = container.pop(leaf)
+            self._record_prior(state, path, container, leaf, "remove", removed)
             return self._clone_value(removed), PatchOp(op="remove", path=path)
 
         if isinstance(container, list):
@@ -1262,6 +1679,8 @@ class StateSyncService:
                 removed = container.pop(index)
             except IndexError as exc:
                 raise ValueError(f"State path {path} does not exist.") from exc
+            position = index if index >= 0 else index + len(container) + 1
+            self._record_prior(state, path, container, position, "remove", removed)
             return self._clone_value(removed), PatchOp(op="remove", path=path)
 
         raise ValueError(f"State path {path} does not support remove mutations.")
@@ -1278,6 +1697,9 @@ class StateSyncService:
             if not isinstance(current_value, int | float):
                 raise ValueError(f"State path {path} is not numeric.")
             container[leaf] = current_value + amount
+            self._record_prior(
+                state, path, container, leaf, "inc", current_value, amount=amount
+            )
             return PatchOp(op="inc", path=path, value=amount)
 
         if isinstance(container, list):
@@ -1289,6 +1711,15 @@ class StateSyncService:
             if not isinstance(current_value, int | float):
                 raise ValueError(f"State path {path} is not numeric.")
             container[index] = current_value + amount
+            self._record_prior(
+                state,
+                path,
+                container,
+                index % len(container),
+                "inc",
+                current_value,
+                amount=amount,
+            )
             return PatchOp(op="inc", path=path, value=amount)
 
         if hasattr(container, leaf):
@@ -1296,6 +1727,9 @@ class StateSyncService:
             if not isinstance(current_value, int | float):
                 raise ValueError(f"State path {path} is not numeric.")
             setattr(container, leaf, current_value + amount)
+            self._record_prior(
+                state, path, container, leaf, "inc", current_value, amount=amount
+            )
             return PatchOp(op="inc", path=path, value=amount)
 
         raise ValueError(f"State path {path} does not support increment mutations.")
@@ -1305,154 +1739,309 @@ class StateSyncService:
     ) -> PatchOp:
         return self.increment_mutation(state, path, -amount)
 
-    def _synchronize_sheet_attribute_projections(
+    def synchronize_state(self, state: State) -> list[PatchOp]:
+        """Run every reconciliation hook over a loaded or imported state."""
+        ops = self._synchronizer_registry().run_all(state)
+        self._synchronized_state = state
+        return ops
+
+    def _synchronize(
         self,
         state: State,
-        operations: list[PatchOp],
+        ops: list[PatchOp],
+        *,
+        only: Collection[str] | None = None,
     ) -> list[PatchOp]:
-        affected_sheet_ids: set[str] = set()
-        affected_instance_ids: set[str] = set()
-        for operation in operations:
-            segments = self._parse_path(operation.path)
-            if (
-                len(segments) >= 3
-                and segments[0] == "sheets"
-                and segments[2] == "stats"
-            ):
-                affected_sheet_ids.add(segments[1])
-            if (
-                len(segments) >= 3
-                and segments[0] == "instanced_sheets"
-                and segments[2] == "stats"
-            ):
-                affected_instance_ids.add(segments[1])
-        if not affected_sheet_ids and not affected_instance_ids:
-            return []
+        """Run the reconciliation hooks `ops` call for.
+
+        State that was never reconciled in full, such as one loaded lazily or
+        assigned directly, gets a full pass instead.
+        """
+        registry = self._synchronizer_registry()
+        if state is self._synchronized_state:
+            return registry.run(state, ops, only=only)
+        synchronized = registry.run(state, ops, only=only, full=True)
+        self._synchronized_state = state
+        return synchronized
+
+    def _synchronizer_registry(self) -> SynchronizerRegistry:
+        """Reconciliation hooks run after every mutation, in dependency order.
+
+        Each one lists the state paths it reads and runs only when the
+        transaction, or a hook before it, changed one of them.
+        """
+        if self._synchronizers is not None:
+            return self._synchronizers
+
+        from backend.features.augmentations.service import (
+            EQUIPMENT_AUGMENTATION_INPUTS,
+            equipment_augmentation_subjects,
+            synchronize_equipment_augmentations_mutation,
+        )
+        from backend.features.sheet_runtime.service import (
+            synchronize_resource_bounds_mutation,
+        )
+        from backend.features.pinned_actions.service import (
+            synchronize_pinned_actions_mutation,
+        )
+        from backend.features.catalog_organization.service import (
+            CATALOG_COLLECTION_ROOTS,
+            catalog_placement_ids,
+            synchronize_catalog_entries_mutation,
+        )
+        registry = SynchronizerRegistry(self._parse_path)
+        # Equipment and standalone effects also rebase direct-effect projections
+        # on whatever numeric sheet or instance field they target.
+        registry.register(
+            "equipment_augmentations",
+            EQUIPMENT_AUGMENTATION_INPUTS,
+            lambda state, scope: synchronize_equipment_augmentations_mutation(
+                state,
+                equipment_augmentation_subjects(state, scope),
+            ),
+        )
+        # Only edits inside stats re-evaluate attributes; creating or replacing a
+        # sheet keeps the attributes it was given.
+        registry.register(
+            "sheet_attribute_projections",
+            [("sheets", "*", "stats"), ("instanced_sheets", "*", "stats")],
+            self._synchronize_sheet_attribute_projections,
+            replacements=False,
+            scoped_only=True,
+        )
+        registry.register(
+            "resource_bounds",
+            [("instanced_sheets",), ("direct_effect_projections",)],
+            lambda state, scope: synchronize_resource_bounds_mutation(
+                state,
+                None
+                if scope.touches("direct_effect_projections")
+                else scope.ids("instanced_sheets"),
+            ),
+        )
+        registry.register(
+            "pinned_actions",
+            [("instanced_sheets",), ("items",), ("actions",)],
+            lambda state, scope: synchronize_pinned_actions_mutation(
+                state,
+                None
+                if scope.touches("items") or scope.touches("actions")
+                else scope.ids("instanced_sheets"),
+            ),
+        )
+        registry.register(
+            "catalog_entries",
+            [
+                ("catalog_entries",),
+                *((root, "*") for root in CATALOG_COLLECTION_ROOTS.values()),
+            ],
+            lambda state, scope: synchronize_catalog_entries_mutation(
+                state,
+                catalog_placement_ids(scope),
+            ),
+        )
+        registry.register(
+            "item_player_catalog_access",
+            [
+                ("items", "*", "player_catalog_access"),
+                ("instanced_sheets", "*", "parent_id"),
+                ("sheets", "*", "dm_only"),
+            ],
+            self._synchronize_item_player_catalog_access,
+        )
+        self._synchronizers = registry
+        return registry
 
+    def _synchronize_item_player_catalog_access(
+        self,
+        state: State,
+        scope: SynchronizerScope,
+    ) -> list[PatchOp]:
+        from backend.features.sheet_admin.items.service import (
+            synchronize_item_player_catalog_access_mutation,
+        )
+
+        item_ids = scope.ids("items")
+        instance_ids = scope.ids("instanced_sheets")
+        sheet_ids = scope.ids("sheets")
+        if item_ids is None or instance_ids is None or sheet_ids is None:
+            return synchronize_item_player_catalog_access_mutation(state)
+        return synchronize_item_player_catalog_access_mutation(
+            state,
+            item_ids,
+            instance_ids=instance_ids,
+            sheet_ids=sheet_ids,
+        )
+
+    def _synchronize_sheet_attribute_projections(
+        self,
+        state: State,
+        scope: SynchronizerScope,
+    ) -> list[PatchOp]:
         from backend.features.attributes.service import (
             reevaluate_instance_attributes_mutations,
             reevaluate_sheet_attributes_mutations,
         )
 
         attribute_operations: list[PatchOp] = []
-        for sheet_id in sorted(affected_sheet_ids):
-            if sheet_id in state.sheets:
-                attribute_operations.extend(
-                    reevaluate_sheet_attributes_mutations(state, sheet_id)
-                )
-        for instance_id in sorted(affected_instance_ids):
-            if instance_id in state.instanced_sheets:
-                attribute_operations.extend(
-                    reevaluate_instance_attributes_mutations(state, instance_id)
-                )
+        for root, reevaluate in (
+            ("sheets", reevaluate_sheet_attributes_mutations),
+            ("instanced_sheets", reevaluate_instance_attributes_mutations),
+        ):
+            subjects = getattr(state, root)
+            affected_ids = scope.ids(root)
+            for subject_id in sorted(subjects if affected_ids is None else affected_ids):
+                if subject_id not in subjects:
+                    continue
+                attribute_ids = self._dirty_attribute_ids(state, scope, root, subject_id)
+                if attribute_ids is not None and not attribute_ids:
+                    continue
+                attribute_operations.extend(reevaluate(state, subject_id, attribute_ids))
         return attribute_operations
 
+    def _dirty_attribute_ids(
+        self,
+        state: State,
+        scope: SynchronizerScope,
+        root: str,
+        subject_id: str,
+    ) -> set[str] | None:
+        """Attributes downstream of the scope's writes, or None to evaluate all."""
+        if scope.ids(root) is None:
+            return None
+        changed = [
+            segments[2:]
+            for segments in scope.paths
+            if segments[:2] == (root, subject_id)
+        ]
+        if state is StateSingleton.getState():
+            graph = self._projections.dependency_graph(state, root, subject_id, changed)
+        else:
+            # A verification run works on a copy the store is not bound to.
+            subject = getattr(state, root)[subject_id]
+            graph = FormulaDependencyGraph.build(subject)
+        if graph is None:
+            return None
+        return {
+            node[1]
+            for node in graph.dirty(changed)
+            if node[0] == "attributes"
+        }
+
     def _stat_projection_operations(
         self,
         state: State,
         operations: list[PatchOp],
     ) -> list[PatchOp]:
-        affected_sheet_ids: set[str] = set()
-        affected_instance_ids: set[str] = set()
-        for operation in operations:
-            segments = self._parse_path(operation.path)
-            if len(segments) < 2:
-                continue
-            projected_fields = {
-                "stats",
-                "attributes",
-                "stat_bonuses",
-                "max_health",
-                "max_mana",
-                "racial_hp_multiplier",
-            }
-            if segments[0] == "sheets" and (
-                len(segments) == 2
-                or (len(segments) >= 3 and segments[2] in projected_fields)
-            ):
-                affected_sheet_ids.add(segments[1])
-            if segments[0] == "instanced_sheets" and (
-                len(segments) == 2
-                or (len(segments) >= 3 and segments[2] in projected_fields)
-            ):
-                affected_instance_ids.add(segments[1])
+        """Refresh stat projections a transaction affected and patch the changes.
 
-        sheet_operations: list[PatchOp] = []
-        for sheet_id in sorted(affected_sheet_ids):
-            sheet = state.sheets.get(sheet_id)
-            if sheet is None:
+        Any other subject the operations touched is dropped from the projection
+        store so its next read is recomputed from current state. Evaluated
+        stats are patched key by key, except on a subject the transaction
+        replaced outright, whose values are all sent again.
+        """
+        projected_fields = {
+            "stats",
+            "attributes",
+            "stat_bonuses",
+            "max_health",
+            "max_mana",
+            "racial_hp_multiplier",
+        }
+        affected: dict[str, set[str]] = {"sheets": set(), "instanced_sheets": set()}
+        touched: dict[str, set[str]] = {"sheets": set(), "instanced_sheets": set()}
+        # Subject-relative paths each subject's operations wrote, or None for a
+        # subject replaced as a whole.
+        changed: dict[tuple[str, str], list[tuple[str, ...]] | None] = {}
+        self._projections.bind(state)
+        for operation in operations:
+            segments = operation.segments
+            if not segments or segments[0] not in affected:
                 continue
-            maxima = evaluate_resource_maxima(sheet)
-            sheet_operations.extend(
-                [
-                    PatchOp(
-                        op="set",
-                        path=self.join_path("sheets", sheet_id, "evaluated_stats"),
-                        value=evaluate_sheet_stats(sheet),
-                    ),
-                    PatchOp(
-                        op="set",
-                        path=self.join_path("sheets", sheet_id, "evaluated_max_health"),
-                        value=maxima["health"],
-                    ),
-                    PatchOp(
-                        op="set",
-                        path=self.join_path("sheets", sheet_id, "evaluated_max_mana"),
-                        value=maxima["mana"],
-                    ),
-                ]
-            )
-        instance_operations: list[PatchOp] = []
-        for instance_id in sorted(affected_instance_ids):
-            instance = state.instanced_sheets.get(instance_id)
-            if instance is None or instance.stats is None:
+            root = segments[0]
+            if len(segments) == 1:
+                self._projections.forget_stat_values(root)
                 continue
-            maxima = evaluate_resource_maxima(instance)
-            from backend.features.sheet_runtime.service import evaluate_reaction_limit
+            touched[root].add(segments[1])
+            key = (root, segments[1])
+            if len(segments) == 2:
+                changed[key] = None
+            elif changed.setdefault(key, []) is not None:
+                changed[key].append(segments[2:])
+            if len(segments) == 2 or segments[2] in projected_fields:
+                affected[root].add(segments[1])
+        for root, subject_ids in touched.items():
+            for subject_id in subject_ids - affected[root]:
+                self._projections.forget_stat_values(root, subject_id)
+
+        # Subjects added or replaced outright, such as the instances an
+        # encounter spawns, are evaluated together as one batch.
+        replaced = [key for key, paths in changed.items() if paths is None]
+        for root, subject_id in replaced:
+            self._projections.forget_stat_values(root, subject_id)
+        self._projections.prime_stat_values(state, replaced)
 
-            instance_operations.extend(
-                [
-                    PatchOp(
-                        op="set",
-                        path=self.join_path(
-                            "instanced_sheets", instance_id, "evaluated_stats"
-                        ),
-                        value=evaluate_sheet_stats(instance),
-                    ),
-                    PatchOp(
-                        op="set",
-                        path=self.join_path(
-                            "instanced_sheets", instance_id, "evaluated_max_health"
-                        ),
-                        value=maxima["health"],
-                    ),
-                    PatchOp(
-                        op="set",
-                        path=self.join_path(
-                            "instanced_sheets", instance_id, "evaluated_max_mana"
-                        ),
-                        value=maxima["mana"],
-                    ),
-                    PatchOp(
-                        op="set",
-                        path=self.join_path(
-                            "instanced_sheets", instance_id, "evaluated_max_reactions"
-                        ),
-                        value=evaluate_reaction_limit(instance),
-                    ),
-                ]
-            )
-        return [*sheet_operations, *instance_operations]
+        projected: list[PatchOp] = []
+        for root in ("sheets", "instanced_sheets"):
+            for subject_id in sorted(affected[root]):
+                subject = getattr(state, root).get(subject_id)
+                if subject is None:
+                    continue
+                if root == "instanced_sheets" and subject.stats is None:
+                    continue
+                subject_changes = changed[(root, subject_id)]
+                if subject_changes is None:
+                    previous = None
+                    current = self._projections.stat_values(state, root, subject_id)
+                else:
+                    previous, current = self._projections.refresh_stat_values(
+                        state,
+                        root,
+                        subject_id,
+                        subject_changes,
+                    )
+                if current is None:
+                    continue
+                for field_name, value in current.items():
+                    path = self.join_path(root, subject_id, field_name)
+                    if previous is None:
+                        projected.append(PatchOp(op="set", path=path, value=value))
+                    elif field_name == "evaluated_stats":
+                        projected.extend(
+                            _dict_patch_operations(path, previous[field_name], value)
+                        )
+                    elif previous.get(field_name) != value:
+                        projected.append(PatchOp(op="set", path=path, value=value))
+        return projected
+
+    def _patch_operations(
+        self,
+        state: State,
+        rollback: RollbackLog,
+        operations: list[PatchOp],
+    ) -> list[PatchOp]:
+        """`operations` followed by the projection changes they cause.
+
+        The projection store writes into the transaction's rollback log, so a
+        rollback restores the entries this replaced instead of the whole store.
+        """
+        with recording_into(rollback):
+            return [
+                *operations,
+                *self._stat_projection_operations(state, operations),
+                *self._inventory_projection_operations(state, operations),
+            ]
 
     def _inventory_projection_operations(
         self,
         state: State,
         operations: list[PatchOp],
     ) -> list[PatchOp]:
-        affected_sheet_ids: set[str] = set()
-        affected_instance_ids: set[str] = set()
+        """Refresh carried and container weights and patch the values that moved."""
+        affected: dict[str, set[str]] = {"sheets": set(), "instanced_sheets": set()}
+        self._projections.bind(state)
         for operation in operations:
-            segments = self._parse_path(operation.path)
+            segments = operation.segments
             if not segments:
                 continue
             if segments[0] == "items" and (
@@ -1465,79 +2054,62 @@ class StateSyncService:
                     "contents_weight_behavior",
                 }
             ):
-                affected_sheet_ids.update(state.sheets)
-                affected_instance_ids.update(state.instanced_sheets)
-            elif len(segments) >= 2 and segments[0] == "sheets" and (
-                len(segments) == 2 or (len(segments) >= 3 and segments[2] == "items")
-            ):
-                affected_sheet_ids.add(segments[1])
-            elif len(segments) >= 2 and segments[0] == "instanced_sheets" and (
-                len(segments) == 2 or (len(segments) >= 3 and segments[2] == "items")
+                if len(segments) == 1:
+                    affected["sheets"].update(state.sheets)
+                    affected["instanced_sheets"].update(state.instanced_sheets)
+                    continue
+                for root, subject_id in self._projections.holders_of(
+                    state,
+                    segments[1],
+                ):
+                    affected[root].add(subject_id)
+            elif segments[0] in affected and len(segments) == 1:
+                self._projections.forget_inventory(segments[0])
+            elif segments[0] in affected and (
+                len(segments) == 2 or segments[2] == "items"
             ):
-                affected_instance_ids.add(segments[1])
+                affected[segments[0]].add(segments[1])
 
         projected: list[PatchOp] = []
-        for sheet_id in sorted(affected_sheet_ids):
-            sheet = state.sheets.get(sheet_id)
-            if sheet is not None:
-                contents_weights = calculate_container_contents_weights(
-                    sheet.items,
-                    state.items,
+        for root in ("sheets", "instanced_sheets"):
+            for subject_id in sorted(affected[root]):
+                previous, current = self._projections.refresh_inventory(
+                    state,
+                    root,
+                    subject_id,
                 )
-                projected.append(
-                    PatchOp(
-                        op="set",
-                        path=self.join_path(
-                            "sheets", sheet_id, "current_carried_weight"
-                        ),
-                        value=calculate_carried_weight(sheet.items, state.items),
+                if current is None:
+                    continue
+                if (
+                    previous is None
+                    or previous.current_carried_weight != current.current_carried_weight
+                ):
+                    projected.append(
+                        PatchOp(
+                            op="set",
+                            path=self.join_path(root, subject_id, "current_carried_weight"),
+                            value=current.current_carried_weight,
+                        )
                     )
+                previous_contents = (
+                    previous.contents_weights if previous is not None else {}
                 )
                 projected.extend(
                     PatchOp(
                         op="set",
                         path=self.join_path(
-                            "sheets",
-                            sheet_id,
+                            root,
+                            subject_id,
                             "items",
                             relationship_id,
                             "current_contents_weight",
                         ),
-                        value=contents_weights.get(relationship_id, 0),
+                        value=weight,
                     )
-                    for relationship_id in sorted(contents_weights)
-                )
-        for instance_id in sorted(affected_instance_ids):
-            instance = state.instanced_sheets.get(instance_id)
-            if instance is not None:
-                contents_weights = calculate_container_contents_weights(
-                    instance.items,
-                    state.items,
-                )
-                projected.append(
-                    PatchOp(
-                        op="set",
-                        path=self.join_path(
-                            "instanced_sheets",
-                            instance_id,
-                            "current_carried_weight",
-                        ),
-                        value=calculate_carried_weight(instance.items, state.items),
-                    )
-                )
-                projected.extend(
-                    PatchOp(
-                        op="set",
-                        path=self.join_path(
-                            "instanced_sheets",
-                            instance_id,
-                            "items",
-                            relationship_id,
-                            "current_contents_weight",
-                        ),
-                        value=contents_weights.get(relationship_id, 0),
+                    for relationship_id, weight in sorted(
+                        current.contents_weights.items()
                     )
-                    for relationship_id in sorted(contents_weights)
+                    if previous_contents.get(relationship_id) != weight
                 )
         return projected
 
@@ -1548,188 +2120,475 @@ class StateSyncService:
         request_id: str | None = None,
         before_commit: Callable[[MutationResultT], Awaitable[None]] | None = None,
     ) -> MutationResultT:
-        async with self._lock:
-            if request_id is not None and request_id in self._processed_request_id_set:
-                raise DuplicateRequestError(
-                    f"Duplicate request '{request_id}' was ignored; its state mutation "
-                    "was already processed."
-                )
+        batch = self._open_batch()
+        if batch is not None:
+            state = batch.rollback.state
 
+            def build_in_batch() -> tuple[MutationResultT, list[PatchOp]]:
+                result, ops = mutation(state)
+                ops.extend(self._synchronize(state, ops))
+                return result, ops
+
+            return await self._join_batch(
+                batch,
+                build_in_batch,
+                request_id=request_id,
+                before_commit=before_commit,
+            )
+
+        async with self._lock:
+            self._check_duplicate_request(request_id)
             state = StateSingleton.getState()
-            previous_state = deepcopy(state)
+
+            def build() -> tuple[MutationResultT, list[PatchOp]]:
+                result, ops = mutation(state)
+                ops.extend(self._synchronize(state, ops))
+                return result, ops
+
+            rollback, (result, ops) = await self._stage(state, build)
             inverse_ops: list[PatchOp] = []
             patch_ops: list[PatchOp] = []
             try:
-                result, ops = mutation(state)
-                from backend.features.augmentations.service import (
-                    synchronize_equipment_augmentations_mutation,
-                )
-                from backend.features.sheet_runtime.service import (
-                    synchronize_resource_bounds_mutation,
-                )
-                from backend.features.pinned_actions.service import (
-                    synchronize_pinned_actions_mutation,
-                )
-                from backend.features.catalog_organization.service import (
-                    synchronize_catalog_entries_mutation,
-                )
-                from backend.features.sheet_admin.items.service import (
-                    synchronize_item_player_catalog_access_mutation,
-                )
-
-                ops.extend(synchronize_equipment_augmentations_mutation(state))
-                ops.extend(self._synchronize_sheet_attribute_projections(state, ops))
-                ops.extend(synchronize_resource_bounds_mutation(state))
-                ops.extend(synchronize_pinned_actions_mutation(state))
-                ops.extend(synchronize_catalog_entries_mutation(state))
-                ops.extend(synchronize_item_player_catalog_access_mutation(state))
+                self._visibility.observe(state, ops)
                 if before_commit is not None:
                     await before_commit(result)
                 if ops:
-                    inverse_ops = self._build_inverse_ops(previous_state, ops)
-                    patch_ops = [
-                        *ops,
-                        *self._stat_projection_operations(state, ops),
-                        *self._inventory_projection_operations(state, ops),
-                    ]
-                    # Persist before publishing a version or patch. If the write
-                    # fails, the rollback below restores memory; committing first
-                    # would leave the server holding a mutation no client can see
-                    # and no version gap to recover from.
-                    StateSingleton.dumpState()
-            except Exception:
-                for state_field in fields(state):
-                    setattr(
-                        state,
-                        state_field.name,
-                        deepcopy(getattr(previous_state, state_field.name)),
+                    inverse_ops = rollback.inverse_operations()
+                    patch_ops = self._patch_operations(state, rollback, ops)
+                    # Persist before publishing a version or patch. If the
+                    # write fails, the rollback restores memory; committing
+                    # first would leave the server holding a mutation no client
+                    # can see and no version gap to recover from. Projection
+                    # ops are derived on load and are not journaled.
+                    pending = self._queue_commit(
+                        rollback,
+                        self._journal_ops(state, rollback, ops),
+                        request_id=request_id,
                     )
+            except BaseException:
+                self._abort_staged(rollback)
                 raise
-            if ops:
-                if inverse_ops:
-                    self._undo_history.append(inverse_ops)
-                patch = self._next_patch(patch_ops, request_id=request_id)
-                self._record_mutation(patch, source=current_request_source())
+            if not ops:
+                self._staging = None
                 if request_id is not None:
                     self._remember_processed_request(request_id)
-                await websocket_sessions.broadcast_per_session(
-                    lambda session: self._redact_patch_for_role(
-                        patch,
-                        role=session.role,
-                        assigned_instance_id=session.assigned_instance_id,
-                    )
-                )
-            elif request_id is not None:
+                    # No patch will be broadcast for this request, so the
+                    # transport layer has to answer it explicitly. See
+                    # consume_no_op_request.
+                    self._no_op_request_ids.append(request_id)
+                return result
+
+        def publish() -> StatePatch:
+            if inverse_ops:
+                self._undo_history.append(inverse_ops)
+            patch = self._next_patch(patch_ops, request_id=request_id)
+            self._record_mutation(patch, source=current_request_source())
+            if request_id is not None:
                 self._remember_processed_request(request_id)
-                # No patch will be broadcast for this request, so the transport
-                # layer has to answer it explicitly. See consume_no_op_request.
-                self._no_op_request_ids.append(request_id)
-            return result
+            return patch
+
+        if await self._commit(pending, publish):
+            raise asyncio.CancelledError
+        return result
 
     async def apply_audit_mutation(
         self,
         mutation: Callable[[State], tuple[MutationResultT, list[PatchOp]]],
     ) -> MutationResultT:
         """Persist and broadcast audit state without creating an undo entry."""
+        batch = self._open_batch()
+        if batch is not None:
+            return await self._join_batch(batch, lambda: mutation(batch.rollback.state))
         async with self._lock:
             state = StateSingleton.getState()
-            previous_state = deepcopy(state)
-            try:
-                result, ops = mutation(state)
-                if ops:
-                    # Same ordering rule as apply_mutation: durable first, then
-                    # versioned and broadcast.
-                    StateSingleton.dumpState()
-            except Exception:
-                for state_field in fields(state):
-                    setattr(
-                        state,
-                        state_field.name,
-                        deepcopy(getattr(previous_state, state_field.name)),
-                    )
-                raise
-
+            rollback, (result, ops) = await self._stage(state, lambda: mutation(state))
             if not ops:
+                self._staging = None
                 return result
+            self._visibility.observe(state, ops)
+            # Same ordering rule as apply_mutation: durable first, then
+            # versioned and broadcast.
+            pending = self._queue_commit(rollback, self._journal_ops(state, rollback, ops))
 
+        def publish() -> StatePatch:
             patch = self._next_patch(ops)
             self._record_mutation(patch, source=current_request_source())
-            await websocket_sessions.broadcast_per_session(
-                lambda session: self._redact_patch_for_role(
-                    patch,
-                    role=session.role,
-                    assigned_instance_id=session.assigned_instance_id,
-                )
-            )
-            return result
+            return patch
+
+        if await self._commit(pending, publish):
+            raise asyncio.CancelledError
+        return result
 
     async def undo_last_change(self, *, request_id: str | None = None) -> bool:
+        self._refuse_in_batch("Undo")
         async with self._lock:
             if not self._undo_history:
                 return False
 
             state = StateSingleton.getState()
-            previous_state = deepcopy(state)
             inverse_ops = self._undo_history.pop()
-            try:
+
+            def build() -> list[PatchOp]:
                 applied_ops = [self._apply_patch_op(state, op) for op in inverse_ops]
                 applied_ops.extend(
-                    self._synchronize_sheet_attribute_projections(state, applied_ops)
-                )
-                from backend.features.sheet_runtime.service import (
-                    synchronize_resource_bounds_mutation,
+                    self._synchronize(
+                        state,
+                        applied_ops,
+                        only=("sheet_attribute_projections", "resource_bounds"),
+                    )
                 )
+                return applied_ops
 
-                applied_ops.extend(synchronize_resource_bounds_mutation(state))
-                patch_ops = [
-                    *applied_ops,
-                    *self._stat_projection_operations(state, applied_ops),
-                    *self._inventory_projection_operations(state, applied_ops),
-                ]
-                StateSingleton.dumpState()
-            except Exception:
-                # Restore both the state and the undo entry so a failed undo can
-                # be retried instead of silently consuming history.
-                for state_field in fields(state):
-                    setattr(
-                        state,
-                        state_field.name,
-                        deepcopy(getattr(previous_state, state_field.name)),
+            try:
+                rollback, applied_ops = await self._stage(state, build)
+                try:
+                    self._visibility.observe(state, applied_ops)
+                    patch_ops = self._patch_operations(state, rollback, applied_ops)
+                    pending = self._queue_commit(
+                        rollback,
+                        self._journal_ops(state, rollback, applied_ops),
+                        request_id=request_id,
                     )
+                except BaseException:
+                    self._abort_staged(rollback)
+                    raise
+            except BaseException:
+                # Restore the undo entry too so a failed undo can be retried
+                # instead of silently consuming history.
                 self._undo_history.append(inverse_ops)
                 raise
+
+        def publish() -> StatePatch:
             patch = self._next_patch(patch_ops, request_id=request_id)
             self._record_mutation(patch, source=current_request_source())
             if request_id is not None:
                 self._remember_processed_request(request_id)
-            await websocket_sessions.broadcast_per_session(
-                lambda session: self._redact_patch_for_role(
-                    patch,
-                    role=session.role,
-                    assigned_instance_id=session.assigned_instance_id,
-                )
-            )
-            return True
+            return patch
+
+        try:
+            cancelled = await self._commit(pending, publish)
+        except Exception:
+            self._undo_history.append(inverse_ops)
+            raise
+        if cancelled:
+            raise asyncio.CancelledError
+        return True
 
     async def apply_private_mutation(
         self,
         mutation: Callable[[State], MutationResultT],
     ) -> MutationResultT:
+        """Persist an unbroadcast change to roots in `UNPATCHED_STATE_ROOTS`."""
+        batch = self._open_batch()
+        if batch is not None:
+            return await self._join_batch(
+                batch,
+                lambda: (mutation(batch.rollback.state), []),
+            )
+        async with self._lock:
+            state = StateSingleton.getState()
+            rollback, result = await self._stage(state, lambda: mutation(state))
+            journal_ops = self._journal_ops(state, rollback, [])
+            if not journal_ops:
+                self._staging = None
+                return result
+            pending = self._queue_commit(rollback, journal_ops, advances_version=False)
+
+        if await self._commit(pending, lambda: None):
+            raise asyncio.CancelledError
+        return result
+
+    @asynccontextmanager
+    async def batch(self, *, request_id: str | None = None) -> AsyncIterator[None]:
+        """Run every mutation applied inside the block as one transaction.
+
+        Mutations, audit and private mutations alike, join the batch instead of
+        committing on their own. When the block exits, the combined changes are
+        journaled in one write and published as one patch and one undo entry.
+        If the block raises, all of them are rolled back together. The lock is
+        held for the whole block, so other transactions wait for the batch.
+        """
+        if self._open_batch() is not None:
+            raise ValueError("Request batches cannot be nested.")
         async with self._lock:
+            self._check_duplicate_request(request_id)
+            # Let earlier commits settle first: a batch cannot be rerun the way
+            # a single mutation is when its writes overlap a pending commit.
+            await self._drain_pending()
             state = StateSingleton.getState()
-            previous_state = deepcopy(state)
+            with self._transaction_rollback(state) as rollback:
+                batch = _OpenBatch(service=self, rollback=rollback)
+                self._staging = rollback
+                token = _open_batch.set(batch)
+                try:
+                    yield
+                except BaseException:
+                    self._abort_staged(rollback)
+                    raise
+                finally:
+                    _open_batch.reset(token)
+
+            ops = batch.ops
+            inverse_ops: list[PatchOp] = []
+            patch_ops: list[PatchOp] = []
             try:
-                result = mutation(state)
-                StateSingleton.dumpState()
-            except Exception:
-                for state_field in fields(state):
-                    setattr(
-                        state,
-                        state_field.name,
-                        deepcopy(getattr(previous_state, state_field.name)),
+                rollback.release_unchanged_roots(DIRECTLY_EDITED_STATE_ROOTS)
+                journal_ops = self._journal_ops(state, rollback, ops)
+                if ops:
+                    inverse_ops = rollback.inverse_operations()
+                    patch_ops = self._patch_operations(state, rollback, ops)
+                pending = (
+                    self._queue_commit(
+                        rollback,
+                        journal_ops,
+                        request_id=request_id,
+                        advances_version=bool(ops),
                     )
+                    if journal_ops
+                    else None
+                )
+            except BaseException:
+                self._abort_staged(rollback)
                 raise
-            return result
+            request_ids = [*batch.request_ids, *([request_id] if request_id else [])]
+            if pending is None:
+                self._staging = None
+                for processed_id in request_ids:
+                    self._remember_processed_request(processed_id)
+                return
+
+        def publish() -> StatePatch | None:
+            for processed_id in request_ids:
+                self._remember_processed_request(processed_id)
+            if not ops:
+                return None
+            if inverse_ops:
+                self._undo_history.append(inverse_ops)
+            patch = self._next_patch(patch_ops, request_id=request_id)
+            self._record_mutation(patch, source=current_request_source())
+            return patch
+
+        if await self._commit(pending, publish):
+            raise asyncio.CancelledError
+
+    def _open_batch(self) -> _OpenBatch | None:
+        batch = _open_batch.get()
+        return batch if batch is not None and batch.service is self else None
+
+    def _refuse_in_batch(self, operation: str) -> None:
+        if self._open_batch() is not None:
+            raise ValueError(f"{operation} cannot run inside a request batch.")
+
+    async def _join_batch(
+        self,
+        batch: _OpenBatch,
+        build: Callable[[], tuple[MutationResultT, list[PatchOp]]],
+        *,
+        request_id: str | None = None,
+        before_commit: Callable[[MutationResultT], Awaitable[None]] | None = None,
+    ) -> MutationResultT:
+        """Apply a mutation inside an open batch; it commits with the batch."""
+        self._check_duplicate_request(request_id)
+        savepoint = batch.rollback.savepoint()
+        try:
+            result, ops = build()
+            self._visibility.observe(batch.rollback.state, ops)
+            if before_commit is not None:
+                await before_commit(result)
+        except BaseException:
+            # Undo only this mutation; the caller decides whether the batch
+            # as a whole goes on.
+            batch.rollback.rollback_to(savepoint)
+            self._visibility.clear()
+            self._synchronized_state = None
+            raise
+        batch.ops.extend(ops)
+        if request_id is not None:
+            batch.request_ids.append(request_id)
+        return result
+
+    async def compact_checkpoint(self) -> None:
+        """Fold the journal into a full checkpoint between transactions."""
+        async with self._lock:
+            await self._drain_pending()
+            await self._wait_for_durability(
+                StateSingleton.scheduleDump(only_dirty=True)
+            )
+
+    def _check_duplicate_request(self, request_id: str | None) -> None:
+        if request_id is None:
+            return
+        batch = self._open_batch()
+        if (
+            request_id in self._processed_request_id_set
+            or any(pending.request_id == request_id for pending in self._pending)
+            or (batch is not None and request_id in batch.request_ids)
+        ):
+            raise DuplicateRequestError(
+                f"Duplicate request '{request_id}' was ignored; its state mutation "
+                "was already processed."
+            )
+
+    def _published_state(self) -> State:
+        """Live state without the changes of transactions not yet published."""
+        state = StateSingleton.getState()
+        logs = [pending.rollback for pending in self._pending]
+        if self._staging is not None:
+            logs.append(self._staging)
+        return published_state(state, [log for log in logs if log.state is state])
+
+    async def _stage(
+        self,
+        state: State,
+        build: Callable[[], StagedT],
+    ) -> tuple[RollbackLog, StagedT]:
+        """Run `build` against memory until its writes miss every pending commit.
+
+        The write set is inferred from the rollback log. A transaction whose
+        writes overlap a pending commit is rolled back, waits for that commit
+        to settle and runs again, so callbacks must only change the state they
+        are given. Called with the lock held.
+        """
+        while True:
+            await self._wait_for_barriers()
+            with self._transaction_rollback(state) as rollback:
+                try:
+                    outcome = build()
+                except Exception:
+                    rollback.restore()
+                    raise
+            rollback.release_unchanged_roots(DIRECTLY_EDITED_STATE_ROOTS)
+            written = rollback.written_branches()
+            conflicts = [
+                pending.settled
+                for pending in self._pending
+                if branches_overlap(pending.rollback.written_branches(), written)
+            ]
+            if not conflicts:
+                self._staging = rollback
+                return rollback, outcome
+            rollback.restore()
+            self._synchronized_state = None
+            await asyncio.wait(conflicts)
+
+    async def _wait_for_barriers(self) -> None:
+        """Let failed and full-checkpoint commits settle before staging on them."""
+        while any(pending.exclusive or pending.failed for pending in self._pending):
+            await asyncio.wait([self._pending[-1].settled])
+
+    async def _drain_pending(self) -> bool:
+        """Wait for every pending commit to settle; False if the last one failed."""
+        if not self._pending:
+            return True
+        # Each commit settles only after the one before it.
+        last = self._pending[-1].settled
+        await asyncio.wait([last])
+        return last.result()
+
+    def _abort_staged(self, rollback: RollbackLog) -> None:
+        rollback.restore()
+        self._visibility.clear()
+        self._synchronized_state = None
+        self._staging = None
+
+    def _queue_commit(
+        self,
+        rollback: RollbackLog,
+        journal_ops: list[PatchOp],
+        *,
+        request_id: str | None = None,
+        advances_version: bool = True,
+    ) -> _PendingCommit:
+        """Queue the staged transaction's journal write behind the pending ones."""
+        # Without a journal to append to, the write is a full checkpoint of
+        # memory; staging is held back until it settles (see _wait_for_barriers).
+        exclusive = not StateSingleton.journalAppendable()
+        state_version = self._state_version + sum(
+            pending.advances_version for pending in self._pending
+        )
+        pending = _PendingCommit(
+            rollback=rollback,
+            write=StateSingleton.journalCommit(
+                journal_ops,
+                state_version=state_version + 1 if advances_version else state_version,
+                request_id=request_id,
+            ),
+            settled=asyncio.get_running_loop().create_future(),
+            previous=self._pending[-1].settled if self._pending else None,
+            exclusive=exclusive,
+            advances_version=advances_version,
+            request_id=request_id,
+        )
+        self._pending.append(pending)
+        self._staging = None
+        return pending
+
+    async def _commit(
+        self,
+        pending: _PendingCommit,
+        publish: Callable[[], StatePatch | None],
+    ) -> bool:
+        """Publish a pending commit in queue order once it is durable.
+
+        `publish` assigns the version and records the commit; its patch is then
+        broadcast before the next commit may publish. If this commit's write or
+        any commit queued before it failed, its changes are rolled back and the
+        error is raised instead. Returns whether the caller was cancelled while
+        waiting, as `_wait_for_durability` does.
+        """
+        error: Exception | None = None
+        cancelled = False
+        try:
+            cancelled = await self._wait_for_durability(pending.write)
+        except Exception as exc:
+            error = exc
+        if pending.previous is not None:
+            cancelled = await self._wait_for_durability(pending.previous) or cancelled
+            if error is None and not pending.previous.result():
+                error = AbortedCommitError(
+                    "A state change queued before this one failed to persist, so "
+                    "this change was rolled back."
+                )
+        self._pending.remove(pending)
+        if error is not None:
+            # Commits staged after this one fail in turn; until then they keep
+            # the projection entries they wrote over this one's.
+            later = [queued.rollback for queued in self._pending]
+            if self._staging is not None:
+                later.append(self._staging)
+            pending.rollback.restore(later=later)
+            self._visibility.clear()
+            self._synchronized_state = None
+            pending.settled.set_result(False)
+            raise error
+        try:
+            patch = publish()
+            if patch is not None:
+                await self._broadcast_patch(patch)
+        finally:
+            pending.settled.set_result(True)
+        return cancelled
+
+    async def _wait_for_durability(
+        self,
+        write: Future[Any] | asyncio.Future[Any],
+    ) -> bool:
+        """Wait for a queued write without blocking the event loop.
+
+        A queued write cannot be withdrawn, so a cancelled caller still waits
+        for it to land and finishes its transaction. The return value tells
+        the caller to re-raise the cancellation once that is done.
+        """
+        durable = asyncio.wrap_future(write)
+        cancelled = False
+        while True:
+            try:
+                await asyncio.shield(durable)
+                return cancelled
+            except asyncio.CancelledError:
+                if durable.cancelled():
+                    raise
+                cancelled = True
 
     async def add(
         self,
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Callable, Collection, Iterable, Sequence
+from copy import deepcopy
+from dataclasses import dataclass, field
+
+from pydantic_core import to_jsonable_python
+
+from backend.core.transport import PatchOp
+from backend.state.models.state import State
+
+# Run every synchronizer over the whole state on a copy and compare its
+# operations with the scheduled run. Meant for development; it doubles the cost
+# of every mutation.
+VERIFY_SYNCHRONIZERS = os.environ.get("STATE_SYNC_VERIFY_SYNCHRONIZERS", "0") == "1"
+
+
+@dataclass(frozen=True)
+class SynchronizerScope:
+    """The entities under each root a synchronizer's inputs touched.
+
+    `ids(root)` is None when the whole root is in scope, either because a full
+    run was requested or because an operation replaced the root itself.
+    `paths` lists the touched paths themselves; it is empty in a full run.
+    """
+
+    entity_ids: dict[str, set[str] | None] = field(default_factory=dict)
+    full: bool = False
+    paths: tuple[tuple[str, ...], ...] = ()
+
+    def touches(self, root: str) -> bool:
+        return self.full or root in self.entity_ids
+
+    def ids(self, root: str) -> set[str] | None:
+        if self.full:
+            return None
+        return self.entity_ids.get(root, set())
+
+
+FULL_SCOPE = SynchronizerScope(full=True)
+
+
+@dataclass(frozen=True)
+class Synchronizer:
+    """A reconciliation step and the state paths it reads.
+
+    Each input is a path prefix whose segments may be `*` to match any entity.
+    An operation is an input change when either path is a prefix of the other,
+    so replacing a whole entity or root counts as changing every field in it.
+    With `replacements=False` only operations at or below an input count.
+    A synchronizer with `scoped_only` has no whole-state form and receives its
+    scope even in a full run.
+    """
+
+    name: str
+    inputs: tuple[tuple[str, ...], ...]
+    run: Callable[[State, SynchronizerScope], list[PatchOp]]
+    replacements: bool = True
+    scoped_only: bool = False
+
+    def matches(self, segments: Sequence[str]) -> bool:
+        return any(
+            (self.replacements or len(segments) >= len(pattern))
+            and _overlaps(pattern, segments)
+            for pattern in self.inputs
+        )
+
+
+class SynchronizerRegistry:
+    """Runs registered synchronizers in order, each only when its inputs changed.
+
+    Operations produced by one synchronizer count as changes for the ones after
+    it, matching the order the synchronizers were registered in.
+    """
+
+    def __init__(
+        self,
+        parse_path: Callable[[str], list[str]],
+        *,
+        verify: bool = VERIFY_SYNCHRONIZERS,
+    ) -> None:
+        self._parse_path = parse_path
+        self._synchronizers: list[Synchronizer] = []
+        self.verify = verify
+
+    def register(
+        self,
+        name: str,
+        inputs: Iterable[Sequence[str]],
+        run: Callable[[State, SynchronizerScope], list[PatchOp]],
+        *,
+        replacements: bool = True,
+        scoped_only: bool = False,
+    ) -> None:
+        self._synchronizers.append(
+            Synchronizer(
+                name=name,
+                inputs=tuple(tuple(pattern) for pattern in inputs),
+                run=run,
+                replacements=replacements,
+                scoped_only=scoped_only,
+            )
+        )
+
+    def run(
+        self,
+        state: State,
+        operations: Sequence[PatchOp],
+        *,
+        only: Collection[str] | None = None,
+        full: bool = False,
+    ) -> list[PatchOp]:
+        """Reconcile `state` after `operations` and return the added operations.
+
+        `only` limits the run to the named synchronizers. `full` reconciles
+        every entity, not only the ones `operations` touched.
+        """
+        synchronizers = [
+            synchronizer
+            for synchronizer in self._synchronizers
+            if only is None or synchronizer.name in only
+        ]
+        if full:
+            return self._run(state, operations, synchronizers, full=True)
+        expected = (
+            self._run(deepcopy(state), operations, synchronizers, full=True)
+            if self.verify
+            else None
+        )
+        synchronized = self._run(state, operations, synchronizers, full=False)
+        if expected is not None:
+            self._compare(expected, synchronized)
+        return synchronized
+
+    def run_all(self, state: State) -> list[PatchOp]:
+        """Reconcile every entity, for state that did not arrive through mutations."""
+        return self._run(state, [], self._synchronizers, full=True)
+
+    def _run(
+        self,
+        state: State,
+        operations: Sequence[PatchOp],
+        synchronizers: Sequence[Synchronizer],
+        *,
+        full: bool,
+    ) -> list[PatchOp]:
+        touched = [self._parse_path(operation.path) for operation in operations]
+        synchronized: list[PatchOp] = []
+        for synchronizer in synchronizers:
+            if full and not synchronizer.scoped_only:
+                scope = FULL_SCOPE
+            else:
+                scope = _scope(
+                    segments for segments in touched if synchronizer.matches(segments)
+                )
+                if not scope.full and not scope.entity_ids:
+                    continue
+            produced = synchronizer.run(state, scope)
+            synchronized.extend(produced)
+            touched.extend(self._parse_path(operation.path) for operation in produced)
+        return synchronized
+
+    def _compare(self, expected: list[PatchOp], actual: list[PatchOp]) -> None:
+        missing = _signatures(expected) - _signatures(actual)
+        unexpected = _signatures(actual) - _signatures(expected)
+        if missing or unexpected:
+            raise RuntimeError(
+                "Scheduled synchronizers disagree with a full run: "
+                f"missing {sorted(path for _, path, _ in missing)}, "
+                f"unexpected {sorted(path for _, path, _ in unexpected)}."
+            )
+
+
+def _overlaps(pattern: Sequence[str], segments: Sequence[str]) -> bool:
+    return all(
+        expected == "*" or expected == actual
+        for expected, actual in zip(pattern, segments)
+    )
+
+
+def _scope(touched: Iterable[Sequence[str]]) -> SynchronizerScope:
+    entity_ids: dict[str, set[str] | None] = {}
+    paths: list[tuple[str, ...]] = []
+    for segments in touched:
+        if not segments:
+            return FULL_SCOPE
+        paths.append(tuple(segments))
+        root = segments[0]
+        if len(segments) == 1:
+            entity_ids[root] = None
+            continue
+        ids = entity_ids.setdefault(root, set())
+        if ids is not None:
+            ids.add(segments[1])
+    return SynchronizerScope(entity_ids=entity_ids, paths=tuple(paths))
+
+
+def _signatures(operations: Iterable[PatchOp]) -> set[tuple[str, str, str]]:
+    return {
+        (
+            operation.op,
+            operation.path,
+            json.dumps(to_jsonable_python(operation.value), sort_keys=True),
+        )
+        for operation in operations
+    }
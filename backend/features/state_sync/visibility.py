@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from backend.core.transport import PatchOp
+from backend.state.models.state import State
+
+# Instance fields that decide what else its player may see: the inventory
+# carries items into view and the parent keeps a `dm_only` template visible.
+_VISIBILITY_INSTANCE_FIELDS = {"items", "parent_id"}
+
+
+@dataclass
+class PlayerVisibility:
+    """The items, sheet templates and active conditions one player may see."""
+
+    assigned_instance_id: str | None
+    items: set[str] = field(default_factory=set)
+    sheets: set[str] = field(default_factory=set)
+    conditions: set[str] = field(default_factory=set)
+    carried: frozenset[str] = frozenset()
+    parent_id: str | None = None
+
+
+class VisibilityIndex:
+    """Per-player visibility, kept in step with the state it was built from.
+
+    An audience's entry is built on first use. After that, state sync reports
+    the operations each transaction applied, and only the items, sheets and
+    conditions they name are rechecked, so redaction answers visibility
+    questions with a set lookup. Like the projection store, the index is tied
+    to one state object, and it is cleared whenever a transaction is rolled back.
+    """
+
+    def __init__(self) -> None:
+        self._state: State | None = None
+        self._players: dict[str | None, PlayerVisibility] = {}
+
+    def bind(self, state: State) -> None:
+        if state is not self._state:
+            self.clear()
+            self._state = state
+
+    def clear(self) -> None:
+        self._state = None
+        self._players.clear()
+
+    def for_player(
+        self,
+        state: State,
+        assigned_instance_id: str | None,
+    ) -> PlayerVisibility:
+        self.bind(state)
+        visibility = self._players.get(assigned_instance_id)
+        if visibility is None:
+            visibility = _build(state, assigned_instance_id)
+            self._players[assigned_instance_id] = visibility
+        return visibility
+
+    def observe(self, state: State, operations: Iterable[PatchOp]) -> None:
+        """Recheck what `operations` may have changed for each indexed player."""
+        self.bind(state)
+        if not self._players:
+            return
+        items: set[str] = set()
+        sheets: set[str] = set()
+        conditions: set[str] = set()
+        instances: set[str] = set()
+        for operation in operations:
+            segments = operation.segments
+            if not segments:
+                self._players.clear()
+                return
+            root = segments[0]
+            if root not in {"items", "sheets", "instanced_sheets", "active_conditions"}:
+                continue
+            if len(segments) == 1:
+                self._players.clear()
+                return
+            key = segments[1]
+            if root == "items":
+                items.add(key)
+            elif root == "active_conditions":
+                conditions.add(key)
+            elif root == "sheets":
+                if len(segments) == 2 or segments[2] == "dm_only":
+                    sheets.add(key)
+            elif key in self._players:
+                if len(segments) == 2:
+                    del self._players[key]
+                elif segments[2] in _VISIBILITY_INSTANCE_FIELDS:
+                    instances.add(key)
+
+        for instance_id in instances:
+            visibility = self._players.get(instance_id)
+            if visibility is None:
+                continue
+            carried, parent_id = _instance_reach(state, instance_id)
+            items.update(carried ^ visibility.carried)
+            if parent_id != visibility.parent_id:
+                sheets.update(
+                    sheet_id
+                    for sheet_id in (visibility.parent_id, parent_id)
+                    if sheet_id is not None
+                )
+            visibility.carried = carried
+            visibility.parent_id = parent_id
+
+        for visibility in self._players.values():
+            for visible, keys, is_visible in (
+                (visibility.items, items, _item_visible),
+                (visibility.sheets, sheets, _sheet_visible),
+                (visibility.conditions, conditions, _condition_visible),
+            ):
+                for key in keys:
+                    if is_visible(state, visibility, key):
+                        visible.add(key)
+                    else:
+                        visible.discard(key)
+
+
+def _build(state: State, assigned_instance_id: str | None) -> PlayerVisibility:
+    carried, parent_id = _instance_reach(state, assigned_instance_id)
+    visibility = PlayerVisibility(
+        assigned_instance_id=assigned_instance_id,
+        carried=carried,
+        parent_id=parent_id,
+    )
+    visibility.items = {
+        item_id for item_id in state.items if _item_visible(state, visibility, item_id)
+    }
+    visibility.sheets = {
+        sheet_id for sheet_id in state.sheets if _sheet_visible(state, visibility, sheet_id)
+    }
+    visibility.conditions = {
+        application_id
+        for application_id in state.active_conditions
+        if _condition_visible(state, visibility, application_id)
+    }
+    return visibility
+
+
+def _instance_reach(
+    state: State,
+    instance_id: str | None,
+) -> tuple[frozenset[str], str | None]:
+    instance = state.instanced_sheets.get(instance_id) if instance_id is not None else None
+    if instance is None:
+        return frozenset(), None
+    return frozenset(bridge.item_id for bridge in instance.items.values()), instance.parent_id
+
+
+def _item_visible(state: State, visibility: PlayerVisibility, item_id: str) -> bool:
+    item = state.items.get(item_id)
+    if item is None:
+        return False
+    instance_id = visibility.assigned_instance_id
+    return (
+        item_id in visibility.carried
+        or (
+            item.approval_status == "approved"
+            and item.player_catalog_access.allows(instance_id)
+        )
+        or (
+            item.approval_status == "pending"
+            and item.submitted_by_instance_id == instance_id
+        )
+    )
+
+
+def _sheet_visible(state: State, visibility: PlayerVisibility, sheet_id: str) -> bool:
+    # Templates behind `dm_only` are enemy stat blocks; the claimed instance's
+    # own parent stays visible so its character sheet can render.
+    sheet = state.sheets.get(sheet_id)
+    return sheet is not None and (not sheet.dm_only or sheet_id == visibility.parent_id)
+
+
+def _condition_visible(
+    state: State,
+    visibility: PlayerVisibility,
+    application_id: str,
+) -> bool:
+    condition = state.active_conditions.get(application_id)
+    return (
+        condition is not None
+        and condition.visibility != "gm_only"
+        and condition.instance_id == visibility.assigned_instance_id
+    )
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import os
+import random
 from dataclasses import asdict, is_dataclass
 from typing import Annotated, Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from pydantic_core import to_jsonable_python
 
 from backend.features.auth.schema import Authenticate, AuthRole
 from backend.features.chat.schema import (
@@ -96,7 +99,7 @@ from backend.features.sheet_access.schema import (
     GenerateSheetAccessCode,
     GetSheetAccessCodes,
 )
-from backend.features.sheet_runtime.schema import PerformAction
+from backend.features.sheet_runtime.schema import ActionExecuted, PerformAction
 from backend.features.sheet_runtime.schema import (
     AdjustInstancedSheetReactions,
     ResetInstancedSheetReactions,
@@ -107,7 +110,13 @@ from backend.features.contribution_points.schema import (
 )
 from backend.features.pinned_actions.schema import SetPinnedInstanceActions
 from backend.features.state_backup.schema import ExportStateBackup, ImportStateBackup
-from backend.features.state_sync.schema import ResyncState, UndoLastStateChange
+from backend.features.state_sync.schema import (
+    CoalescedStatePatch,
+    RequestBatch,
+    ResyncState,
+    StatePatch,
+    UndoLastStateChange,
+)
 from backend.features.variable_registry.schema import (
     GetActionFormulaAuthoringMetadata,
     GetAugmentationTargetMetadata,
@@ -165,6 +174,7 @@ class StateSnapshotEvent(ProtocolModel):
     response_id: str | None = None
     state: BackendStateSnapshotPayload
     state_version: int
+    state_epoch: str | None = None
     type: Literal["state_snapshot"] = "state_snapshot"
     request_id: str | None = None
 
@@ -177,6 +187,28 @@ class StatePatchEvent(ProtocolModel):
     request_id: str | None = None
 
 
+class PatchVersionEvent(ProtocolModel):
+    state_version: int
+    request_id: str | None = None
+
+
+class CoalescedStatePatchEvent(ProtocolModel):
+    """Consecutive state patches merged for one session's coalescing window.
+
+    Applying `ops` moves a client from `base_version` to `state_version`.
+    `versions` keeps every version boundary, so requests waiting on any of the
+    merged patches can be resolved.
+    """
+
+    response_id: str | None = None
+    ops: list[PatchOperation]
+    base_version: int
+    state_version: int
+    versions: list[PatchVersionEvent]
+    type: Literal["coalesced_state_patch"] = "coalesced_state_patch"
+    request_id: str | None = None
+
+
 class RequestCompletedEvent(ProtocolModel):
     """Terminal response for a valid request that changed no state.
 
@@ -501,6 +533,25 @@ class XpTrackerEvent(ProtocolModel):
     request_id: str | None = None
 
 
+class BatchItemResultEvent(ProtocolModel):
+    index: int
+    request_type: str | None
+    request_id: str | None
+    status: Literal["applied", "rolled_back", "failed", "skipped"]
+    reason: str | None = None
+
+
+class BatchCompletedEvent(ProtocolModel):
+    """Per-request outcome of a batch, sent after its single state patch."""
+
+    response_id: str | None = None
+    applied: bool
+    results: list[BatchItemResultEvent]
+    state_version: int
+    type: Literal["batch_completed"] = "batch_completed"
+    request_id: str | None = None
+
+
 class StateBackupExportedEvent(ProtocolModel):
     response_id: str | None = None
     persisted_state_json: str
@@ -513,6 +564,7 @@ ApplicationRequest = Annotated[
     Authenticate
     | ResyncState
     | UndoLastStateChange
+    | RequestBatch
     | ExportStateBackup
     | ImportStateBackup
     | SendRoll20ChatMessage
@@ -612,6 +664,7 @@ ServerEvent = Annotated[
     | AuthenticateResponseEvent
     | StateSnapshotEvent
     | StatePatchEvent
+    | CoalescedStatePatchEvent
     | RequestCompletedEvent
     | ActionExecutedEvent
     | Roll20BridgeStatusEvent
@@ -622,7 +675,8 @@ ServerEvent = Annotated[
     | SheetAccessCodesEvent
     | SheetAccessClaimedEvent
     | XpTrackerEvent
-    | StateBackupExportedEvent,
+    | StateBackupExportedEvent
+    | BatchCompletedEvent,
     Field(discriminator="type"),
 ]
 
@@ -634,7 +688,39 @@ def parse_application_request(payload: Any) -> BaseModel:
     return _APPLICATION_REQUEST_ADAPTER.validate_python(payload)
 
 
+# Events the backend builds itself from already-validated state. Outside
+# development and test they are serialized directly, and only this fraction of
+# them is also run through the protocol schema to catch drift. Their schemas
+# fill in no defaults and convert no values, so both paths send the same
+# frame. Snapshots are not listed: the state schema fills in defaults and
+# floats, and their frames are cached per audience, so they are always
+# validated.
+TRUSTED_SERVER_EVENT_TYPES: tuple[type, ...] = (
+    StatePatch,
+    CoalescedStatePatch,
+    ActionExecuted,
+)
+SERVER_EVENT_VALIDATION_RATE = float(
+    os.environ.get(
+        "SERVER_EVENT_VALIDATION_RATE",
+        "1"
+        if os.environ.get("APP_ENV", "development").strip().lower()
+        in {"development", "test"}
+        else "0.01",
+    )
+)
+
+
 def normalize_server_event(payload: Any) -> dict[str, Any]:
+    if (
+        type(payload) in TRUSTED_SERVER_EVENT_TYPES
+        and random.random() >= SERVER_EVENT_VALIDATION_RATE
+    ):
+        return to_jsonable_python(payload)
+    return _validate_server_event(payload)
+
+
+def _validate_server_event(payload: Any) -> dict[str, Any]:
     if isinstance(payload, BaseModel):
         raw_payload = payload.model_dump(mode="json")
     elif is_dataclass(payload):
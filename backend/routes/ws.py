@@ -11,10 +11,12 @@ from backend.core.request_registry import (
     MalformedRequestError,
     UnknownRequestTypeError,
     request_registry,
+    validation_error_message,
 )
 from backend.features.auth import service as auth_service
 from backend.features.auth.schema import Authenticate
 from backend.features.chat import service as chat_service
+from backend.features.session.models import WebSocketSession
 from backend.features.session.service import websocket_sessions
 from backend.features.state_sync.service import state_sync_service
 from backend.state.migrations import PersistedStateError
@@ -54,95 +56,82 @@ def _error_payload(reason: str, request_id: str | None = None) -> dict[str, Any]
     }
 
 
-def _validation_error_message(exc: ValidationError) -> str:
-    errors = exc.errors(include_url=False)
-    if not errors:
-        return "Invalid request payload"
-
-    formatted_errors: list[str] = []
-    for error in errors:
-        location = ".".join(str(part) for part in error["loc"])
-        if location:
-            formatted_errors.append(f"{location}: {error['msg']}")
-        else:
-            formatted_errors.append(str(error["msg"]))
-    return "; ".join(formatted_errors)
+async def _connected_session(websocket: WebSocket) -> WebSocketSession | None:
+    """The socket's session, or None once it was disconnected or evicted."""
+    try:
+        return await websocket_sessions.get_session(websocket)
+    except ValueError:
+        return None
 
 
 async def handle_client_payload(
     websocket: WebSocket,
     payload: Any,
 ) -> None:
+    # Every reply goes through the session's outbox so it is ordered with the
+    # state patches queued there. A socket without a session has been evicted
+    # or disconnected and gets nothing more.
+    session = await _connected_session(websocket)
+    if session is None:
+        return
     normalized_payload, request_id = _assign_request_id(payload)
 
     if not isinstance(normalized_payload, dict):
-        await websocket.send_json(
-            normalize_server_event(
-                _error_payload(
-                    reason="Invalid Request: payload must be an object",
-                    request_id=request_id,
-                )
-            )
+        await websocket_sessions.send(
+            session,
+            _error_payload(
+                reason="Invalid Request: payload must be an object",
+                request_id=request_id,
+            ),
         )
         return
 
     request_type = normalized_payload.get("type")
     if not isinstance(request_type, str) or not request_type:
-        await websocket.send_json(
-            normalize_server_event(
-                _error_payload(
-                    reason="type: Field required",
-                    request_id=request_id,
-                )
-            )
+        await websocket_sessions.send(
+            session,
+            _error_payload(
+                reason="type: Field required",
+                request_id=request_id,
+            ),
         )
         return
 
     try:
-        try:
-            session = await websocket_sessions.get_session(websocket)
-        except ValueError:
-            session = await websocket_sessions.connect(
-                websocket,
-                role="unauthenticated",
-                accept=False,
-            )
         await request_registry.dispatch(session, normalized_payload)
         no_op = state_sync_service.consume_no_op_request(request_id)
         if no_op and request_registry.answers_with_state_patch_only(request_type):
             # The request was valid but changed nothing, so the state_patch that
             # would normally close it out on the client is never broadcast.
-            await websocket.send_json(
-                normalize_server_event(RequestCompletedEvent(request_id=request_id))
+            await websocket_sessions.send(
+                session,
+                RequestCompletedEvent(request_id=request_id),
             )
     except ValidationError as exc:
-        await websocket.send_json(
-            normalize_server_event(
-                _error_payload(
-                    reason=_validation_error_message(exc),
-                    request_id=request_id,
-                )
-            )
+        await websocket_sessions.send(
+            session,
+            _error_payload(
+                reason=validation_error_message(exc),
+                request_id=request_id,
+            ),
         )
         return
     except (MalformedRequestError, UnknownRequestTypeError) as exc:
-        await websocket.send_json(
-            normalize_server_event(
-                _error_payload(
-                    reason=str(exc),
-                    request_id=request_id,
-                )
-            )
+        await websocket_sessions.send(
+            session,
+            _error_payload(
+                reason=str(exc),
+                request_id=request_id,
+            ),
         )
         return
     except (PermissionError, PersistedStateError, ValueError) as exc:
-        await websocket.send_json(
-            normalize_server_event(
-                _error_payload(
-                    reason=str(exc),
-                    request_id=request_id,
-                )
-            )
+        await websocket_sessions.send(
+            session,
+            _error_payload(
+                reason=str(exc),
+                request_id=request_id,
+            ),
         )
     except WebSocketDisconnect:
         raise
@@ -155,13 +144,12 @@ async def handle_client_payload(
             request_type,
             request_id,
         )
-        await websocket.send_json(
-            normalize_server_event(
-                _error_payload(
-                    reason="The server failed to process that request.",
-                    request_id=request_id,
-                )
-            )
+        await websocket_sessions.send(
+            session,
+            _error_payload(
+                reason="The server failed to process that request.",
+                request_id=request_id,
+            ),
         )
 
 
@@ -195,27 +183,21 @@ async def authenticate_application_websocket(
     websocket: WebSocket,
     payload: Any,
 ):
-    try:
-        session = await websocket_sessions.get_session(websocket)
-    except ValueError:
-        session = await websocket_sessions.connect(
-            websocket,
-            role="unauthenticated",
-            accept=False,
-        )
+    session = await _connected_session(websocket)
+    if session is None:
+        return None
 
     normalized_payload, request_id = _assign_request_id(payload)
 
     try:
         request = Authenticate.model_validate(normalized_payload)
     except ValidationError as exc:
-        await websocket.send_json(
-            normalize_server_event(
-                _error_payload(
-                    reason=_validation_error_message(exc),
-                    request_id=request_id,
-                )
-            )
+        await websocket_sessions.send(
+            session,
+            _error_payload(
+                reason=validation_error_message(exc),
+                request_id=request_id,
+            ),
         )
         return None
 
@@ -233,7 +215,7 @@ async def authenticate_service_websocket(
     except ValidationError as exc:
         await _reject_connection(
             websocket,
-            reason=_validation_error_message(exc),
+            reason=validation_error_message(exc),
             request_id=request_id,
         )
         return None
@@ -269,9 +251,15 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
             try:
                 payload = await _receive_json_payload(websocket)
             except ValueError as exc:
-                await websocket.send_json(
-                    normalize_server_event(_error_payload(reason=str(exc)))
-                )
+                payload = None
+                reason = str(exc)
+            # The session service closes an evicted socket itself; anything
+            # the client still had in flight is dropped.
+            session = await _connected_session(websocket)
+            if session is None:
+                break
+            if payload is None:
+                await websocket_sessions.send(session, _error_payload(reason=reason))
                 continue
 
             await handle_client_payload(websocket, payload)
@@ -324,7 +312,7 @@ async def chat_bridge_endpoint(websocket: WebSocket) -> None:
             except ValidationError as exc:
                 logger.warning(
                     "Ignoring invalid Roll20 bridge payload: %s",
-                    _validation_error_message(exc),
+                    validation_error_message(exc),
                 )
                 continue
             except ValueError as exc:
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+from collections.abc import Collection, Iterable, Sequence
 from copy import deepcopy
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, Literal
 
 from backend.features.formula_runtime.service import evaluate_numeric_formula
 from backend.state.models.damage import PHYSICAL_DAMAGE_TYPES
-from backend.state.models.formula import Formula, FormulaAliases
+from backend.state.models.formula import FORMULA_ALIAS_PATTERN, Formula, FormulaAliases
 
 if TYPE_CHECKING:
     from backend.state.models.sheet import Sheet
@@ -480,13 +481,27 @@ class _LazyAttributeValues(dict[str, EvaluatedAttributeValue]):
         return self._resolver(attribute_id)
 
 
-def evaluate_all_subject_attributes(subject: Any) -> None:
+def evaluate_all_subject_attributes(
+    subject: Any,
+    attribute_ids: Collection[str] | None = None,
+) -> None:
+    """Evaluate the subject's Attribute bridges in place.
+
+    With `attribute_ids`, only those bridges are evaluated; every other bridge
+    must already hold its current result and is read as it stands.
+    """
     evaluated: dict[str, EvaluatedAttributeValue] = {}
     visiting: list[str] = []
 
     def evaluate_bridge(attribute_id: str) -> EvaluatedAttributeValue:
         if attribute_id in evaluated:
             return evaluated[attribute_id]
+        if attribute_ids is not None and attribute_id not in attribute_ids:
+            current = subject.attributes.get(attribute_id)
+            if current is not None:
+                if current.evaluation_error is not None:
+                    raise ValueError(current.evaluation_error)
+                return current.evaluated_value
         if attribute_id in visiting:
             cycle = " -> ".join([*visiting[visiting.index(attribute_id) :], attribute_id])
             raise ValueError(f"Attribute formula cycle detected: {cycle}.")
@@ -523,6 +538,8 @@ def evaluate_all_subject_attributes(subject: Any) -> None:
             visiting.pop()
 
     for attribute_id, bridge in subject.attributes.items():
+        if attribute_ids is not None and attribute_id not in attribute_ids:
+            continue
         try:
             evaluate_bridge(attribute_id)
         except (AttributeError, KeyError, SyntaxError, TypeError, ValueError) as exc:
@@ -590,8 +607,187 @@ def validate_sheet_formula_dependencies(sheet: "Sheet") -> None:
         visit(node)
 
 
-def evaluate_all_sheet_attributes(sheet: "Sheet") -> None:
-    evaluate_all_subject_attributes(sheet)
+FormulaNode = tuple[str, ...]
+_RESOURCE_FORMULA_FIELDS = ("max_health", "max_mana")
+
+
+@dataclass
+class FormulaDependencyGraph:
+    """What each formula of one sheet or instance reads, kept between changes.
+
+    Nodes are paths relative to the subject: every stat, every Attribute, and
+    the resource maxima. `reads` holds each path a node's formula may resolve,
+    including the stat paths evaluation infers for legacy aliases and the stat
+    bonus a nested stat adds. `dependents` maps a node to the nodes that read
+    it. Unlike `validate_sheet_formula_dependencies`, which checks declared
+    aliases only, the graph over-approximates so that a node outside `dirty`
+    is guaranteed to evaluate as it did before.
+    """
+
+    reads: dict[FormulaNode, frozenset[FormulaNode]]
+    dependents: dict[FormulaNode, set[FormulaNode]]
+    # The formula object each node's reads were taken from, so a replaced
+    # formula is noticed even when no caller reports the write.
+    formulas: dict[FormulaNode, Formula | None]
+
+    @classmethod
+    def build(cls, subject: Any) -> FormulaDependencyGraph:
+        formulas = {node: _node_formula(subject, node) for node in _formula_nodes(subject)}
+        reads = {node: _formula_reads(subject, node) for node in formulas}
+        dependents: dict[FormulaNode, set[FormulaNode]] = {node: set() for node in reads}
+        for node, paths in reads.items():
+            for path in paths:
+                for target in _overlapping_nodes(path, reads):
+                    dependents[target].add(node)
+        return cls(reads=reads, dependents=dependents, formulas=formulas)
+
+    def refreshed(
+        self,
+        subject: Any,
+        changed: Iterable[Sequence[str]] = (),
+    ) -> FormulaDependencyGraph:
+        """The graph for `subject` as it is now, rebuilt only if a read moved.
+
+        `changed` lists paths written since the graph was built; formulas
+        edited in place are only noticed through it.
+        """
+        nodes = _formula_nodes(subject)
+        if len(nodes) != len(self.formulas) or any(
+            node not in self.formulas for node in nodes
+        ):
+            return self.build(subject)
+        stale = {
+            node
+            for node, formula in self.formulas.items()
+            if _node_formula(subject, node) is not formula
+        }
+        for path in changed:
+            path = tuple(path)
+            stale.update(_overlapping_nodes(path, self.reads))
+            stale.update(
+                node
+                for node, paths in self.reads.items()
+                if any(_paths_overlap(path, read) for read in paths)
+            )
+        if any(_formula_reads(subject, node) != self.reads[node] for node in stale):
+            return self.build(subject)
+        for node in stale:
+            self.formulas[node] = _node_formula(subject, node)
+        return self
+
+    def dirty(self, changed: Iterable[Sequence[str]]) -> set[FormulaNode]:
+        """Nodes whose value may differ after `changed` paths were written."""
+        pending: list[FormulaNode] = []
+        for path in changed:
+            path = tuple(path)
+            pending.extend(_overlapping_nodes(path, self.reads))
+            pending.extend(
+                node
+                for node, paths in self.reads.items()
+                if any(_paths_overlap(path, read) for read in paths)
+            )
+        dirty: set[FormulaNode] = set()
+        while pending:
+            node = pending.pop()
+            if node not in dirty:
+                dirty.add(node)
+                pending.extend(self.dependents[node])
+        return dirty
+
+
+def _formula_nodes(subject: Any) -> list[FormulaNode]:
+    nodes: list[FormulaNode] = []
+    if getattr(subject, "stats", None) is not None:
+        nodes.extend(("stats", stat_name) for stat_name in vars(subject.stats))
+    nodes.extend(("attributes", attribute_id) for attribute_id in subject.attributes)
+    nodes.extend(
+        (field_name,)
+        for field_name in _RESOURCE_FORMULA_FIELDS
+        if hasattr(subject, field_name)
+    )
+    return nodes
+
+
+def _node_formula(subject: Any, node: FormulaNode) -> Formula | None:
+    if node[0] == "stats":
+        value = getattr(subject.stats, node[1], None)
+    elif node[0] == "attributes":
+        bridge = subject.attributes.get(node[1])
+        value = bridge.value.formula if bridge is not None else None
+    else:
+        value = getattr(subject, node[0], None)
+    return value if isinstance(value, Formula) else None
+
+
+def _formula_reads(subject: Any, node: FormulaNode) -> frozenset[FormulaNode]:
+    formula = _node_formula(subject, node)
+    if formula is None:
+        return frozenset()
+    stats = getattr(subject, "stats", None)
+    reads: set[FormulaNode] = set()
+    if node[0] == "stats":
+        reads.add(("stat_bonuses", node[1]))
+    pending = [(formula, node[0] != "attributes")]
+    seen: set[int] = set()
+    while pending:
+        formula, infers = pending.pop()
+        if id(formula) in seen:
+            continue
+        seen.add(id(formula))
+        paths = [tuple(alias.path) for alias in formula.aliases or []]
+        if infers and stats is not None:
+            # Stats are also bound as nested formulas, and maxima evaluated,
+            # with aliases inferred from the text.
+            paths.extend(
+                ("stats", name)
+                for name in FORMULA_ALIAS_PATTERN.findall(formula.text)
+                if hasattr(stats, name)
+            )
+        for path in paths:
+            reads.add(path)
+            if len(path) == 1 and stats is not None and hasattr(stats, path[0]):
+                reads.add(("stats", path[0]))
+            elif path[:1] not in {("stats",), ("attributes",)}:
+                # A formula outside the graph's nodes is expanded in place, so
+                # its own reads count as this node's.
+                nested = _resolve_subject_path(subject, path)
+                if isinstance(nested, Formula):
+                    pending.append((nested, True))
+    return frozenset(reads)
+
+
+def _resolve_subject_path(subject: Any, path: FormulaNode) -> Any:
+    current = subject
+    for segment in path:
+        if isinstance(current, dict):
+            current = current.get(segment)
+        else:
+            current = getattr(current, segment, None)
+        if current is None:
+            return None
+    return current
+
+
+def _paths_overlap(left: Sequence[str], right: Sequence[str]) -> bool:
+    length = min(len(left), len(right))
+    return tuple(left[:length]) == tuple(right[:length])
+
+
+def _overlapping_nodes(
+    path: FormulaNode,
+    nodes: Collection[FormulaNode],
+) -> set[FormulaNode]:
+    for length in (1, 2):
+        if len(path) >= length and path[:length] in nodes:
+            return {path[:length]}
+    return {node for node in nodes if node[: len(path)] == path}
+
+
+def evaluate_all_sheet_attributes(
+    sheet: "Sheet",
+    attribute_ids: Collection[str] | None = None,
+) -> None:
+    evaluate_all_subject_attributes(sheet, attribute_ids)
 
 
 def evaluate_sheet_attribute_bridge(sheet: "Sheet", bridge: AttributeBridge) -> None:
@@ -606,7 +802,10 @@ def evaluate_sheet_attribute_bridge(sheet: "Sheet", bridge: AttributeBridge) ->
             sheet.attributes[bridge.attribute_id] = current
 
 
-def synchronize_required_sheet_attributes(sheet: "Sheet") -> None:
+def synchronize_required_sheet_attributes(
+    sheet: "Sheet",
+    attribute_ids: Collection[str] | None = None,
+) -> None:
     definitions = {
         **required_attribute_definitions(),
         **sheet_attribute_definitions(),
@@ -622,14 +821,20 @@ def synchronize_required_sheet_attributes(sheet: "Sheet") -> None:
                 value=deepcopy(definition.default_value),
             )
             sheet.attributes[attribute_id] = bridge
+            # Anything may read the new bridge, so evaluate every one.
+            attribute_ids = None
         bridge.attribute_id = attribute_id
         bridge.relationship_id = f"required_attribute_{attribute_id}"
-    evaluate_all_sheet_attributes(sheet)
+    evaluate_all_sheet_attributes(sheet, attribute_ids)
 
 
-def synchronize_all_sheet_attributes(sheet: "Sheet") -> None:
-    synchronize_required_sheet_attributes(sheet)
-    evaluate_all_sheet_attributes(sheet)
+def synchronize_all_sheet_attributes(
+    sheet: "Sheet",
+    attribute_ids: Collection[str] | None = None,
+) -> None:
+    """Attach required Attributes and evaluate them, or only `attribute_ids`."""
+    synchronize_required_sheet_attributes(sheet, attribute_ids)
+    evaluate_all_sheet_attributes(sheet, attribute_ids)
 
 
 def synchronize_required_item_attributes(
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from collections.abc import Iterable
 from dataclasses import dataclass, field
+from functools import lru_cache
 import re
 from typing import Any, List, Optional, TYPE_CHECKING
 
@@ -11,7 +12,10 @@ if TYPE_CHECKING:
     from backend.state.models.sheet import InstancedSheet, Sheet
 
 
-_FORMULA_ALIAS_PATTERN = re.compile(r"@([A-Za-z_][A-Za-z0-9_]*)")
+FORMULA_ALIAS_PATTERN = re.compile(r"@([A-Za-z_][A-Za-z0-9_]*)")
+# Distinct normalized formulas kept. Entries are keyed by content, so an edited
+# formula normalizes afresh and the old entry ages out.
+REFERENCED_FORMULA_CACHE_SIZE = 4096
 
 
 def normalize_formula_tags(tags: Iterable[str] | None) -> list[str]:
@@ -94,59 +98,72 @@ class Formula:
         *,
         seen_formula_ids: set[int] | None = None,
     ) -> str:
+        return render_bound_value(
+            self._bind_variable(
+                root,
+                var_name,
+                var_path,
+                seen_formula_ids=seen_formula_ids,
+            )
+        )
+
+    def _bind_variable(
+        self,
+        root: Sheet | InstancedSheet,
+        var_name: str,
+        var_path: List[str],
+        *,
+        seen_formula_ids: set[int] | None = None,
+        memo: BindingMemo | None = None,
+    ) -> BoundValue:
+        if memo is None:
+            return self._bind_path_value(
+                root, var_name, var_path, seen_formula_ids=seen_formula_ids
+            )
+        key = tuple(var_path)
+        value = memo.paths.get(key)
+        if value is None:
+            value = self._bind_path_value(
+                root,
+                var_name,
+                var_path,
+                seen_formula_ids=seen_formula_ids,
+                memo=memo,
+            )
+            memo.paths[key] = value
+        return value
+
+    def _bind_path_value(
+        self,
+        root: Sheet | InstancedSheet,
+        var_name: str,
+        var_path: List[str],
+        *,
+        seen_formula_ids: set[int] | None = None,
+        memo: BindingMemo | None = None,
+    ) -> BoundValue:
         current_var = self._resolve_path_value(root, var_name, var_path)
 
         if isinstance(current_var, Formula):
-            nested_formula = current_var
-            if getattr(root, "stats", None) is not None:
-                aliases = current_var.aliases
-                if aliases is None:
-                    aliases = [
-                        FormulaAliases(name=name, path=["stats", name])
-                        for name in sorted(
-                            set(re.findall(r"@([A-Za-z_][A-Za-z0-9_]*)", current_var.text))
-                        )
-                        if hasattr(root.stats, name)
-                    ]
-                normalized_aliases = [
-                        FormulaAliases(
-                            name=alias.name,
-                            path=(
-                                ["stats", alias.path[0]]
-                                if len(alias.path) == 1 and hasattr(root.stats, alias.path[0])
-                                else list(alias.path)
-                            ),
-                        )
-                        for alias in aliases
-                    ]
-                if aliases is not current_var.aliases or any(
-                    normalized.path != original.path
-                    for normalized, original in zip(
-                        normalized_aliases, current_var.aliases or [], strict=False
-                    )
-                ):
-                    nested_formula = Formula(
-                        aliases=normalized_aliases,
-                        text=current_var.text,
-                        tags=list(current_var.tags),
-                    )
-            expanded = nested_formula.expand_formula(
+            nested_formula = referenced_formula(root, current_var)
+            bound = nested_formula.bind(
                 root,
                 seen_formula_ids=seen_formula_ids,
+                memo=memo,
             )
             if len(var_path) == 2 and var_path[0] == "stats":
                 bonuses = getattr(root, "stat_bonuses", {})
                 bonus = bonuses.get(var_path[1], 0)
                 if bonus:
-                    return f"({expanded}) + ({bonus})"
-            return expanded
+                    return BoundFormula(text=bound.text, aliases=bound.aliases, bonus=bonus)
+            return bound
         elif isinstance(current_var, int | float):
-            return str(current_var)
+            return current_var
         elif isinstance(current_var, ProficiencyBridge):
             # TODO: add this proficiency to the the list of proficiencies that need to be upped at the end of this transaction
             prof_calc = current_var.growth_rate * current_var.use_count
             prof = min(prof_calc, 1)
-            return str(prof)
+            return prof
         else:
             raise ValueError(
                 "Given invalid value which maps to type "
@@ -154,38 +171,152 @@ class Formula:
                 + f" at path {var_path}"
             )
 
-    def expand_formula(
+    def bind(
         self,
         root: Sheet | InstancedSheet,
         *,
         seen_formula_ids: set[int] | None = None,
-    ) -> str:
+        memo: BindingMemo | None = None,
+    ) -> BoundFormula:
+        """Resolve every alias against `root` without rendering any text.
+
+        With a `memo`, formulas bound against the same unchanged root share
+        each nested formula's binding instead of repeating it.
+        """
         seen_formula_ids = set() if seen_formula_ids is None else set(seen_formula_ids)
         formula_id = id(self)
         if formula_id in seen_formula_ids:
             raise ValueError("Formula expansion cycle detected.")
+        if memo is not None:
+            cached = memo.formulas.get(formula_id)
+            if cached is not None:
+                return cached[1]
         seen_formula_ids.add(formula_id)
 
-        expanded_aliases: dict[str, str] = {}
+        bound_aliases: dict[str, BoundValue] = {}
         for alias in self.aliases or []:
-            value = (
-                "("
-                + self.expand_variable(
-                    root,
-                    alias.name,
-                    alias.path,
-                    seen_formula_ids=seen_formula_ids,
-                )
-                + ")"
+            value = self._bind_variable(
+                root,
+                alias.name,
+                alias.path,
+                seen_formula_ids=seen_formula_ids,
+                memo=memo,
             )
             # Preserve the historical first-alias-wins behavior for duplicate names,
             # while still resolving every alias so invalid unused paths are rejected.
-            expanded_aliases.setdefault(alias.name, value)
+            bound_aliases.setdefault(alias.name, value)
+        bound = BoundFormula(text=self.text, aliases=bound_aliases)
+        if memo is not None:
+            memo.formulas[formula_id] = (self, bound)
+        return bound
 
-        return _FORMULA_ALIAS_PATTERN.sub(
-            lambda match: expanded_aliases.get(match.group(1), match.group(0)),
+    def expand_formula(
+        self,
+        root: Sheet | InstancedSheet,
+        *,
+        seen_formula_ids: set[int] | None = None,
+    ) -> str:
+        return self.bind(root, seen_formula_ids=seen_formula_ids).render()
+
+
+@dataclass(frozen=True)
+class BoundFormula:
+    """Formula text with each alias resolved to a number or a nested formula.
+
+    `render` produces the expanded text; the formula runtime evaluates the same
+    structure directly. `bonus` is a stat bonus added to a nested stat formula.
+    """
+
+    text: str
+    aliases: dict[str, BoundValue]
+    bonus: Any = 0
+
+    def render(self) -> str:
+        expanded = FORMULA_ALIAS_PATTERN.sub(
+            lambda match: (
+                "(" + render_bound_value(self.aliases[match.group(1)]) + ")"
+                if match.group(1) in self.aliases
+                else match.group(0)
+            ),
             self.text,
         )
+        if self.bonus:
+            return f"({expanded}) + ({self.bonus})"
+        return expanded
+
+
+BoundValue = BoundFormula | int | float
+
+
+@dataclass
+class BindingMemo:
+    """Bindings shared by formulas bound against one unchanged root.
+
+    Only successful bindings are kept. A formula or path that reaches a cycle
+    never binds, so a memo hit can skip the cycle check. Formulas are keyed by
+    `id` and kept alive alongside their binding so the id is not reused.
+    """
+
+    paths: dict[tuple[str, ...], BoundValue] = field(default_factory=dict)
+    formulas: dict[int, tuple[Formula, BoundFormula]] = field(default_factory=dict)
+
+
+def referenced_formula(root: Sheet | InstancedSheet, formula: Formula) -> Formula:
+    """The formula a path reference to `formula` binds against `root`.
+
+    On a root with stats, missing aliases are inferred from stat names and
+    one-segment alias paths naming a stat are read under `stats`. The formula
+    itself is returned when nothing changes, which keeps cycle detection intact.
+
+    Normalized formulas are cached by the formula's content and by which of
+    its names the stats define, so an edited formula or a different stats
+    shape normalizes afresh. The cached formula is shared and must not be
+    changed.
+    """
+    stats = getattr(root, "stats", None)
+    if stats is None:
+        return formula
+    if formula.aliases is None:
+        aliases = tuple(
+            (name, ("stats", name))
+            for name in _alias_names(formula.text)
+            if hasattr(stats, name)
+        )
+        return _formula_with_aliases(formula.text, aliases, tuple(formula.tags))
+    moved = [
+        len(alias.path) == 1 and hasattr(stats, alias.path[0]) for alias in formula.aliases
+    ]
+    if not any(moved):
+        return formula
+    aliases = tuple(
+        (alias.name, ("stats", alias.path[0]) if is_moved else tuple(alias.path))
+        for alias, is_moved in zip(formula.aliases, moved, strict=True)
+    )
+    return _formula_with_aliases(formula.text, aliases, tuple(formula.tags))
+
+
+@lru_cache(maxsize=REFERENCED_FORMULA_CACHE_SIZE)
+def _alias_names(text: str) -> tuple[str, ...]:
+    return tuple(sorted(set(FORMULA_ALIAS_PATTERN.findall(text))))
+
+
+@lru_cache(maxsize=REFERENCED_FORMULA_CACHE_SIZE)
+def _formula_with_aliases(
+    text: str,
+    aliases: tuple[tuple[str, tuple[str, ...]], ...],
+    tags: tuple[str, ...],
+) -> Formula:
+    return Formula(
+        aliases=[FormulaAliases(name=name, path=list(path)) for name, path in aliases],
+        text=text,
+        tags=list(tags),
+    )
+
+
+def render_bound_value(value: BoundValue) -> str:
+    if isinstance(value, BoundFormula):
+        return value.render()
+    return str(value)
 
 
 @dataclass
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
 import os
+import queue
 import shutil
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field, fields, is_dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
+from uuid import uuid4
 
+from backend.core.state_path import StatePath
 from backend.state.models.action_history import prune_action_history
 from backend.state.migrations import (
     CURRENT_STATE_SCHEMA_VERSION,
@@ -22,6 +32,14 @@ from backend.state.default_actions import seeded_global_actions
 logger = logging.getLogger(__name__)
 STATE_PATH = Path(__file__).resolve().parents[2] / "state_dumpy.json"
 DEFAULT_STATE = State()
+# How long the checkpoint writer holds a journal batch open for more commits
+# after the first one arrives. Zero still groups every commit queued while the
+# previous batch was being flushed; a small window trades commit latency for
+# fewer fsyncs under bursty load.
+JOURNAL_MAX_BATCH_LATENCY_SECONDS = (
+    float(os.environ.get("STATE_JOURNAL_MAX_BATCH_LATENCY_MS", "0")) / 1000
+)
+_MAX_WRITE_BATCH = 512
 
 
 def _fresh_state() -> State:
@@ -40,15 +58,162 @@ def _temporary_path(path: Path) -> Path:
     return path.with_name(f"{path.name}.tmp")
 
 
+def _journal_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.journal")
+
+
+def _shard_directory(path: Path) -> Path:
+    return path.with_name(f"{path.name}.shards")
+
+
+def _shard_entry(path: Path, root: str, checkpoint_id: str) -> dict[str, str]:
+    return {"file": f"{_shard_directory(path).name}/{root}.{checkpoint_id}.json"}
+
+
 def _decode_checkpoint(document: Any) -> State:
     migration = migrate_persisted_state(document)
     return State.from_dict(migration.state)
 
 
-def _load_checkpoint(path: Path) -> State | None:
+def _read_document(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _manifest_checksum(document: dict[str, Any]) -> str:
+    body = {key: value for key, value in document.items() if key != "checksum"}
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _shard_digest(data: bytes) -> dict[str, Any]:
+    return {"bytes": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+def _read_shard_bytes(directory: Path, entry: dict[str, Any]) -> bytes:
+    """Read a shard file, rejecting one that does not match its digest."""
+    data = (directory / entry["file"]).read_bytes()
+    if "sha256" in entry and _shard_digest(data) != {
+        "bytes": entry.get("bytes"),
+        "sha256": entry["sha256"],
+    }:
+        raise ValueError(f"State shard {entry['file']} does not match its digest.")
+    return data
+
+
+def _read_manifest(path: Path) -> Any:
+    document = _read_document(path)
+    if (
+        isinstance(document, dict)
+        and "checksum" in document
+        and document["checksum"] != _manifest_checksum(document)
+    ):
+        raise ValueError(f"State checkpoint {path} does not match its checksum.")
+    return document
+
+
+def _manifest_shards(path: Path | None, *, schema_version: Any) -> dict[str, Any]:
+    if path is None:
+        return {}
     try:
-        with path.open("r", encoding="utf-8") as file:
-            return _decode_checkpoint(json.load(file))
+        document = _read_manifest(path)
+    except (OSError, ValueError):
+        return {}
+    if (
+        not isinstance(document, dict)
+        or document.get("schema_version") != schema_version
+        or not isinstance(document.get("shards"), dict)
+    ):
+        return {}
+    return document["shards"]
+
+
+def _read_checkpoint_document(
+    path: Path,
+    *,
+    shard_fallback: Path | None = None,
+) -> Any:
+    """Read a checkpoint as one envelope, assembling a sharded manifest.
+
+    Legacy single-file checkpoints are returned as they are. A shard that
+    cannot be read, or does not match its digest, is taken from the
+    ``shard_fallback`` manifest when that manifest has the same schema and a
+    different file for the root.
+    """
+    document = _read_manifest(path)
+    if not isinstance(document, dict) or "shards" not in document:
+        return document
+
+    fallback_shards: dict[str, Any] | None = None
+    state: dict[str, Any] = {}
+    for root, entry in document["shards"].items():
+        try:
+            state[root] = json.loads(_read_shard_bytes(path.parent, entry))
+        except (OSError, ValueError) as exc:
+            if fallback_shards is None:
+                fallback_shards = _manifest_shards(
+                    shard_fallback,
+                    schema_version=document.get("schema_version"),
+                )
+            fallback = fallback_shards.get(root)
+            if shard_fallback is None or fallback is None or fallback == entry:
+                raise
+            logger.warning(
+                "State shard %s is unreadable (%s); using %s from %s.",
+                entry["file"],
+                exc,
+                fallback["file"],
+                shard_fallback,
+            )
+            state[root] = json.loads(_read_shard_bytes(shard_fallback.parent, fallback))
+
+    envelope = {
+        key: value
+        for key, value in document.items()
+        if key not in {"checksum", "shards"}
+    }
+    envelope["state"] = state
+    return envelope
+
+
+def _load_checkpoint(
+    path: Path,
+    *,
+    journal_path: Path | None = None,
+    shard_fallback: Path | None = None,
+) -> State | None:
+    """Load one checkpoint, replaying the journal tail written on top of it."""
+    loaded = _load_versioned_checkpoint(
+        path,
+        journal_path=journal_path,
+        shard_fallback=shard_fallback,
+    )
+    return loaded[0] if loaded is not None else None
+
+
+def _load_versioned_checkpoint(
+    path: Path,
+    *,
+    journal_path: Path | None = None,
+    shard_fallback: Path | None = None,
+) -> tuple[State, int] | None:
+    """Load one checkpoint and the state version of the last commit it holds.
+
+    Checkpoints written before versions were recorded load as version ``0``.
+    """
+
+    def read() -> Any:
+        return _read_checkpoint_document(path, shard_fallback=shard_fallback)
+
+    try:
+        document = read()
+        if journal_path is not None:
+            document = _replay_journal(read, document, journal_path)
+        state_version = document.get("state_version") if isinstance(document, dict) else None
+        return (
+            _decode_checkpoint(document),
+            state_version if isinstance(state_version, int) else 0,
+        )
     except FileNotFoundError:
         return None
     except (
@@ -64,14 +229,220 @@ def _load_checkpoint(path: Path) -> State | None:
         return None
 
 
-def _checkpoint_document(state: State) -> dict[str, Any]:
-    return {
+def _load_persisted_state(path: Path) -> State | None:
+    """Recover the state last committed to ``path`` and its journal."""
+    return _load_checkpoint(
+        path,
+        journal_path=_journal_path(path),
+        shard_fallback=_backup_path(path),
+    )
+
+
+def _checkpoint_header(
+    *,
+    journal_id: str | None = None,
+    state_version: int | None = None,
+) -> dict[str, Any]:
+    header: dict[str, Any] = {
         "schema_version": CURRENT_STATE_SCHEMA_VERSION,
         "saved_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if journal_id is not None:
+        header["journal_id"] = journal_id
+    if state_version is not None:
+        header["state_version"] = state_version
+    return header
+
+
+def _checkpoint_document(state: State) -> dict[str, Any]:
+    return {
+        **_checkpoint_header(),
         "state": state.to_dict(include_private=True),
     }
 
 
+@dataclass
+class _RootValue:
+    value: Any
+
+
+def _root_document(state: State, root: str) -> Any:
+    """Serialize one root exactly as ``State.to_dict`` would."""
+    return asdict(_RootValue(getattr(state, root)))["value"]
+
+
+def _journal_root(op: Any) -> str:
+    path = op["path"] if isinstance(op, dict) else op.path
+    if isinstance(path, StatePath) and path.root is not None:
+        return path.root
+    return _journal_segments(path)[0]
+
+
+def _journal_value(value: Any) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    raise TypeError(f"Cannot journal {value.__class__.__name__} values.")
+
+
+def _append_journal(path: Path, lines: list[str]) -> None:
+    """Append records and flush them to disk with a single fsync.
+
+    A failed write is truncated back off the file so the next record never
+    lands behind a torn line.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as file:
+        offset = file.tell()
+        try:
+            file.writelines(lines)
+            file.flush()
+            os.fsync(file.fileno())
+        except OSError:
+            try:
+                file.truncate(offset)
+            except OSError:
+                pass
+            raise
+
+
+def _read_journal(path: Path, journal_id: str) -> list[dict[str, Any]]:
+    """Return the contiguous records written on top of checkpoint ``journal_id``.
+
+    Records from another checkpoint generation are left over from a compaction
+    or replacement that was interrupted before the journal was removed, so they
+    are already part of some checkpoint and are skipped. Reading stops at the
+    first line that does not decode; a crash mid-append leaves exactly one such
+    torn line at the end.
+    """
+    try:
+        lines = path.read_bytes().splitlines()
+    except FileNotFoundError:
+        return []
+
+    records: list[dict[str, Any]] = []
+    for line_number, line in enumerate(lines, start=1):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            if line_number != len(lines):
+                logger.warning(
+                    "State journal %s is unreadable at line %s; ignoring the rest.",
+                    path,
+                    line_number,
+                )
+            break
+        if not isinstance(record, dict) or record.get("journal_id") != journal_id:
+            continue
+        if record.get("sequence") != len(records) + 1:
+            logger.warning(
+                "State journal %s skips to sequence %s; ignoring the rest.",
+                path,
+                record.get("sequence"),
+            )
+            break
+        records.append(record)
+    return records
+
+
+def _journal_segments(path: str) -> list[str]:
+    if not path.startswith("/") or path == "/":
+        raise ValueError(f"Journal path must address a state value: {path}")
+    return [
+        segment.replace("~1", "/").replace("~0", "~")
+        for segment in path[1:].split("/")
+    ]
+
+
+def _apply_journal_op(state: dict[str, Any], op: dict[str, Any]) -> None:
+    segments = _journal_segments(op["path"])
+    container: Any = state
+    for segment in segments[:-1]:
+        container = container[int(segment)] if isinstance(container, list) else container[segment]
+    leaf = segments[-1]
+    kind = op["op"]
+    value = op.get("value")
+
+    if isinstance(container, list):
+        if kind == "add":
+            if leaf == "-":
+                container.append(value)
+            else:
+                container.insert(int(leaf), value)
+        elif kind == "set":
+            container[int(leaf)] = value
+        elif kind == "remove":
+            container.pop(int(leaf))
+        elif kind == "inc":
+            container[int(leaf)] += value
+        else:
+            raise ValueError(f"Unsupported journal operation {kind}.")
+        return
+
+    if not isinstance(container, dict):
+        raise TypeError(f"Cannot replay journal path {op['path']}.")
+    if kind in {"add", "set"}:
+        container[leaf] = value
+    elif kind == "remove":
+        del container[leaf]
+    elif kind == "inc":
+        container[leaf] += value
+    else:
+        raise ValueError(f"Unsupported journal operation {kind}.")
+
+
+def _apply_journal_records(document: Any, records: Iterable[dict[str, Any]]) -> None:
+    for record in records:
+        for op in record["ops"]:
+            _apply_journal_op(document["state"], op)
+        if isinstance(record.get("state_version"), int):
+            document["state_version"] = record["state_version"]
+
+
+def _replay_journal(
+    read: Callable[[], Any],
+    document: Any,
+    journal_path: Path,
+) -> Any:
+    """Apply journal records committed after the checkpoint document.
+
+    Records replay onto the raw document before migration. They were written
+    by the same schema as the checkpoint they follow, and a record that no
+    longer applies keeps the records before it: the checkpoint is re-read and
+    only those are replayed, so no record is ever half applied.
+    """
+    if not isinstance(document, dict) or not isinstance(document.get("journal_id"), str):
+        return document
+    records = _read_journal(journal_path, document["journal_id"])
+    for index, record in enumerate(records):
+        if record.get("schema_version") != document.get("schema_version"):
+            logger.warning(
+                "State journal %s record %s has schema version %s; ignoring the rest.",
+                journal_path,
+                record.get("sequence"),
+                record.get("schema_version"),
+            )
+            records = records[:index]
+            break
+    try:
+        _apply_journal_records(document, records)
+    except (IndexError, KeyError, TypeError, ValueError):
+        document = read()
+        for index, record in enumerate(records):
+            try:
+                _apply_journal_records(document, [record])
+            except (IndexError, KeyError, TypeError, ValueError) as exc:
+                logger.warning(
+                    "State journal %s record %s could not be replayed: %s",
+                    journal_path,
+                    record.get("sequence"),
+                    exc,
+                )
+                document = read()
+                _apply_journal_records(document, records[:index])
+                break
+    return document
+
+
 def _fsync_directory(path: Path) -> None:
     """Flush the directory entry, best effort.
 
@@ -95,22 +466,137 @@ def _fsync_directory(path: Path) -> None:
         os.close(directory_fd)
 
 
-def _write_checkpoint(path: Path, state: State) -> None:
+def _write_checkpoint(
+    path: Path,
+    state: State,
+    *,
+    journal_id: str | None = None,
+) -> None:
+    checkpoint_id = journal_id or uuid4().hex
+    roots = state.to_dict(include_private=True)
+    _write_sharded_checkpoint(
+        path,
+        _checkpoint_header(journal_id=journal_id),
+        roots,
+        {root: _shard_entry(path, root, checkpoint_id) for root in roots},
+    )
+
+
+def _write_sharded_checkpoint(
+    path: Path,
+    header: dict[str, Any],
+    roots: dict[str, Any],
+    shards: dict[str, dict[str, str]],
+) -> None:
+    """Write the given roots to new shard files, then swap in the manifest.
+
+    Roots absent from ``roots`` keep the shard file the previous manifest
+    named for them, along with its digest. New shard files are unreferenced
+    until the manifest replace succeeds and are removed again if it fails.
+    """
+    shard_directory = _shard_directory(path)
+    shard_directory.mkdir(parents=True, exist_ok=True)
+    written: list[Path] = []
+    manifest_shards: dict[str, dict[str, Any]] = {}
+    try:
+        for root, value in roots.items():
+            shard_path = path.parent / shards[root]["file"]
+            data = json.dumps(value).encode("utf-8")
+            with shard_path.open("wb") as file:
+                written.append(shard_path)
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            manifest_shards[root] = {**shards[root], **_shard_digest(data)}
+
+        previous_entries = _previous_shard_entries(path)
+        for root, entry in shards.items():
+            if root in roots:
+                continue
+            previous = previous_entries.get(entry["file"])
+            if previous is None:
+                data = (path.parent / entry["file"]).read_bytes()
+                previous = {**entry, **_shard_digest(data)}
+            manifest_shards[root] = previous
+
+        _fsync_directory(shard_directory)
+        manifest = {**header, "shards": dict(sorted(manifest_shards.items()))}
+        manifest["checksum"] = _manifest_checksum(manifest)
+        _write_checkpoint_document(path, manifest)
+    except BaseException:
+        for shard_path in written:
+            shard_path.unlink(missing_ok=True)
+        raise
+    _remove_unreferenced_shards(path, manifest_shards)
+
+
+def _previous_shard_entries(path: Path) -> dict[str, dict[str, Any]]:
+    try:
+        document = _read_manifest(path)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(document, dict) or not isinstance(document.get("shards"), dict):
+        return {}
+    return {
+        entry["file"]: entry
+        for entry in document["shards"].values()
+        if isinstance(entry, dict) and "sha256" in entry
+    }
+
+
+def _checkpoint_digests_match(path: Path) -> bool:
+    """Verify a sharded checkpoint against its checksums without decoding it."""
+    try:
+        document = _read_manifest(path)
+        if not isinstance(document, dict) or "checksum" not in document:
+            return False
+        for entry in document["shards"].values():
+            if "sha256" not in entry:
+                return False
+            _read_shard_bytes(path.parent, entry)
+    except (AttributeError, KeyError, OSError, TypeError, ValueError):
+        return False
+    return True
+
+
+def _remove_unreferenced_shards(path: Path, shards: dict[str, dict[str, str]]) -> None:
+    """Delete shard files that neither the primary nor the backup names."""
+    backup_path = _backup_path(path)
+    try:
+        backup = _read_document(backup_path)
+    except FileNotFoundError:
+        backup = {}
+    except (OSError, ValueError):
+        return
+    referenced = {entry["file"] for entry in shards.values()}
+    if isinstance(backup, dict) and isinstance(backup.get("shards"), dict):
+        referenced.update(entry["file"] for entry in backup["shards"].values())
+    shard_directory = _shard_directory(path)
+    for shard_path in shard_directory.glob("*.json"):
+        if f"{shard_directory.name}/{shard_path.name}" not in referenced:
+            shard_path.unlink(missing_ok=True)
+
+
+def _write_checkpoint_document(path: Path, document: dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     temporary_path = _temporary_path(path)
     backup_path = _backup_path(path)
 
     try:
         with temporary_path.open("w", encoding="utf-8") as file:
-            json.dump(_checkpoint_document(state), file)
+            json.dump(document, file)
             file.flush()
             os.fsync(file.fileno())
 
         # Copy the current primary aside instead of renaming it. Renaming first
         # means any later failure leaves no primary checkpoint at all; copying
         # keeps the old primary readable until the atomic replace succeeds. A
-        # corrupt primary is never allowed to overwrite a good backup.
-        if path.exists() and _load_checkpoint(path) is not None:
+        # corrupt primary is never allowed to overwrite a good backup. Digests
+        # settle that without decoding; only a primary without them, or one
+        # that fails them, pays for a full load.
+        if path.exists() and (
+            _checkpoint_digests_match(path) or _load_checkpoint(path) is not None
+        ):
             shutil.copy2(path, backup_path)
 
         os.replace(temporary_path, path)
@@ -119,22 +605,198 @@ def _write_checkpoint(path: Path, state: State) -> None:
         temporary_path.unlink(missing_ok=True)
 
 
+@dataclass
+class _JournalAppend:
+    path: Path
+    journal_id: str
+    line: str
+    future: Future[None] = field(default_factory=Future)
+
+
+@dataclass
+class _CheckpointWrite:
+    path: Path
+    header: dict[str, Any]
+    roots: dict[str, Any]
+    shards: dict[str, dict[str, str]]
+    journal_id: str
+    future: Future[None] = field(default_factory=Future)
+
+
+def _settle(future: Future[None], error: BaseException | None = None) -> None:
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
+
+
+class _CheckpointWriter:
+    """Background thread that performs every checkpoint and journal write.
+
+    Writes run strictly in submission order, so a journal record can never
+    reach disk ahead of the checkpoint it extends. Journal appends queued
+    together are group committed: written back to back and flushed with one
+    fsync. Callers wait on the returned future instead of on the disk.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: queue.SimpleQueue[_JournalAppend | _CheckpointWrite] = (
+            queue.SimpleQueue()
+        )
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        # Generations whose checkpoint or an earlier append failed. Anything
+        # still queued for them would follow a missing base or a torn line.
+        self._failed_journal_ids: set[str] = set()
+
+    def submit(self, job: _JournalAppend | _CheckpointWrite) -> Future[None]:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="state-checkpoint-writer",
+                    daemon=True,
+                )
+                self._thread.start()
+        self._jobs.put(job)
+        return job.future
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect(self._jobs.get())
+            start = 0
+            while start < len(batch):
+                job = batch[start]
+                if isinstance(job, _CheckpointWrite):
+                    self._write_checkpoint(job)
+                    start += 1
+                    continue
+                end = start + 1
+                while (
+                    end < len(batch)
+                    and isinstance(batch[end], _JournalAppend)
+                    and batch[end].path == job.path
+                    and batch[end].journal_id == job.journal_id
+                ):
+                    end += 1
+                self._append(batch[start:end])
+                start = end
+
+    def _collect(
+        self,
+        first: _JournalAppend | _CheckpointWrite,
+    ) -> list[_JournalAppend | _CheckpointWrite]:
+        batch = [first]
+        deadline = time.monotonic() + JOURNAL_MAX_BATCH_LATENCY_SECONDS
+        while len(batch) < _MAX_WRITE_BATCH:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._jobs.get(timeout=remaining))
+                else:
+                    batch.append(self._jobs.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _append(self, jobs: list[_JournalAppend]) -> None:
+        journal_id = jobs[0].journal_id
+        if journal_id in self._failed_journal_ids:
+            error: BaseException = OSError(
+                f"State journal generation {journal_id} is no longer writable."
+            )
+        else:
+            try:
+                _append_journal(jobs[0].path, [job.line for job in jobs])
+                error = None
+            except BaseException as exc:
+                self._failed_journal_ids.add(journal_id)
+                error = exc
+        for job in jobs:
+            _settle(job.future, error)
+
+    def _write_checkpoint(self, job: _CheckpointWrite) -> None:
+        try:
+            _write_sharded_checkpoint(job.path, job.header, job.roots, job.shards)
+            # Records of the previous generation are part of the new
+            # checkpoint now. If removal is interrupted, their journal id
+            # keeps replay from applying them a second time.
+            _journal_path(job.path).unlink(missing_ok=True)
+        except BaseException as exc:
+            self._failed_journal_ids.add(job.journal_id)
+            _settle(job.future, exc)
+            return
+        _settle(job.future)
+
+
+_checkpoint_writer = _CheckpointWriter()
+
+
 class StateSingleton:
+    """Owner of the canonical in-memory state and its on-disk recovery files.
+
+    ``dumpState`` writes a full checkpoint tagged with a fresh journal id and
+    removes the previous journal. Committed mutations then append their
+    patch operations to the journal with ``journalCommit``, so commit cost
+    follows the size of the patch rather than the size of the campaign.
+
+    Checkpoints are a small manifest naming one shard file per state root.
+    Compaction rewrites only the roots that journaled commits touched since
+    the previous checkpoint and keeps the other shard files as they are.
+
+    Checkpoints and journal records both carry the state version of the latest
+    commit, so a restart can resume numbering from ``stateVersion``.
+    """
+
     _state: State | None = None
+    # The checkpoint the journal currently extends: its file, the in-memory
+    # state object it was written from, and its journal id. A state swapped
+    # in behind the store's back, or a different STATE_PATH, starts over with
+    # a full checkpoint instead of appending to an unrelated journal.
+    _journal_base: tuple[Path, State, str] | None = None
+    _journal_sequence = 0
+    # Shard entries of the latest checkpoint and the roots journaled since.
+    # Without known shards the next checkpoint rewrites every root.
+    _shards: dict[str, dict[str, str]] | None = None
+    _dirty_roots: set[str] = set()
+    _state_version = 0
+    # Guards the journal bookkeeping above. Write failures are reported on the
+    # writer thread, which updates it from there.
+    _journal_lock = threading.RLock()
 
     @classmethod
     def initializeState(cls) -> State:
-        cls._state = _load_checkpoint(STATE_PATH)
-        if cls._state is None:
-            cls._state = _load_checkpoint(_backup_path(STATE_PATH))
-            if cls._state is not None:
+        journal_path = _journal_path(STATE_PATH)
+        with cls._journal_lock:
+            cls._journal_base = None
+            cls._shards = None
+        loaded = _load_versioned_checkpoint(
+            STATE_PATH,
+            journal_path=journal_path,
+            shard_fallback=_backup_path(STATE_PATH),
+        )
+        if loaded is None:
+            loaded = _load_versioned_checkpoint(
+                _backup_path(STATE_PATH),
+                journal_path=journal_path,
+            )
+            if loaded is not None:
                 logger.warning(
                     "Recovered state from backup checkpoint %s.",
                     _backup_path(STATE_PATH),
                 )
-        if cls._state is None:
+        if loaded is None:
             logger.warning("No valid state checkpoint found; using empty state.")
             cls._state = _fresh_state()
+            cls._state_version = 0
+            return cls._state
+        cls._state, cls._state_version = loaded
+        if journal_path.exists():
+            # Fold the replayed tail into a new checkpoint so appends never
+            # follow a torn line or a record from another generation.
+            cls.dumpState()
         return cls._state
 
     @classmethod
@@ -146,25 +808,195 @@ class StateSingleton:
 
     @classmethod
     def dumpState(cls) -> None:
+        cls.scheduleDump().result()
+
+    @classmethod
+    def scheduleDump(cls, *, only_dirty: bool = False) -> Future[None]:
+        """Queue a checkpoint of the current state and start a new journal.
+
+        With ``only_dirty`` only roots touched by journaled commits since the
+        previous checkpoint are rewritten. Changes made to the state object
+        directly are only captured by a full dump.
+        """
         if cls._state is None:
             cls._state = _fresh_state()
-        cls._state.action_history = prune_action_history(cls._state.action_history)
-        _write_checkpoint(STATE_PATH, cls._state)
+        cls._prune_action_history(cls._state)
+        return cls._schedule_journal_base(cls._state, only_dirty=only_dirty)
+
+    @classmethod
+    def journalCommit(
+        cls,
+        ops: Iterable[Any],
+        *,
+        state_version: int,
+        request_id: str | None = None,
+    ) -> Future[None]:
+        """Queue the patch operations of one committed mutation.
+
+        The returned future settles once the record is durable.
+        """
+        state = cls.getState()
+        cls._state_version = state_version
+        with cls._journal_lock:
+            base = cls._journal_base
+            if base is None or base[0] != STATE_PATH or base[1] is not state:
+                return cls.scheduleDump()
+
+            ops = list(ops)
+            cls._dirty_roots.update(_journal_root(op) for op in ops)
+            cls._journal_sequence += 1
+            record = {
+                "journal_id": base[2],
+                "sequence": cls._journal_sequence,
+                "schema_version": CURRENT_STATE_SCHEMA_VERSION,
+                "state_version": state_version,
+                "request_id": request_id,
+                "ops": ops,
+            }
+            future = _checkpoint_writer.submit(
+                _JournalAppend(
+                    path=_journal_path(STATE_PATH),
+                    journal_id=base[2],
+                    line=json.dumps(record, default=_journal_value) + "\n",
+                )
+            )
+        future.add_done_callback(lambda done: cls._forget_failed_base(done, base[2]))
+        return future
+
+    @classmethod
+    def journalAppendable(cls) -> bool:
+        """Whether the next commit appends to the journal rather than dumping state."""
+        with cls._journal_lock:
+            base = cls._journal_base
+        return base is not None and base[0] == STATE_PATH and base[1] is cls.getState()
+
+    @classmethod
+    def stateVersion(cls) -> int:
+        """The state version of the latest commit journaled or loaded from disk."""
+        return cls._state_version
+
+    @classmethod
+    def journalSize(cls) -> int:
+        try:
+            return _journal_path(STATE_PATH).stat().st_size
+        except FileNotFoundError:
+            return 0
 
     @classmethod
     def exportPersistedState(cls) -> dict[str, Any]:
         if cls._state is None:
             cls._state = _fresh_state()
-        cls._state.action_history = prune_action_history(cls._state.action_history)
+        cls._prune_action_history(cls._state)
         return _checkpoint_document(cls._state)
 
     @classmethod
-    def replaceState(cls, state: State) -> None:
-        state.action_history = prune_action_history(state.action_history)
-        _write_checkpoint(STATE_PATH, state)
+    def replaceState(cls, state: State, *, state_version: int | None = None) -> None:
+        cls._prune_action_history(state)
+        if state_version is not None:
+            cls._state_version = state_version
+        cls._schedule_journal_base(state).result()
+        cls._state = state
+
+    @classmethod
+    async def replaceStateAsync(
+        cls,
+        state: State,
+        *,
+        state_version: int | None = None,
+    ) -> None:
+        """``replaceState`` for the event loop: wait for the checkpoint without blocking it.
+
+        A cancelled caller does not withdraw the queued checkpoint, and the
+        state is only swapped in once it is durable.
+        """
+        cls._prune_action_history(state)
+        if state_version is not None:
+            cls._state_version = state_version
+        await asyncio.shield(asyncio.wrap_future(cls._schedule_journal_base(state)))
         cls._state = state
 
     @classmethod
     def restartState(cls) -> None:
         cls._state = _fresh_state()
+        cls._state_version = 0
         cls.dumpState()
+
+    @classmethod
+    def _prune_action_history(cls, state: State) -> None:
+        pruned = prune_action_history(state.action_history)
+        if len(pruned) != len(state.action_history):
+            with cls._journal_lock:
+                cls._dirty_roots.add("action_history")
+        state.action_history = pruned
+
+    @classmethod
+    def _schedule_journal_base(
+        cls,
+        state: State,
+        *,
+        only_dirty: bool = False,
+    ) -> Future[None]:
+        with cls._journal_lock:
+            return cls._schedule_journal_base_locked(state, only_dirty=only_dirty)
+
+    @classmethod
+    def _schedule_journal_base_locked(
+        cls,
+        state: State,
+        *,
+        only_dirty: bool,
+    ) -> Future[None]:
+        journal_id = uuid4().hex
+        base = cls._journal_base
+        previous_shards = cls._shards
+        root_names = [state_field.name for state_field in fields(State)]
+        if (
+            only_dirty
+            and previous_shards is not None
+            and base is not None
+            and base[0] == STATE_PATH
+            and base[1] is state
+            and set(previous_shards) == set(root_names)
+        ):
+            dirty_roots = [root for root in root_names if root in cls._dirty_roots]
+        else:
+            previous_shards = {}
+            dirty_roots = root_names
+        # Serialize here, where the state is consistent; encoding and all
+        # file work happen on the writer thread.
+        roots = {root: _root_document(state, root) for root in dirty_roots}
+        shards = {
+            **(previous_shards or {}),
+            **{root: _shard_entry(STATE_PATH, root, journal_id) for root in roots},
+        }
+        cls._journal_base = (STATE_PATH, state, journal_id)
+        cls._journal_sequence = 0
+        cls._shards = shards
+        cls._dirty_roots = set()
+        future = _checkpoint_writer.submit(
+            _CheckpointWrite(
+                path=STATE_PATH,
+                header=_checkpoint_header(
+                    journal_id=journal_id,
+                    state_version=cls._state_version,
+                ),
+                roots=roots,
+                shards=shards,
+                journal_id=journal_id,
+            )
+        )
+        future.add_done_callback(lambda done: cls._forget_failed_base(done, journal_id))
+        return future
+
+    @classmethod
+    def _forget_failed_base(cls, future: Future[None], journal_id: str) -> None:
+        # A failed checkpoint or append leaves nothing reliable to extend; the
+        # next commit starts over with a full checkpoint and a fresh journal.
+        # Runs on the writer thread.
+        if future.cancelled() or future.exception() is None:
+            return
+        with cls._journal_lock:
+            base = cls._journal_base
+            if base is not None and base[2] == journal_id:
+                cls._journal_base = None
+            cls._shards = None
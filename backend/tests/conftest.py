@@ -38,8 +38,15 @@ def deterministic_request_ids(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]
 
 
 @pytest.fixture(autouse=True)
-def reset_state_sync_service() -> Iterator[None]:
+def reset_state_sync_service(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Give the shared service a fresh lock and history for every test.
+
+    Transactions hold the lock while they wait on the checkpoint writer, so a
+    contended lock binds to the loop that awaited it. Each test runs its
+    scenario on a new ``asyncio.run`` loop, so it needs its own lock.
+    """
     from backend.features.state_sync.service import state_sync_service
 
+    monkeypatch.setattr(state_sync_service, "_lock", asyncio.Lock())
     asyncio.run(state_sync_service.reset())
     yield
@@ -1,5 +1,4 @@
 import asyncio
-import json
 from dataclasses import asdict
 from copy import deepcopy
 
@@ -254,7 +253,7 @@ def test_dump_state_trims_action_history_before_persisting(tmp_path, monkeypatch
 
     StateSingleton.dumpState()
 
-    persisted = json.loads(state_path.read_text(encoding="utf-8"))
+    persisted = store_module._read_checkpoint_document(state_path)
     persisted_history = persisted["state"]["action_history"]
     assert len(persisted_history) == ACTION_HISTORY_RETENTION_LIMIT
     assert "history-000" not in persisted_history
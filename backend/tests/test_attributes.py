@@ -1,4 +1,5 @@
 import asyncio
+import json
 from copy import deepcopy
 
 import pytest
@@ -28,6 +29,9 @@ class FakeWebSocket:
     async def send_json(self, payload: dict) -> None:
         self.sent_messages.append(payload)
 
+    async def send_text(self, data: str) -> None:
+        await self.send_json(json.loads(data))
+
 
 def _formula(text: str, aliases: list[dict] | None = None) -> dict:
     return {"aliases": aliases, "text": text}
@@ -346,6 +350,45 @@ def test_attribute_recomputes_when_dependency_changes(monkeypatch) -> None:
     asyncio.run(scenario())
 
 
+def test_stat_change_recomputes_only_downstream_stats(monkeypatch) -> None:
+    async def scenario() -> None:
+        original_state = deepcopy(StateSingleton.getState())
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        try:
+            _reset_with_sheet()
+            await websocket_sessions.reset()
+            websocket = FakeWebSocket()
+            await websocket_sessions.connect(websocket, role="dm")
+
+            for value in (12, 30):
+                await handle_client_payload(
+                    websocket,
+                    {
+                        "type": "set_sheet_base_stat",
+                        "sheet_id": "mage",
+                        "stat_name": "strength",
+                        "value": value,
+                    },
+                )
+
+            assert websocket.sent_messages[-1]["ops"] == [
+                {"op": "set", "path": "/sheets/mage/stats/strength", "value": 30},
+                {"op": "set", "path": "/sheets/mage/evaluated_stats/strength", "value": 30},
+                {"op": "set", "path": "/sheets/mage/evaluated_stats/lifting", "value": 30},
+                {
+                    "op": "set",
+                    "path": "/sheets/mage/evaluated_stats/carry_weight",
+                    "value": 30,
+                },
+            ]
+            sheet = StateSingleton.getState().sheets["mage"]
+            assert sheet.attributes["amount_of_reactions"].evaluated_value == 1
+        finally:
+            StateSingleton._state = original_state
+
+    asyncio.run(scenario())
+
+
 def test_player_cannot_edit_sheet_attribute(monkeypatch) -> None:
     async def scenario() -> None:
         original_state = deepcopy(StateSingleton.getState())
@@ -914,9 +957,6 @@ def test_attribute_visibility_changes_reconcile_all_subject_bridges(monkeypatch)
                 ("remove", "/sheets/mage/attributes/rank_label"),
                 ("remove", "/items/sword/attributes/rank_label"),
                 ("remove", "/actions/parry/attributes/rank_label"),
-                ("set", "/sheets/mage/evaluated_stats"),
-                ("set", "/sheets/mage/evaluated_max_health"),
-                ("set", "/sheets/mage/evaluated_max_mana"),
             }
             private_snapshot = await state_sync_service.snapshot(role="player")
             assert "rank_label" not in private_snapshot.state["attributes"]
@@ -938,9 +978,6 @@ def test_attribute_visibility_changes_reconcile_all_subject_bridges(monkeypatch)
                 ("set", "/sheets/mage/attributes/rank_label"),
                 ("set", "/items/sword/attributes/rank_label"),
                 ("set", "/actions/parry/attributes/rank_label"),
-                ("set", "/sheets/mage/evaluated_stats"),
-                ("set", "/sheets/mage/evaluated_max_health"),
-                ("set", "/sheets/mage/evaluated_max_mana"),
             }
         finally:
             StateSingleton._state = original_state
@@ -1,4 +1,5 @@
 import asyncio
+import json
 from copy import deepcopy
 from dataclasses import asdict
 
@@ -34,6 +35,9 @@ class FakeWebSocket:
     async def send_json(self, payload: dict) -> None:
         self.sent_messages.append(payload)
 
+    async def send_text(self, data: str) -> None:
+        await self.send_json(json.loads(data))
+
 
 def _reset_state() -> None:
     StateSingleton._state = deepcopy(DEFAULT_STATE)
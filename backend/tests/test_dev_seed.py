@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import json
 from pathlib import Path
 
 from backend.dev.dm_examples import (
@@ -20,7 +19,7 @@ def test_seed_state_is_complete_reloadable_and_deterministic(tmp_path: Path) ->
     store_module._write_checkpoint(target, State())
 
     first_state = asyncio.run(seed_state(target))
-    first_document = json.loads(target.read_text(encoding="utf-8"))
+    first_document = store_module._read_checkpoint_document(target)
     original_backup = store_module._load_checkpoint(target.with_name("state.json.bak"))
 
     assert original_backup is not None
@@ -65,7 +64,7 @@ def test_seed_state_is_complete_reloadable_and_deterministic(tmp_path: Path) ->
     assert flames.steps[0].amount.formula_id == "flames_of_life_mana_cost"
 
     second_state = asyncio.run(seed_state(target))
-    second_document = json.loads(target.read_text(encoding="utf-8"))
+    second_document = store_module._read_checkpoint_document(target)
 
     assert second_state.to_dict(include_private=True) == first_state.to_dict(
         include_private=True
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import json
 from pathlib import Path
 
 import pytest
@@ -48,6 +49,9 @@ class FakeWebSocket:
                 websocket=self,
             )
 
+    async def send_text(self, data: str) -> None:
+        await self.send_json(json.loads(data))
+
 
 async def _send(websocket: FakeWebSocket, payload: dict) -> list[dict]:
     start = len(websocket.sent_messages)
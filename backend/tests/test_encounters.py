@@ -1,6 +1,8 @@
 import asyncio
+import json
 from copy import deepcopy
 from dataclasses import asdict
+from itertools import count
 
 from backend.routes.ws import handle_client_payload, websocket_sessions
 from backend.state.models.action import Action
@@ -28,6 +30,9 @@ class FakeWebSocket:
     async def send_json(self, payload: dict) -> None:
         self.sent_messages.append(payload)
 
+    async def send_text(self, data: str) -> None:
+        await self.send_json(json.loads(data))
+
     async def receive_text(self) -> str:
         raise RuntimeError("receive_text not implemented for FakeWebSocket")
 
@@ -408,6 +413,62 @@ def test_encounter_spawn_matches_canonical_instance_construction(monkeypatch) ->
     asyncio.run(scenario())
 
 
+def test_encounter_spawn_rolls_dice_maxima_for_each_copy(monkeypatch) -> None:
+    async def scenario() -> None:
+        original_state = deepcopy(StateSingleton.getState())
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        rolls = count(1)
+        monkeypatch.setattr(
+            "backend.features.formula_runtime.service.random.randint",
+            lambda low, high: next(rolls),
+        )
+        try:
+            _reset_state()
+            state = StateSingleton.getState()
+            template = Sheet.from_dict(_sheet_payload())
+            template.max_health = Formula(aliases=[], text="100 + 1d20")
+            template.max_mana = Formula(aliases=[], text="40")
+            state.sheets["mage_template"] = template
+            await websocket_sessions.reset()
+            websocket = FakeWebSocket()
+            await websocket_sessions.connect(websocket, role="dm")
+            await handle_client_payload(
+                websocket,
+                {
+                    "type": "save_encounter_preset",
+                    "encounter": {
+                        "id": "encounter_1",
+                        "name": "Three Mages",
+                        "entries": [
+                            {
+                                "template_id": "mage_template",
+                                "count": 3,
+                            }
+                        ],
+                    },
+                },
+            )
+            await handle_client_payload(
+                websocket,
+                {
+                    "type": "spawn_encounter_preset",
+                    "encounter_id": "encounter_1",
+                },
+            )
+
+            copies = [
+                state.instanced_sheets[f"encounter_1_mage_template_{index}"]
+                for index in range(1, 4)
+            ]
+            assert len({copy.health for copy in copies}) == 3
+            assert all(100 < copy.health <= 120 for copy in copies)
+            assert [copy.mana for copy in copies] == [40, 40, 40]
+        finally:
+            StateSingleton._state = original_state
+
+    asyncio.run(scenario())
+
+
 def test_dm_can_delete_encounter_preset(monkeypatch) -> None:
     async def scenario() -> None:
         original_state = deepcopy(StateSingleton.getState())
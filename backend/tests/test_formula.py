@@ -1,12 +1,20 @@
+import random
 from dataclasses import dataclass
 
 import pytest
 
 from backend.features.formula_runtime.service import (
     FormulaExecutionContext,
+    FormulaMemo,
+    compile_formula_text,
     compose_roll20_message,
+    evaluate_bound_formula,
     evaluate_numeric_expression,
     evaluate_numeric_formula,
+    evaluate_resource_maxima,
+    evaluate_resource_maxima_batch,
+    evaluate_sheet_stats,
+    evaluate_sheet_stats_batch,
     resolve_roll_mode,
 )
 from backend.state.models.augmentation import (
@@ -19,6 +27,7 @@ from backend.state.models.formula import (
     FormulaAliases,
     FormulaDefinition,
     normalize_formula_tags,
+    referenced_formula,
 )
 from backend.state.models.proficiency import ProficiencyBridge
 from backend.state.models.state import State
@@ -434,3 +443,263 @@ def test_formula_runtime_rejects_unsupported_operator() -> None:
 def test_formula_runtime_rejects_invalid_dice_expressions() -> None:
     with pytest.raises(ValueError, match="Dice keep count cannot exceed dice count."):
         evaluate_numeric_expression("1d20kh2")
+
+
+def _outcome(evaluate, seed: int) -> tuple[object, ...]:
+    random.seed(seed)
+    try:
+        value = evaluate()
+        result: tuple[object, ...] = ("value", type(value), repr(value))
+    except Exception as error:  # noqa: BLE001 - both paths must fail alike
+        result = ("error", type(error), str(error))
+    return (*result, random.random())
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "@strength * 2 + 1d6",
+        "2d6kh1 + @nested - d4",
+        "floor(@nested / 3) + max(@strength, 3d6kl2)",
+        "round(@ratio * 10, 1) ** 2",
+        "-@nested + @bonused",
+        "@nested + 1d20kh2",
+        "1/0 + 101d6",
+        "@broken + d6",
+        "@missing + 1",
+        "1.d6 + @strength",
+        "d6(2) + 1",
+        "2d6 + @infinite",
+        "abs(@strength)",
+        "(@strength, d6)",
+    ],
+)
+def test_compiled_evaluation_matches_the_expanded_text(text: str) -> None:
+    root = DummySheet(
+        stats=DummyStats(
+            strength=12,
+            mana=20,
+            derived=Formula(aliases=None, text="1"),
+        ),
+        proficiencies={},
+        variables={
+            "ratio": 0.37,
+            "infinite": float("inf"),
+            "nested": Formula(
+                aliases=[FormulaAliases(name="strength", path=["stats", "strength"])],
+                text="@strength + 2d6",
+            ),
+            "broken": Formula(aliases=None, text="1) + (2"),
+        },
+    )
+    formula = Formula(
+        aliases=[
+            FormulaAliases(name="strength", path=["stats", "strength"]),
+            FormulaAliases(name="bonused", path=["variables", "nested"]),
+            *(
+                FormulaAliases(name=name, path=["variables", name])
+                for name in ("nested", "ratio", "infinite", "broken", "missing")
+            ),
+        ],
+        text=text,
+    )
+
+    for seed in range(5):
+        assert _outcome(
+            lambda: evaluate_bound_formula(formula.bind(root)),
+            seed,
+        ) == _outcome(
+            lambda: evaluate_numeric_expression(formula.expand_formula(root)),
+            seed,
+        )
+
+
+def test_formula_text_is_compiled_once_per_text() -> None:
+    compiled = compile_formula_text("@strength * 2 + 1d6", frozenset({"strength"}))
+
+    assert compiled is not None
+    assert compile_formula_text("@strength * 2 + 1d6", frozenset({"strength"})) is compiled
+    assert compile_formula_text("@strength * 3 + 1d6", frozenset({"strength"})) is not compiled
+    # A rolled number would merge into "1.", so this text is left to the
+    # expanded-text evaluator.
+    assert compile_formula_text("1.d6", frozenset()) is None
+
+
+@dataclass
+class DummyStatBlock:
+    constitution: Formula
+    health: Formula
+    endurance: Formula
+    agility: int
+
+
+@dataclass
+class DummyStatSheet:
+    stats: DummyStatBlock
+    stat_bonuses: dict[str, int]
+    max_health: Formula
+    max_mana: Formula
+
+
+def _stat_formula(text: str, *names: str) -> Formula:
+    return Formula(
+        aliases=[FormulaAliases(name=name, path=["stats", name]) for name in names],
+        text=text,
+    )
+
+
+def test_sheet_evaluation_shares_nested_formulas_within_one_pass(monkeypatch) -> None:
+    rolls: list[int] = []
+
+    def roll(low: int, high: int) -> int:
+        rolls.append(high)
+        return len(rolls)
+
+    monkeypatch.setattr("backend.features.formula_runtime.service.random.randint", roll)
+    sheet = DummyStatSheet(
+        stats=DummyStatBlock(
+            constitution=_stat_formula("@agility + 2", "agility"),
+            health=_stat_formula("@constitution * 2", "constitution"),
+            endurance=_stat_formula(
+                "@health + @constitution + 1d4", "health", "constitution"
+            ),
+            agility=3,
+        ),
+        stat_bonuses={"health": 4},
+        max_health=_stat_formula("@endurance + @health", "endurance", "health"),
+        max_mana=_stat_formula("@health * 3 + @endurance", "health", "endurance"),
+    )
+
+    memo = FormulaMemo()
+    stats = evaluate_sheet_stats(sheet, memo=memo)
+    maxima = evaluate_resource_maxima(sheet, memo=memo)
+    memoized_rolls = list(rolls)
+    rolls.clear()
+    expected_stats = {
+        name: evaluate_numeric_formula(sheet, formula) + sheet.stat_bonuses.get(name, 0)
+        for name, formula in vars(sheet.stats).items()
+        if isinstance(formula, Formula)
+    }
+    expected_maxima = {
+        resource: evaluate_numeric_expression(formula.expand_formula(sheet))
+        for resource, formula in (("health", sheet.max_health), ("mana", sheet.max_mana))
+    }
+
+    assert stats == {**expected_stats, "agility": 3}
+    assert maxima == expected_maxima
+    # Nested dice still roll once per reference.
+    assert memoized_rolls == rolls == [4, 4, 4]
+    assert memo.paths[("stats", "agility")] == 3
+    assert ("stats", "health") in memo.paths
+
+
+def test_memoized_binding_keeps_cycle_detection() -> None:
+    first = Formula(
+        aliases=[FormulaAliases(name="second", path=["variables", "second"])],
+        text="@second",
+    )
+    second = Formula(
+        aliases=[FormulaAliases(name="first", path=["variables", "first"])],
+        text="@first",
+    )
+    root = DummySheet(
+        stats=None,
+        proficiencies={},
+        variables={"first": first, "second": second, "plain": 2},
+    )
+    memo = FormulaMemo()
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="cycle detected"):
+            evaluate_numeric_formula(root, first, memo=memo)
+    assert ("variables", "second") not in memo.paths
+
+
+def _stat_sheet(agility: float, **overrides: object) -> DummyStatSheet:
+    sheet = DummyStatSheet(
+        stats=DummyStatBlock(
+            constitution=_stat_formula("@agility + 2", "agility"),
+            health=_stat_formula("@constitution * 2", "constitution"),
+            endurance=_stat_formula("floor(@health / 3) + @constitution", "health", "constitution"),
+            agility=agility,
+        ),
+        stat_bonuses={},
+        max_health=_stat_formula("@endurance + @health", "endurance", "health"),
+        max_mana=Formula(aliases=None, text="@agility * 3"),
+    )
+    for name, value in overrides.items():
+        if name in {"stat_bonuses", "max_health", "max_mana"}:
+            setattr(sheet, name, value)
+        else:
+            setattr(sheet.stats, name, value)
+    return sheet
+
+
+def test_batched_sheet_evaluation_matches_each_subject_alone() -> None:
+    subjects = [
+        *(_stat_sheet(agility) for agility in range(-3, 9)),
+        _stat_sheet(4, stat_bonuses={"constitution": 5, "health": 1.5}),
+        _stat_sheet(
+            4,
+            health=_stat_formula("@constitution / (@agility - 4)", "constitution", "agility"),
+        ),
+        _stat_sheet(4, constitution=_stat_formula("@agility + 1d4", "agility")),
+        _stat_sheet(4, constitution=_stat_formula("@health", "health")),
+        _stat_sheet(float("inf")),
+        _stat_sheet(4, endurance=Formula(aliases=None, text="@agility +")),
+    ]
+
+    random.seed(3)
+    expected_stats = [evaluate_sheet_stats(subject) for subject in subjects]
+    random.seed(3)
+    assert evaluate_sheet_stats_batch(subjects) == expected_stats
+    assert evaluate_resource_maxima_batch(subjects[:13]) == [
+        evaluate_resource_maxima(subject) for subject in subjects[:13]
+    ]
+    assert evaluate_sheet_stats_batch([]) == []
+
+
+def test_batched_maxima_raise_the_first_subject_error() -> None:
+    subjects = [
+        _stat_sheet(4),
+        _stat_sheet(4, max_mana=Formula(aliases=None, text="@agility / 0")),
+        _stat_sheet(4, max_health=Formula(aliases=[], text="1 +")),
+    ]
+
+    with pytest.raises(ZeroDivisionError):
+        evaluate_resource_maxima(subjects[1])
+    with pytest.raises(ZeroDivisionError):
+        evaluate_resource_maxima_batch(subjects)
+
+
+def test_referenced_formula_normalization_is_cached_by_content_and_stats() -> None:
+    sheet = _stat_sheet(4)
+    inferred = Formula(aliases=None, text="@agility + @luck", tags=["Speed"])
+    short_path = Formula(
+        aliases=[FormulaAliases(name="agility", path=["agility"])],
+        text="@agility * 2",
+    )
+
+    normalized = referenced_formula(sheet, inferred)
+    assert normalized.aliases == [FormulaAliases(name="agility", path=["stats", "agility"])]
+    assert normalized.tags == ["speed"]
+    same_content = Formula(aliases=None, text=inferred.text, tags=["speed"])
+    assert referenced_formula(_stat_sheet(9), same_content) is normalized
+    assert referenced_formula(sheet, sheet.stats.health) is sheet.stats.health
+    statless = DummySheet(stats=None, proficiencies={}, variables={})
+    assert referenced_formula(statless, inferred) is inferred
+
+    moved = referenced_formula(sheet, short_path)
+    assert moved.aliases == [FormulaAliases(name="agility", path=["stats", "agility"])]
+    short_path.aliases[0].path[0] = "constitution"
+    assert referenced_formula(sheet, short_path).aliases == [
+        FormulaAliases(name="agility", path=["stats", "constitution"])
+    ]
+    # A stats object without the name leaves the alias where it was.
+    other = DummySheet(
+        stats=DummyStats(strength=1, mana=2, derived=inferred),
+        proficiencies={},
+        variables={},
+    )
+    assert referenced_formula(other, short_path) is short_path
+    assert referenced_formula(other, inferred).aliases == []
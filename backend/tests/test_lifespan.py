@@ -1,6 +1,7 @@
 import asyncio
 
 from backend.core import main
+from backend.features.state_sync.service import state_sync_service
 
 
 def test_periodic_dump_task_stops_without_waiting_for_interval(monkeypatch) -> None:
@@ -17,3 +18,36 @@ def test_periodic_dump_task_stops_without_waiting_for_interval(monkeypatch) -> N
         assert dumps == []
 
     asyncio.run(scenario())
+
+
+def test_periodic_dump_compacts_journal_once_it_outgrows_the_threshold(
+    monkeypatch,
+) -> None:
+    async def scenario() -> None:
+        dumps: list[str] = []
+        journal_sizes = iter([0, main.JOURNAL_COMPACTION_BYTES])
+        monkeypatch.setattr(main, "COMPACTION_CHECK_SECONDS", 0.001)
+        async def compact_checkpoint() -> None:
+            dumps.append("dump")
+
+        monkeypatch.setattr(
+            state_sync_service,
+            "compact_checkpoint",
+            compact_checkpoint,
+        )
+        monkeypatch.setattr(
+            main.StateSingleton,
+            "journalSize",
+            lambda: next(journal_sizes, 0),
+        )
+
+        stop_event = asyncio.Event()
+        task = asyncio.create_task(main._periodic_dump(stop_event))
+        while not dumps:
+            await asyncio.sleep(0)
+        stop_event.set()
+
+        await asyncio.wait_for(task, timeout=0.1)
+        assert dumps == ["dump"]
+
+    asyncio.run(scenario())
@@ -16,6 +16,7 @@ EXPECTED_ROUTE_MINIMUM_ROLES = {
     "add_player_inventory_item": "player",
     "allocate_instanced_sheet_stat_points": "player",
     "adjust_instanced_sheet_resource": "player",
+    "batch": "player",
     "adjust_instanced_sheet_reactions": "player",
     "reset_instanced_sheet_reactions": "player",
     "set_pinned_instance_actions": "player",
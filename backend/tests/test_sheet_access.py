@@ -1,4 +1,5 @@
 import asyncio
+import json
 from copy import deepcopy
 
 from backend.features.sheet_access import service as sheet_access_service
@@ -20,6 +21,9 @@ class FakeWebSocket:
     async def send_json(self, payload: dict) -> None:
         self.sent_messages.append(payload)
 
+    async def send_text(self, data: str) -> None:
+        await self.send_json(json.loads(data))
+
     async def receive_text(self) -> str:
         raise RuntimeError("receive_text not implemented for FakeWebSocket")
 
@@ -1,4 +1,5 @@
 import asyncio
+import json
 from copy import deepcopy
 
 from backend.routes.ws import handle_client_payload, websocket_sessions
@@ -19,6 +20,9 @@ class FakeWebSocket:
     async def send_json(self, payload: dict) -> None:
         self.sent_messages.append(payload)
 
+    async def send_text(self, data: str) -> None:
+        await self.send_json(json.loads(data))
+
     async def receive_text(self) -> str:
         raise RuntimeError("receive_text not implemented for FakeWebSocket")
 
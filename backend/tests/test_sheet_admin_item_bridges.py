@@ -1,4 +1,5 @@
 import asyncio
+import json
 from copy import deepcopy
 
 from backend.routes.ws import handle_client_payload, websocket_sessions
@@ -21,6 +22,9 @@ class FakeWebSocket:
     async def send_json(self, payload: dict) -> None:
         self.sent_messages.append(payload)
 
+    async def send_text(self, data: str) -> None:
+        await self.send_json(json.loads(data))
+
     async def receive_text(self) -> str:
         raise RuntimeError("receive_text not implemented for FakeWebSocket")
 
@@ -1186,3 +1190,56 @@ def test_item_update_respects_equipped_dependencies_and_delete_cascades(
             StateSingleton._state = original_state
 
     asyncio.run(scenario())
+
+
+def test_item_weight_edit_patches_only_sheets_that_carry_the_item(monkeypatch) -> None:
+    async def scenario() -> None:
+        original_state = deepcopy(StateSingleton.getState())
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        try:
+            _reset_state()
+            state = StateSingleton.getState()
+            state.sheets["mage_template"] = Sheet.from_dict(_sheet_payload())
+            state.sheets["rogue_template"] = Sheet.from_dict(
+                _sheet_payload("rogue_template")
+            )
+            state.items["sword"] = Item.from_dict(_item_payload())
+            await websocket_sessions.reset()
+            await state_sync_service.reset()
+            websocket = FakeWebSocket()
+            await websocket_sessions.connect(websocket, role="dm")
+
+            await state_sync_service.set("/items/sword/weight", 4)
+            await handle_client_payload(
+                websocket,
+                {
+                    "type": "create_sheet_item_bridge",
+                    "sheet_id": "mage_template",
+                    "bridge": _bridge_payload(),
+                },
+            )
+            await state_sync_service.set("/items/sword/weight", 5)
+            await handle_client_payload(
+                websocket,
+                {
+                    "type": "delete_sheet_item_bridge",
+                    "sheet_id": "mage_template",
+                    "relationship_id": "main_hand",
+                },
+            )
+            await state_sync_service.set("/items/sword/weight", 6)
+
+            unheld, _, held, _, released = [
+                {op["path"]: op.get("value") for op in message["ops"]}
+                for message in websocket.sent_messages
+            ]
+            assert unheld == {"/items/sword/weight": 4}
+            assert held == {
+                "/items/sword/weight": 5,
+                "/sheets/mage_template/current_carried_weight": 5,
+            }
+            assert released == {"/items/sword/weight": 6}
+        finally:
+            StateSingleton._state = original_state
+
+    asyncio.run(scenario())
@@ -1,4 +1,5 @@
 import asyncio
+import json
 from copy import deepcopy
 
 import pytest
@@ -47,6 +48,9 @@ class FakeWebSocket:
                 websocket=self,
             )
 
+    async def send_text(self, data: str) -> None:
+        await self.send_json(json.loads(data))
+
     async def receive_text(self) -> str:
         raise RuntimeError("receive_text not implemented for FakeWebSocket")
 
@@ -1728,6 +1732,7 @@ def test_unauthenticated_client_cannot_adjust_instanced_sheet_resource(
             )
             await websocket_sessions.reset()
             websocket = FakeWebSocket()
+            await websocket_sessions.connect(websocket, role="unauthenticated")
 
             await handle_client_payload(
                 websocket,
@@ -2337,7 +2342,6 @@ def test_equipping_weapon_adds_missing_sheet_proficiency(monkeypatch) -> None:
             } == {
                 "/sheets/mage_template/items/equipped-axe",
                 "/sheets/mage_template/proficiencies/weapon_proficiency_axes",
-                "/sheets/mage_template/current_carried_weight",
             }
         finally:
             StateSingleton._state = original_state
@@ -1,4 +1,5 @@
 import asyncio
+import json
 from copy import deepcopy
 
 from backend.routes.ws import handle_client_payload, websocket_sessions
@@ -15,6 +16,9 @@ class FakeWebSocket:
     async def send_json(self, payload: dict) -> None:
         self.sent_messages.append(payload)
 
+    async def send_text(self, data: str) -> None:
+        await self.send_json(json.loads(data))
+
 
 def _item_payload(item_id: str, *, tags: list[str] | None = None) -> dict:
     return {
@@ -1,5 +1,7 @@
+import asyncio
 import json
 import os
+import threading
 from collections.abc import Iterator
 from copy import deepcopy
 from pathlib import Path
@@ -62,7 +64,7 @@ def test_dump_writes_versioned_checkpoint_and_round_trips_state(isolate_state) -
 
     StateSingleton.dumpState()
 
-    document = json.loads(state_path.read_text(encoding="utf-8"))
+    document = store_module._read_checkpoint_document(state_path)
     assert document["schema_version"] == CURRENT_STATE_SCHEMA_VERSION
     assert document["saved_at"].endswith("+00:00")
     assert document["state"]["actions"]["attack"]["name"] == "Attack"
@@ -740,8 +742,8 @@ def test_dump_rotates_only_valid_primary_checkpoint_to_backup(
     StateSingleton._state = State.from_dict(_state_payload(action_name="second"))
     StateSingleton.dumpState()
 
-    primary = json.loads(state_path.read_text(encoding="utf-8"))
-    backup = json.loads(backup_path.read_text(encoding="utf-8"))
+    primary = store_module._read_checkpoint_document(state_path)
+    backup = store_module._read_checkpoint_document(backup_path)
     assert set(primary["state"]["actions"]) == {"second"}
     assert set(backup["state"]["actions"]) == {"first"}
 
@@ -749,7 +751,7 @@ def test_dump_rotates_only_valid_primary_checkpoint_to_backup(
     StateSingleton._state = State.from_dict(_state_payload(action_name="third"))
     StateSingleton.dumpState()
 
-    backup = json.loads(backup_path.read_text(encoding="utf-8"))
+    backup = store_module._read_checkpoint_document(backup_path)
     assert set(backup["state"]["actions"]) == {"first"}
 
 
@@ -774,10 +776,10 @@ def test_failed_primary_replace_leaves_recoverable_backup(
     # interrupted replacement leaves both the primary and its backup readable.
     backup_path = store_module._backup_path(state_path)
     assert state_path.exists()
-    assert set(json.loads(state_path.read_text(encoding="utf-8"))["state"]["actions"]) == {
+    assert set(store_module._read_checkpoint_document(state_path)["state"]["actions"]) == {
         "stable"
     }
-    assert set(json.loads(backup_path.read_text(encoding="utf-8"))["state"]["actions"]) == {
+    assert set(store_module._read_checkpoint_document(backup_path)["state"]["actions"]) == {
         "stable"
     }
 
@@ -786,6 +788,563 @@ def test_failed_primary_replace_leaves_recoverable_backup(
     assert loaded.actions["stable"].name == "Stable"
 
 
+def test_committed_mutations_append_to_journal_and_replay_on_startup(
+    isolate_state: Path,
+) -> None:
+    from backend.features.state_sync.service import state_sync_service
+
+    state_path = isolate_state
+    StateSingleton._state = State.from_dict(_state_payload(action_name="attack"))
+    StateSingleton.dumpState()
+    checkpoint = state_path.read_text(encoding="utf-8")
+    action = State.from_dict(_state_payload(action_name="slash")).actions["slash"]
+
+    def add_access_code(state: State) -> None:
+        state.sheet_access_codes["ACCESS-1"] = SheetAccessCode(
+            code="ACCESS-1",
+            sheet_id="sheet_1",
+        )
+
+    async def scenario() -> None:
+        await state_sync_service.add("/actions/slash", action)
+        await state_sync_service.set("/actions/slash/name", "Wide Slash")
+        await state_sync_service.remove("/actions/attack")
+        await state_sync_service.apply_private_mutation(add_access_code)
+
+    asyncio.run(scenario())
+
+    journal_path = store_module._journal_path(state_path)
+    records = [
+        json.loads(line)
+        for line in journal_path.read_text(encoding="utf-8").splitlines()
+    ]
+    assert [record["sequence"] for record in records] == [1, 2, 3, 4]
+    assert records[1]["ops"] == [
+        {"op": "set", "path": "/actions/slash/name", "value": "Wide Slash"}
+    ]
+    assert state_path.read_text(encoding="utf-8") == checkpoint
+
+    expected = StateSingleton.getState().to_dict(include_private=True)
+    StateSingleton._state = None
+    loaded = StateSingleton.initializeState()
+
+    assert loaded.to_dict(include_private=True) == expected
+    assert loaded.actions["slash"].name == "Wide Slash"
+    assert "attack" not in loaded.actions
+    # Startup folds the replayed tail into a new checkpoint.
+    assert not journal_path.exists()
+    assert "journal_id" in store_module._read_checkpoint_document(state_path)
+
+
+def test_restart_resumes_the_state_version_of_the_last_commit(
+    isolate_state: Path,
+) -> None:
+    StateSingleton._state = State.from_dict(_state_payload(action_name="attack"))
+    StateSingleton.dumpState()
+    StateSingleton.journalCommit(
+        [{"op": "set", "path": "/actions/attack/name", "value": "Lunge"}],
+        state_version=7,
+    ).result()
+
+    StateSingleton._state = None
+    StateSingleton._state_version = 0
+    StateSingleton.initializeState()
+    assert StateSingleton.stateVersion() == 7
+
+    # Startup folded the journal into a checkpoint that records the version.
+    StateSingleton._state = None
+    StateSingleton._state_version = 0
+    StateSingleton.initializeState()
+    assert StateSingleton.stateVersion() == 7
+    assert store_module._read_checkpoint_document(isolate_state)["state_version"] == 7
+
+
+def test_journal_replay_ignores_torn_tail_and_stale_generations(
+    isolate_state: Path,
+) -> None:
+    state_path = isolate_state
+    journal_path = store_module._journal_path(state_path)
+    StateSingleton._state = State.from_dict(_state_payload(action_name="attack"))
+    StateSingleton.dumpState()
+    StateSingleton.journalCommit(
+        [{"op": "set", "path": "/actions/attack/name", "value": "Stale"}],
+        state_version=1,
+    ).result()
+    stale_records = journal_path.read_text(encoding="utf-8")
+
+    # A replacement starts a new journal generation. Records left behind by an
+    # interrupted journal removal must not replay onto the new checkpoint.
+    StateSingleton.replaceState(State.from_dict(_state_payload(action_name="attack")))
+    StateSingleton.journalCommit(
+        [{"op": "set", "path": "/actions/attack/name", "value": "Committed"}],
+        state_version=2,
+    ).result()
+    committed_records = journal_path.read_text(encoding="utf-8")
+    journal_path.write_text(
+        stale_records + committed_records + '{"journal_id": "torn", "seq',
+        encoding="utf-8",
+    )
+
+    StateSingleton._state = None
+    loaded = StateSingleton.initializeState()
+
+    assert loaded.actions["attack"].name == "Committed"
+
+
+def test_journal_starts_from_full_checkpoint_for_state_swapped_in_directly(
+    isolate_state: Path,
+) -> None:
+    state_path = isolate_state
+    StateSingleton.dumpState()
+    StateSingleton._state = State.from_dict(_state_payload(action_name="swapped"))
+
+    StateSingleton.journalCommit([], state_version=1).result()
+
+    assert not store_module._journal_path(state_path).exists()
+    persisted = store_module._read_checkpoint_document(state_path)
+    assert set(persisted["state"]["actions"]) == {"swapped"}
+
+
+def test_checkpoint_writer_group_commits_queued_journal_appends(
+    isolate_state: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    journal_path = store_module._journal_path(isolate_state)
+    fsynced: list[int] = []
+    real_fsync = store_module.os.fsync
+
+    def counting_fsync(fd: int) -> None:
+        fsynced.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr(store_module, "JOURNAL_MAX_BATCH_LATENCY_SECONDS", 0.2)
+    monkeypatch.setattr(store_module.os, "fsync", counting_fsync)
+    writer = store_module._CheckpointWriter()
+
+    futures = [
+        writer.submit(
+            store_module._JournalAppend(
+                path=journal_path,
+                journal_id="generation",
+                line=json.dumps({"sequence": sequence}) + "\n",
+            )
+        )
+        for sequence in range(1, 4)
+    ]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert len(fsynced) == 1
+    assert [
+        json.loads(line)["sequence"]
+        for line in journal_path.read_text(encoding="utf-8").splitlines()
+    ] == [1, 2, 3]
+
+
+def test_mutation_waits_for_journal_write_without_blocking_event_loop(
+    isolate_state: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from backend.features.state_sync.service import state_sync_service
+
+    StateSingleton._state = State.from_dict(_state_payload(action_name="attack"))
+    StateSingleton.dumpState()
+    write_released = threading.Event()
+    real_append = store_module._append_journal
+
+    def held_append(path: Path, lines: list[str]) -> None:
+        write_released.wait(timeout=5)
+        real_append(path, lines)
+
+    monkeypatch.setattr(store_module, "_append_journal", held_append)
+
+    async def scenario() -> None:
+        mutation = asyncio.create_task(
+            state_sync_service.set("/actions/attack/name", "Heavy Attack")
+        )
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert not mutation.done()
+        assert state_sync_service.current_version == 0
+
+        write_released.set()
+        await mutation
+        assert state_sync_service.current_version == 1
+
+    asyncio.run(scenario())
+
+
+
+def test_replacing_state_waits_for_its_checkpoint_without_blocking_event_loop(
+    isolate_state: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    StateSingleton._state = State.from_dict(_state_payload(action_name="attack"))
+    StateSingleton.dumpState()
+    replacement = State.from_dict(_state_payload(action_name="parry"))
+    write_released = threading.Event()
+    real_write = store_module._CheckpointWriter._write_checkpoint
+
+    def held_write(self, job) -> None:
+        write_released.wait(timeout=5)
+        real_write(self, job)
+
+    monkeypatch.setattr(store_module._CheckpointWriter, "_write_checkpoint", held_write)
+
+    async def scenario() -> None:
+        replace = asyncio.create_task(
+            StateSingleton.replaceStateAsync(replacement, state_version=4)
+        )
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert not replace.done()
+        assert StateSingleton.getState() is not replacement
+
+        write_released.set()
+        await replace
+        assert StateSingleton.getState() is replacement
+
+    asyncio.run(scenario())
+
+    document = store_module._read_checkpoint_document(isolate_state)
+    assert document["state_version"] == 4
+
+
+def test_disjoint_mutations_stage_while_an_earlier_write_is_pending(
+    isolate_state: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from backend.features.state_sync.service import state_sync_service
+
+    state = State.from_dict(_state_payload(action_name="attack"))
+    state.actions.update(State.from_dict(_state_payload(action_name="parry")).actions)
+    StateSingleton._state = state
+    StateSingleton.dumpState()
+    write_released = threading.Event()
+    real_append = store_module._append_journal
+
+    def held_append(path: Path, lines: list[str]) -> None:
+        write_released.wait(timeout=5)
+        real_append(path, lines)
+
+    monkeypatch.setattr(store_module, "_append_journal", held_append)
+
+    async def scenario() -> None:
+        await state_sync_service.reset()
+        first = asyncio.create_task(
+            state_sync_service.set("/actions/attack/name", "Heavy Attack")
+        )
+        for _ in range(10):
+            await asyncio.sleep(0)
+        disjoint = asyncio.create_task(
+            state_sync_service.set("/actions/parry/name", "Riposte")
+        )
+        conflicting = asyncio.create_task(
+            state_sync_service.set("/actions/attack/name", "Cleave")
+        )
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        assert state.actions["parry"].name == "Riposte"
+        assert state.actions["attack"].name == "Heavy Attack"
+        snapshot = await state_sync_service.snapshot(role="dm")
+        assert snapshot.state_version == 0
+        assert snapshot.state["actions"]["attack"]["name"] == "Attack"
+        assert snapshot.state["actions"]["parry"]["name"] == "Parry"
+
+        write_released.set()
+        await asyncio.gather(first, disjoint, conflicting)
+        assert state_sync_service.current_version == 3
+        assert [
+            (entry.state_version, entry.paths)
+            for entry in await state_sync_service.recent_mutations()
+        ] == [
+            (1, ("/actions/attack/name",)),
+            (2, ("/actions/parry/name",)),
+            (3, ("/actions/attack/name",)),
+        ]
+        assert state.actions["attack"].name == "Cleave"
+
+    asyncio.run(scenario())
+
+
+def test_private_commit_pending_ahead_does_not_shift_the_journaled_version(
+    isolate_state: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from backend.features.state_sync.service import state_sync_service
+
+    StateSingleton._state = State.from_dict(_state_payload(action_name="attack"))
+    StateSingleton.dumpState()
+    write_released = threading.Event()
+    real_append = store_module._append_journal
+
+    def held_append(path: Path, lines: list[str]) -> None:
+        write_released.wait(timeout=5)
+        real_append(path, lines)
+
+    def add_access_code(state: State) -> None:
+        state.sheet_access_codes["ACCESS-1"] = SheetAccessCode(
+            code="ACCESS-1",
+            sheet_id="sheet_1",
+        )
+
+    monkeypatch.setattr(store_module, "_append_journal", held_append)
+
+    async def scenario() -> None:
+        await state_sync_service.reset()
+        private = asyncio.create_task(
+            state_sync_service.apply_private_mutation(add_access_code)
+        )
+        for _ in range(10):
+            await asyncio.sleep(0)
+        public = asyncio.create_task(
+            state_sync_service.set("/actions/attack/name", "Heavy Attack")
+        )
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        write_released.set()
+        await asyncio.gather(private, public)
+        assert state_sync_service.current_version == 1
+
+    asyncio.run(scenario())
+
+    records = [
+        json.loads(line)
+        for line in store_module._journal_path(isolate_state)
+        .read_text(encoding="utf-8")
+        .splitlines()
+    ]
+    assert [record.get("state_version") for record in records] == [0, 1]
+    assert StateSingleton.stateVersion() == 1
+
+
+def test_patch_is_redacted_without_changes_staged_after_it(
+    isolate_state: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from backend.features.state_sync.service import state_sync_service
+    from backend.state.models.catalog import CatalogEntry, CatalogFolder
+
+    state = State.from_dict(_state_payload(action_name="attack"))
+    state.actions.update(State.from_dict(_state_payload(action_name="parry")).actions)
+    StateSingleton._state = state
+    StateSingleton.dumpState()
+    first_released = threading.Event()
+    later_released = threading.Event()
+    real_append = store_module._append_journal
+    appends: list[int] = []
+
+    def held_append(path: Path, lines: list[str]) -> None:
+        appends.append(len(lines))
+        (first_released if len(appends) == 1 else later_released).wait(timeout=5)
+        real_append(path, lines)
+
+    monkeypatch.setattr(store_module, "_append_journal", held_append)
+    player_patches = []
+    real_broadcast = state_sync_service._broadcast_patch
+
+    async def recording_broadcast(patch) -> None:
+        player_patches.append(
+            state_sync_service._redact_patch_for_role(patch, role="player")
+        )
+        await real_broadcast(patch)
+
+    monkeypatch.setattr(state_sync_service, "_broadcast_patch", recording_broadcast)
+
+    def place(folder_id: str, action_id: str):
+        def mutation(current: State):
+            entry_id = f"actions:{action_id}"
+            ops = [
+                state_sync_service.add_mutation(
+                    current,
+                    f"/catalog_folders/{folder_id}",
+                    CatalogFolder(id=folder_id, catalog="actions", name=folder_id),
+                ),
+                state_sync_service.add_mutation(
+                    current,
+                    f"/catalog_entries/{entry_id}",
+                    CatalogEntry(
+                        id=entry_id,
+                        catalog="actions",
+                        entry_id=action_id,
+                        folder_id=folder_id,
+                    ),
+                ),
+            ]
+            return None, ops
+
+        return mutation
+
+    async def scenario() -> None:
+        await state_sync_service.reset()
+        committed = asyncio.create_task(
+            state_sync_service.apply_mutation(place("combat", "attack"))
+        )
+        for _ in range(10):
+            await asyncio.sleep(0)
+        phantom = asyncio.create_task(
+            state_sync_service.apply_mutation(place("phantom_folder", "parry"))
+        )
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert "phantom_folder" in state.catalog_folders
+
+        first_released.set()
+        await committed
+        assert not phantom.done()
+        later_released.set()
+        await phantom
+
+    asyncio.run(scenario())
+
+    folders, entries = (op.value for op in player_patches[0].ops)
+    assert set(folders) == {"combat"}
+    assert set(entries) == {"actions:attack"}
+    assert set(player_patches[1].ops[0].value) == {"combat", "phantom_folder"}
+
+
+def test_failed_write_rolls_back_the_mutations_staged_behind_it(
+    isolate_state: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from backend.features.state_sync.service import state_sync_service
+
+    state = State.from_dict(_state_payload(action_name="attack"))
+    state.actions.update(State.from_dict(_state_payload(action_name="parry")).actions)
+    StateSingleton._state = state
+    StateSingleton.dumpState()
+    write_released = threading.Event()
+
+    def failing_append(path: Path, lines: list[str]) -> None:
+        write_released.wait(timeout=5)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store_module, "_append_journal", failing_append)
+
+    async def scenario() -> None:
+        await state_sync_service.reset()
+        first = asyncio.create_task(
+            state_sync_service.set("/actions/attack/name", "Heavy Attack")
+        )
+        for _ in range(10):
+            await asyncio.sleep(0)
+        second = asyncio.create_task(
+            state_sync_service.set("/actions/parry/name", "Riposte")
+        )
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert state.actions["parry"].name == "Riposte"
+
+        write_released.set()
+        results = await asyncio.gather(first, second, return_exceptions=True)
+
+        assert all(isinstance(result, OSError) for result in results)
+        assert state_sync_service.current_version == 0
+        assert state.actions["attack"].name == "Attack"
+        assert state.actions["parry"].name == "Parry"
+
+    asyncio.run(scenario())
+
+def _shard_files(state_path: Path) -> dict[str, str]:
+    manifest = json.loads(state_path.read_text(encoding="utf-8"))
+    return {root: entry["file"] for root, entry in manifest["shards"].items()}
+
+
+def test_compaction_rewrites_only_shards_of_journaled_roots(
+    isolate_state: Path,
+) -> None:
+    from backend.features.state_sync.service import state_sync_service
+
+    state_path = isolate_state
+    StateSingleton._state = State.from_dict(_state_payload(action_name="attack"))
+    StateSingleton.dumpState()
+    before = _shard_files(state_path)
+
+    async def scenario() -> None:
+        await state_sync_service.set("/actions/attack/name", "Heavy Attack")
+        await state_sync_service.compact_checkpoint()
+
+    asyncio.run(scenario())
+
+    after = _shard_files(state_path)
+    assert set(after) == set(before)
+    assert {root for root in after if after[root] != before[root]} == {"actions"}
+    assert not store_module._journal_path(state_path).exists()
+    shard_directory = store_module._shard_directory(state_path)
+    assert {
+        f"{shard_directory.name}/{path.name}" for path in shard_directory.iterdir()
+    } == set(after.values()) | {before["actions"]}
+
+    StateSingleton._state = None
+    loaded = StateSingleton.initializeState()
+    assert loaded.actions["attack"].name == "Heavy Attack"
+
+
+def test_unreadable_shard_falls_back_to_the_backup_shard_for_that_root(
+    isolate_state: Path,
+) -> None:
+    state_path = isolate_state
+    StateSingleton._state = State.from_dict(_state_payload(action_name="first"))
+    StateSingleton.dumpState()
+    StateSingleton._state = State.from_dict(_state_payload(action_name="second"))
+    StateSingleton._state.sheet_access_codes["ACCESS-1"] = SheetAccessCode(
+        code="ACCESS-1",
+        sheet_id="sheet_1",
+    )
+    StateSingleton.dumpState()
+    (state_path.parent / _shard_files(state_path)["actions"]).write_text(
+        "not-json",
+        encoding="utf-8",
+    )
+
+    StateSingleton._state = None
+    loaded = StateSingleton.initializeState()
+
+    assert set(loaded.actions) == {"first"}
+    assert set(loaded.sheet_access_codes) == {"ACCESS-1"}
+
+
+def test_backup_rotation_verifies_digests_without_loading_the_primary(
+    isolate_state: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    state_path = isolate_state
+    StateSingleton._state = State.from_dict(_state_payload(action_name="first"))
+    StateSingleton.dumpState()
+    primary = state_path.read_bytes()
+
+    def fail_load(*args: object, **kwargs: object) -> None:
+        raise AssertionError("a verified primary should not be decoded")
+
+    monkeypatch.setattr(store_module, "_load_checkpoint", fail_load)
+    StateSingleton._state = State.from_dict(_state_payload(action_name="second"))
+    StateSingleton.dumpState()
+
+    assert store_module._backup_path(state_path).read_bytes() == primary
+
+
+def test_shard_that_fails_its_digest_falls_back_to_the_backup_shard(
+    isolate_state: Path,
+) -> None:
+    state_path = isolate_state
+    StateSingleton._state = State.from_dict(_state_payload(action_name="first"))
+    StateSingleton.dumpState()
+    StateSingleton._state = State.from_dict(_state_payload(action_name="second"))
+    StateSingleton.dumpState()
+    (state_path.parent / _shard_files(state_path)["actions"]).write_text(
+        "{}",
+        encoding="utf-8",
+    )
+
+    assert not store_module._checkpoint_digests_match(state_path)
+    StateSingleton._state = None
+    loaded = StateSingleton.initializeState()
+
+    assert set(loaded.actions) == {"first"}
+
+
 def test_newer_primary_schema_falls_back_to_supported_backup(
     isolate_state: Path,
 ) -> None:
@@ -1686,7 +2245,7 @@ def test_export_and_replace_state_preserve_private_data(isolate_state: Path) ->
     replacement.sheet_access_codes = {}
     StateSingleton.replaceState(replacement)
 
-    persisted = json.loads(state_path.read_text(encoding="utf-8"))
+    persisted = store_module._read_checkpoint_document(state_path)
     assert persisted["schema_version"] == CURRENT_STATE_SCHEMA_VERSION
     assert persisted["state"]["sheet_access_codes"] == {}
     assert not store_module._temporary_path(state_path).exists()
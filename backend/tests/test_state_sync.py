@@ -1,18 +1,32 @@
 import asyncio
+import json
+from concurrent.futures import Future
 from copy import deepcopy
 from dataclasses import asdict
 
 import pytest
 
+from backend.features.augmentations.service import equipment_augmentation_subjects
+from backend.features.catalog_organization.service import catalog_placement_ids
+from backend.features.sheet_admin.items.service import (
+    synchronize_item_player_catalog_access_mutation,
+)
 from backend.features.state_sync import handler as state_sync_handler
+from backend.features.state_sync.patch_log import PatchLog
 from backend.features.state_sync.schema import PatchOp, ResyncState
 from backend.features.session.service import websocket_sessions
 from backend.features.state_sync.service import (
     DuplicateRequestError,
     StateSyncService,
     build_state_patch,
+    coalesce_operations,
     state_sync_service,
 )
+from backend.features.state_sync.synchronizers import (
+    SynchronizerRegistry,
+    SynchronizerScope,
+)
+from backend.features.state_sync.visibility import VisibilityIndex
 from backend.state.models.encounter import EncounterPreset
 from backend.state.models.augmentation import (
     Augmentation,
@@ -23,6 +37,7 @@ from backend.state.models.augmentation import (
 from backend.state.models.formula import Formula
 from backend.state.models.attribute import synchronize_required_sheet_attributes
 from backend.state.models.condition import ActiveCondition, ConditionPreset
+from backend.state.models.item import Item, ItemBridge
 from backend.state.models.sheet import InstancedSheet, Sheet
 from backend.state.models.state import State
 from backend.state.store import DEFAULT_STATE, StateSingleton
@@ -39,6 +54,9 @@ class FakeWebSocket:
     async def send_json(self, payload: dict) -> None:
         self.sent_messages.append(payload)
 
+    async def send_text(self, data: str) -> None:
+        await self.send_json(json.loads(data))
+
 
 def _reset_state() -> None:
     StateSingleton._state = deepcopy(DEFAULT_STATE)
@@ -430,6 +448,78 @@ def test_player_snapshot_keeps_a_dm_only_parent_of_the_claimed_instance(
     asyncio.run(scenario())
 
 
+def test_player_visibility_index_follows_mutations(monkeypatch) -> None:
+    async def scenario() -> None:
+        original_state = deepcopy(StateSingleton.getState())
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        try:
+            _reset_state()
+            state = StateSingleton.getState()
+            for sheet_id in ("mage_template", "ogre_template"):
+                template = _build_sheet_state()
+                template.dm_only = True
+                state.sheets[sheet_id] = template
+            state.instanced_sheets["mage_instance"] = InstancedSheet.from_dict(
+                {
+                    "parent_id": "mage_template",
+                    "notes": "",
+                    "health": 100,
+                    "mana": 20,
+                    "resistances": {},
+                    "augments": {},
+                }
+            )
+            for item_id, mode in (("potion", "none"), ("sword", "all")):
+                state.items[item_id] = Item.from_dict(
+                    {
+                        "id": item_id,
+                        "name": item_id.title(),
+                        "description": "",
+                        "price": "1 gp",
+                        "player_catalog_access": {"mode": mode, "instance_ids": []},
+                    }
+                )
+            visibility = state_sync_service._player_visibility("mage_instance")
+            assert (visibility.items, visibility.sheets) == ({"sword"}, {"mage_template"})
+
+            await state_sync_service.set(
+                "/instanced_sheets/mage_instance/items/bridge-1",
+                ItemBridge(
+                    relationship_id="bridge-1",
+                    count=1,
+                    equipped=False,
+                    item_id="potion",
+                ),
+            )
+            await state_sync_service.set("/items/sword/approval_status", "pending")
+            await state_sync_service.set(
+                "/instanced_sheets/mage_instance/parent_id",
+                "ogre_template",
+            )
+            await state_sync_service.set(
+                "/active_conditions/blinded",
+                ActiveCondition(
+                    application_id="blinded",
+                    condition_id="blinded",
+                    condition_name="Blinded",
+                    description="",
+                    visibility="public",
+                    instance_id="mage_instance",
+                ),
+            )
+
+            # Updated in place from the operations, and equal to a fresh build.
+            assert state_sync_service._player_visibility("mage_instance") is visibility
+            assert visibility == VisibilityIndex().for_player(state, "mage_instance")
+            assert visibility.items == {"potion"}
+            assert visibility.sheets == {"ogre_template"}
+            assert visibility.conditions == {"blinded"}
+        finally:
+            StateSingleton._state = original_state
+
+    asyncio.run(scenario())
+
+
 def test_player_patches_drop_other_instances_and_dm_only_sheets() -> None:
     patch = state_sync_service._redact_patch_for_role(
         build_state_patch(
@@ -592,6 +682,367 @@ def test_active_condition_patches_are_filtered_per_player_assignment(monkeypatch
     asyncio.run(scenario())
 
 
+def test_patch_is_redacted_once_per_audience_and_reused_for_replay(
+    monkeypatch,
+) -> None:
+    async def scenario() -> None:
+        original_state = deepcopy(StateSingleton.getState())
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        redacted_audiences: list[tuple[str, str | None]] = []
+        redact = state_sync_service._redact_patch_for_role
+
+        def counting_redact(patch, *, role, assigned_instance_id=None):
+            redacted_audiences.append((role, assigned_instance_id))
+            return redact(patch, role=role, assigned_instance_id=assigned_instance_id)
+
+        monkeypatch.setattr(state_sync_service, "_redact_patch_for_role", counting_redact)
+        try:
+            _reset_state()
+            await websocket_sessions.reset()
+            await state_sync_service.reset()
+            sockets = [FakeWebSocket() for _ in range(4)]
+            await websocket_sessions.connect(sockets[0], role="dm")
+            for socket in sockets[1:]:
+                await websocket_sessions.connect(socket, role="player")
+                await websocket_sessions.assign_player_sheet(
+                    socket,
+                    sheet_id="sheet-1",
+                    instance_id="instance-1" if socket is not sockets[3] else "instance-2",
+                )
+
+            await state_sync_service.add(
+                "/active_conditions/public-one",
+                ActiveCondition(
+                    application_id="public-one",
+                    condition_id="public",
+                    condition_name="Public",
+                    description="Visible status.",
+                    visibility="public",
+                    instance_id="instance-1",
+                ),
+            )
+
+            assert sorted(redacted_audiences, key=str) == sorted(
+                [("dm", None), ("player", "instance-1"), ("player", "instance-2")],
+                key=str,
+            )
+            assert sockets[1].sent_messages == sockets[2].sent_messages
+            assert sockets[3].sent_messages[0]["ops"] == []
+
+            replay = await state_sync_service.replay_since(
+                0,
+                role="player",
+                assigned_instance_id="instance-1",
+            )
+            assert replay is not None
+            replay[0].request_id = "resync-1"
+            assert len(redacted_audiences) == 3
+            second_replay = await state_sync_service.replay_since(
+                0,
+                role="player",
+                assigned_instance_id="instance-1",
+            )
+            assert second_replay is not None
+            assert second_replay[0].request_id is None
+        finally:
+            StateSingleton._state = original_state
+
+    asyncio.run(scenario())
+
+
+def test_trusted_events_skip_schema_validation_outside_development(
+    monkeypatch,
+) -> None:
+    from backend.protocol import socket as protocol_socket
+
+    patch = build_state_patch(
+        [PatchOp(op="set", path="/sheets/sheet-1/name", value="Renamed")],
+        state_version=3,
+        request_id="request-1",
+    )
+    validated = protocol_socket.normalize_server_event(patch)
+    monkeypatch.setattr(protocol_socket, "SERVER_EVENT_VALIDATION_RATE", 0.0)
+
+    def fail_validation(payload):
+        raise AssertionError("trusted events should not be validated")
+
+    monkeypatch.setattr(protocol_socket, "_validate_server_event", fail_validation)
+
+    assert protocol_socket.normalize_server_event(patch) == validated
+    with pytest.raises(AssertionError):
+        protocol_socket.normalize_server_event(
+            {"type": "error", "reason": "Not trusted.", "response_id": None}
+        )
+
+
+def test_trusted_events_serialize_like_validated_events(monkeypatch) -> None:
+    from pydantic_core import to_jsonable_python
+
+    from backend.features.sheet_runtime.schema import ActionExecuted
+    from backend.features.state_sync.schema import (
+        CoalescedStatePatch,
+        PatchVersion,
+        StatePatch,
+    )
+    from backend.protocol import socket as protocol_socket
+
+    sheet = _build_sheet_state()
+    item = Item.from_dict(
+        {
+            "id": "sword",
+            "name": "Sword",
+            "description": "",
+            "price": "1 gp",
+            "weight": 3,
+        }
+    )
+    redacted_item = {
+        key: value
+        for key, value in to_jsonable_python(item).items()
+        if not key.startswith("gm_") and key != "player_catalog_access"
+    }
+    ops = [
+        PatchOp(op="add", path="/sheets/mage_template", value=sheet),
+        PatchOp(op="set", path="/items/sword", value=item),
+        PatchOp(op="set", path="/items/sword", value=redacted_item),
+        PatchOp(op="inc", path="/instanced_sheets/mage_instance/health", value=-4),
+        PatchOp(op="remove", path="/items/shield"),
+    ]
+    samples = {
+        StatePatch: build_state_patch(ops, state_version=3, request_id="request-1"),
+        CoalescedStatePatch: CoalescedStatePatch(
+            response_id=None,
+            ops=ops,
+            base_version=2,
+            state_version=4,
+            versions=[PatchVersion(state_version=3), PatchVersion(4, "request-2")],
+        ),
+        ActionExecuted: ActionExecuted(
+            response_id="request-3",
+            sheet_id="mage_template",
+            action_id="fireball",
+            applied_mutations=["/instanced_sheets/mage_instance/mana"],
+            emitted_messages=["[[2d6]] fire damage"],
+            request_id="request-3",
+        ),
+    }
+    assert set(samples) == set(protocol_socket.TRUSTED_SERVER_EVENT_TYPES)
+
+    monkeypatch.setattr(protocol_socket, "SERVER_EVENT_VALIDATION_RATE", 0.0)
+    for event in samples.values():
+        direct = protocol_socket.normalize_server_event(event)
+        validated = protocol_socket._validate_server_event(event)
+        assert json.dumps(direct) == json.dumps(validated)
+
+
+def test_snapshot_frames_are_built_once_per_audience_and_version(monkeypatch) -> None:
+    async def scenario() -> None:
+        original_state = deepcopy(StateSingleton.getState())
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        builds: list[str] = []
+        build = state_sync_service._build_snapshot
+
+        def counting_build(*, role, assigned_instance_id=None, request_id=None):
+            builds.append(role)
+            return build(
+                role=role,
+                assigned_instance_id=assigned_instance_id,
+                request_id=request_id,
+            )
+
+        monkeypatch.setattr(state_sync_service, "_build_snapshot", counting_build)
+        try:
+            _reset_state()
+            StateSingleton.getState().sheets["mage_template"] = _build_sheet_state()
+            await websocket_sessions.reset()
+            await state_sync_service.reset()
+
+            first = await state_sync_service.snapshot_frame(role="dm")
+            again = await state_sync_service.snapshot_frame(role="dm")
+            resync = await state_sync_service.snapshot_frame(
+                role="dm",
+                request_id="resync-1",
+            )
+            assert again is first
+            assert builds == ["dm"]
+            assert json.loads(resync) == {
+                **json.loads(first),
+                "request_id": "resync-1",
+            }
+
+            await state_sync_service.increment(
+                "/sheets/mage_template/stats/strength",
+                1,
+            )
+            bumped = json.loads(await state_sync_service.snapshot_frame(role="dm"))
+            assert builds == ["dm", "dm"]
+            assert bumped["state_version"] == json.loads(first)["state_version"] + 1
+        finally:
+            StateSingleton._state = original_state
+
+    asyncio.run(scenario())
+
+
+def test_projection_ops_are_patched_only_when_derived_values_change(
+    monkeypatch,
+) -> None:
+    async def scenario() -> None:
+        original_state = deepcopy(StateSingleton.getState())
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        try:
+            _reset_state()
+            StateSingleton.getState().sheets["mage_template"] = _build_sheet_state()
+            await websocket_sessions.reset()
+            await state_sync_service.reset()
+            websocket = FakeWebSocket()
+            await websocket_sessions.connect(websocket, role="dm")
+
+            await state_sync_service.increment("/sheets/mage_template/stats/strength", 2)
+            await state_sync_service.set("/sheets/mage_template/stats/strength", 12)
+
+            changed, unchanged = websocket.sent_messages
+            assert "/sheets/mage_template/evaluated_stats" in {
+                op["path"] for op in changed["ops"]
+            }
+            assert [op["path"] for op in unchanged["ops"]] == [
+                "/sheets/mage_template/stats/strength"
+            ]
+            snapshot = await state_sync_service.snapshot(role="dm")
+            assert snapshot.state["sheets"]["mage_template"]["evaluated_stats"] == (
+                changed["ops"][1]["value"]
+            )
+        finally:
+            StateSingleton._state = original_state
+
+    asyncio.run(scenario())
+
+
+def test_rolled_back_commit_restores_projections_instead_of_resending_them(
+    monkeypatch,
+) -> None:
+    async def scenario() -> None:
+        original_state = deepcopy(StateSingleton.getState())
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        journal_commit = StateSingleton.journalCommit
+
+        def failing_commit(*args, **kwargs) -> Future:
+            write: Future = Future()
+            write.set_exception(OSError("disk full"))
+            return write
+
+        try:
+            _reset_state()
+            state = StateSingleton.getState()
+            state.sheets["mage_template"] = _build_sheet_state()
+            state.sheets["mage_template"].items["bridge-1"] = ItemBridge(
+                relationship_id="bridge-1",
+                count=2,
+                equipped=False,
+                item_id="potion",
+            )
+            state.items["potion"] = Item.from_dict(
+                {
+                    "id": "potion",
+                    "name": "Potion",
+                    "description": "",
+                    "price": "1 gp",
+                    "weight": 1,
+                }
+            )
+            await websocket_sessions.reset()
+            await state_sync_service.reset()
+            websocket = FakeWebSocket()
+            await websocket_sessions.connect(websocket, role="dm")
+
+            await state_sync_service.set("/items/potion/weight", 3)
+            monkeypatch.setattr(StateSingleton, "journalCommit", failing_commit)
+            with pytest.raises(OSError, match="disk full"):
+                await state_sync_service.set("/items/potion/weight", 5)
+            monkeypatch.setattr(StateSingleton, "journalCommit", journal_commit)
+            await state_sync_service.set("/items/potion/weight", 3)
+
+            changed, unchanged = websocket.sent_messages
+            assert {
+                op["path"]: op["value"] for op in changed["ops"]
+            }["/sheets/mage_template/current_carried_weight"] == 6
+            # The failed commit put back the carried weight it had replaced, so
+            # the unchanged weight is not sent again.
+            assert [op["path"] for op in unchanged["ops"]] == ["/items/potion/weight"]
+        finally:
+            StateSingleton._state = original_state
+
+    asyncio.run(scenario())
+
+
+def test_commits_rolled_back_behind_a_failed_write_restore_shared_projections(
+    monkeypatch,
+) -> None:
+    async def scenario() -> None:
+        original_state = deepcopy(StateSingleton.getState())
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        journal_commit = StateSingleton.journalCommit
+        writes: list[Future] = []
+
+        def held_commit(*args, **kwargs) -> Future:
+            writes.append(Future())
+            return writes[-1]
+
+        try:
+            _reset_state()
+            state = StateSingleton.getState()
+            state.sheets["mage_template"] = _build_sheet_state()
+            state.sheets["mage_template"].items["bridge-1"] = ItemBridge(
+                relationship_id="bridge-1",
+                count=2,
+                equipped=False,
+                item_id="potion",
+            )
+            state.items["potion"] = Item.from_dict(
+                {
+                    "id": "potion",
+                    "name": "Potion",
+                    "description": "",
+                    "price": "1 gp",
+                    "weight": 3,
+                }
+            )
+            await websocket_sessions.reset()
+            await state_sync_service.reset()
+            websocket = FakeWebSocket()
+            await websocket_sessions.connect(websocket, role="dm")
+            await state_sync_service.set("/items/potion/weight", 3)
+
+            # Both transactions refresh the sheet's carried weight, though
+            # their writes do not overlap.
+            monkeypatch.setattr(StateSingleton, "journalCommit", held_commit)
+            first = asyncio.create_task(
+                state_sync_service.set("/items/potion/weight", 5)
+            )
+            for _ in range(10):
+                await asyncio.sleep(0)
+            second = asyncio.create_task(
+                state_sync_service.set("/sheets/mage_template/items/bridge-1/count", 4)
+            )
+            for _ in range(10):
+                await asyncio.sleep(0)
+            assert len(writes) == 2
+            writes[0].set_exception(OSError("disk full"))
+            writes[1].set_result(None)
+            results = await asyncio.gather(first, second, return_exceptions=True)
+            assert all(isinstance(result, Exception) for result in results)
+            monkeypatch.setattr(StateSingleton, "journalCommit", journal_commit)
+
+            await state_sync_service.set("/items/potion/weight", 3)
+
+            assert [op["path"] for op in websocket.sent_messages[-1]["ops"]] == [
+                "/items/potion/weight"
+            ]
+        finally:
+            StateSingleton._state = original_state
+
+    asyncio.run(scenario())
+
+
 def test_template_note_patch_is_redacted_for_players(monkeypatch) -> None:
     async def scenario() -> None:
         original_state = deepcopy(StateSingleton.getState())
@@ -822,16 +1273,16 @@ def test_state_sync_increment_and_decrement_are_broadcast(monkeypatch) -> None:
                 2,
                 -1,
             ]
-            assert [
-                message["ops"][1]["path"] for message in dm_socket.sent_messages
-            ] == [
-                "/sheets/mage_template/evaluated_stats",
-                "/sheets/mage_template/evaluated_stats",
-            ]
-            assert [
-                message["ops"][1]["value"]["strength"]
-                for message in dm_socket.sent_messages
-            ] == [12, 11]
+            # The first patch publishes the whole projection; later ones only
+            # the evaluated stats that changed.
+            first_projection = dm_socket.sent_messages[0]["ops"][1]
+            assert first_projection["path"] == "/sheets/mage_template/evaluated_stats"
+            assert first_projection["value"]["strength"] == 12
+            assert dm_socket.sent_messages[1]["ops"][1] == {
+                "op": "set",
+                "path": "/sheets/mage_template/evaluated_stats/strength",
+                "value": 11,
+            }
             assert player_socket.sent_messages == dm_socket.sent_messages
             assert [
                 (
@@ -859,9 +1310,7 @@ def test_state_sync_increment_and_decrement_are_broadcast(monkeypatch) -> None:
                     None,
                     (
                         "/sheets/mage_template/stats/strength",
-                        "/sheets/mage_template/evaluated_stats",
-                        "/sheets/mage_template/evaluated_max_health",
-                        "/sheets/mage_template/evaluated_max_mana",
+                        "/sheets/mage_template/evaluated_stats/strength",
                     ),
                 ),
             ]
@@ -898,10 +1347,12 @@ def test_state_sync_undo_reverses_last_mutation_and_broadcasts_patch(monkeypatch
                 2,
                 -2,
             ]
-            assert [
-                message["ops"][1]["value"]["strength"]
-                for message in dm_socket.sent_messages
-            ] == [12, 10]
+            assert dm_socket.sent_messages[0]["ops"][1]["value"]["strength"] == 12
+            assert dm_socket.sent_messages[1]["ops"][1] == {
+                "op": "set",
+                "path": "/sheets/mage_template/evaluated_stats/strength",
+                "value": 10,
+            }
             assert player_socket.sent_messages == dm_socket.sent_messages
         finally:
             StateSingleton._state = original_state
@@ -945,6 +1396,108 @@ def test_state_sync_undo_restores_set_remove_and_add_mutations(monkeypatch) -> N
     asyncio.run(scenario())
 
 
+def test_failed_mutation_restores_only_the_branches_it_touched(monkeypatch) -> None:
+    async def scenario() -> None:
+        original_state = deepcopy(StateSingleton.getState())
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        try:
+            _reset_state()
+            state = StateSingleton.getState()
+            state.sheets["mage_template"] = _build_sheet_state()
+            state.sheets["untouched_template"] = _build_sheet_state()
+            untouched = state.sheets["untouched_template"]
+            expected = deepcopy(state)
+
+            def mutation(current: State) -> tuple[None, list[PatchOp]]:
+                ops = [
+                    state_sync_service.increment_mutation(
+                        current, "/sheets/mage_template/stats/strength", 5
+                    ),
+                    state_sync_service.set_mutation(
+                        current, "/sheets/mage_template/name", "Renamed"
+                    ),
+                    state_sync_service.add_mutation(
+                        current, "/sheets/new_template", _build_sheet_state()
+                    ),
+                    state_sync_service.set_mutation(current, "/catalog_entries", {}),
+                ]
+                raise ValueError(f"rejected after {len(ops)} operations")
+
+            with pytest.raises(ValueError, match="rejected after 4"):
+                await state_sync_service.apply_mutation(mutation, request_id="req-1")
+
+            assert state == expected
+            assert state.sheets["untouched_template"] is untouched
+            assert state_sync_service.current_version == 0
+        finally:
+            StateSingleton._state = original_state
+
+    asyncio.run(scenario())
+
+
+def test_list_writes_roll_back_in_place_and_undo_from_their_positions(monkeypatch) -> None:
+    async def scenario() -> None:
+        original_state = deepcopy(StateSingleton.getState())
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        try:
+            _reset_state()
+            state = StateSingleton.getState()
+            state.sheets["mage_template"] = _build_sheet_state()
+            sheet = state.sheets["mage_template"]
+            sheet.max_health.tags = ["first", "second"]
+            expected = deepcopy(state)
+            tags_path = "/sheets/mage_template/max_health/tags"
+
+            def failing(current: State) -> tuple[None, list[PatchOp]]:
+                state_sync_service.add_mutation(current, f"{tags_path}/-", "third")
+                state_sync_service.add_mutation(current, f"{tags_path}/0", "zeroth")
+                state_sync_service.remove_mutation(current, f"{tags_path}/-1")
+                state_sync_service.set_mutation(current, f"{tags_path}/1", "renamed")
+                raise ValueError("rejected")
+
+            with pytest.raises(ValueError, match="rejected"):
+                await state_sync_service.apply_mutation(failing, request_id="req-1")
+
+            assert state == expected
+            assert state.sheets["mage_template"] is sheet
+
+            def edit(current: State) -> tuple[None, list[PatchOp]]:
+                return None, [
+                    state_sync_service.add_mutation(current, f"{tags_path}/-", "third"),
+                    state_sync_service.remove_mutation(current, f"{tags_path}/0")[1],
+                ]
+
+            await state_sync_service.apply_mutation(edit, request_id="req-2")
+            assert sheet.max_health.tags == ["second", "third"]
+            await state_sync_service.undo_last_change(request_id="req-undo")
+            assert sheet.max_health.tags == ["first", "second"]
+        finally:
+            StateSingleton._state = original_state
+
+    asyncio.run(scenario())
+
+
+def test_coalescing_drops_superseded_sets_but_not_across_list_shifts() -> None:
+    ops = [
+        PatchOp(op="set", path="/sheets/a/name", value="First"),
+        PatchOp(op="inc", path="/sheets/a/stats/strength", value=1),
+        PatchOp(op="set", path="/sheets/a/stats/dexterity", value=12),
+        PatchOp(op="set", path="/sheets/a/name", value="Second"),
+        PatchOp(op="set", path="/sheets/a/stats", value={"strength": 3}),
+        PatchOp(op="set", path="/items/list/1/name", value="Kept"),
+        PatchOp(op="remove", path="/items/list/0"),
+        PatchOp(op="set", path="/items/list/1", value={"name": "Other"}),
+    ]
+
+    assert coalesce_operations(ops) == [
+        PatchOp(op="set", path="/sheets/a/name", value="Second"),
+        PatchOp(op="set", path="/sheets/a/stats", value={"strength": 3}),
+        PatchOp(op="set", path="/items/list/1/name", value="Kept"),
+        PatchOp(op="remove", path="/items/list/0"),
+        PatchOp(op="set", path="/items/list/1", value={"name": "Other"}),
+    ]
+
+
 def test_state_sync_undo_returns_false_when_history_is_empty() -> None:
     assert asyncio.run(state_sync_service.undo_last_change(request_id="req-undo")) is False
 
@@ -981,10 +1534,12 @@ def test_resync_state_replays_missing_patches(monkeypatch) -> None:
                 2,
                 -1,
             ]
-            assert [
-                message["ops"][1]["value"]["strength"]
-                for message in websocket.sent_messages
-            ] == [12, 11]
+            assert websocket.sent_messages[0]["ops"][1]["value"]["strength"] == 12
+            assert websocket.sent_messages[1]["ops"][1] == {
+                "op": "set",
+                "path": "/sheets/mage_template/evaluated_stats/strength",
+                "value": 11,
+            }
             assert all(
                 message["request_id"] == "req-3" for message in websocket.sent_messages
             )
@@ -1038,6 +1593,7 @@ def test_resync_state_falls_back_to_snapshot_on_invalid_version(monkeypatch) ->
                     "response_id": None,
                     "state": expected_state,
                     "state_version": 1,
+                    "state_epoch": state_sync_service.current_epoch,
                     "type": "state_snapshot",
                     "request_id": "req-2",
                 }
@@ -1046,3 +1602,246 @@ def test_resync_state_falls_back_to_snapshot_on_invalid_version(monkeypatch) ->
             StateSingleton._state = original_state
 
     asyncio.run(scenario())
+
+
+def test_resync_replays_from_the_patch_log_across_a_restart(tmp_path) -> None:
+    async def scenario() -> None:
+        original_state = deepcopy(StateSingleton.getState())
+        try:
+            _reset_state()
+            StateSingleton.getState().sheets["mage_template"] = _build_sheet_state()
+            service = StateSyncService(patch_history_limit=2)
+            service.attach_patch_log(PatchLog(tmp_path / "patches"), state_version=0)
+            epoch = service.current_epoch
+            for request_id in ("req-1", "req-2", "req-3", "req-4"):
+                await service.increment(
+                    "/sheets/mage_template/stats/strength",
+                    1,
+                    request_id=request_id,
+                )
+
+            replay = await service.replay_since(0, epoch=epoch, role="dm")
+            assert [patch.request_id for patch in replay] == [
+                "req-1",
+                "req-2",
+                "req-3",
+                "req-4",
+            ]
+            assert await service.replay_since(0, epoch="another-epoch") is None
+
+            restarted = StateSyncService()
+            restarted.attach_patch_log(PatchLog(tmp_path / "patches"), state_version=4)
+            assert restarted.current_epoch == epoch
+            assert restarted.current_version == 4
+            replay = await restarted.replay_since(1, epoch=epoch, role="dm")
+            assert [patch.state_version for patch in replay] == [2, 3, 4]
+            assert replay[0].ops[0] == PatchOp(
+                op="inc",
+                path="/sheets/mage_template/stats/strength",
+                value=1,
+            )
+
+            # A log that stops short of the persisted state cannot vouch for it.
+            lost_tail = StateSyncService()
+            lost_tail.attach_patch_log(PatchLog(tmp_path / "patches"), state_version=5)
+            assert lost_tail.current_epoch != epoch
+            assert await lost_tail.replay_since(1) is None
+        finally:
+            StateSingleton._state = original_state
+
+    asyncio.run(scenario())
+
+
+def test_patch_log_prefers_a_snapshot_when_the_replay_outweighs_it(tmp_path) -> None:
+    patch_log = PatchLog(tmp_path / "patches", segment_bytes=64, retention_bytes=256)
+    patch_log.open(0)
+    for version in range(1, 11):
+        patch_log.append(
+            build_state_patch(
+                [PatchOp(op="set", path="/notes", value="x" * 40)],
+                state_version=version,
+            )
+        )
+
+    retained = patch_log.read_since(8, max_bytes=1024)
+    assert [patch.state_version for patch in retained] == [9, 10]
+    assert patch_log.read_since(8, max_bytes=100) is None
+    # Segments past the retention budget are dropped oldest first.
+    assert patch_log.size <= 256
+    assert patch_log.read_since(1, max_bytes=1024) is None
+
+
+def test_patch_log_starts_a_new_epoch_when_an_earlier_segment_lost_patches(
+    tmp_path,
+) -> None:
+    patch_log = PatchLog(tmp_path / "patches", segment_bytes=64)
+    epoch = patch_log.open(0)
+    for version in range(1, 7):
+        patch_log.append(
+            build_state_patch(
+                [PatchOp(op="set", path="/notes", value="x" * 40)],
+                state_version=version,
+            )
+        )
+    patch_log.close()
+    assert PatchLog(tmp_path / "patches").open(6) == epoch
+
+    # Unsynced writes can vanish from any segment, not only the last one.
+    first_segment = min((tmp_path / "patches").glob("*.jsonl"))
+    first_segment.write_bytes(b"\0" * first_segment.stat().st_size)
+
+    reopened = PatchLog(tmp_path / "patches")
+    assert reopened.open(6) != epoch
+    assert reopened.read_since(0, max_bytes=1024) is None
+
+
+def test_state_paths_are_parsed_once_and_interned() -> None:
+    joined = state_sync_service.join_path("sheets", "a/b~c", "name")
+    op = PatchOp(op="set", path="/sheets/a~1b~0c/name", value="Mage")
+
+    assert joined == "/sheets/a~1b~0c/name"
+    assert op.path is joined
+    assert op.segments == ("sheets", "a/b~c", "name")
+    assert joined.root == "sheets"
+    assert deepcopy(op).path is joined
+    assert json.dumps(asdict(op)) == (
+        '{"op": "set", "path": "/sheets/a~1b~0c/name", "value": "Mage"}'
+    )
+    assert PatchOp(op="set", path="sheets").path == "sheets"
+    with pytest.raises(ValueError, match="must start with"):
+        state_sync_service._parse_path("sheets")
+
+
+def test_synchronizers_run_only_over_entities_their_inputs_touched() -> None:
+    service = StateSyncService()
+    state = State()
+    scopes: dict[str, list] = {"health": [], "items": []}
+
+    def health(state: State, scope) -> list[PatchOp]:
+        scopes["health"].append(scope.ids("instanced_sheets"))
+        return [PatchOp(op="set", path="/items/potion/weight", value=1)]
+
+    def items(state: State, scope) -> list[PatchOp]:
+        scopes["items"].append(scope.ids("items"))
+        return []
+
+    registry = SynchronizerRegistry(service._parse_path, verify=False)
+    registry.register("health", [("instanced_sheets", "*", "health")], health)
+    registry.register("items", [("items",)], items)
+
+    registry.run(state, [PatchOp(op="set", path="/notes", value="")])
+    registry.run(
+        state,
+        [
+            PatchOp(op="set", path="/instanced_sheets/a/health", value=1),
+            PatchOp(op="set", path="/instanced_sheets/b", value=None),
+            PatchOp(op="set", path="/instanced_sheets/c/mana", value=1),
+        ],
+    )
+    registry.run(state, [PatchOp(op="set", path="/instanced_sheets", value={})])
+
+    assert scopes == {"health": [{"a", "b"}, None], "items": [{"potion"}, {"potion"}]}
+
+
+def test_entity_synchronizers_reconcile_only_the_entities_in_scope() -> None:
+    state = State()
+    state.sheets["mage_template"] = _build_sheet_state()
+    for instance_id in ("mage_instance", "other_instance"):
+        state.instanced_sheets[instance_id] = InstancedSheet.from_dict(
+            {"parent_id": "mage_template", "health": 10, "mana": 10}
+        )
+    state.instanced_sheets["mage_instance"].items["bridge-1"] = ItemBridge(
+        relationship_id="bridge-1",
+        count=1,
+        equipped=True,
+        item_id="sword",
+    )
+    for item_id in ("sword", "shield"):
+        state.items[item_id] = Item.from_dict(
+            {
+                "id": item_id,
+                "name": item_id.title(),
+                "description": "",
+                "price": "1 gp",
+                "player_catalog_access": {
+                    "mode": "selected",
+                    "instance_ids": ["mage_instance", "other_instance"],
+                },
+            }
+        )
+    touched_sword = SynchronizerScope(entity_ids={"items": {"sword"}})
+
+    assert equipment_augmentation_subjects(state, touched_sword) == {
+        ("instanced_sheets", "mage_instance"),
+        ("sheets", "mage_template"),
+    }
+    assert equipment_augmentation_subjects(
+        state, SynchronizerScope(entity_ids={"items": None})
+    ) is None
+    assert catalog_placement_ids(touched_sword) == {"items:sword"}
+
+    del state.instanced_sheets["other_instance"]
+    # Only the item whose own access changed is checked, until the removal of
+    # an instance it grants is part of the scope.
+    assert synchronize_item_player_catalog_access_mutation(state, {"sword"}) == [
+        PatchOp(op="set", path="/items/sword", value=state.items["sword"])
+    ]
+    ops = synchronize_item_player_catalog_access_mutation(
+        state, set(), instance_ids={"other_instance"}
+    )
+    assert [op.path for op in ops] == ["/items/shield"]
+    assert state.items["shield"].player_catalog_access.instance_ids == ["mage_instance"]
+
+
+def test_first_mutation_reconciles_state_that_was_assigned_directly(
+    monkeypatch,
+) -> None:
+    async def scenario() -> None:
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        await websocket_sessions.reset()
+        _reset_state()
+        state = StateSingleton.getState()
+        sheet = _build_sheet_state()
+        state.sheets["mage_template"] = sheet
+        for instance_id in ("mage_instance", "other_instance"):
+            instance = InstancedSheet.from_dict(
+                {"parent_id": "mage_template", "health": 500, "mana": 20}
+            )
+            instance.stats = deepcopy(sheet.stats)
+            state.instanced_sheets[instance_id] = instance
+
+        await state_sync_service.set(
+            "/instanced_sheets/mage_instance/notes", "First", request_id="req-1"
+        )
+        # Nothing touched the other instance, but its health was never clamped.
+        assert state.instanced_sheets["other_instance"].health == 120
+
+        # Later mutations run scoped, so drift introduced behind the service's
+        # back stays put; verification would report it as missed work.
+        monkeypatch.setattr(state_sync_service._synchronizer_registry(), "verify", False)
+        state.instanced_sheets["other_instance"].health = 500
+        await state_sync_service.set(
+            "/instanced_sheets/mage_instance/notes", "Second", request_id="req-2"
+        )
+        assert state.instanced_sheets["other_instance"].health == 500
+
+    asyncio.run(scenario())
+
+
+def test_synchronizer_verification_reports_work_the_scheduled_run_missed() -> None:
+    service = StateSyncService()
+    state = State()
+
+    def clamp(state: State, scope) -> list[PatchOp]:
+        if scope.ids("instanced_sheets") is None:
+            return [PatchOp(op="set", path="/instanced_sheets/a/health", value=0)]
+        return []
+
+    registry = SynchronizerRegistry(service._parse_path, verify=True)
+    registry.register("clamp", [("instanced_sheets",)], clamp)
+
+    with pytest.raises(RuntimeError, match="/instanced_sheets/a/health"):
+        registry.run(
+            state,
+            [PatchOp(op="set", path="/instanced_sheets/a/mana", value=1)],
+        )
@@ -0,0 +1,608 @@
+"""Differential check of patch redaction against the rule chain it replaced."""
+
+import asyncio
+from copy import deepcopy
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+
+import pytest
+from pydantic_core import to_jsonable_python
+
+from backend.core.state_path import join_state_path
+from backend.core.transport import PatchOp
+from backend.dev.dm_examples import INSTANCE_ID, SHADOWBLADE_INSTANCE_ID
+from backend.dev.seed import seed_state
+from backend.features.action_history.service import (
+    serialize_action_history,
+    serialize_action_history_entry,
+)
+from backend.features.session.models import SessionRole
+from backend.features.state_sync.schema import StatePatch
+from backend.features.state_sync.service import (
+    DM_ONLY_STATE_ROOTS,
+    PRIVATE_ITEM_FIELDS,
+    PRIVATE_SHEET_FIELDS,
+    PRIVATE_SHEET_XP_FIELDS,
+    PRIVATE_STATE_ROOTS,
+    StateSyncService,
+    state_sync_service,
+)
+from backend.state.models.action_history import ActionHistoryEntry, ActionHistoryText
+from backend.state.models.augmentation import AugmentationSource
+from backend.state.models.catalog import CatalogEntry, CatalogFolder
+from backend.state.models.condition import ActiveCondition
+from backend.state.models.shared import Bridge
+from backend.state.models.state import State
+from backend.state.store import StateSingleton
+
+AUDIENCES: list[tuple[SessionRole, str | None]] = [
+    ("dm", None),
+    ("player", INSTANCE_ID),
+    ("player", SHADOWBLADE_INSTANCE_ID),
+    ("player", None),
+]
+
+
+# The per-operation rule chain that compiled redaction policies replaced, kept
+# verbatim as the reference the policies must agree with.
+def _reference_redaction(
+    service: StateSyncService,
+    patch: StatePatch,
+    *,
+    role: SessionRole,
+    assigned_instance_id: str | None = None,
+) -> StatePatch:
+    redacted_patch = deepcopy(patch)
+    if not redacted_patch.ops:
+        return redacted_patch
+
+    redacted_ops: list[PatchOp] = []
+    refresh_catalog_projection = False
+    for op in redacted_patch.ops:
+        segments = op.segments
+        if segments and segments[0] in PRIVATE_STATE_ROOTS:
+            continue
+        if segments and segments[0] == "action_history":
+            if op.op == "remove":
+                redacted_ops.append(op)
+                continue
+
+            if len(segments) == 1:
+                serialized_entries = serialize_action_history(
+                    StateSingleton.getState().action_history,
+                    role=role,
+                    assigned_instance_id=assigned_instance_id,
+                )
+                op.value = {
+                    key: value.model_dump(mode="json")
+                    for key, value in serialized_entries.items()
+                }
+                redacted_ops.append(op)
+                continue
+
+            entry_id = segments[1]
+            entry = StateSingleton.getState().action_history.get(entry_id)
+            serialized_entry = (
+                serialize_action_history_entry(
+                    entry,
+                    role=role,
+                    assigned_instance_id=assigned_instance_id,
+                )
+                if entry is not None
+                else None
+            )
+            if serialized_entry is None:
+                if op.op == "set":
+                    redacted_ops.append(PatchOp(op="remove", path=op.path))
+                continue
+
+            redacted_ops.append(
+                PatchOp(
+                    op=op.op if len(segments) == 2 else "set",
+                    path=(
+                        op.path
+                        if len(segments) == 2
+                        else service.join_path("action_history", entry_id)
+                    ),
+                    value=serialized_entry.model_dump(mode="json"),
+                )
+            )
+            continue
+        if role == "dm":
+            redacted_ops.append(op)
+            continue
+
+        if len(segments) == 2 and segments[0] == "items":
+            refresh_catalog_projection = True
+
+        if segments and segments[0] in {"catalog_entries", "catalog_folders"}:
+            projected_state = service._redact_state_for_role(
+                StateSingleton.getState().to_dict(),
+                role=role,
+                assigned_instance_id=assigned_instance_id,
+            )
+            root = segments[0]
+            redacted_ops.append(
+                PatchOp(
+                    op="set",
+                    path=service.join_path(root),
+                    value=projected_state[root],
+                )
+            )
+            continue
+
+        if segments and segments[0] in DM_ONLY_STATE_ROOTS:
+            continue
+
+        # Mirror of the snapshot rule: a player only ever sees their own
+        # claimed instance, so no other instance's mutations are forwarded.
+        if segments and segments[0] == "instanced_sheets":
+            if len(segments) < 2 or segments[1] != assigned_instance_id:
+                continue
+
+        # Enemy templates stay GM-only. A template that becomes `dm_only`
+        # after the client already holds it is turned into a removal so the
+        # client cannot keep serving a stale copy.
+        if len(segments) >= 2 and segments[0] == "sheets":
+            sheet_id = segments[1]
+            if op.op == "remove" and len(segments) == 2:
+                redacted_ops.append(op)
+                continue
+            if not service._player_can_see_sheet(
+                sheet_id,
+                assigned_instance_id=assigned_instance_id,
+            ):
+                if op.op == "set" and len(segments) == 2:
+                    redacted_ops.append(
+                        PatchOp(op="remove", path=service.join_path("sheets", sheet_id))
+                    )
+                continue
+
+        if (
+            len(segments) >= 3
+            and segments[0] == "instanced_sheets"
+            and segments[2] == "items"
+        ):
+            if len(segments) == 4 and op.op in {"add", "set"}:
+                instance = StateSingleton.getState().instanced_sheets.get(
+                    segments[1]
+                )
+                bridge = (
+                    instance.items.get(segments[3])
+                    if instance is not None
+                    else None
+                )
+                if bridge is not None and service._player_can_see_item(
+                    bridge.item_id,
+                    assigned_instance_id=assigned_instance_id,
+                ):
+                    item = StateSingleton.getState().items.get(bridge.item_id)
+                    if item is not None:
+                        redacted_ops.append(
+                            PatchOp(
+                                op="set",
+                                path=service.join_path("items", bridge.item_id),
+                                value=service._redact_item_payload(item),
+                            )
+                        )
+            redacted_ops.append(op)
+            continue
+
+        if len(segments) >= 2 and segments[0] == "items":
+            item_id = segments[1]
+            if (
+                len(segments) >= 3
+                and segments[2] in PRIVATE_ITEM_FIELDS
+            ):
+                continue
+            if op.op == "remove" and len(segments) == 2:
+                redacted_ops.append(op)
+                continue
+            visible = service._player_can_see_item(
+                item_id,
+                assigned_instance_id=assigned_instance_id,
+            )
+            if not visible:
+                if op.op == "set":
+                    redacted_ops.append(
+                        PatchOp(
+                            op="remove",
+                            path=service.join_path("items", item_id),
+                        )
+                    )
+                continue
+            if len(segments) >= 4 and segments[2] == "attributes":
+                current_attribute = StateSingleton.getState().attributes.get(
+                    segments[3]
+                )
+                if (
+                    current_attribute is not None
+                    and current_attribute.visibility != "gm_only"
+                ):
+                    redacted_ops.append(op)
+                elif op.op == "remove":
+                    redacted_ops.append(op)
+                elif op.op == "set":
+                    redacted_ops.append(PatchOp(op="remove", path=op.path))
+                continue
+            if len(segments) == 2:
+                current_item = StateSingleton.getState().items.get(item_id)
+                if current_item is not None:
+                    op.value = service._redact_item_payload(current_item)
+            else:
+                op.value = service._redact_item_payload(op.value)
+            redacted_ops.append(op)
+            continue
+
+        if len(segments) >= 2 and segments[0] == "attributes":
+            if op.op == "remove":
+                redacted_ops.append(op)
+                continue
+            current_attribute = StateSingleton.getState().attributes.get(segments[1])
+            if current_attribute is not None and current_attribute.visibility != "gm_only":
+                redacted_ops.append(op)
+            elif op.op == "set":
+                redacted_ops.append(PatchOp(op="remove", path=op.path))
+            continue
+
+        if (
+            len(segments) >= 4
+            and segments[0] == "sheets"
+            and segments[2] == "attributes"
+        ):
+            current_attribute = StateSingleton.getState().attributes.get(segments[3])
+            if current_attribute is not None and current_attribute.visibility != "gm_only":
+                redacted_ops.append(op)
+            elif op.op == "remove":
+                redacted_ops.append(op)
+            elif op.op == "set":
+                redacted_ops.append(PatchOp(op="remove", path=op.path))
+            continue
+
+        if (
+            len(segments) >= 4
+            and segments[0] in {"items", "actions"}
+            and segments[2] == "attributes"
+        ):
+            current_attribute = StateSingleton.getState().attributes.get(segments[3])
+            if current_attribute is not None and current_attribute.visibility != "gm_only":
+                redacted_ops.append(op)
+            elif op.op == "remove":
+                redacted_ops.append(op)
+            elif op.op == "set":
+                redacted_ops.append(PatchOp(op="remove", path=op.path))
+            continue
+
+        if len(segments) >= 2 and segments[0] == "active_conditions":
+            if op.op == "remove":
+                redacted_ops.append(op)
+                continue
+            value = asdict(op.value) if is_dataclass(op.value) else op.value
+            visible = (
+                isinstance(value, dict)
+                and value.get("visibility") != "gm_only"
+                and value.get("instance_id") == assigned_instance_id
+            )
+            if visible:
+                redacted_ops.append(op)
+            elif op.op == "set":
+                redacted_ops.append(PatchOp(op="remove", path=op.path))
+            continue
+
+        if (
+            len(segments) >= 2
+            and segments[0] == "standalone_effect_applications"
+        ):
+            if op.op == "remove":
+                visible_prefix = f"standalone:{assigned_instance_id}:"
+                if segments[1].startswith(visible_prefix):
+                    redacted_ops.append(op)
+                continue
+            value = asdict(op.value) if is_dataclass(op.value) else op.value
+            visible = (
+                isinstance(value, dict)
+                and value.get("instance_id") == assigned_instance_id
+            )
+            if visible:
+                redacted_ops.append(op)
+            elif op.op == "set":
+                redacted_ops.append(PatchOp(op="remove", path=op.path))
+            continue
+
+        if len(segments) >= 2 and segments[0] == "condition_presets":
+            if op.op == "remove":
+                redacted_ops.append(op)
+                continue
+            value = asdict(op.value) if is_dataclass(op.value) else op.value
+            visible = not (
+                isinstance(value, dict) and value.get("visibility") == "gm_only"
+            )
+            if visible:
+                redacted_ops.append(op)
+            elif op.op == "set":
+                redacted_ops.append(PatchOp(op="remove", path=op.path))
+            continue
+
+        if len(segments) >= 2 and segments[0] == "augmentations":
+            if op.op == "remove":
+                redacted_ops.append(op)
+                continue
+            current_augmentation = StateSingleton.getState().augmentations.get(
+                segments[1]
+            )
+            if (
+                current_augmentation is None
+                and segments[1].startswith("condition:")
+            ):
+                continue
+            if (
+                current_augmentation is not None
+                and current_augmentation.source.type == "condition"
+            ):
+                active_condition = StateSingleton.getState().active_conditions.get(
+                    current_augmentation.source.application_id
+                )
+                visible = (
+                    active_condition is not None
+                    and active_condition.visibility != "gm_only"
+                    and active_condition.instance_id == assigned_instance_id
+                )
+                if visible:
+                    redacted_ops.append(op)
+                elif op.op == "set" and len(segments) == 2:
+                    redacted_ops.append(PatchOp(op="remove", path=op.path))
+                continue
+            value = asdict(op.value) if is_dataclass(op.value) else op.value
+            source = value.get("source") if isinstance(value, dict) else None
+            if isinstance(source, dict) and source.get("type") == "condition":
+                active_condition = StateSingleton.getState().active_conditions.get(
+                    source.get("application_id")
+                )
+                visible = (
+                    active_condition is not None
+                    and active_condition.visibility != "gm_only"
+                    and active_condition.instance_id == assigned_instance_id
+                )
+                if visible:
+                    redacted_ops.append(op)
+                elif op.op == "set":
+                    redacted_ops.append(PatchOp(op="remove", path=op.path))
+                continue
+
+        if (
+            len(segments) >= 4
+            and segments[0] == "instanced_sheets"
+            and segments[2] == "augments"
+        ):
+            if op.op == "remove":
+                if segments[1] == assigned_instance_id:
+                    redacted_ops.append(op)
+                continue
+            augmentation = StateSingleton.getState().augmentations.get(segments[3])
+            if augmentation is not None and augmentation.source.type == "condition":
+                active_condition = StateSingleton.getState().active_conditions.get(
+                    augmentation.source.application_id
+                )
+                visible = (
+                    active_condition is not None
+                    and active_condition.visibility != "gm_only"
+                    and active_condition.instance_id == assigned_instance_id
+                )
+                if visible:
+                    redacted_ops.append(op)
+                elif op.op == "set":
+                    redacted_ops.append(PatchOp(op="remove", path=op.path))
+                continue
+        if (
+            len(segments) >= 3
+            and segments[0] == "sheets"
+            and segments[2] in PRIVATE_SHEET_FIELDS | PRIVATE_SHEET_XP_FIELDS
+        ):
+            continue
+
+        if len(segments) == 2 and segments[0] == "sheets":
+            op.value = service._redact_sheet_payload(op.value)
+
+        if len(segments) >= 2 and segments[0] == "actions":
+            if is_dataclass(op.value):
+                op.value = asdict(op.value)
+            if isinstance(op.value, dict):
+                service._redact_subject_attributes(op.value)
+        redacted_ops.append(op)
+
+    if refresh_catalog_projection:
+        projected_state = service._redact_state_for_role(
+            StateSingleton.getState().to_dict(),
+            role=role,
+            assigned_instance_id=assigned_instance_id,
+        )
+        redacted_ops = [
+            op
+            for op in redacted_ops
+            if op.path
+            not in {
+                service.join_path("catalog_entries"),
+                service.join_path("catalog_folders"),
+            }
+        ]
+        for root in ("catalog_folders", "catalog_entries"):
+            redacted_ops.append(
+                PatchOp(
+                    op="set",
+                    path=service.join_path(root),
+                    value=projected_state[root],
+                )
+            )
+    redacted_patch.ops = redacted_ops
+    return redacted_patch
+
+
+@pytest.fixture(scope="module")
+def campaign_state(tmp_path_factory: pytest.TempPathFactory) -> State:
+    target: Path = tmp_path_factory.mktemp("redaction") / "state.json"
+    original_state = StateSingleton._state
+    try:
+        state = asyncio.run(seed_state(target))
+    finally:
+        StateSingleton._state = original_state
+    return _with_hidden_details(state)
+
+
+def _with_hidden_details(state: State) -> State:
+    """The seed plus the GM-only and per-instance records it does not carry."""
+    state = State.from_dict(state.to_dict(include_private=True))
+    next(iter(state.attributes.values())).visibility = "gm_only"
+
+    conditions = [
+        ("condition-own", INSTANCE_ID, "public"),
+        ("condition-own-hidden", INSTANCE_ID, "gm_only"),
+        ("condition-other", SHADOWBLADE_INSTANCE_ID, "public"),
+    ]
+    template = next(iter(state.augmentations.values()))
+    for application_id, instance_id, visibility in conditions:
+        augmentation_id = f"condition:{application_id}"
+        state.active_conditions[application_id] = ActiveCondition(
+            application_id=application_id,
+            condition_id="blinded",
+            condition_name="Blinded",
+            description="",
+            visibility=visibility,
+            instance_id=instance_id,
+            augmentation_ids=[augmentation_id],
+        )
+        augmentation = deepcopy(template)
+        augmentation.id = augmentation_id
+        augmentation.source = AugmentationSource(
+            type="condition",
+            application_id=application_id,
+        )
+        state.augmentations[augmentation_id] = augmentation
+        instance = state.instanced_sheets[instance_id]
+        instance.augments[augmentation_id] = Bridge(
+            relationship_id=f"bridge-{application_id}",
+            entry_id=augmentation_id,
+        )
+
+    pending_item = next(iter(state.items.values()))
+    pending_item.approval_status = "pending"
+    pending_item.submitted_by_instance_id = SHADOWBLADE_INSTANCE_ID
+
+    state.catalog_folders["gear"] = CatalogFolder(id="gear", catalog="items", name="Gear")
+    for item_id in state.items:
+        state.catalog_entries[f"entry-{item_id}"] = CatalogEntry(
+            id=f"entry-{item_id}",
+            catalog="items",
+            entry_id=item_id,
+            folder_id="gear",
+        )
+    state.action_history["history-1"] = ActionHistoryEntry(
+        id="history-1",
+        request_id="request-1",
+        action_id="fire_bolt",
+        action_name="Fire Bolt",
+        actor_role="player",
+        actor_sheet_id="mage",
+        actor_instance_id=INSTANCE_ID,
+        target_sheet_id=None,
+        created_at="2026-06-18T12:00:00Z",
+        state_version=7,
+        status="success",
+        public_summary="Fire Bolt succeeded.",
+        gm_summary="Fire Bolt resolved from @arcane * 2.",
+        emitted_messages=[ActionHistoryText("GM detail", visibility="gm_only")],
+    )
+    return state
+
+
+def _operations(state: State) -> list[PatchOp]:
+    """Every operation kind at paths down to depth four of three entities per root."""
+    paths: list[tuple[tuple[str, ...], object]] = []
+    document = state.to_dict(include_private=True)
+    for root, collection in document.items():
+        paths.append(((root,), collection))
+        if not isinstance(collection, dict):
+            continue
+        for key, entity in list(collection.items())[:3]:
+            paths.append(((root, key), entity))
+            live = getattr(state, root, None)
+            if isinstance(live, dict) and is_dataclass(live.get(key)):
+                paths.append(((root, key), live[key]))
+            # Any change under a catalog root re-sends the whole projected root.
+            if not isinstance(entity, dict) or root.startswith("catalog_"):
+                continue
+            for field_name, value in entity.items():
+                paths.append(((root, key, field_name), value))
+                if isinstance(value, dict):
+                    for child_key in list(value)[:1]:
+                        paths.append(((root, key, field_name, child_key), value[child_key]))
+    paths.extend(
+        [
+            (("augmentations", "condition:gone"), {"source": {"type": "condition"}}),
+            (
+                ("standalone_effect_applications", f"standalone:{INSTANCE_ID}:1"),
+                {"instance_id": INSTANCE_ID},
+            ),
+            (
+                ("standalone_effect_applications", f"standalone:{SHADOWBLADE_INSTANCE_ID}:1"),
+                {"instance_id": SHADOWBLADE_INSTANCE_ID},
+            ),
+            (("condition_presets", "hidden"), {"visibility": "gm_only"}),
+            (("sheets", "missing", "name"), "Nobody"),
+            (("items", "missing"), {"name": "Ghost"}),
+        ]
+    )
+
+    operations: list[PatchOp] = []
+    for segments, value in paths:
+        path = join_state_path(*segments)
+        operations.extend(
+            [
+                PatchOp(op="set", path=path, value=deepcopy(value)),
+                PatchOp(op="add", path=path, value=deepcopy(value)),
+                PatchOp(op="remove", path=path),
+                PatchOp(op="inc", path=path, value=1),
+            ]
+        )
+    return operations
+
+
+def _redact(redaction, operations: list[PatchOp], role, assigned_instance_id):
+    patch = StatePatch(
+        response_id=None,
+        ops=deepcopy(operations),
+        state_version=1,
+        request_id="request",
+    )
+    try:
+        redacted = redaction(patch, role=role, assigned_instance_id=assigned_instance_id)
+    except Exception as error:  # noqa: BLE001 - both sides must fail alike
+        return type(error)
+    return to_jsonable_python(redacted.ops)
+
+
+@pytest.mark.parametrize(("role", "assigned_instance_id"), AUDIENCES)
+def test_compiled_redaction_matches_reference_rules(
+    campaign_state: State,
+    role: SessionRole,
+    assigned_instance_id: str | None,
+) -> None:
+    original_state = StateSingleton._state
+    StateSingleton._state = campaign_state
+    try:
+        operations = _operations(campaign_state)
+
+        def reference(patch, **audience):
+            return _reference_redaction(state_sync_service, patch, **audience)
+
+        mismatches = [
+            op.path
+            for op in operations
+            if _redact(state_sync_service._redact_patch_for_role, [op], role, assigned_instance_id)
+            != _redact(reference, [op], role, assigned_instance_id)
+        ]
+        assert mismatches == []
+        assert _redact(
+            state_sync_service._redact_patch_for_role, operations, role, assigned_instance_id
+        ) == _redact(reference, operations, role, assigned_instance_id)
+    finally:
+        StateSingleton._state = original_state
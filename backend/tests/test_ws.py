@@ -13,6 +13,7 @@ from backend.features.auth.tokens import (
 )
 from backend.features.chat import service as chat_service
 from backend.features.state_sync import handler as state_sync_handler
+from backend.features.state_sync.schema import RequestBatch
 from backend.features.state_sync.service import state_sync_service
 from backend.routes.ws import (
     AUTH_CLOSE_CODE,
@@ -24,6 +25,7 @@ from backend.routes.ws import (
     handle_client_payload,
     websocket_sessions,
 )
+from backend.protocol.socket import _SERVER_EVENT_ADAPTER, parse_application_request
 from backend.state.models.action import Action
 from backend.state.models.access_code import SheetAccessCode
 from backend.state.models.sheet import InstancedSheet, Sheet
@@ -57,6 +59,9 @@ class FakeWebSocket:
                 websocket=self,
             )
 
+    async def send_text(self, data: str) -> None:
+        await self.send_json(json.loads(data))
+
     async def receive_text(self) -> str:
         raise RuntimeError("receive_text not implemented for FakeWebSocket")
 
@@ -213,6 +218,145 @@ def test_connections_start_unauthenticated() -> None:
     asyncio.run(scenario())
 
 
+def _notice(reason: str) -> dict:
+    return {"response_id": None, "reason": reason, "type": "error", "request_id": None}
+
+
+def test_stalled_socket_does_not_hold_up_broadcasts_to_other_sessions() -> None:
+    class StalledWebSocket(FakeWebSocket):
+        def __init__(self) -> None:
+            super().__init__()
+            self.release = asyncio.Event()
+
+        async def send_json(self, payload: dict) -> None:
+            await self.release.wait()
+            await super().send_json(payload)
+
+    async def scenario() -> None:
+        await websocket_sessions.reset()
+        stalled = StalledWebSocket()
+        healthy = FakeWebSocket()
+        await websocket_sessions.connect(stalled, role="player")
+        await websocket_sessions.connect(healthy, role="player")
+
+        await asyncio.wait_for(
+            websocket_sessions.broadcast(_notice("first")),
+            timeout=1,
+        )
+        await websocket_sessions.broadcast(_notice("second"))
+
+        assert [message["reason"] for message in healthy.sent_messages] == [
+            "first",
+            "second",
+        ]
+        assert stalled.sent_messages == []
+
+        stalled.release.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert [message["reason"] for message in stalled.sent_messages] == [
+            "first",
+            "second",
+        ]
+        await websocket_sessions.reset()
+
+    asyncio.run(scenario())
+
+
+def test_session_that_overflows_its_send_queue_is_evicted(monkeypatch) -> None:
+    from backend.features.session import service as session_service
+
+    class StalledWebSocket(FakeWebSocket):
+        async def send_json(self, payload: dict) -> None:
+            await asyncio.Event().wait()
+
+    monkeypatch.setattr(session_service, "SEND_QUEUE_LIMIT", 2)
+
+    async def scenario() -> None:
+        await websocket_sessions.reset()
+        stalled = StalledWebSocket()
+        healthy = FakeWebSocket()
+        await websocket_sessions.connect(stalled, role="player")
+        await websocket_sessions.connect(healthy, role="player")
+
+        for index in range(4):
+            await websocket_sessions.broadcast(_notice(f"event-{index}"))
+        await asyncio.sleep(0)
+
+        assert stalled.closed_code == session_service.SLOW_CONSUMER_CLOSE_CODE
+        assert len(healthy.sent_messages) == 4
+        assert await websocket_sessions.group_counts() == {"dms": 0, "players": 1}
+        with pytest.raises(ValueError, match="not connected"):
+            await websocket_sessions.get_session(stalled)
+
+    asyncio.run(scenario())
+
+
+def test_request_errors_queue_behind_events_already_in_the_outbox() -> None:
+    class StalledWebSocket(FakeWebSocket):
+        def __init__(self) -> None:
+            super().__init__()
+            self.release = asyncio.Event()
+
+        async def send_json(self, payload: dict) -> None:
+            await self.release.wait()
+            await super().send_json(payload)
+
+    async def scenario() -> None:
+        await websocket_sessions.reset()
+        websocket = StalledWebSocket()
+        await websocket_sessions.connect(websocket, role="player")
+
+        await websocket_sessions.broadcast(_notice("first"))
+        await asyncio.wait_for(
+            handle_client_payload(websocket, {"request_id": "req-untyped"}),
+            timeout=1,
+        )
+        assert websocket.sent_messages == []
+
+        websocket.release.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert [message["reason"] for message in websocket.sent_messages] == [
+            "first",
+            "type: Field required",
+        ]
+        await websocket_sessions.reset()
+
+    asyncio.run(scenario())
+
+
+def test_evicted_socket_is_not_handled_or_registered_again(monkeypatch) -> None:
+    from backend.features.session import service as session_service
+
+    class StalledWebSocket(FakeWebSocket):
+        async def send_json(self, payload: dict) -> None:
+            await asyncio.Event().wait()
+
+    monkeypatch.setattr(session_service, "SEND_QUEUE_LIMIT", 1)
+
+    async def scenario() -> None:
+        await websocket_sessions.reset()
+        stalled = StalledWebSocket()
+        await websocket_sessions.connect(stalled, role="player")
+        for index in range(3):
+            await websocket_sessions.broadcast(_notice(f"event-{index}"))
+        await asyncio.sleep(0)
+        assert stalled.closed_code == session_service.SLOW_CONSUMER_CLOSE_CODE
+
+        await handle_client_payload(stalled, {"request_id": "req-untyped"})
+        await authenticate_application_websocket(
+            stalled,
+            {"type": "authenticate", "token": PLAYER_JOIN_CODE},
+        )
+
+        with pytest.raises(ValueError, match="not connected"):
+            await websocket_sessions.get_session(stalled)
+        assert await websocket_sessions.group_counts() == {"dms": 0, "players": 0}
+
+    asyncio.run(scenario())
+
+
 def test_authenticate_application_websocket_accepts_player_code() -> None:
     async def scenario() -> None:
         await websocket_sessions.reset()
@@ -828,6 +972,7 @@ def test_unauthenticated_socket_can_retry_authentication_without_reconnecting()
                     "sheets": {},
                 },
                 "state_version": 0,
+                "state_epoch": state_sync_service.current_epoch,
                 "type": "state_snapshot",
                 "request_id": None,
             },
@@ -887,6 +1032,7 @@ def test_handle_client_payload_bootstraps_player_session_after_authentication()
                     "sheets": {},
                 },
                 "state_version": 0,
+                "state_epoch": state_sync_service.current_epoch,
                 "type": "state_snapshot",
                 "request_id": None,
             },
@@ -947,6 +1093,7 @@ def test_handle_client_payload_bootstraps_dm_session_after_authentication() -> N
                     "sheets": {},
                 },
                 "state_version": 0,
+                "state_epoch": state_sync_service.current_epoch,
                 "type": "state_snapshot",
                 "request_id": None,
             },
@@ -1412,6 +1559,242 @@ def test_websocket_contract_undo_last_state_change_broadcasts_inverse_patch(
     asyncio.run(scenario())
 
 
+def _health_adjustment(request_id: str, delta: int) -> dict:
+    return {
+        "type": "adjust_instanced_sheet_resource",
+        "instance_id": "mage_instance",
+        "resource": "health",
+        "delta": delta,
+        "request_id": request_id,
+    }
+
+
+def test_batch_commits_its_requests_as_one_patch_and_one_undo_entry(
+    monkeypatch,
+) -> None:
+    async def scenario() -> None:
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        state = StateSingleton.getState()
+        state.instanced_sheets["mage_instance"] = _build_instance_state()
+        await websocket_sessions.reset()
+        dm_socket = FakeWebSocket()
+        await websocket_sessions.connect(dm_socket, role="dm")
+
+        await handle_client_payload(
+            dm_socket,
+            {
+                "type": "batch",
+                "request_id": "req-batch",
+                "requests": [
+                    _health_adjustment("req-1", -5),
+                    _health_adjustment("req-2", -10),
+                ],
+            },
+        )
+
+        patch, completed = dm_socket.sent_messages
+        assert patch["type"] == "state_patch"
+        assert patch["request_id"] == "req-batch"
+        assert patch["state_version"] == 1
+        assert [op["value"] for op in patch["ops"]] == [85, 75]
+        assert completed == {
+            "response_id": None,
+            "applied": True,
+            "results": [
+                {
+                    "index": 0,
+                    "request_type": "adjust_instanced_sheet_resource",
+                    "request_id": "req-1",
+                    "status": "applied",
+                    "reason": None,
+                },
+                {
+                    "index": 1,
+                    "request_type": "adjust_instanced_sheet_resource",
+                    "request_id": "req-2",
+                    "status": "applied",
+                    "reason": None,
+                },
+            ],
+            "state_version": 1,
+            "type": "batch_completed",
+            "request_id": "req-batch",
+        }
+        assert state.instanced_sheets["mage_instance"].health == 75
+        assert state_sync_service.undo_depth == 1
+
+        await state_sync_service.undo_last_change(request_id="req-undo")
+        assert state.instanced_sheets["mage_instance"].health == 90
+
+    asyncio.run(scenario())
+
+
+def test_failed_batch_request_rolls_back_the_whole_batch(monkeypatch) -> None:
+    async def scenario() -> None:
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        state = StateSingleton.getState()
+        state.instanced_sheets["mage_instance"] = _build_instance_state()
+        await websocket_sessions.reset()
+        dm_socket = FakeWebSocket()
+        await websocket_sessions.connect(dm_socket, role="dm")
+
+        await handle_client_payload(
+            dm_socket,
+            {
+                "type": "batch",
+                "request_id": "req-batch",
+                "requests": [
+                    _health_adjustment("req-1", -5),
+                    {"type": "undo_last_state_change", "request_id": "req-2"},
+                    _health_adjustment("req-3", -10),
+                ],
+            },
+        )
+
+        (completed,) = dm_socket.sent_messages
+        assert completed["applied"] is False
+        assert completed["state_version"] == 0
+        assert [
+            (result["status"], result["reason"]) for result in completed["results"]
+        ] == [
+            ("rolled_back", None),
+            ("failed", "Undo cannot run inside a request batch."),
+            ("skipped", None),
+        ]
+        assert state.instanced_sheets["mage_instance"].health == 90
+        assert state_sync_service.current_version == 0
+
+        # The rolled-back request IDs were never processed, so a retry runs.
+        await handle_client_payload(dm_socket, _health_adjustment("req-1", -5))
+        assert state.instanced_sheets["mage_instance"].health == 85
+
+    asyncio.run(scenario())
+
+
+def test_batch_round_trips_through_the_protocol_schema(monkeypatch) -> None:
+    """A batch request and every frame it produces parse as protocol types."""
+
+    async def send_batch(socket: FakeWebSocket, payload: dict) -> list[dict]:
+        request = parse_application_request(payload)
+        assert isinstance(request, RequestBatch)
+        assert request.requests == payload["requests"]
+        start = len(socket.sent_messages)
+        await handle_client_payload(socket, payload)
+        frames = socket.sent_messages[start:]
+        for frame in frames:
+            event = _SERVER_EVENT_ADAPTER.validate_python(frame)
+            assert event.model_dump(mode="json") == frame
+        return frames
+
+    async def scenario() -> None:
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        state = StateSingleton.getState()
+        state.instanced_sheets["mage_instance"] = _build_instance_state()
+        await websocket_sessions.reset()
+        dm_socket = FakeWebSocket()
+        await websocket_sessions.connect(dm_socket, role="dm")
+
+        committed = await send_batch(
+            dm_socket,
+            {
+                "type": "batch",
+                "request_id": "req-batch",
+                "requests": [
+                    _health_adjustment("req-1", -5),
+                    _health_adjustment("req-2", -10),
+                ],
+            },
+        )
+        assert [frame["type"] for frame in committed] == [
+            "state_patch",
+            "batch_completed",
+        ]
+        patch, completed = committed
+        assert patch["request_id"] == completed["request_id"] == "req-batch"
+        assert completed["applied"] is True
+        assert completed["state_version"] == patch["state_version"]
+        assert [
+            (result["request_id"], result["status"]) for result in completed["results"]
+        ] == [("req-1", "applied"), ("req-2", "applied")]
+
+        (rolled_back,) = await send_batch(
+            dm_socket,
+            {
+                "type": "batch",
+                "request_id": "req-failed-batch",
+                "requests": [
+                    _health_adjustment("req-3", -5),
+                    {**_health_adjustment("req-4", -5), "instance_id": "missing"},
+                    _health_adjustment("req-5", -5),
+                ],
+            },
+        )
+        assert rolled_back["type"] == "batch_completed"
+        assert rolled_back["request_id"] == "req-failed-batch"
+        assert rolled_back["applied"] is False
+        assert rolled_back["state_version"] == completed["state_version"]
+        assert [
+            (result["request_id"], result["status"])
+            for result in rolled_back["results"]
+        ] == [
+            ("req-3", "rolled_back"),
+            ("req-4", "failed"),
+            ("req-5", "skipped"),
+        ]
+        assert rolled_back["results"][1]["reason"]
+
+    asyncio.run(scenario())
+
+
+def test_patches_inside_the_coalescing_window_arrive_as_one_frame(
+    monkeypatch,
+) -> None:
+    async def scenario() -> None:
+        monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
+        monkeypatch.setattr(websocket_sessions, "coalesce_window_ms", 20)
+        state = StateSingleton.getState()
+        state.instanced_sheets["mage_instance"] = _build_instance_state()
+        await websocket_sessions.reset()
+        dm_socket = FakeWebSocket()
+        player_socket = FakeWebSocket()
+        await websocket_sessions.connect(dm_socket, role="dm")
+        await _connect_assigned_player(player_socket)
+
+        for index, delta in enumerate((-5, -10, -15), start=1):
+            await handle_client_payload(
+                dm_socket, _health_adjustment(f"req-{index}", delta)
+            )
+        await asyncio.sleep(0.05)
+
+        expected = {
+            "response_id": None,
+            "ops": [
+                {
+                    "op": "set",
+                    "path": "/instanced_sheets/mage_instance/health",
+                    "value": 60,
+                }
+            ],
+            "base_version": 0,
+            "state_version": 3,
+            "versions": [
+                {"state_version": 1, "request_id": "req-1"},
+                {"state_version": 2, "request_id": "req-2"},
+                {"state_version": 3, "request_id": "req-3"},
+            ],
+            "type": "coalesced_state_patch",
+            "request_id": "req-3",
+        }
+        assert dm_socket.sent_messages == [expected]
+        assert player_socket.sent_messages == [expected]
+
+        # History keeps every version for replay.
+        replay = await state_sync_service.replay_since(1, role="dm")
+        assert [patch.state_version for patch in replay] == [2, 3]
+
+    asyncio.run(scenario())
+
+
 def test_websocket_contract_resync_replays_missing_patch(monkeypatch) -> None:
     async def scenario() -> None:
         monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
@@ -1688,6 +2071,7 @@ def test_state_sync_bootstrap_sends_snapshot() -> None:
                     "sheets": {},
                 },
                 "state_version": 0,
+                "state_epoch": state_sync_service.current_epoch,
                 "type": "state_snapshot",
                 "request_id": None,
             },
@@ -1739,6 +2123,7 @@ def test_resync_state_returns_state_snapshot() -> None:
                     "sheets": {},
                 },
                 "state_version": 0,
+                "state_epoch": state_sync_service.current_epoch,
                 "type": "state_snapshot",
                 "request_id": "req-1",
             }
@@ -1783,11 +2168,11 @@ def test_dm_can_import_state_backup_and_broadcasts_full_snapshots(
     async def scenario() -> None:
         await websocket_sessions.reset()
         monkeypatch.setattr(StateSingleton, "dumpState", lambda: None)
-        monkeypatch.setattr(
-            StateSingleton,
-            "replaceState",
-            staticmethod(lambda state: setattr(StateSingleton, "_state", state)),
-        )
+
+        async def replace_state(state, **_) -> None:
+            StateSingleton._state = state
+
+        monkeypatch.setattr(StateSingleton, "replaceStateAsync", replace_state)
         dm_socket = FakeWebSocket()
         player_socket = FakeWebSocket()
         await websocket_sessions.connect(dm_socket, role="dm")
@@ -1,4 +1,5 @@
 import asyncio
+import json
 from copy import deepcopy
 
 from backend.features.state_sync.service import state_sync_service
@@ -18,6 +19,9 @@ class FakeWebSocket:
     async def send_json(self, payload: dict) -> None:
         self.sent_messages.append(payload)
 
+    async def send_text(self, data: str) -> None:
+        await self.send_json(json.loads(data))
+
 
 def _sheet(sheet_id: str, name: str, *, dm_only: bool, xp: float = 0) -> Sheet:
     formula = {"aliases": None, "text": "0"}
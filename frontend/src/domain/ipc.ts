@@ -109,7 +109,12 @@ export type ServerEvent =
       type: "snapshot";
       snapshot: AppSnapshot;
       stateVersion?: number;
+      stateEpoch?: string;
       incremental?: boolean;
+      // Set when one frame merged several patches: the version it applies to
+      // and the request behind each merged version.
+      baseVersion?: number;
+      requestIds?: string[];
       requestId?: string;
     }
   | { type: "ack"; requestId: string }
@@ -66,6 +66,12 @@ describe("useGameClient feedback messages", () => {
         generate_access_code: true
       })
     ).toBe(false);
+    expect(
+      requestResolvesOnSnapshot({
+        type: "batch",
+        requests: [{ type: "undo_last_state_change" }]
+      })
+    ).toBe(false);
     expect(
       requestResolvesOnSnapshot({
         type: "set_instanced_sheet_resource",
@@ -48,6 +48,9 @@ export function requestResolvesOnSnapshot(request: ProtocolApplicationRequest):
   if (request.type === "perform_action") {
     return false;
   }
+  if (request.type === "batch") {
+    return false;
+  }
   if (request.type === "create_instanced_sheet" && request.generate_access_code) {
     return false;
   }
@@ -165,12 +168,13 @@ export function useGameClient(): GameClient {
       }
       if (event.type === "snapshot") {
         dispatch({ type: "apply_snapshot", snapshot: event.snapshot });
-        if (event.requestId) {
-          const metadata = pendingIntentMapRef.current[event.requestId];
+        const requestIds = event.requestIds ?? (event.requestId ? [event.requestId] : []);
+        requestIds.forEach((requestId) => {
+          const metadata = pendingIntentMapRef.current[requestId];
           if (metadata?.resolvesOnSnapshot) {
-            resolveIntent(event.requestId);
+            resolveIntent(requestId);
           }
-        }
+        });
         return;
       }
       if (event.type === "ack") {
@@ -183,6 +183,7 @@ describe("ManagedGameClient", () => {
       type: "snapshot",
       snapshot: emptySnapshot(),
       stateVersion: 5,
+      stateEpoch: "epoch-1",
       incremental: false
     });
     transport.emit({
@@ -205,6 +206,7 @@ describe("ManagedGameClient", () => {
       throw new Error("Expected resync_state request");
     }
     expect(transport.protocolRequests[0].last_seen_version).toBe(5);
+    expect(transport.protocolRequests[0].last_seen_epoch).toBe("epoch-1");
 
     transport.emit({
       type: "snapshot",
@@ -221,6 +223,40 @@ describe("ManagedGameClient", () => {
     });
   });
 
+  it("accepts a coalesced patch that starts at the last seen version", async () => {
+    const transport = new FakeTransport();
+    const client = new ManagedGameClient({
+      transportFactory: () => transport
+    });
+    const events: ServerEvent[] = [];
+    client.onEvent((event) => events.push(event));
+
+    await client.connect();
+    transport.emit({
+      type: "snapshot",
+      snapshot: emptySnapshot(),
+      stateVersion: 5,
+      incremental: false
+    });
+    transport.emit({
+      type: "snapshot",
+      snapshot: emptySnapshot(),
+      stateVersion: 8,
+      baseVersion: 5,
+      requestIds: ["req-6", "req-8"],
+      incremental: true
+    });
+    transport.emit({
+      type: "snapshot",
+      snapshot: emptySnapshot(),
+      stateVersion: 9,
+      incremental: true
+    });
+
+    expect(transport.protocolRequests).toEqual([]);
+    expect(events.map((event) => event.type)).toEqual(["snapshot", "snapshot", "snapshot"]);
+  });
+
   it("schedules websocket reconnects with backoff and re-authenticates after a dropped connection", async () => {
     const transports: FakeTransport[] = [];
     const scheduledReconnects: Array<{ delayMs: number; callback: () => void; canceled: boolean }> =
@@ -59,6 +59,7 @@ export class ManagedGameClient {
   private cancelScheduledReconnect: TransportUnsubscribe | null = null;
   private authToken: string | null = null;
   private lastSeenStateVersion: number | null = null;
+  private lastSeenStateEpoch: string | null = null;
   private connectionState: ClientConnectionState;
   private desiredConnected = false;
   private reconnectAttempt = 0;
@@ -153,6 +154,7 @@ export class ManagedGameClient {
     this.clearTransport();
     transport?.disconnect();
     this.lastSeenStateVersion = null;
+    this.lastSeenStateEpoch = null;
     this.reconnectAttempt = 0;
     this.updateConnectionState({
       ...this.connectionState,
@@ -241,7 +243,8 @@ export class ManagedGameClient {
     const requestId = makeId("resync");
     const request = buildResyncStateRequest({
       requestId,
-      lastSeenVersion: this.lastSeenStateVersion
+      lastSeenVersion: this.lastSeenStateVersion,
+      lastSeenEpoch: this.lastSeenStateEpoch
     });
     this.transport.sendProtocolRequest(request);
     return requestId;
@@ -261,10 +264,11 @@ export class ManagedGameClient {
       }
 
       if (event.type === "snapshot" && typeof event.stateVersion === "number") {
+        const baseVersion = event.baseVersion ?? event.stateVersion - 1;
         if (
           event.incremental &&
           this.lastSeenStateVersion !== null &&
-          event.stateVersion !== this.lastSeenStateVersion + 1
+          baseVersion !== this.lastSeenStateVersion
         ) {
           const requestId = this.requestResync();
           if (requestId) {
@@ -278,6 +282,11 @@ export class ManagedGameClient {
           return;
         }
         this.lastSeenStateVersion = event.stateVersion;
+        if (!event.incremental) {
+          // Versions only line up within one epoch; the server answers a
+          // resync from another epoch with a snapshot instead of patches.
+          this.lastSeenStateEpoch = event.stateEpoch ?? null;
+        }
       }
       this.emit(event);
     });
@@ -291,6 +300,7 @@ export class ManagedGameClient {
 
   private handleConnectionLost(message: string): void {
     this.lastSeenStateVersion = null;
+    this.lastSeenStateEpoch = null;
     this.clearTransport();
 
     if (!this.shouldAutoReconnect()) {
@@ -822,6 +822,7 @@ describe("adaptProtocolServerEvent", () => {
         proficiencies: {}
       },
       state_version: 0,
+      state_epoch: "epoch-1",
       type: "state_snapshot",
       request_id: null
     });
@@ -831,6 +832,7 @@ describe("adaptProtocolServerEvent", () => {
     }
 
     const afterSnapshot = adaptProtocolServerEvent(initialSocketProtocolState, snapshotEvent);
+    expect(afterSnapshot.events[0]).toMatchObject({ stateVersion: 0, stateEpoch: "epoch-1" });
     const patchEvent = parseProtocolServerEvent({
       response_id: null,
       ops: [
@@ -986,6 +988,69 @@ describe("adaptProtocolServerEvent", () => {
     expect(adapted.nextProtocolState.backendState).not.toBe(originalBackendState);
   });
 
+  it("applies coalesced patches as one incremental snapshot covering every merged version", () => {
+    const snapshotEvent = parseProtocolServerEvent({
+      response_id: null,
+      state: {
+        instanced_sheets: {
+          instance_1: {
+            parent_id: "sheet_1",
+            health: 10,
+            mana: 4,
+            augments: {}
+          }
+        }
+      },
+      state_version: 3,
+      type: "state_snapshot",
+      request_id: null
+    });
+
+    if (!snapshotEvent || snapshotEvent.type !== "state_snapshot") {
+      throw new Error("Expected state_snapshot event");
+    }
+
+    const afterSnapshot = adaptProtocolServerEvent(initialSocketProtocolState, snapshotEvent);
+    const coalescedEvent = parseProtocolServerEvent({
+      response_id: null,
+      ops: [
+        { op: "set", path: "/instanced_sheets/instance_1/health", value: 6 },
+        { op: "inc", path: "/instanced_sheets/instance_1/mana", value: -1 }
+      ],
+      base_version: 3,
+      state_version: 6,
+      versions: [
+        { state_version: 4, request_id: "req-4" },
+        { state_version: 5, request_id: null },
+        { state_version: 6, request_id: "req-6" }
+      ],
+      type: "coalesced_state_patch",
+      request_id: "req-6"
+    });
+
+    if (!coalescedEvent || coalescedEvent.type !== "coalesced_state_patch") {
+      throw new Error("Expected coalesced_state_patch event");
+    }
+
+    const adapted = adaptProtocolServerEvent(afterSnapshot.nextProtocolState, coalescedEvent);
+    const snapshot = adapted.events[0];
+
+    expect(adapted.events).toHaveLength(1);
+    expect(snapshot).toMatchObject({
+      type: "snapshot",
+      stateVersion: 6,
+      baseVersion: 3,
+      incremental: true,
+      requestIds: ["req-4", "req-6"],
+      requestId: "req-6"
+    });
+    if (snapshot?.type !== "snapshot") {
+      throw new Error("Expected snapshot event");
+    }
+    expect(snapshot.snapshot.persistentSheets[0]?.value.health).toBe(6);
+    expect(snapshot.snapshot.persistentSheets[0]?.value.mana).toBe(3);
+  });
+
   it("acknowledges requests that completed without changing state", () => {
     const event = parseProtocolServerEvent({
       response_id: null,
@@ -1002,4 +1067,75 @@ describe("adaptProtocolServerEvent", () => {
       { type: "ack", requestId: "req-no-op" }
     ]);
   });
+
+  it("settles batch requests from their completion event", () => {
+    const committed = parseProtocolServerEvent({
+      response_id: null,
+      applied: true,
+      results: [
+        {
+          index: 0,
+          request_type: "adjust_instanced_sheet_resource",
+          request_id: "req-heal",
+          status: "applied",
+          reason: null
+        }
+      ],
+      state_version: 8,
+      type: "batch_completed",
+      request_id: "req-batch"
+    });
+    const rolledBack = parseProtocolServerEvent({
+      response_id: null,
+      applied: false,
+      results: [
+        {
+          index: 0,
+          request_type: "adjust_instanced_sheet_resource",
+          request_id: "req-heal",
+          status: "rolled_back",
+          reason: null
+        },
+        {
+          index: 1,
+          request_type: "adjust_instanced_sheet_resource",
+          request_id: "req-missing",
+          status: "failed",
+          reason: "Instance not found"
+        },
+        { index: 2, request_type: null, request_id: null, status: "skipped" }
+      ],
+      state_version: 8,
+      type: "batch_completed",
+      request_id: "req-batch"
+    });
+
+    if (committed?.type !== "batch_completed" || rolledBack?.type !== "batch_completed") {
+      throw new Error("Expected batch_completed events");
+    }
+    expect(rolledBack.results.map((result) => result.status)).toEqual([
+      "rolled_back",
+      "failed",
+      "skipped"
+    ]);
+    expect(adaptProtocolServerEvent(initialSocketProtocolState, committed).events).toEqual([
+      { type: "ack", requestId: "req-batch" }
+    ]);
+    expect(adaptProtocolServerEvent(initialSocketProtocolState, rolledBack).events).toEqual([
+      {
+        type: "error",
+        requestId: "req-batch",
+        message:
+          "Batch rolled back at request 2 (adjust_instanced_sheet_resource): Instance not found"
+      }
+    ]);
+    expect(
+      parseProtocolServerEvent({
+        applied: true,
+        results: [{ index: 0, status: "done" }],
+        state_version: 8,
+        type: "batch_completed"
+      })
+    ).toBeNull();
+  });
 });
@@ -11,6 +11,7 @@ import type {
 import { resolveCharacterProfile } from "@/features/sheets/characterProfile";
 import type {
   ProtocolBackendState,
+  ProtocolBatchItemResult,
   ProtocolPatchOperation,
   ProtocolServerEvent
 } from "@/infrastructure/ws/protocol";
@@ -270,6 +271,54 @@ function projectSnapshot(state: ProtocolBackendState): AppSnapshot {
   };
 }
 
+function adaptIncrementalPatch(
+  protocolState: SocketProtocolState,
+  ops: ProtocolPatchOperation[] | null,
+  versions: {
+    stateVersion: number;
+    baseVersion?: number;
+    requestIds?: string[];
+    requestId?: string;
+  }
+): { nextProtocolState: SocketProtocolState; events: ServerEvent[] } {
+  if (!protocolState.backendState) {
+    return {
+      nextProtocolState: protocolState,
+      events: [
+        {
+          type: "error",
+          requestId: versions.requestId,
+          message: "Received state patch before initial snapshot"
+        }
+      ]
+    };
+  }
+
+  const backendState = applyProtocolPatch(protocolState.backendState, ops);
+  return {
+    nextProtocolState: { backendState },
+    events: [
+      {
+        type: "snapshot",
+        snapshot: projectSnapshot(backendState),
+        incremental: true,
+        ...versions
+      }
+    ]
+  };
+}
+
+function describeBatchFailure(results: ProtocolBatchItemResult[]): string {
+  const failed = results.find((result) => result.status === "failed");
+  if (!failed) {
+    return "Batch rolled back.";
+  }
+  const request = `request ${failed.index + 1}${
+    failed.request_type ? ` (${failed.request_type})` : ""
+  }`;
+  return `Batch rolled back at ${request}: ${failed.reason ?? "request failed"}`;
+}
+
 export function adaptProtocolServerEvent(
   protocolState: SocketProtocolState,
   event: ProtocolServerEvent
@@ -298,6 +347,7 @@ export function adaptProtocolServerEvent(
             type: "snapshot",
             snapshot: projectSnapshot(backendState),
             stateVersion: event.state_version,
+            stateEpoch: event.state_epoch ?? undefined,
             incremental: false,
             requestId: event.request_id ?? undefined
           }
@@ -305,34 +355,21 @@ export function adaptProtocolServerEvent(
       };
     }
 
-    case "state_patch": {
-      if (!protocolState.backendState) {
-        return {
-          nextProtocolState: protocolState,
-          events: [
-            {
-              type: "error",
-              requestId: event.request_id ?? undefined,
-              message: "Received state patch before initial snapshot"
-            }
-          ]
-        };
-      }
-
-      const backendState = applyProtocolPatch(protocolState.backendState, event.ops ?? null);
-      return {
-        nextProtocolState: { backendState },
-        events: [
-          {
-            type: "snapshot",
-            snapshot: projectSnapshot(backendState),
-            stateVersion: event.state_version,
-            incremental: true,
-            requestId: event.request_id ?? undefined
-          }
-        ]
-      };
-    }
+    case "state_patch":
+      return adaptIncrementalPatch(protocolState, event.ops ?? null, {
+        stateVersion: event.state_version,
+        requestId: event.request_id ?? undefined
+      });
+
+    case "coalesced_state_patch":
+      return adaptIncrementalPatch(protocolState, event.ops, {
+        stateVersion: event.state_version,
+        baseVersion: event.base_version,
+        requestIds: event.versions.flatMap((version) =>
+          version.request_id ? [version.request_id] : []
+        ),
+        requestId: event.request_id ?? undefined
+      });
 
     case "action_executed":
       return {
@@ -489,6 +526,26 @@ export function adaptProtocolServerEvent(
         events: event.request_id ? [{ type: "ack", requestId: event.request_id }] : []
       };
 
+    case "batch_completed":
+      // A committed batch's state patch arrives first; this event settles the
+      // batch request either way, since a rolled-back batch sends no patch.
+      if (event.applied) {
+        return {
+          nextProtocolState: protocolState,
+          events: event.request_id ? [{ type: "ack", requestId: event.request_id }] : []
+        };
+      }
+      return {
+        nextProtocolState: protocolState,
+        events: [
+          {
+            type: "error",
+            requestId: event.request_id ?? undefined,
+            message: describeBatchFailure(event.results)
+          }
+        ]
+      };
+
     case "variable_registry":
       // Unreachable today: parseProtocolServerEvent has no `variable_registry`
       // case, so these events are rejected as invalid payloads before they get
@@ -4,8 +4,11 @@ import type {
   AuthenticateResponseEvent as ProtocolAuthenticateResponseEvent,
   AugmentationTargetMetadataEvent as ProtocolAugmentationTargetMetadataEvent,
   BackendStateSnapshotPayload as ProtocolBackendState,
+  BatchCompletedEvent as ProtocolBatchCompletedEvent,
+  BatchItemResultEvent as ProtocolBatchItemResult,
   ErrorEvent as ProtocolErrorEvent,
   PatchOperation as ProtocolPatchOperation,
+  PatchVersionEvent as ProtocolPatchVersion,
   ProtocolApplicationRequest,
   ProtocolServerEvent,
   Roll20BridgeStatusEvent as ProtocolRoll20BridgeStatusEvent,
@@ -24,8 +27,11 @@ export type {
   ProtocolApplicationRequest,
   ProtocolAuthenticateResponseEvent,
   ProtocolBackendState,
+  ProtocolBatchCompletedEvent,
+  ProtocolBatchItemResult,
   ProtocolErrorEvent,
   ProtocolPatchOperation,
+  ProtocolPatchVersion,
   ProtocolRoll20BridgeStatusEvent,
   ProtocolRoll20BridgeSyncConfigEvent,
   ProtocolSheetAccessCodesEvent,
@@ -55,6 +61,28 @@ function isPatchOperation(value: unknown): value is ProtocolPatchOperation {
   );
 }
 
+function isPatchVersion(value: unknown): value is ProtocolPatchVersion {
+  return (
+    isRecord(value) &&
+    typeof value.state_version === "number" &&
+    isNullableString(value.request_id)
+  );
+}
+
+function isBatchItemResult(value: unknown): value is ProtocolBatchItemResult {
+  return (
+    isRecord(value) &&
+    typeof value.index === "number" &&
+    (typeof value.request_type === "string" || value.request_type === null) &&
+    (typeof value.request_id === "string" || value.request_id === null) &&
+    (value.status === "applied" ||
+      value.status === "rolled_back" ||
+      value.status === "failed" ||
+      value.status === "skipped") &&
+    isNullableString(value.reason)
+  );
+}
+
 export function parseProtocolServerEvent(payload: unknown): ProtocolServerEvent | null {
   if (!isRecord(payload) || typeof payload.type !== "string") {
     return null;
@@ -96,6 +124,7 @@ export function parseProtocolServerEvent(payload: unknown): ProtocolServerEvent
               : null,
           state: payload.state as ProtocolBackendState,
           state_version: payload.state_version,
+          state_epoch: typeof payload.state_epoch === "string" ? payload.state_epoch : null,
           type: "state_snapshot",
           request_id:
             typeof payload.request_id === "string" || payload.request_id === null
@@ -127,6 +156,57 @@ export function parseProtocolServerEvent(payload: unknown): ProtocolServerEvent
       }
       return null;
 
+    case "coalesced_state_patch":
+      if (
+        typeof payload.base_version === "number" &&
+        typeof payload.state_version === "number" &&
+        Array.isArray(payload.ops) &&
+        payload.ops.every(isPatchOperation) &&
+        Array.isArray(payload.versions) &&
+        payload.versions.every(isPatchVersion)
+      ) {
+        return {
+          response_id:
+            typeof payload.response_id === "string" || payload.response_id === null
+              ? payload.response_id
+              : null,
+          ops: payload.ops,
+          base_version: payload.base_version,
+          state_version: payload.state_version,
+          versions: payload.versions,
+          type: "coalesced_state_patch",
+          request_id:
+            typeof payload.request_id === "string" || payload.request_id === null
+              ? payload.request_id
+              : undefined
+        };
+      }
+      return null;
+
+    case "batch_completed":
+      if (
+        typeof payload.applied === "boolean" &&
+        typeof payload.state_version === "number" &&
+        Array.isArray(payload.results) &&
+        payload.results.every(isBatchItemResult)
+      ) {
+        return {
+          response_id:
+            typeof payload.response_id === "string" || payload.response_id === null
+              ? payload.response_id
+              : null,
+          applied: payload.applied,
+          results: payload.results,
+          state_version: payload.state_version,
+          type: "batch_completed",
+          request_id:
+            typeof payload.request_id === "string" || payload.request_id === null
+              ? payload.request_id
+              : undefined
+        };
+      }
+      return null;
+
     case "request_completed":
       return {
         response_id:
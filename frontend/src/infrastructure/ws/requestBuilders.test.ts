@@ -78,6 +78,7 @@ import {
   buildDetachInstancedSheetAttributeRequest,
   buildPerformActionRequest,
   buildGenerateSheetAccessCodeRequest,
+  buildRequestBatchRequest,
   buildResyncStateRequest,
   buildResetInstancedSheetAttributeValueRequest,
   buildResetSheetAttributeValueRequest,
@@ -301,6 +302,7 @@ const requestBuilderByType = {
   attach_sheet_attribute: buildAttachSheetAttributeRequest,
   attach_subject_attribute: buildAttachSubjectAttributeRequest,
   authenticate: buildAuthenticateRequest,
+  batch: buildRequestBatchRequest,
   claim_sheet_access_code: buildClaimSheetAccessCodeRequest,
   create_action: buildCreateActionRequest,
   create_catalog_folder: buildCreateCatalogFolderRequest,
@@ -533,10 +535,49 @@ describe("requestBuilders", () => {
       type: "resync_state",
       last_seen_version: 12
     });
+    expect(
+      buildResyncStateRequest({
+        requestId: "req-resync",
+        lastSeenVersion: 12,
+        lastSeenEpoch: "epoch-1"
+      })
+    ).toEqual({
+      request_id: "req-resync",
+      type: "resync_state",
+      last_seen_version: 12,
+      last_seen_epoch: "epoch-1"
+    });
     expect(buildUndoLastStateChangeRequest({ requestId: "req-undo" })).toEqual({
       request_id: "req-undo",
       type: "undo_last_state_change"
     });
+    expect(
+      buildRequestBatchRequest({
+        requestId: "req-batch",
+        requests: [
+          buildSetInstancedSheetResourceRequest({
+            instanceId: "instance-1",
+            resource: "health",
+            value: 8,
+            requestId: "req-health"
+          }),
+          buildUndoLastStateChangeRequest()
+        ]
+      })
+    ).toEqual({
+      request_id: "req-batch",
+      type: "batch",
+      requests: [
+        {
+          request_id: "req-health",
+          type: "set_instanced_sheet_resource",
+          instance_id: "instance-1",
+          resource: "health",
+          value: 8
+        },
+        { type: "undo_last_state_change" }
+      ]
+    });
   });
 
   it("builds state backup requests", () => {
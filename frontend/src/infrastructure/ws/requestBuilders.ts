@@ -2058,14 +2058,30 @@ export function buildPerformActionRequest({
 
 export function buildResyncStateRequest({
   lastSeenVersion,
+  lastSeenEpoch,
   requestId
 }: {
   lastSeenVersion?: number | null;
+  lastSeenEpoch?: string | null;
 } & OptionalRequestId = {}): ProtocolRequest<"resync_state"> {
   return {
     ...requestIdField(requestId),
     type: "resync_state",
-    ...(lastSeenVersion === undefined ? {} : { last_seen_version: lastSeenVersion })
+    ...(lastSeenVersion === undefined ? {} : { last_seen_version: lastSeenVersion }),
+    ...(lastSeenEpoch === undefined ? {} : { last_seen_epoch: lastSeenEpoch })
+  };
+}
+
+export function buildRequestBatchRequest({
+  requests,
+  requestId
+}: {
+  requests: ProtocolApplicationRequest[];
+} & OptionalRequestId): ProtocolRequest<"batch"> {
+  return {
+    ...requestIdField(requestId),
+    type: "batch",
+    requests
   };
 }
 